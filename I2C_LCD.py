@@ -27,6 +27,12 @@ class I2CLcd(LcdApi):
         self.i2c_addr = i2c_addr
         self.backlight = 1  # 1 = AN, 0 = AUS
 
+        # Vorallokierte Sendepuffer: 1 Byte (Einzel-Write), 4 Byte pro Zeichen
+        # (High-Nibble E=1/E=0, Low-Nibble E=1/E=0) fuer eine ganze Zeile
+        self._byte_buf = bytearray(1)
+        self._seq_buf = bytearray(4 * min(40, num_columns))
+        self._seq_mv = memoryview(self._seq_buf)
+
         self._write(0x00)  # alle Pins Low
         sleep_ms(20)
 
@@ -64,12 +70,27 @@ class I2CLcd(LcdApi):
     # --------------------------------------------------------------
     def _write(self, byte):
         """I²C-Write mit einfachem OSError-Catch (Bus haengt)."""
+        self._byte_buf[0] = byte
+        self._write_buf(self._byte_buf)
+
+    def _write_buf(self, buf):
+        """Mehrere PCF8574-Zustaende in einem Transfer (werden nacheinander gelatcht)."""
         try:
-            self.i2c.writeto(self.i2c_addr, bytearray([byte]))
+            self.i2c.writeto(self.i2c_addr, buf)
         except OSError:
             # kurzer Bus-Stall – in der Praxis reicht ein µs-Delay
             sleep_ms(1)
-            self.i2c.writeto(self.i2c_addr, bytearray([byte]))
+            self.i2c.writeto(self.i2c_addr, buf)
+
+    def _fill_strobes(self, offset, value, flags):
+        """Traegt die 4 Strobe-Bytes fuer ein Byte (2 Nibbles) ab offset ein."""
+        seq = self._seq_buf
+        high = flags | (((value >> 4) & 0x0F) << SHIFT_DATA)
+        low = flags | ((value & 0x0F) << SHIFT_DATA)
+        seq[offset] = high | MASK_E
+        seq[offset + 1] = high
+        seq[offset + 2] = low | MASK_E
+        seq[offset + 3] = low
 
     def _hal_write_init_nibble(self, nibble):
         """Nur waehrend des Resets verwendet."""
@@ -83,28 +104,23 @@ class I2CLcd(LcdApi):
     #   oeffentliche HAL-Funktionen fuer LcdApi
     # --------------------------------------------------------------
     def hal_write_command(self, cmd):
-        high = (((cmd >> 4) & 0x0F) << SHIFT_DATA) | (self.backlight << SHIFT_BACKLIGHT)
-        low = (((cmd) & 0x0F) << SHIFT_DATA) | (self.backlight << SHIFT_BACKLIGHT)
-
-        for half in (high, low):
-            self._write(half | MASK_E)
-            self._write(half)
+        self._fill_strobes(0, cmd, self.backlight << SHIFT_BACKLIGHT)
+        self._write_buf(self._seq_mv[:4])
 
         if cmd <= 3:  # HOME / CLEAR
             sleep_ms(5)
 
     def hal_write_data(self, data):
-        high = (
-            MASK_RS
-            | (self.backlight << SHIFT_BACKLIGHT)
-            | (((data >> 4) & 0x0F) << SHIFT_DATA)
-        )
-        low = (
-            MASK_RS
-            | (self.backlight << SHIFT_BACKLIGHT)
-            | ((data & 0x0F) << SHIFT_DATA)
-        )
-
-        for half in (high, low):
-            self._write(half | MASK_E)
-            self._write(half)
+        self._fill_strobes(0, data, MASK_RS | (self.backlight << SHIFT_BACKLIGHT))
+        self._write_buf(self._seq_mv[:4])
+
+    def hal_write_data_bulk(self, buf, start, end):
+        """Ganze Zeichenfolge als eine Strobe-Sequenz in einem writeto senden."""
+        flags = MASK_RS | (self.backlight << SHIFT_BACKLIGHT)
+        per_transfer = len(self._seq_buf) // 4
+        while start < end:
+            count = min(per_transfer, end - start)
+            for i in range(count):
+                self._fill_strobes(i * 4, buf[start + i], flags)
+            self._write_buf(self._seq_mv[:count * 4])
+            start += count
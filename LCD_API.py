@@ -46,6 +46,11 @@ class LcdApi:
         self.cursor_y = 0
         self.backlight = 1  # int, nicht bool (Kompat. zu shifts)
 
+        # Framebuffer: _fb = Soll-Inhalt, _glass = was tatsaechlich angezeigt wird
+        size = self.num_lines * self.num_columns
+        self._fb = bytearray(b" " * size)
+        self._glass = bytearray(b" " * size)
+
         self.display_off()
         self.backlight_on()
         self.clear()
@@ -61,6 +66,9 @@ class LcdApi:
         self.hal_write_command(self.LCD_CLR)  # 4.1 ms delay in HAL
         self.cursor_x = 0
         self.cursor_y = 0
+        for i in range(len(self._glass)):
+            self._glass[i] = 0x20
+            self._fb[i] = 0x20
 
     # --- Cursor Sichtbarkeit -----------------------------------------
     def show_cursor(self):
@@ -115,7 +123,13 @@ class LcdApi:
 
     def putchar(self, char):
         if char != "\n":
-            self.hal_write_data(ord(char))
+            code = ord(char) & 0xFF
+            self.hal_write_data(code)
+            # Direkte Ausgabe im Framebuffer nachfuehren, damit flush() sie nicht ueberschreibt
+            if self.cursor_x < self.num_columns:
+                pos = self.cursor_y * self.num_columns + self.cursor_x
+                self._glass[pos] = code
+                self._fb[pos] = code
             self.cursor_x += 1
         if self.cursor_x >= self.num_columns or char == "\n":
             self.cursor_x = 0
@@ -126,9 +140,91 @@ class LcdApi:
         """
         Schreibt String auf das LCD, maximal _max Zeichen
         (Schutz gegen versehentliche Riesen-Strings).
+        Zeichen bis zum Zeilenende gehen als ein Block an hal_write_data_bulk.
         """
-        for char in string[:_max]:
-            self.putchar(char)
+        string = string[:_max]
+        cols = self.num_columns
+        i = 0
+        n = len(string)
+        while i < n:
+            room = cols - self.cursor_x
+            if string[i] == "\n" or room <= 0:
+                self.putchar(string[i])
+                i += 1
+                continue
+            j = i
+            pos = self.cursor_y * cols + self.cursor_x
+            while j < n and j - i < room and string[j] != "\n":
+                code = ord(string[j]) & 0xFF
+                self._glass[pos + j - i] = code
+                self._fb[pos + j - i] = code
+                j += 1
+            self.hal_write_data_bulk(self._glass, pos, pos + j - i)
+            self.cursor_x += j - i
+            i = j
+            if self.cursor_x >= cols:
+                self.cursor_x = 0
+                self.cursor_y = (self.cursor_y + 1) % self.num_lines
+                self.move_to(self.cursor_x, self.cursor_y)
+
+    # -----------------------------------------------------------------
+    #   Framebuffer (Dirty-Region-Update ohne clear)
+    # -----------------------------------------------------------------
+    def clear_buffer(self):
+        """Leert nur den Framebuffer – das Display aendert sich erst mit flush()."""
+        for i in range(len(self._fb)):
+            self._fb[i] = 0x20
+
+    def write_at(self, x, y, text):
+        """Schreibt text ab (x, y) in den Framebuffer (wird am Zeilenende abgeschnitten)."""
+        if not 0 <= y < self.num_lines or x >= self.num_columns:
+            return
+        row = y * self.num_columns
+        for char in text:
+            if x >= self.num_columns:
+                break
+            if x >= 0:
+                self._fb[row + x] = ord(char) & 0xFF
+            x += 1
+
+    def flush(self):
+        """
+        Sendet nur die geaenderten Zeichen-Runs (je ein move_to pro Run).
+        Luecken von einem Zeichen werden mitgesendet – das kostet genauso viel
+        wie ein weiterer move_to. Gibt die Anzahl gesendeter Zeichen zurueck.
+        """
+        fb = self._fb
+        glass = self._glass
+        cols = self.num_columns
+        sent = 0
+        for y in range(self.num_lines):
+            row = y * cols
+            x = 0
+            while x < cols:
+                if fb[row + x] == glass[row + x]:
+                    x += 1
+                    continue
+                start = x
+                end = x + 1
+                x += 1
+                while x < cols:
+                    if fb[row + x] != glass[row + x]:
+                        end = x + 1
+                    elif x - end >= 1:
+                        break
+                    x += 1
+                self.move_to(start, y)
+                self.hal_write_data_bulk(fb, row + start, row + end)
+                for i in range(row + start, row + end):
+                    glass[i] = fb[i]
+                sent += end - start
+                self.cursor_x = end
+                if end >= cols:
+                    # Run bis zum Zeilenende: wie putstr() in die naechste Zeile umbrechen
+                    self.cursor_x = 0
+                    self.cursor_y = (y + 1) % self.num_lines
+                    self.move_to(self.cursor_x, self.cursor_y)
+        return sent
 
     # -----------------------------------------------------------------
     #   CGRAM / Custom Characters
@@ -163,5 +259,10 @@ class LcdApi:
     def hal_write_data(self, data):
         raise NotImplementedError
 
+    def hal_write_data_bulk(self, buf, start, end):
+        """Schreibt buf[start:end] als Daten; HALs koennen das in einem Transfer buendeln."""
+        for i in range(start, end):
+            self.hal_write_data(buf[i])
+
     def hal_sleep_us(self, usecs):
         time.sleep_us(usecs)
@@ -0,0 +1,126 @@
+# alarm_ringer.py
+"""
+Nicht-blockierendes Klingeln als Zustandsautomat.
+
+tick() wird vom Scheduler der Hauptschleife aufgerufen (alle TICK_MS) und
+schaltet Noten, LED-Blinken und Stop-Erkennung anhand von ticks_ms-Deadlines.
+Eine Note blockiert die Schleife nie; ein Stopp greift spaetestens nach einem
+Tick. Die Hardware wird ueber Callbacks angesprochen (PWM, LEDs, Joystick).
+"""
+import utime
+from log_utils import log_message
+
+IDLE = 0
+RINGING = 1
+
+
+class AlarmRinger:
+    TICK_MS = 20
+    LED_PERIOD_MS = 300
+    MAX_DURATION_MS = 900 * 1000
+
+    def __init__(self, melody, tone, leds, stop_requested, on_start=None, on_stop=None,
+                 log_path=None, clock=None):
+        """
+        melody: flaches array('H') (Frequenz, Dauer_ms, ...); 0 Hz = Pause, wird endlos wiederholt
+        tone(freq, volume): PWM setzen (freq 0 = still)
+        leds(cycle): Blinkphase 0/1 anzeigen (None = LEDs werden anderweitig animiert)
+        stop_requested(): True, wenn der Benutzer abbricht (Joystick/Taster)
+        on_start(idx, text) / on_stop(idx, text, manuell): Anzeige auf- und abbauen
+        """
+        self.melody = melody
+        self._tone = tone
+        self._leds = leds
+        self._stop_requested = stop_requested
+        self._on_start = on_start
+        self._on_stop = on_stop
+        self.log_path = log_path
+        self._clock = clock or utime.ticks_ms
+        self.state = IDLE
+        self.idx = None
+        self.text = None
+        self.volume = 0
+        self._pending = []      # weitere faellige Alarme (idx, text, volume)
+        self._note = 0
+        self._note_deadline = 0
+        self._led_cycle = 0
+        self._led_deadline = 0
+        self._end_deadline = 0
+
+    @property
+    def active(self):
+        return self.state == RINGING
+
+    # --------------------------------------------------------------
+    #   Steuerung
+    # --------------------------------------------------------------
+    def start(self, idx, text, volume):
+        """Startet einen Alarm; klingelt schon einer, wird der neue danach gespielt."""
+        if self.state == RINGING:
+            if idx != self.idx and all(p[0] != idx for p in self._pending):
+                self._pending.append((idx, text, volume))
+            return
+        now = self._clock()
+        self.state = RINGING
+        self.idx, self.text, self.volume = idx, text, volume
+        self._note = 0
+        self._note_deadline = now
+        self._led_cycle = 0
+        self._led_deadline = now
+        self._end_deadline = utime.ticks_add(now, self.MAX_DURATION_MS)
+        if self._on_start:
+            self._on_start(idx, text)
+
+    def stop(self, manual=False):
+        """Beendet den aktuellen Alarm (PWM aus, Anzeige zuruecksetzen)."""
+        if self.state != RINGING:
+            return
+        self.state = IDLE
+        try:
+            self._tone(0, 0)
+        except Exception as e:
+            log_message(self.log_path, "[Alarm] PWM-Stop Fehler: {}".format(str(e)))
+        if self._on_stop:
+            self._on_stop(self.idx, self.text, manual)
+        if manual:
+            self._pending = []  # ein Stopp beendet auch die wartenden Alarme
+        elif self._pending:
+            self.start(*self._pending.pop(0))
+
+    # --------------------------------------------------------------
+    #   Tick
+    # --------------------------------------------------------------
+    def tick(self):
+        """Ein Schritt des Automaten. Gibt False zurueck, sobald nichts mehr klingelt."""
+        if self.state != RINGING:
+            return False
+        now = self._clock()
+        try:
+            if self._stop_requested():
+                self.stop(manual=True)
+                return self.active
+            if utime.ticks_diff(now, self._end_deadline) >= 0:
+                log_message(self.log_path, "[Alarm] Maximale Dauer erreicht - Index {}".format(self.idx))
+                self.stop()
+                return self.active
+
+            if utime.ticks_diff(now, self._note_deadline) >= 0:
+                melody = self.melody
+                freq, duration = melody[self._note], melody[self._note + 1]
+                self._tone(freq, self.volume)
+                self._note = (self._note + 2) % len(melody)
+                # relativ zur alten Deadline → kein Drift im Rhythmus
+                self._note_deadline = utime.ticks_add(self._note_deadline, duration)
+                if utime.ticks_diff(now, self._note_deadline) >= 0:
+                    self._note_deadline = utime.ticks_add(now, duration)
+
+            if self._leds and utime.ticks_diff(now, self._led_deadline) >= 0:
+                self._leds(self._led_cycle)
+                self._led_cycle ^= 1
+                self._led_deadline = utime.ticks_add(self._led_deadline, self.LED_PERIOD_MS)
+                if self._leds and utime.ticks_diff(now, self._led_deadline) >= 0:
+                    self._led_deadline = utime.ticks_add(now, self.LED_PERIOD_MS)
+        except Exception as e:
+            log_message(self.log_path, "[Alarm Fehler] {}".format(str(e)))
+            self.stop()
+        return self.active
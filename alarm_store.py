@@ -0,0 +1,352 @@
+# alarm_store.py
+"""
+Gemeinsames Alarm-Modell fuer Uhr, Webserver und Boot: eine Alarmliste im RAM,
+einmal beim Start geladen; Aenderungen laufen ueber commit() und werden an
+alle Abonnenten (subscribe) gemeldet.
+
+Speicher: kompaktes Binaerformat mit CRC32 plus lesbarer alarm.txt.
+
+alarm.txt bleibt die von Hand editierbare Quelle (TIME/TEXT/DAYS/STATUS/---).
+Daneben liegt alarms.bin: 20-Byte-Header, pro Alarm ein 8-Byte-Record und ein
+gemeinsamer Textblock. Geladen wird mit einem readinto() in einen festen
+Puffer. Der Header merkt sich Groesse und mtime der alarm.txt, aus der er
+entstanden ist – wurde die Textdatei danach geaendert, wird sie neu importiert.
+
+Alarm.days: Bit 0 = So … Bit 6 = Sa (wie der Wochentag der Uhr).
+"""
+import os
+import struct
+from log_utils import log_message
+
+try:
+    from binascii import crc32
+except ImportError:
+    def crc32(data, crc=0):
+        crc ^= 0xFFFFFFFF
+        for byte in data:
+            crc ^= byte
+            for _ in range(8):
+                crc = (crc >> 1) ^ (0xEDB88320 if crc & 1 else 0)
+        return crc ^ 0xFFFFFFFF
+
+# --------------------------------------------------------------------
+#   Format
+# --------------------------------------------------------------------
+TEXT_PATH = "/sd/alarm.txt"
+BIN_PATH = "/sd/alarms.bin"
+MAX_ALARMS = 5   # fuenf Bloecke im Web-Formular
+MAX_TEXT_CHARS = 32
+
+_MAGIC = b"NWA1"
+_VERSION = 1
+_HDR_FMT = "<4sBBHIII"   # Magic, Version, Anzahl, Textlaenge, Quell-Groesse, Quell-mtime, CRC32
+_HDR_SIZE = struct.calcsize(_HDR_FMT)
+_REC_FMT = "<BBBBHBx"    # Stunde, Minute, Tage-Maske, Flags, Text-Offset, Text-Laenge
+_REC_SIZE = struct.calcsize(_REC_FMT)
+_FLAG_ACTIVE = 0x01
+
+# Groesste moegliche Datei: UTF-8 braucht hoechstens 4 Byte pro Zeichen
+_buf = bytearray(_HDR_SIZE + MAX_ALARMS * (_REC_SIZE + 4 * MAX_TEXT_CHARS))
+
+_DAY_BITS = ("So", "Mo", "Di", "Mi", "Do", "Fr", "Sa")
+_DAY_ORDER = (1, 2, 3, 4, 5, 6, 0)   # Mo … So fuer Textdatei und Web
+ALL_DAYS = 0x7F
+
+
+def days_to_mask(names):
+    mask = 0
+    for name in names:
+        if name in _DAY_BITS:
+            mask |= 1 << _DAY_BITS.index(name)
+    return mask
+
+
+def mask_to_days(mask):
+    """Tagesnamen in der Reihenfolge Mo … So."""
+    return [_DAY_BITS[bit] for bit in _DAY_ORDER if mask & (1 << bit)]
+
+
+class Alarm:
+    __slots__ = ("hour", "minute", "days", "active", "text")
+
+    def __init__(self, hour, minute, days=0, active=True, text="Kein Text"):
+        self.hour = hour
+        self.minute = minute
+        self.days = days & ALL_DAYS
+        self.text = text[:MAX_TEXT_CHARS]
+        # Ohne Wochentag kann ein Alarm nie klingeln → immer inaktiv
+        self.active = bool(active) and bool(self.days)
+
+    def __eq__(self, other):
+        return (isinstance(other, Alarm) and self.hour == other.hour and self.minute == other.minute
+                and self.days == other.days and self.active == other.active and self.text == other.text)
+
+    def __repr__(self):
+        return "Alarm({}, {}, {})".format(self.time_str(), ','.join(self.day_names()) or '-',
+                                          "aktiv" if self.active else "inaktiv")
+
+    def minute_of_day(self):
+        return self.hour * 60 + self.minute
+
+    def time_str(self):
+        return "{:02d}:{:02d}".format(self.hour, self.minute)
+
+    def day_names(self):
+        return mask_to_days(self.days)
+
+    def rings_on(self, wtag):
+        """True, wenn der Alarm am Wochentag wtag (0 = So) klingelt."""
+        return self.active and bool(self.days & (1 << wtag))
+
+
+# --------------------------------------------------------------------
+#   Binaerformat
+# --------------------------------------------------------------------
+def encode(alarms, stamp=(0, 0)):
+    """Alarme → Bytes von alarms.bin. stamp = (Groesse, mtime) der Quell-alarm.txt."""
+    alarms = alarms[:MAX_ALARMS]
+    body = bytearray(len(alarms) * _REC_SIZE)
+    texts = bytearray()
+    for i, alarm in enumerate(alarms):
+        raw = alarm.text.encode()
+        struct.pack_into(_REC_FMT, body, i * _REC_SIZE, alarm.hour, alarm.minute, alarm.days,
+                         _FLAG_ACTIVE if alarm.active else 0, len(texts), len(raw))
+        texts += raw
+    payload = bytes(body) + bytes(texts)
+    header = struct.pack(_HDR_FMT, _MAGIC, _VERSION, len(alarms), len(texts),
+                         stamp[0] & 0xFFFFFFFF, stamp[1] & 0xFFFFFFFF, crc32(payload) & 0xFFFFFFFF)
+    return header + payload
+
+
+def decode(buf, n, stamp=None):
+    """
+    Alarme aus buf[:n] oder None (fehlt/beschaedigt/veraltet).
+    stamp: (Groesse, mtime) der aktuellen alarm.txt; None = nicht pruefen.
+    """
+    if n < _HDR_SIZE:
+        return None
+    magic, version, count, text_len, src_size, src_mtime, crc = struct.unpack_from(_HDR_FMT, buf, 0)
+    if magic != _MAGIC or version != _VERSION or count > MAX_ALARMS:
+        return None
+    text_base = _HDR_SIZE + count * _REC_SIZE
+    if text_base + text_len != n:
+        return None
+    mv = memoryview(buf)
+    if crc32(mv[_HDR_SIZE:n]) & 0xFFFFFFFF != crc:
+        return None
+    if stamp is not None and (src_size, src_mtime) != (stamp[0] & 0xFFFFFFFF, stamp[1] & 0xFFFFFFFF):
+        return None
+
+    alarms = []
+    for i in range(count):
+        stunde, minute, mask, flags, off, length = struct.unpack_from(_REC_FMT, buf, _HDR_SIZE + i * _REC_SIZE)
+        if off + length > text_len:
+            return None
+        text = bytes(mv[text_base + off:text_base + off + length]).decode()
+        alarms.append(Alarm(stunde, minute, mask, flags & _FLAG_ACTIVE, text))
+    return alarms
+
+
+# --------------------------------------------------------------------
+#   Textformat (alarm.txt)
+# --------------------------------------------------------------------
+def _alarm_from_fields(alarm, log_path=None):
+    if not all(k in alarm for k in ("TIME", "TEXT", "DAYS", "STATUS")):
+        return None
+    try:
+        stunde, minute = map(int, alarm["TIME"].split(":"))
+        if not (0 <= stunde <= 23 and 0 <= minute <= 59):
+            raise ValueError
+    except (ValueError, AttributeError):
+        log_message(log_path, "[Alarme Laden] Ungueltige Alarmzeit: {}".format(alarm.get('TIME')))
+        return None
+    aktiv = alarm["STATUS"].strip().lower() == "aktiv"
+    # DAYS=- : von Hand "jeden Tag" (aktiv), vom Web "keine Tage" (immer inaktiv)
+    if alarm["DAYS"] == "-":
+        mask = ALL_DAYS if aktiv else 0
+    else:
+        mask = days_to_mask(alarm["DAYS"].split(","))
+    return Alarm(stunde, minute, mask, aktiv, alarm["TEXT"])
+
+
+def parse_text(lines, log_path=None):
+    """Parst alarm.txt-Zeilen; ein letzter Block ohne '---' zaehlt mit."""
+    alarms, fields = [], {}
+    for line in lines:
+        line = line.strip()
+        if line == "---":
+            alarm = _alarm_from_fields(fields, log_path)
+            if alarm:
+                alarms.append(alarm)
+            fields = {}
+        elif "=" in line:
+            key, value = line.split("=", 1)
+            fields[key.strip()] = value.strip()
+    alarm = _alarm_from_fields(fields, log_path)
+    if alarm:
+        alarms.append(alarm)
+    if len(alarms) > MAX_ALARMS:
+        log_message(log_path, "[Alarme] {} Alarme in alarm.txt, nur {} werden genutzt".format(len(alarms), MAX_ALARMS))
+    return alarms[:MAX_ALARMS]
+
+
+def format_text(alarms):
+    """Alarme → Inhalt von alarm.txt."""
+    out = []
+    for alarm in alarms[:MAX_ALARMS]:
+        out.append("TIME={}\nTEXT={}\nDAYS={}\nSTATUS={}\n---\n".format(
+            alarm.time_str(), alarm.text, ','.join(alarm.day_names()) or '-',
+            "Aktiv" if alarm.active else "Inaktiv"))
+    return "".join(out)
+
+
+# --------------------------------------------------------------------
+#   Laden / Speichern
+# --------------------------------------------------------------------
+def _stamp(path):
+    """(Groesse, mtime) einer Datei oder None, wenn sie fehlt."""
+    try:
+        st = os.stat(path)
+        return (st[6], int(st[8]))
+    except OSError:
+        return None
+
+
+def _replace(tmp_path, path):
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        os.rename(tmp_path, path)
+
+
+def _write_atomic(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb" if isinstance(data, (bytes, bytearray)) else "w") as f:
+        f.write(data)
+        f.flush()
+    _replace(tmp_path, path)
+
+
+def _read_binary(bin_path, stamp):
+    try:
+        with open(bin_path, "rb") as f:
+            n = f.readinto(_buf)
+    except OSError:
+        return None
+    return decode(_buf, n, stamp)
+
+
+def load(text_path=TEXT_PATH, bin_path=BIN_PATH, log_path=None):
+    """
+    Laedt alle Alarme. Normalfall: ein readinto() von alarms.bin. Fehlt die
+    Binaerdatei, ist sie beschaedigt oder wurde alarm.txt von Hand geaendert,
+    wird der Text importiert und alarms.bin neu geschrieben (Migration).
+    """
+    stamp = _stamp(text_path)
+    alarms = _read_binary(bin_path, stamp)
+    if alarms is not None:
+        return alarms
+    if stamp is None:
+        return []
+
+    try:
+        with open(text_path, "r") as f:
+            alarms = parse_text(f, log_path)
+    except Exception as e:
+        log_message(log_path, "[Alarme Laden Fehler] {}".format(str(e)))
+        return []
+    try:
+        _write_atomic(bin_path, encode(alarms, stamp))
+        log_message(log_path, "[Alarme] {} aus alarm.txt importiert".format(len(alarms)))
+    except Exception as e:
+        log_message(log_path, "[Alarme] alarms.bin nicht geschrieben: {}".format(str(e)))
+    return alarms
+
+
+def save(alarms, text_path=TEXT_PATH, bin_path=BIN_PATH, log_path=None):
+    """Schreibt alarm.txt (Export) und alarms.bin, beide atomar. False bei Fehler."""
+    alarms = alarms[:MAX_ALARMS]
+    try:
+        _write_atomic(text_path, format_text(alarms))
+        _write_atomic(bin_path, encode(alarms, _stamp(text_path) or (0, 0)))
+    except Exception as e:
+        log_message(log_path, "[Alarme] Speichern fehlgeschlagen: {}".format(str(e)))
+        return False
+    try:
+        os.sync()
+    except Exception:
+        pass
+    return True
+
+
+# --------------------------------------------------------------------
+#   Gemeinsame Alarmliste + Aenderungsmeldungen
+# --------------------------------------------------------------------
+_alarms = None      # None = noch nicht geladen
+_listeners = []
+
+
+def subscribe(func):
+    """func(alarms) wird nach jedem reload()/commit() mit der neuen Liste aufgerufen."""
+    _listeners.append(func)
+
+
+def _notify(log_path=None):
+    for func in _listeners:
+        try:
+            func(_alarms)
+        except Exception as e:
+            log_message(log_path, "[Alarme] Abonnent-Fehler: {}".format(str(e)))
+
+
+def alarms(log_path=None):
+    """Gemeinsame Liste (Index = Alarm-ID). Nicht veraendern – Aenderungen ueber commit()."""
+    if _alarms is None:
+        reload(log_path)
+    return _alarms
+
+
+def reload(log_path=None):
+    """Liest die SD neu (Boot, von Hand geaenderte alarm.txt) und meldet das Ergebnis."""
+    global _alarms
+    _alarms = load(log_path=log_path)
+    _notify(log_path)
+    return _alarms
+
+
+def commit(new_alarms, log_path=None):
+    """Speichert und uebernimmt eine neue Liste. False bei Schreibfehler (alte Liste bleibt)."""
+    global _alarms
+    new_alarms = list(new_alarms[:MAX_ALARMS])
+    if not save(new_alarms, log_path=log_path):
+        return False
+    _alarms = new_alarms
+    _notify(log_path)
+    return True
+
+
+def count_active():
+    return sum(1 for alarm in alarms() if alarm.active)
+
+
+def by_weekday(alarm_list=None):
+    """Pro Wochentag (0 = So) die Indizes der dort klingelnden Alarme, nach Uhrzeit sortiert."""
+    if alarm_list is None:
+        alarm_list = alarms()
+    result = [[] for _ in range(7)]
+    for idx, alarm in enumerate(alarm_list):
+        for wtag in range(7):
+            if alarm.rings_on(wtag):
+                result[wtag].append(idx)
+    for idxs in result:
+        idxs.sort(key=lambda i: alarm_list[i].minute_of_day())
+    return result
+
+
+def serialize(alarm_list=None):
+    """Textform (alarm.txt) der aktuellen Liste."""
+    return format_text(alarms() if alarm_list is None else alarm_list)
@@ -1,10 +1,21 @@
 import os
 import time
 import utime
+from array import array
 from machine import ADC, Pin
 
 from time_config import aktualisiere_zeit, synchronisiere_zeit
-from log_utils import log_message, log_important, log_once_per_day, log_alarm_event, log_config_change, log_startup
+from log_utils import (
+    log_message,
+    log_important,
+    log_once_per_day,
+    log_alarm_event,
+    log_config_change,
+    log_startup,
+    log_raw,
+    flush_log,
+    flush_log_if_due,
+)
 import sound_config as sc
 from sound_config import adjust_volume, fuer_elise
 from joystick import get_joystick_direction
@@ -18,6 +29,8 @@ from power_management import (
     get_display_schedule,
     get_display_state,
     set_display_state,
+    flush_settings,
+    get_web_server_mode,
 )
 from recovery_manager import init_recovery_system, feed_watchdog, check_system_health, activity_heartbeat
 from memory_monitor import monitor_memory, emergency_cleanup, check_and_cleanup_low_memory
@@ -25,9 +38,20 @@ from webserver_program import (
     start_webserver_and_show_ip,
     stop_webserver,
     handle_website_connection,
+    start_async_webserver,
+    stop_async_webserver,
 )
 from recovery_manager import feed_watchdog
 from crash_guard import set_stage
+from scheduler import Scheduler
+from alarm_ringer import AlarmRinger
+from led_animation import LedAnimator, blink, hour_leds
+import alarm_store
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    asyncio = None  # Firmware ohne uasyncio -> Poll-Modus
 
 #-----------------------------------------------------------------
 # Globale Variablen / Defaults
@@ -40,7 +64,19 @@ sensor = ADC(4)
 weckzeiten = []
 weckstatus = []
 
+# Vorkompilierter Alarm-Index: pro Wochentag (0 = So) ein sortiertes array('H')
+# mit Eintraegen (Minute_des_Tages << 4) | Alarm-Index (max. 10 Alarme)
+_WOCHENTAGE = ("So", "Mo", "Di", "Mi", "Do", "Fr", "Sa")
+_alarm_index = [array("H") for _ in range(7)]
+_alarm_index_src = None      # weckzeiten-Liste, aus der der Index gebaut wurde
+_alarm_check_key = None      # (Wochentag, Minute des Tages) der letzten Kandidatensuche
+_alarm_candidates = ()       # Alarm-Indizes im Ausloesefenster dieser Minute
+
 reset_threshold = 2  # Sekunden
+
+# Hauptschleife: Uhr-Tick und Eingabe-Polling (Scheduler-Intervalle)
+_CLOCK_TICK_MS = 200   # Vielfaches von _INPUT_POLL_MS → faellt auf einen Poll-Wakeup
+_INPUT_POLL_MS = 100
 last_minute = None
 last_sync_day = None
 rtc_status_logged = False
@@ -67,61 +103,37 @@ except Exception as e:
 # --------------------------------------------------------------------
 # Funktionen
 # --------------------------------------------------------------------
-def lade_alarme_von_datei_new_format(pfad="/sd/alarm.txt", log_path=None):
-    """Parst Alarm-Datei; DAYS = '-' → jeden Tag."""
-    alarme = []
-    try:
-        if "sd" not in os.listdir("/"):
-            log_message(log_path, "[Alarme Laden] SD-Karte nicht gefunden.")
-            return alarme
-        with open(pfad, "r") as f:
-            alarm = {}
-            for line in f:
-                line = line.strip()
-                if line == "---":
-                    if all(k in alarm for k in ("TIME", "TEXT", "DAYS", "STATUS")):
-                        try:
-                            stunde, minute = map(int, alarm["TIME"].split(":"))
-                        except (ValueError, AttributeError):
-                            log_message(
-                                log_path,
-                                "[Alarme Laden] Ungueltige Alarmzeit: {}".format(alarm.get('TIME')),
-                            )
-                            alarm = {}
-                            continue
-                        if alarm["DAYS"] == "-":
-                            tage = ["So", "Mo", "Di", "Mi", "Do", "Fr", "Sa"]
-                        else:
-                            tage = alarm["DAYS"].split(",")
-                        if alarm["STATUS"].strip().lower() == "aktiv":
-                            alarme.append((stunde, minute, alarm["TEXT"], tage))
-                    alarm = {}
-                elif "=" in line:
-                    key, value = line.split("=", 1)
-                    alarm[key.strip()] = value.strip()
-    except Exception as e:
-        log_message(log_path, "[Alarme Laden Fehler] {}".format(str(e)))
-    return alarme
+def compile_alarm_index(alarme):
+    """Baut den Wochentag-Index fuer check_alarm/next_alarm neu auf."""
+    global _alarm_index, _alarm_index_src, _alarm_check_key
+    _alarm_index = [
+        array("H", [(alarme[idx].minute_of_day() << 4) | idx for idx in indizes if idx <= 15])  # 4 Bit fuer den Index
+        for indizes in alarm_store.by_weekday(alarme)
+    ]
+    _alarm_index_src = alarme
+    _alarm_check_key = None
 
 
-def reload_alarms(log_path):
+def _alarme_geaendert(alarme):
+    """alarm_store-Abonnent: gemeinsame Liste uebernehmen (Web-Save, reload) – ohne SD-Zugriff."""
     global weckzeiten, weckstatus
+    weckzeiten = alarme
+    weckstatus = [False] * len(alarme)
+    compile_alarm_index(alarme)
+
+
+alarm_store.subscribe(_alarme_geaendert)
+
+
+def reload_alarms(log_path):
+    """Liest die Alarme beim Start (oder nach Handbearbeitung) einmal von der SD."""
     try:
-        new_alarms = lade_alarme_von_datei_new_format(log_path=log_path)
-        # Plausibilitaetspruefung
-        if isinstance(new_alarms, list) and len(new_alarms) <= 10:  # Max 10 Alarme
-            weckzeiten = new_alarms
-            weckstatus = [False] * len(weckzeiten)
-            # Nur bei Start oder aenderung loggen
-            log_once_per_day(log_path, "Alarme geladen: {} Stueck".format(len(weckzeiten)), time.localtime()[7])
-        else:
-            log_important(log_path, "Ungueltige Alarme-Datei, verwende Fallback")
-            weckzeiten = []
-            weckstatus = []
+        alarm_store.reload(log_path)
+        # Nur bei Start oder aenderung loggen
+        log_once_per_day(log_path, "Alarme geladen: {} aktiv".format(alarm_store.count_active()), time.localtime()[7])
     except Exception as e:
         log_message(log_path, "Fehler beim Laden der Alarme: {}".format(str(e)))
-        weckzeiten = []
-        weckstatus = []
+        _alarme_geaendert([])
 
 
 # ---------------- System-Monitor ----------------
@@ -295,20 +307,18 @@ def update_display(lcd, wochentage, aktueller_tag, hour, minute):
         if not (0 <= aktueller_tag < len(wochentage)):
             aktueller_tag = 0  # Fallback
             
-        lcd.clear()
-        lcd.move_to(0, 0) 
-        lcd.putstr("Neuza")
-        lcd.move_to(0, 1)
-        
         wochentag_str = wochentage[aktueller_tag % 7]
         uhrzeit_str = "{:02d}:{:02d}".format(hour, minute)
 
-        # Zeile 2 sicher clearen und Text zentrieren
-        lcd.putstr(" " * 16)
-        lcd.move_to(0, 1)
+        # Framebuffer statt clear(): flush() sendet nur geaenderte Ziffern
+        lcd.clear_buffer()
+        lcd.write_at(0, 0, "Neuza")
+        naechster = _naechster_alarm_text(wochentage, aktueller_tag, hour, minute)
+        if naechster:
+            lcd.write_at(16 - len(naechster), 0, naechster)
         leer = max(0, (16 - (len(wochentag_str) + 1 + len(uhrzeit_str))) // 2)
-        display_text = " " * leer + wochentag_str + " " + uhrzeit_str
-        lcd.putstr(display_text[:16])  # Maximal 16 Zeichen
+        lcd.write_at(leer, 1, wochentag_str + " " + uhrzeit_str)
+        lcd.flush()
         
     except Exception as e:
         log_message(log_path_global, "[Display Update Fehler] {}".format(str(e)))
@@ -319,6 +329,22 @@ def update_display(lcd, wochentage, aktueller_tag, hour, minute):
         except Exception:
             pass
 
+def _naechster_alarm_text(wochentage, aktueller_tag, hour, minute):
+    """Rechts in Zeile 0: 'HH:MM' (heute) bzw. 'Mo HH:MM' (spaeter), sonst ''."""
+    try:
+        naechster = next_alarm(hour, minute, aktueller_tag)
+    except Exception as e:
+        log_message(log_path_global, "[Naechster Alarm Fehler] {}".format(str(e)))
+        return ""
+    if not naechster:
+        return ""
+    tage_bis, stunde, minuten = naechster[:3]
+    text = "{:02d}:{:02d}".format(stunde, minuten)
+    if tage_bis:
+        text = "{} {}".format(wochentage[(aktueller_tag + tage_bis) % 7], text)
+    return text
+
+
 def update_leds_based_on_time(np, hour, minute):
     if not np:
         return
@@ -328,11 +354,12 @@ def update_leds_based_on_time(np, hour, minute):
         if not (0 <= hour <= 23 and 0 <= minute <= 59):
             return
             
-        total_minutes = hour * 60 + minute
-        leds_on = min(8, max(0, int((total_minutes % (8 * 7.5)) / 7.5) + 1))
+        # Ring fuellt sich einmal pro Stunde (8 LEDs → alle 7,5 Minuten eine mehr)
+        n = np.num_leds
+        leds_on = hour_leds(minute, n)
         
         # Robuste LED-Aktualisierung
-        for i in range(8):
+        for i in range(n):
             try:
                 if i < leds_on:
                     np.set_pixel(i, 255, 20, 147)
@@ -349,126 +376,89 @@ def update_leds_based_on_time(np, hour, minute):
 
 # ---------------- Alarm-Logik ----------------
 def get_tag_name(aktueller_tag):
-    return ["So", "Mo", "Di", "Mi", "Do", "Fr", "Sa"][aktueller_tag % 7]
+    return _WOCHENTAGE[aktueller_tag % 7]
 
 
 def check_alarm(hour, minute, aktueller_tag, weckzeiten, weckstatus, log_path):
-    tag_name = get_tag_name(aktueller_tag)
+    """
+    Faelliger Alarm (Index, Text) oder (None, None). Ausloesefenster +-1 Minute.
+    Die Kandidaten werden nur beim Minutenwechsel aus dem Index gesucht;
+    sonst bleibt pro Aufruf nur die Pruefung von weckstatus.
+    """
+    global _alarm_check_key, _alarm_candidates
+    if _alarm_index_src is not weckzeiten:
+        compile_alarm_index(weckzeiten)
+
+    wtag = aktueller_tag % 7
     aktuelle_minuten = hour * 60 + minute
-
-    for index, (w_h, w_m, text, tage) in enumerate(weckzeiten):
-        if weckstatus[index]:
-            continue
-        if tag_name not in tage:
-            continue
-        alarm_minuten = w_h * 60 + w_m
-        if abs(alarm_minuten - aktuelle_minuten) <= 1:
-            return index, text
+    key = (wtag, aktuelle_minuten)
+    if key != _alarm_check_key:
+        _alarm_check_key = key
+        kandidaten = []
+        for eintrag in _alarm_index[wtag]:
+            diff = (eintrag >> 4) - aktuelle_minuten
+            if diff > 1:
+                break  # sortiert: alle weiteren liegen spaeter
+            if diff >= -1:
+                kandidaten.append(eintrag & 0x0F)
+        _alarm_candidates = kandidaten
+
+    for index in _alarm_candidates:
+        if index < len(weckstatus) and not weckstatus[index]:
+            return index, weckzeiten[index].text
 
     return None, None
 
 
+def next_alarm(hour, minute, aktueller_tag):
+    """
+    Naechster Alarm nach der aktuellen Minute (bis zu 7 Tage voraus).
+    Rueckgabe: (tage_bis, stunde, minute, text, index) oder None.
+    """
+    if _alarm_index_src is not weckzeiten:
+        compile_alarm_index(weckzeiten)
+    aktuelle_minuten = hour * 60 + minute
+    for tage_bis in range(8):
+        for eintrag in _alarm_index[(aktueller_tag + tage_bis) % 7]:
+            minuten = eintrag >> 4
+            if tage_bis == 0 and minuten <= aktuelle_minuten:
+                continue
+            index = eintrag & 0x0F
+            return tage_bis, minuten // 60, minuten % 60, weckzeiten[index].text, index
+    return None
 
-def alarm_ausloesen(np, lcd, volume, text, idx=None, log_path=None):
-    """Memory-sichere Alarm-Funktion mit guaranteed cleanup"""
-    
-    # MEMORY-SAFE: Lokale Variablen minimieren
-    sc.alarm_flag = True
-    start_time = utime.time()
-    cleanup_done = False
-    
-    def log_alarm_stopped_manually():
-        if log_path is not None and idx is not None:
-            log_alarm_event(log_path, "Alarm manuell beendet - Index {}, Text: {}".format(idx, text))
 
-    def emergency_cleanup():
-        """Garantierte Aufraeumung bei Alarm-Ende"""
-        nonlocal cleanup_done
-        if cleanup_done:
-            return
-            
-        try:
-            # Display zuruecksetzen
-            if lcd:
-                lcd.clear()
-            
-            # LEDs zuruecksetzen
-            if np:
-                try:
-                    np.fill(0, 0, 0)
-                    np.show()
-                except Exception as e:
-                    log_message(log_path_global, "[Alarm Ende LED Reset] {}".format(str(e)))
-            
-            # Zeit/LEDs aktualisieren 
+
+def _alarm_aufraeumen(np, lcd, log_path=None):
+    """Garantierte Aufraeumung bei Alarm-Ende (Display, LEDs, Joystick, Speicher)."""
+    try:
+        # Display zuruecksetzen
+        if lcd:
+            lcd.clear()
+
+        # LEDs zuruecksetzen
+        if np:
             try:
-                hour, minute, *_ = aktualisiere_zeit()
-                update_leds_based_on_time(np, hour, minute)
+                np.fill(0, 0, 0)
+                np.show()
             except Exception as e:
-                log_message(log_path_global, "[Alarm Ende Zeit Update] {}".format(str(e)))
-                
-            # Joystick-Buffer leeren
-            clear_joystick_buffer()
-            
-            # Memory cleanup
-            import gc
-            gc.collect()
-            
-            cleanup_done = True
+                log_message(log_path_global, "[Alarm Ende LED Reset] {}".format(str(e)))
+
+        # Zeit/LEDs aktualisieren
+        try:
+            hour, minute, *_ = aktualisiere_zeit()
+            update_leds_based_on_time(np, hour, minute)
         except Exception as e:
-            log_message(log_path, "[Alarm-Cleanup Fehler] {}".format(str(e)))
+            log_message(log_path_global, "[Alarm Ende Zeit Update] {}".format(str(e)))
 
-    try:
-        # ---------- Display Setup (Memory-safe) ----------
-        _setup_alarm_display(lcd, text)
-        
-        # ---------- SIMPLIFIED ALARM LOOP (Memory-safe) ----------
-        melody_notes = [(330, 1000), (415, 1000), (370, 1000), (247, 1000), (0, 500),
-                       (330, 1000), (370, 1000), (415, 1000), (330, 1000)]
-        
-        led_cycle = 0
-        melody_index = 0
-        last_led_time = utime.ticks_ms()
-        last_sound_time = utime.ticks_ms()
-        
-        # SINGLE LOOP statt nested loops - verhindert Memory-Leaks!
-        loop_iterations = 0
-        while sc.alarm_flag and (utime.time() - start_time) < 900:
-            current_time = utime.ticks_ms()
-            
-            # Watchdog-Fuetterung alle 100 Loop-Iterationen (verhindert Reset-Loops)
-            loop_iterations += 1
-            if loop_iterations % 100 == 0:
-                feed_watchdog(log_path)
-            
-            # LED-Blinking (alle 300ms)
-            if utime.ticks_diff(current_time, last_led_time) >= 300:
-                _handle_alarm_leds(np, led_cycle)
-                led_cycle = (led_cycle + 1) % 2
-                last_led_time = current_time
-            
-            # Sound-Handling (nach Melodie-Timing)
-            if melody_index < len(melody_notes) and utime.ticks_diff(current_time, last_sound_time) >= melody_notes[melody_index][1]:
-                note, duration = melody_notes[melody_index]
-                sc.play_note(note, duration, volume)
-                melody_index = (melody_index + 1) % len(melody_notes)
-                last_sound_time = current_time
-            
-            # KRITISCH: Joystick-Check mit sofortigem Exit
-            if get_joystick_direction():
-                sc.alarm_flag = False
-                log_alarm_stopped_manually()
-                feed_watchdog(log_path)  # Final watchdog feed vor Exit
-                break  # SOFORTIGER EXIT verhindert Memory-Leak!
-            
-            # Short sleep to prevent CPU overload
-            utime.sleep_ms(10)
-            
+        # Joystick-Buffer leeren (Stopp-Bewegung darf nicht ins Menue durchrutschen)
+        clear_joystick_buffer()
+
+        # Memory cleanup
+        import gc
+        gc.collect()
     except Exception as e:
-        log_message(log_path, "[Alarm Fehler] {}".format(str(e)))
-    finally:
-        # GARANTIERTE Aufraeumung - egal was passiert!
-        emergency_cleanup()
+        log_message(log_path, "[Alarm-Cleanup Fehler] {}".format(str(e)))
 
 
 def _setup_alarm_display(lcd, text):
@@ -502,23 +492,6 @@ def _setup_alarm_display(lcd, text):
         log_message(log_path_global, "[Alarm Display Fehler] {}".format(str(e)))
 
 
-def _handle_alarm_leds(np, cycle):
-    """Memory-sichere LED-Behandlung fuer Alarm"""
-    if not np:
-        return
-        
-    try:
-        if cycle == 0:
-            # Rot
-            np.fill(255, 0, 0)
-        else:
-            # Aus
-            np.fill(0, 0, 0)
-        np.show()
-    except Exception as e:
-        log_message(log_path_global, "[Alarm LEDs Fehler] {}".format(str(e)))
-    
-    
 def toggle_led_status(np, lcd, status, hour, minute, led=None, blue_led=None, show_feedback=True):
     try:
         # ---------- LED-Ring ----------
@@ -600,7 +573,6 @@ def run_clock_program(lcd, np, wlan, log_path=None, ladebalken_anzeigen_func=Non
         display_on = (get_display_state(log_path) == 'on')
     except Exception:
         display_on = True
-    last_display_check = 0
     manual_override_active = False
     manual_override_state = True
     
@@ -618,6 +590,9 @@ def run_clock_program(lcd, np, wlan, log_path=None, ladebalken_anzeigen_func=Non
     test_running = False
     webserver_running = False
     s = None
+    # Async-Modus: Server laeuft als uasyncio-Task und blockiert die Uhr nie
+    use_async_web = asyncio is not None and get_web_server_mode(log_path) == 'async'
+    async_server = None
     wochentage = ["So", "Mo", "Di", "Mi", "Do", "Fr", "Sa"]
     doppelpunkt_an = True
     letzte_doppelpunkt_zeit = time.time()
@@ -636,6 +611,8 @@ def run_clock_program(lcd, np, wlan, log_path=None, ladebalken_anzeigen_func=Non
 
     def start_webserver():
         nonlocal s, webserver_running
+        if use_async_web:
+            return  # Server wird in _run_async gestartet
         try:
             # Ensure any previous server is cleaned up first
             if s:
@@ -671,6 +648,8 @@ def run_clock_program(lcd, np, wlan, log_path=None, ladebalken_anzeigen_func=Non
 
     def stop_webserver_func():
         nonlocal s, webserver_running
+        if use_async_web:
+            return  # Async-Server bleibt bestehen; waehrend blockierender Menues ruht die Event-Loop
         try:
             if s:  # Always try to cleanup socket if it exists
                 stop_webserver(s, log_path)
@@ -759,6 +738,8 @@ def run_clock_program(lcd, np, wlan, log_path=None, ladebalken_anzeigen_func=Non
                 if force_refresh or desired_brightness != current_brightness:
                     if np:
                         np.brightness(desired_brightness)
+                        if display_on:
+                            np.show()  # Treiber skaliert die gesetzten Farben neu
                     current_brightness = desired_brightness
             except Exception as e:
                 log_message(log_path, "[Display Brightness Fehler] {}".format(str(e)))
@@ -811,365 +792,461 @@ def run_clock_program(lcd, np, wlan, log_path=None, ladebalken_anzeigen_func=Non
 
 
     
-    # Hauptschleife mit garantierter Cleanup
-    try:
-        while True:
-            # Watchdog regelmaessig fuettern (alle Schleifendurchlaeufe)
-            feed_watchdog(log_path)
-            
+    # ------------------------------------------------------------------
+    #   Scheduler-Tasks (ersetzen Polling per Modulo/Zeitvergleich)
+    # ------------------------------------------------------------------
+    second, day, month, year = 0, 0, 0, 0
+
+    # ---------- LED-Animationen: Effekt-Generatoren, vom Scheduler getickt ----------
+    animator = LedAnimator(np, log_path=log_path) if np else None
+    led_task = None
+
+    def _tick_leds():
+        nonlocal led_task
+        if not animator.tick():
+            sched.cancel(led_task)
+            led_task = None
+
+    def _animate(effect):
+        nonlocal led_task
+        if not animator:
+            return
+        animator.play(effect)
+        if led_task is None:
+            led_task = sched.every(animator.period_ms, _tick_leds, "leds")
+
+    # ---------- Alarm: Zustandsautomat, vom Scheduler getickt ----------
+    def _alarm_gestartet(idx, text):
+        sc.alarm_flag = True  # Taster-IRQ setzt es zum Stoppen auf False
+        _setup_alarm_display(lcd, text)
+        _animate(blink(np, (255, 0, 0), on_frames=15, off_frames=15))  # 300 ms Rot/Aus
+
+    def _alarm_beendet(idx, text, manuell):
+        global last_minute
+        if manuell:
+            log_alarm_event(log_path, "Alarm manuell beendet - Index {}, Text: {}".format(idx, text))
+        if animator:
+            animator.stop(clear=False)  # _alarm_aufraeumen setzt den Ring zurueck
+        _alarm_aufraeumen(np, lcd, log_path)
+        last_minute = None  # Uhranzeige beim naechsten Tick neu zeichnen
+
+    ringer = AlarmRinger(
+        sc.melody_notes("alarm", log_path),
+        sc.tone,
+        None,  # LED-Blinken laeuft ueber den LedAnimator
+        lambda: bool(get_joystick_direction()) or not sc.alarm_flag,
+        on_start=_alarm_gestartet,
+        on_stop=_alarm_beendet,
+        log_path=log_path,
+    )
+    alarm_task = None
+
+    def _tick_alarm():
+        nonlocal alarm_task
+        if not ringer.tick():
+            sched.cancel(alarm_task)
+            alarm_task = None
+
+    def _klingeln(idx, text):
+        nonlocal alarm_task
+        ringer.start(idx, text, volume)
+        if alarm_task is None:
+            alarm_task = sched.every(AlarmRinger.TICK_MS, _tick_alarm, "alarm")
+
+    def _tick_clock():
+        nonlocal hour, minute, second, aktueller_tag, day, month, year
+        global last_minute, last_sync_day, rtc_status_logged, weckstatus
+        try:
+            hour, minute, second, aktueller_tag, day, month, year = aktualisiere_zeit()
+        except Exception as e:
+            log_message(log_path, "[Zeit Aktualisierung Fehler] {}".format(str(e)))
+            return
+
+        if "weckzeiten" in globals():
             try:
-                hour, minute, second, aktueller_tag, day, month, year = aktualisiere_zeit()
+                result = check_alarm(hour, minute, aktueller_tag, weckzeiten, weckstatus, log_path)
+                if result and isinstance(result, tuple):
+                    idx, alarm_text = result
+                    if idx is not None and alarm_text:
+                        # Debug: Log RTC-Zeit und Alarm-Zeit
+                        alarm_hour, alarm_minute = (weckzeiten[idx].hour, weckzeiten[idx].minute) if idx < len(weckzeiten) else (0, 0)
+                        log_alarm_event(log_path, "[ALARM-DEBUG] RTC: {:02d}:{:02d}:{:02d}, Alarm-Soll: {:02d}:{:02d}, Index: {}".format(
+                            hour, minute, second, alarm_hour, alarm_minute, idx))
+                        
+                        _klingeln(idx, alarm_text)
+                        weckstatus[idx] = True
+                        log_alarm_event(log_path, "Alarm ausgeloest - Index {}, Text: {}".format(idx, alarm_text))
             except Exception as e:
-                log_message(log_path, "[Zeit Aktualisierung Fehler] {}".format(str(e)))
-                continue
+                log_message(log_path, "[Alarm-Check Fehler] {}".format(str(e)))
 
-            if "weckzeiten" in globals():
-                try:
-                    result = check_alarm(hour, minute, aktueller_tag, weckzeiten, weckstatus, log_path)
-                    if result and isinstance(result, tuple):
-                        idx, alarm_text = result
-                        if idx is not None and alarm_text:
-                            # Debug: Log RTC-Zeit und Alarm-Zeit
-                            alarm_hour, alarm_minute = weckzeiten[idx][:2] if idx < len(weckzeiten) else (0, 0)
-                            log_alarm_event(log_path, "[ALARM-DEBUG] RTC: {:02d}:{:02d}:{:02d}, Alarm-Soll: {:02d}:{:02d}, Index: {}".format(
-                                hour, minute, second, alarm_hour, alarm_minute, idx))
-                            
-                            alarm_ausloesen(np, lcd, volume, alarm_text, idx=idx, log_path=log_path)
-                            weckstatus[idx] = True
-                            log_alarm_event(log_path, "Alarm ausgeloest - Index {}, Text: {}".format(idx, alarm_text))
-                except Exception as e:
-                    log_message(log_path, "[Alarm-Check Fehler] {}".format(str(e)))
+        try:
+            if hour == 0 and minute == 0 and second < 10 and not rtc_status_logged:
+                log_message(log_path, "[RTC-Status] Zeit: {}:{}, Tag: {}, Wochentag: {}".format(hour, minute, day, aktueller_tag))
+                rtc_status_logged = True
+            elif minute != 0:
+                rtc_status_logged = False
+
+            if last_sync_day != day and hour == 0 and minute == 0:
+                if ladebalken_anzeigen_func and lcd:
+                    ladebalken_anzeigen_func(lcd, "Auto-Sync...")
+                erfolg = synchronisiere_zeit(log_path)
+                if lcd:
+                    lcd.clear()
+                    lcd.putstr("Auto-Sync: OK" if erfolg else "Auto-Sync: Fail")
+                log_message(log_path, "Auto-Sync erfolgreich." if erfolg else "Auto-Sync fehlgeschlagen (RTC genutzt).")
+                time.sleep(2)
+        except Exception as e:
+            log_message(log_path, "[Auto-Sync Fehler] {}".format(str(e)))
 
+        if 1 <= day <= 31 and last_sync_day != day:
+            weckstatus = [False] * len(weckzeiten)
+            last_sync_day = day
+            log_date = "{:02d}.{:02d}.{} - NEUER TAG ({})".format(day, month, year, wochentage[aktueller_tag % 7])
+            log_raw(log_path, "\n" + "-" * 40 + "\n" + "{}\n".format(log_date) + "-" * 40 + "\n\n")
+            log_once_per_day(log_path, "Alarm-Reset fuer neuen Tag: RTC-Tag = {}, last_sync_day = {}".format(day, last_sync_day), day)
+
+        if minute != last_minute and not ringer.active and not (animator and animator.active):
+            last_minute = minute
             try:
-                direction = get_joystick_direction()
+                if display_on and lcd:
+                    update_display(lcd, wochentage, aktueller_tag, hour, minute)
+                if display_on and np:
+                    update_leds_based_on_time(np, hour, minute)
             except Exception as e:
-                log_message(log_path, "[Joystick Lesen Fehler] {}".format(str(e)))
-                direction = None
-
-            if direction:
-                menu_last_interaction = time.time() 
-                activity_heartbeat()  # System ist aktiv
-
-                # BASIS-MODUS: Links/Rechts = Volume, Oben/Unten = Menue
-                if not menumode:
-                    # WICHTIG: Wenn Volume-Mode aktiv ist, Up/Down NICHT ins Menue lassen
-                    if direction in ("left", "right"):
-                        # Volume-Steuerung (wird weiter unten behandelt)
-                        pass
-                    elif not volume_mode and direction in ("up", "down"):
-                        menumode = True
-                        menu_index = 0
-                        display_toggle_enabled = False  # Display-Toggle waehrend Menue deaktivieren
-                        time.sleep(0.3)  # Verhindert ungewollten Doppelsprung
-
-                elif menumode:
-                    if direction == "up":
-                        menu_index = (menu_index + 1) % len(menu_entries)
-                        time.sleep(0.25)
-                    elif direction == "down":
-                        menu_index = (menu_index - 1) % len(menu_entries)
-                        time.sleep(0.25)
-                    elif direction == "press":
-                        eintrag = menu_entries[menu_index]
-
-                        if eintrag.startswith("1."):
-                            test_running = True
-                            stop_webserver_func()
-                            from test_program import test_program
-                            test_program(lcd, np, wlan, log_path, volume)
-                            test_running = False
-                            start_webserver()
-                            zuruck_zur_uhranzeige()  # Korrekte Menue-Verlassen Behandlung
-
-                        elif eintrag.startswith("2."):
-                            show_cpu_temp_and_free_space(lcd, ladebalken_anzeigen_func)
-                            lcd.clear()
-                            zuruck_zur_uhranzeige()  # Korrekte Menue-Verlassen Behandlung
-
-                        elif eintrag.startswith("3."):
-                            target_mode = 'boost' if get_led_power_mode(log_path) != 'boost' else 'normal'
-                            if set_led_power_mode(target_mode, log_path):
-                                power_mode_active = (target_mode == 'boost')
-                                if power_mode_active:
-                                    if lcd:
-                                        lcd.clear()
-                                        lcd.putstr("Power Modus AN")
-                                        lcd.move_to(0, 1)
-                                        lcd.putstr("LEDs: 100%")
-                                    if np:
-                                        try:
-                                            np.brightness(255)
-                                            if display_on:
-                                                update_leds_based_on_time(np, hour, minute)
-                                        except Exception as e:
-                                            log_message(log_path, "[Power Modus] LED Boost Fehler: {}".format(str(e)))
-                                    current_brightness = 255
-                                    log_important(log_path, "[Power Modus] LEDs auf 100% (Config)")
-                                else:
-                                    if lcd:
-                                        lcd.clear()
-                                        lcd.putstr("Power Modus AUS")
-                                        lcd.move_to(0, 1)
-                                        lcd.putstr("LEDs: Normal")
-                                    try:
-                                        desired = get_brightness_for_state(display_on, log_path)
-                                    except Exception:
-                                        desired = current_brightness
-                                    current_brightness = desired
-                                    if np:
-                                        try:
-                                            np.brightness(desired)
-                                            if display_on:
-                                                update_leds_based_on_time(np, hour, minute)
-                                        except Exception as e:
-                                            log_message(log_path, "[Power Modus] LED Normal Fehler: {}".format(str(e)))
-                                    log_important(log_path, "[Power Modus] LEDs auf Normal (Config)")
-                                time.sleep(2)
-                            else:
-                                if lcd:
-                                    lcd.clear()
-                                    lcd.putstr("Power-Config FAIL")
-                                log_message(log_path, "[Power Modus] Schreiben nach power_config.txt fehlgeschlagen")
-                                time.sleep(2)
-                            zuruck_zur_uhranzeige()  # Korrekte Menue-Verlassen Behandlung
+                log_message(log_path, "[Minuten-Update Fehler] {}".format(str(e)))
 
-                        elif eintrag.startswith("4."):
-                            if lcd:
-                                lcd.clear()
-                                lcd.putstr("IP Adresse:")
-                                lcd.move_to(0, 1)
-                                lcd.putstr(wlan.ifconfig()[0] if wlan else "Keine Verb.")
-                                time.sleep(4)
-                                lcd.clear()
-                            zuruck_zur_uhranzeige()  # Korrekte Menue-Verlassen Behandlung
+        # --- NEU: Sekundenparitaet statt eigener Stoppuhr -----------------
+        if lcd and not menumode and not volume_mode and not ringer.active:
+            try:
+                pos = ((16 - (len(wochentage[aktueller_tag % 7]) + 1 + 5)) // 2
+                       + len(wochentage[aktueller_tag % 7]) + 3)
+                lcd.move_to(pos, 1)
+                lcd.putstr(":" if second % 2 else " ")
+            except Exception as e:
+                log_message(log_path, "[Doppelpunkt Fehler] {}".format(str(e)))
 
-                        elif eintrag.startswith("5."):
-                            if lcd:
-                                lcd.clear()
-                            if np:
-                                try:
-                                    np.fill(0, 0, 0)
-                                except TypeError:
-                                    np.fill((0, 0, 0))
+    def _check_display_schedule():
+        nonlocal display_on, manual_override_active, current_brightness
+        try:
+            schedule = get_display_schedule(log_path)
+            # Zeiten in Minuten
+            def _to_min(ts):
+                try:
+                    h=int(ts[:2]); m=int(ts[3:5]); return h*60+m
+                except Exception:
+                    return 0
+            on_m = _to_min(schedule['on_time'])
+            off_m = _to_min(schedule['off_time'])
+            cur_m = hour*60 + minute
+
+            # Tagesgrenze: wenn neuer Tag erkannt (bereits vorhanden oben), hier keine Aktion
+            # Einmal-Schalter: nur GENAU bei Zeitpunkten schalten
+            # 1) AUS-Schaltung exakt zur Off-Zeit
+            if schedule['auto'] and cur_m == off_m:
+                if display_on:
+                    set_display_state(
+                        False,
+                        source="schedule",
+                        hour=hour,
+                        minute=minute,
+                        aktueller_tag=aktueller_tag,
+                        show_feedback=False,
+                        log_entry="[Auto Display] AUS um {:02d}:{:02d}".format(hour, minute),
+                        brightness_override=get_brightness_for_state(False, log_path),
+                    )
+                manual_override_active = False  # Override beendet an Schaltzeit
+
+            # 2) AN-Schaltung exakt zur On-Zeit
+            if schedule['auto'] and cur_m == on_m:
+                if not display_on:
+                    set_display_state(
+                        True,
+                        source="schedule",
+                        hour=hour,
+                        minute=minute,
+                        aktueller_tag=aktueller_tag,
+                        show_feedback=False,
+                        log_entry="[Auto Display] AN um {:02d}:{:02d}".format(hour, minute),
+                        brightness_override=get_brightness_for_state(True, log_path),
+                    )
+                manual_override_active = False
+
+            # Helligkeit ggf. an den aktuellen Zustand anpassen (ohne Power-Mode)
+            if not power_mode_active:
+                try:
+                    desired = get_brightness_for_state(display_on, log_path)
+                    if desired != current_brightness:
+                        current_brightness = desired
+                        if np:
+                            np.brightness(current_brightness)
+                            if display_on:
                                 np.show()
-                            time.sleep(0.5)
-                            try:
-                                _mp_reset = __import__('machine').reset
-                                _mp_reset()
-                            except Exception:
-                                pass
-
-            if menumode and lcd:
-                # Anti-Bounce: Nur updaten wenn mindestens 100ms im Menu
-                if time.time() - menu_last_interaction > 0.1:
-                    lcd.clear()
-                    lcd.move_to((16 - len("System")) // 2, 0)
-                    lcd.putstr("System")
-                    text = menu_entries[menu_index]
-                    lcd.move_to((16 - len(text)) // 2, 1)
-                    lcd.putstr(text)
+                except Exception as e:
+                    log_message(log_path, "[Helligkeit Sync Fehler] {}".format(str(e)))
+        except Exception as e:
+            log_message(log_path, "[Display Management Fehler] {}".format(str(e)))
 
-            if menumode and time.time() - menu_last_interaction > menu_timeout:
-                if lcd:
-                    lcd.clear()
-                zuruck_zur_uhranzeige()  # Korrekte Menue-Verlassen Behandlung
+    def _check_health():
+        try:
+            check_system_health(log_path)
+        except Exception as e:
+            log_message(log_path, "[System Check Fehler] {}".format(str(e)))
+
+    def _check_memory():
+        try:
+            feed_watchdog(log_path)  # Watchdog vor Memory-Ops fuettern
+            free_mem = monitor_memory(log_path, context="main_loop_check")
+            # Sanftes Low-Memory-Handling mit Cooldown statt haeufigen Notfall-Cleanups
+            if free_mem < 12288:  # frueher ansetzen, aber schonend reagieren
+                check_and_cleanup_low_memory(log_path, threshold=8192, cooldown_s=600)
+            feed_watchdog(log_path)
+        except Exception as e:
+            log_message(log_path, "[System Check Fehler] {}".format(str(e)))
+
+    def _flush_storage():
+        # Gepufferte Log-Zeilen / Einstellungen gebuendelt auf SD schreiben
+        flush_log_if_due(log_path)
+        flush_settings(log_path)
 
+    sched = Scheduler(log_path)
+    sched.every(_CLOCK_TICK_MS, _tick_clock, "clock")
+    sched.every(30000, _check_display_schedule, "display_schedule")
+    sched.every(30000, _check_health, "health", first_delay_ms=30000)  # System-Health Check alle 30 Sekunden
+    sched.every(180000, _check_memory, "memory", first_delay_ms=180000)  # Memory-Check alle 3 Minuten
+    sched.every(1000, _flush_storage, "flush")
+
+    def _loop_once():
+        """Ein Durchlauf der Hauptschleife (Scheduler, Eingaben, Menue, Poll-Webserver)."""
+        nonlocal menu_last_interaction, menumode, menu_index, test_running
+        nonlocal power_mode_active, current_brightness
+        nonlocal volume_mode, volume_last_interaction, volume, volume_dirty
+        global display_toggle_enabled
+
+        # Watchdog regelmaessig fuettern (alle Schleifendurchlaeufe)
+        feed_watchdog(log_path)
+
+        sched.run_pending()
+
+        try:
+            # Waehrend ein Alarm klingelt, gehoert der Joystick dem AlarmRinger
+            direction = None if ringer.active else get_joystick_direction()
+        except Exception as e:
+            log_message(log_path, "[Joystick Lesen Fehler] {}".format(str(e)))
+            direction = None
+
+        if direction:
+            menu_last_interaction = time.time() 
+            activity_heartbeat()  # System ist aktiv
+
+            # BASIS-MODUS: Links/Rechts = Volume, Oben/Unten = Menue
             if not menumode:
+                # WICHTIG: Wenn Volume-Mode aktiv ist, Up/Down NICHT ins Menue lassen
                 if direction in ("left", "right"):
-                    if not volume_mode:
-                        volume_mode = True
-                        volume_last_interaction = time.time()
-                    else:
-                        volume_last_interaction = time.time()
-
-                    if direction == "left" and volume > 0:
-                        new_volume = max(0, volume - 5)
-                        if new_volume != volume:
-                            volume = new_volume
-                            volume_dirty = True
-                    elif direction == "right" and volume < 100:
-                        new_volume = min(100, volume + 5)
-                        if new_volume != volume:
-                            volume = new_volume
-                            volume_dirty = True
-
-                    if lcd:
+                    # Volume-Steuerung (wird weiter unten behandelt)
+                    pass
+                elif not volume_mode and direction in ("up", "down"):
+                    menumode = True
+                    menu_index = 0
+                    display_toggle_enabled = False  # Display-Toggle waehrend Menue deaktivieren
+                    time.sleep(0.3)  # Verhindert ungewollten Doppelsprung
+
+            elif menumode:
+                if direction == "up":
+                    menu_index = (menu_index + 1) % len(menu_entries)
+                    time.sleep(0.25)
+                elif direction == "down":
+                    menu_index = (menu_index - 1) % len(menu_entries)
+                    time.sleep(0.25)
+                elif direction == "press":
+                    eintrag = menu_entries[menu_index]
+
+                    if eintrag.startswith("1."):
+                        test_running = True
+                        stop_webserver_func()
+                        from test_program import test_program
+                        test_program(lcd, np, wlan, log_path, volume)
+                        test_running = False
+                        start_webserver()
+                        zuruck_zur_uhranzeige()  # Korrekte Menue-Verlassen Behandlung
+
+                    elif eintrag.startswith("2."):
+                        show_cpu_temp_and_free_space(lcd, ladebalken_anzeigen_func)
                         lcd.clear()
-                        lcd.putstr("Volume: {}%".format(volume))
+                        zuruck_zur_uhranzeige()  # Korrekte Menue-Verlassen Behandlung
 
-                elif direction == "press" and volume_mode:
-                    volume_mode = False
-                    if lcd:
-                        lcd.clear()
-                        lcd.putstr("Volume: " + str(volume) + "%")
-                    persist_volume()
-                    fuer_elise(volume)
-                    time.sleep(0.5)
-                    zuruck_zur_uhranzeige()
-                    
-                elif direction == "press" and not volume_mode and not menumode:
-                    # Display Toggle NUR wenn nicht im Menue-Modus UND genug Zeit seit Menue-Verlassen vergangen
-                    current_time = time.time()
-                    if display_toggle_enabled and (current_time - last_menu_exit_time) > 1.0:
-                        target_state = not display_on
-                        set_display_state(
-                            target_state,
-                            source="manual",
-                            hour=hour,
-                            minute=minute,
-                            aktueller_tag=aktueller_tag,
-                            show_feedback=True,
-                            log_entry="Display Toggle: {} (Override aktiv)".format(
-                                "AN" if target_state else "AUS"
-                            ),
-                        )
-                    # Ignorieren wenn im Menue oder kurz nach Menue-Verlassen
-
-            if webserver_running:
-                try:
-                    handle_website_connection(s, log_path)
-                except Exception as e:
-                    log_message(log_path, "[Webserver Fehler] {}".format(str(e)))
+                    elif eintrag.startswith("3."):
+                        target_mode = 'boost' if get_led_power_mode(log_path) != 'boost' else 'normal'
+                        if set_led_power_mode(target_mode, log_path):
+                            power_mode_active = (target_mode == 'boost')
+                            if power_mode_active:
+                                if lcd:
+                                    lcd.clear()
+                                    lcd.putstr("Power Modus AN")
+                                    lcd.move_to(0, 1)
+                                    lcd.putstr("LEDs: 100%")
+                                if np:
+                                    try:
+                                        np.brightness(255)
+                                        if display_on:
+                                            np.show()
+                                    except Exception as e:
+                                        log_message(log_path, "[Power Modus] LED Boost Fehler: {}".format(str(e)))
+                                current_brightness = 255
+                                log_important(log_path, "[Power Modus] LEDs auf 100% (Config)")
+                            else:
+                                if lcd:
+                                    lcd.clear()
+                                    lcd.putstr("Power Modus AUS")
+                                    lcd.move_to(0, 1)
+                                    lcd.putstr("LEDs: Normal")
+                                try:
+                                    desired = get_brightness_for_state(display_on, log_path)
+                                except Exception:
+                                    desired = current_brightness
+                                current_brightness = desired
+                                if np:
+                                    try:
+                                        np.brightness(desired)
+                                        if display_on:
+                                            np.show()
+                                    except Exception as e:
+                                        log_message(log_path, "[Power Modus] LED Normal Fehler: {}".format(str(e)))
+                                log_important(log_path, "[Power Modus] LEDs auf Normal (Config)")
+                            time.sleep(2)
+                        else:
+                            if lcd:
+                                lcd.clear()
+                                lcd.putstr("Power-Config FAIL")
+                            log_message(log_path, "[Power Modus] Schreiben nach power_config.txt fehlgeschlagen")
+                            time.sleep(2)
+                        zuruck_zur_uhranzeige()  # Korrekte Menue-Verlassen Behandlung
 
-            try:
-                if hour == 0 and minute == 0 and second < 10 and not rtc_status_logged:
-                    log_message(log_path, "[RTC-Status] Zeit: {}:{}, Tag: {}, Wochentag: {}".format(hour, minute, day, aktueller_tag))
-                    rtc_status_logged = True
-                elif minute != 0:
-                    rtc_status_logged = False
-
-                if last_sync_day != day and hour == 0 and minute == 0:
-                    if ladebalken_anzeigen_func and lcd:
-                        ladebalken_anzeigen_func(lcd, "Auto-Sync...")
-                    erfolg = synchronisiere_zeit(log_path)
-                    if lcd:
-                        lcd.clear()
-                        lcd.putstr("Auto-Sync: OK" if erfolg else "Auto-Sync: Fail")
-                    log_message(log_path, "Auto-Sync erfolgreich." if erfolg else "Auto-Sync fehlgeschlagen (RTC genutzt).")
-                    time.sleep(2)
-            except Exception as e:
-                log_message(log_path, "[Auto-Sync Fehler] {}".format(str(e)))
-
-            if 1 <= day <= 31 and last_sync_day != day:
-                weckstatus = [False] * len(weckzeiten)
-                last_sync_day = day
-                log_date = "{:02d}.{:02d}.{} - NEUER TAG ({})".format(day, month, year, wochentage[aktueller_tag % 7])
-                with open(log_path, "a") as f:
-                    f.write("\n" + "-" * 40 + "\n")
-                    f.write("{}\n".format(log_date))
-                    f.write("-" * 40 + "\n\n")
-                log_once_per_day(log_path, "Alarm-Reset fuer neuen Tag: RTC-Tag = {}, last_sync_day = {}".format(day, last_sync_day), day)
-
-            # Display Management – Einmal-Schalter-Logik
-            try:
-                now = time.time()
-                if now - last_display_check > 30:  # Check alle 30s
-                    last_display_check = now
-                    sched = get_display_schedule(log_path)
-                    # Zeiten in Minuten
-                    def _to_min(ts):
+                    elif eintrag.startswith("4."):
+                        if lcd:
+                            lcd.clear()
+                            lcd.putstr("IP Adresse:")
+                            lcd.move_to(0, 1)
+                            lcd.putstr(wlan.ifconfig()[0] if wlan else "Keine Verb.")
+                            time.sleep(4)
+                            lcd.clear()
+                        zuruck_zur_uhranzeige()  # Korrekte Menue-Verlassen Behandlung
+
+                    elif eintrag.startswith("5."):
+                        if lcd:
+                            lcd.clear()
+                        if np:
+                            try:
+                                np.fill(0, 0, 0)
+                            except TypeError:
+                                np.fill((0, 0, 0))
+                            np.show()
+                        flush_settings(log_path, force=True)
+                        flush_log(log_path)
+                        time.sleep(0.5)
                         try:
-                            h=int(ts[:2]); m=int(ts[3:5]); return h*60+m
+                            _mp_reset = __import__('machine').reset
+                            _mp_reset()
                         except Exception:
-                            return 0
-                    on_m = _to_min(sched['on_time'])
-                    off_m = _to_min(sched['off_time'])
-                    cur_m = hour*60 + minute
-
-                    # Tagesgrenze: wenn neuer Tag erkannt (bereits vorhanden oben), hier keine Aktion
-                    # Einmal-Schalter: nur GENAU bei Zeitpunkten schalten
-                    # 1) AUS-Schaltung exakt zur Off-Zeit
-                    if sched['auto'] and cur_m == off_m:
-                        if display_on:
-                            set_display_state(
-                                False,
-                                source="schedule",
-                                hour=hour,
-                                minute=minute,
-                                aktueller_tag=aktueller_tag,
-                                show_feedback=False,
-                                log_entry="[Auto Display] AUS um {:02d}:{:02d}".format(hour, minute),
-                                brightness_override=get_brightness_for_state(False, log_path),
-                            )
-                        manual_override_active = False  # Override beendet an Schaltzeit
-
-                    # 2) AN-Schaltung exakt zur On-Zeit
-                    if sched['auto'] and cur_m == on_m:
-                        if not display_on:
-                            set_display_state(
-                                True,
-                                source="schedule",
-                                hour=hour,
-                                minute=minute,
-                                aktueller_tag=aktueller_tag,
-                                show_feedback=False,
-                                log_entry="[Auto Display] AN um {:02d}:{:02d}".format(hour, minute),
-                                brightness_override=get_brightness_for_state(True, log_path),
-                            )
-                        manual_override_active = False
-
-                    # Helligkeit ggf. an den aktuellen Zustand anpassen (ohne Power-Mode)
-                    if not power_mode_active:
-                        try:
-                            desired = get_brightness_for_state(display_on, log_path)
-                            if desired != current_brightness:
-                                current_brightness = desired
-                                if np:
-                                    np.brightness(current_brightness)
-                                    if display_on:
-                                        update_leds_based_on_time(np, hour, minute)
-                        except Exception as e:
-                            log_message(log_path, "[Helligkeit Sync Fehler] {}".format(str(e)))
-            except Exception as e:
-                log_message(log_path, "[Display Management Fehler] {}".format(str(e)))
+                            pass
+
+        if menumode and lcd:
+            # Anti-Bounce: Nur updaten wenn mindestens 100ms im Menu
+            if time.time() - menu_last_interaction > 0.1:
+                # Unveraenderte Menue-Zeilen erzeugen keinen I2C-Verkehr
+                lcd.clear_buffer()
+                lcd.write_at((16 - len("System")) // 2, 0, "System")
+                text = menu_entries[menu_index]
+                lcd.write_at((16 - len(text)) // 2, 1, text)
+                lcd.flush()
+
+        if menumode and time.time() - menu_last_interaction > menu_timeout:
+            if lcd:
+                lcd.clear()
+            zuruck_zur_uhranzeige()  # Korrekte Menue-Verlassen Behandlung
 
-            if minute != last_minute:
-                last_minute = minute
-                try:
-                    if display_on and lcd:
-                        update_display(lcd, wochentage, aktueller_tag, hour, minute)
-                    if display_on and np:
-                        update_leds_based_on_time(np, hour, minute)
-                except Exception as e:
-                    log_message(log_path, "[Minuten-Update Fehler] {}".format(str(e)))
+        if not menumode:
+            if direction in ("left", "right"):
+                if not volume_mode:
+                    volume_mode = True
+                    volume_last_interaction = time.time()
+                else:
+                    volume_last_interaction = time.time()
+
+                if direction == "left" and volume > 0:
+                    new_volume = max(0, volume - 5)
+                    if new_volume != volume:
+                        volume = new_volume
+                        volume_dirty = True
+                elif direction == "right" and volume < 100:
+                    new_volume = min(100, volume + 5)
+                    if new_volume != volume:
+                        volume = new_volume
+                        volume_dirty = True
 
-            # --- NEU: Sekundenparitaet statt eigener Stoppuhr -----------------
-            if lcd and not menumode and not volume_mode:
-                try:
-                    pos = ((16 - (len(wochentage[aktueller_tag % 7]) + 1 + 5)) // 2
-                           + len(wochentage[aktueller_tag % 7]) + 3)
-                    lcd.move_to(pos, 1)
-                    lcd.putstr(":" if second % 2 else " ")
-                except Exception as e:
-                    log_message(log_path, "[Doppelpunkt Fehler] {}".format(str(e)))
+                if lcd:
+                    lcd.clear()
+                    lcd.putstr("Volume: {}%".format(volume))
 
-            if volume_mode and time.time() - volume_last_interaction > volume_timeout:
+            elif direction == "press" and volume_mode:
                 volume_mode = False
+                if lcd:
+                    lcd.clear()
+                    lcd.putstr("Volume: " + str(volume) + "%")
                 persist_volume()
-                zuruck_zur_uhranzeige()
                 fuer_elise(volume)
+                time.sleep(0.5)
+                zuruck_zur_uhranzeige()
 
-            # Recovery & Watchdog (alle 30 Sekunden)
+            elif direction == "press" and not volume_mode and not menumode:
+                # Display Toggle NUR wenn nicht im Menue-Modus UND genug Zeit seit Menue-Verlassen vergangen
+                current_time = time.time()
+                if display_toggle_enabled and (current_time - last_menu_exit_time) > 1.0:
+                    target_state = not display_on
+                    set_display_state(
+                        target_state,
+                        source="manual",
+                        hour=hour,
+                        minute=minute,
+                        aktueller_tag=aktueller_tag,
+                        show_feedback=True,
+                        log_entry="Display Toggle: {} (Override aktiv)".format(
+                            "AN" if target_state else "AUS"
+                        ),
+                    )
+                # Ignorieren wenn im Menue oder kurz nach Menue-Verlassen
+
+        if webserver_running:
             try:
-                current_time = int(time.time())
-                if current_time % 30 == 0:  # System-Health Check alle 30 Sekunden
-                    check_system_health(log_path)
-                    
-                    # Memory-Check alle 3 Minuten (optimiert von 5 Min)
-                    if current_time % 180 == 0:
-                        feed_watchdog(log_path)  # Watchdog vor Memory-Ops fuettern
-                        free_mem = monitor_memory(log_path, context="main_loop_check")
-                        # Sanftes Low-Memory-Handling mit Cooldown statt haeufigen Notfall-Cleanups
-                        if free_mem < 12288:  # frueher ansetzen, aber schonend reagieren
-                            free_mem = check_and_cleanup_low_memory(log_path, threshold=8192, cooldown_s=600)
-                        feed_watchdog(log_path)
-                
-
-                            
+                handle_website_connection(s, log_path)
             except Exception as e:
-                log_message(log_path, "[System Check Fehler] {}".format(str(e)))
+                log_message(log_path, "[Webserver Fehler] {}".format(str(e)))
+
+        if volume_mode and time.time() - volume_last_interaction > volume_timeout:
+            volume_mode = False
+            persist_volume()
+            zuruck_zur_uhranzeige()
+            fuer_elise(volume)
+
+    async def _run_async():
+        """Async-Modus: Webserver als uasyncio-Task, Uhr-Schleife als Koroutine."""
+        nonlocal async_server
+        async_server = await start_async_webserver(wlan, log_path)
+        if async_server:
+            log_startup(log_path, "Webserver gestartet (async)")
+        while True:
+            _loop_once()
+            # Bis zur naechsten Deadline an den Webserver abgeben
+            await asyncio.sleep(sched.ms_until_next(_INPUT_POLL_MS) / 1000)
+
+    # Hauptschleife mit garantierter Cleanup
+    try:
+        if use_async_web:
+            asyncio.run(_run_async())
+        while True:
+            _loop_once()
 
-            time.sleep(0.1)
+            # Bis zur naechsten Deadline schlafen, Eingaben aber weiter pollen
+            sched.sleep_until_next(_INPUT_POLL_MS)
             
     except KeyboardInterrupt:
         log_message(log_path, "[System] Graceful shutdown angefordert")
@@ -1180,9 +1257,12 @@ def run_clock_program(lcd, np, wlan, log_path=None, ladebalken_anzeigen_func=Non
         log_message(log_path, "[System] Cleanup wird ausgefuehrt...", force=True)
         try:
             stop_webserver_func()
+            if async_server:
+                stop_async_webserver(async_server, log_path)
         except Exception as e:
             log_message(log_path, "[Cleanup] Webserver-Stop Fehler: {}".format(str(e)))
+        flush_settings(log_path, force=True)
         
-        log_message(log_path, "[System] Cleanup abgeschlossen.", force=True)
+        log_message(log_path, "[System] Cleanup abgeschlossen.", force=True, immediate=True)
 
 
@@ -0,0 +1,172 @@
+# config_store.py
+"""
+Key=Value-Konfiguration im RAM mit verzoegertem, atomarem Zurueckschreiben.
+
+Die Datei wird einmal gelesen; Setter aendern nur den RAM-Stand und markieren
+ihn als 'dirty'. Mehrere Aenderungen innerhalb des Schreibfensters werden zu
+einem einzigen SD-Write (tmp-Datei + replace + sync) zusammengefasst.
+"""
+import os
+import time
+from log_utils import log_message
+
+
+class ConfigStore:
+    def __init__(self, path, defaults=None, order=None, write_delay_s=2):
+        self.path = path
+        self.tmp_path = path.rsplit(".", 1)[0] + ".tmp"
+        self.defaults = defaults or {}
+        self.order = order or list(self.defaults)
+        self.write_delay_s = write_delay_s
+        self._values = {}
+        self._stored = ()   # Keys, die tatsaechlich in der Datei standen
+        self._loaded = False
+        self._dirty = False
+        self._last_change = 0
+        self.version = 0  # steigt bei jeder Aenderung (fuer abhaengige Caches)
+
+    # --------------------------------------------------------------
+    #   Laden
+    # --------------------------------------------------------------
+    def load(self, log_path=None):
+        """Liest die Datei (einmalig oder explizit erneut) in den RAM."""
+        values = {}
+        try:
+            with open(self.path, "r") as f:
+                for line in f:
+                    if '=' in line:
+                        key, value = line.strip().split('=', 1)
+                        values[key.strip()] = value.strip()
+        except OSError:
+            pass  # Datei fehlt → nur Defaults
+        except Exception as e:
+            log_message(log_path, "[Config] Fehler beim Laden von {}: {}".format(self.path, str(e)))
+        self._stored = tuple(values)
+        for key, default_value in self.defaults.items():
+            values.setdefault(key, default_value)
+        self._values = values
+        self._loaded = True
+        self._dirty = False
+        self.version += 1
+        return values
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    # --------------------------------------------------------------
+    #   Getter
+    # --------------------------------------------------------------
+    def values(self):
+        """Direkter Zugriff auf den RAM-Stand (nicht veraendern!)."""
+        self._ensure_loaded()
+        return self._values
+
+    def is_stored(self, key):
+        """True, wenn key beim letzten load() in der Datei stand (nicht nur Default)."""
+        self._ensure_loaded()
+        return key in self._stored
+
+    def get(self, key, default=None):
+        self._ensure_loaded()
+        return self._values.get(key, default)
+
+    def get_int(self, key, default=0, lo=None, hi=None):
+        try:
+            value = int(self.get(key, str(default)))
+        except (TypeError, ValueError):
+            value = default
+        if lo is not None and value < lo:
+            value = lo
+        if hi is not None and value > hi:
+            value = hi
+        return value
+
+    def get_bool(self, key, default=False):
+        value = self.get(key)
+        if value is None:
+            return default
+        return str(value).strip().lower() == 'true'
+
+    # --------------------------------------------------------------
+    #   Setter
+    # --------------------------------------------------------------
+    def set(self, key, value):
+        """Setzt einen Wert im RAM. Gibt True zurueck, wenn er sich geaendert hat."""
+        self._ensure_loaded()
+        if isinstance(value, bool):
+            value = 'true' if value else 'false'
+        value = str(value).strip()
+        if self._values.get(key) == value:
+            return False
+        self._values[key] = value
+        self._mark_dirty()
+        return True
+
+    def update(self, items):
+        changed = False
+        for key, value in items.items():
+            if self.set(key, value):
+                changed = True
+        return changed
+
+    def remove(self, key):
+        self._ensure_loaded()
+        if key in self._values:
+            del self._values[key]
+            self._mark_dirty()
+            return True
+        return False
+
+    def _mark_dirty(self):
+        self._dirty = True
+        self._last_change = time.time()
+        self.version += 1
+
+    def is_dirty(self):
+        return self._dirty
+
+    # --------------------------------------------------------------
+    #   Zurueckschreiben
+    # --------------------------------------------------------------
+    def flush_if_due(self, log_path=None):
+        """Schreibt, sobald seit der letzten Aenderung das Fenster verstrichen ist."""
+        if self._dirty and time.time() - self._last_change >= self.write_delay_s:
+            return self.flush(log_path)
+        return True
+
+    def flush(self, log_path=None):
+        """Schreibt sofort (nur wenn dirty). Gibt False bei Schreibfehler zurueck."""
+        if not self._dirty:
+            return True
+        try:
+            with open(self.tmp_path, "w") as f:
+                for key in self.order:
+                    if key in self._values:
+                        f.write("{}={}\n".format(key, self._values[key]))
+                for key, value in self._values.items():
+                    if key not in self.order:
+                        f.write("{}={}\n".format(key, value))
+                f.flush()
+
+            try:
+                os.replace(self.tmp_path, self.path)
+            except AttributeError:
+                os.rename(self.tmp_path, self.path)
+            except OSError:
+                try:
+                    os.remove(self.path)
+                except OSError:
+                    pass
+                os.rename(self.tmp_path, self.path)
+
+            try:
+                os.sync()
+            except Exception:
+                pass
+
+            self._dirty = False
+            return True
+        except Exception as e:
+            log_message(log_path, "[Config] Schreiben von {} fehlgeschlagen: {}".format(self.path, str(e)))
+            return False
@@ -64,6 +64,12 @@ class RTC:
         )
         self.i2c.writeto_mem(self.addr, self.reg, data)
 
+    def enable_sqw_1hz(self):
+        """Schaltet INT/SQW auf 1-Hz-Rechteck (Control-Register: INTCN=0, RS2=RS1=0)."""
+        ctrl = self.i2c.readfrom_mem(self.addr, 0x0E, 1)[0]
+        ctrl &= ~(0x04 | 0x08 | 0x10)
+        self.i2c.writeto_mem(self.addr, 0x0E, bytes((ctrl,)))
+
     def read_time(self, mode=0):
         """
         Liest die Uhr.
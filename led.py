@@ -1,8 +1,9 @@
 # led.py
-import time
 from log_utils import log_message, log_important
 from sound_config import paus
-from recovery_manager import feed_watchdog
+from led_animation import (
+    LedAnimator, sequence, rainbow_wipe, chase, fading_tail, blink,
+)
 
 try:
     from neopixel import myNeopixel
@@ -43,94 +44,25 @@ def _is_ready(np_obj, log_path=None):
     return True
 
 
-def wheel(pos):
-    """0-255 → RGB Regenbogen-Rad."""
-    pos &= 255
-    if pos < 85:
-        return 255 - pos * 3, pos * 3, 0
-    if pos < 170:
-        pos -= 85
-        return 0, 255 - pos * 3, pos * 3
-    pos -= 170
-    return pos * 3, 0, 255 - pos * 3
-
-
-# Fallback fuer Wrapper ohne rotate_right
-def _rotate_right(np_obj, steps=1):
-    try:
-        np_obj.rotate_right(steps)
-    except AttributeError:
-        buf = [np_obj[i] for i in range(NUM_LEDS)]
-        for i in range(NUM_LEDS):
-            np_obj[i] = buf[(i - steps) % NUM_LEDS]
-
-
 # --------------------------------------------------------------------
-#   Animationen
+#   Animationen (Effekte aus led_animation, siehe dort)
 # --------------------------------------------------------------------
+def kranz_effect(np):
+    """Boot-/Test-Show als ein Effekt: Regenbogen, Lauflicht, Schweif, Blitze."""
+    return sequence(
+        rainbow_wipe(np, 50, 5),
+        chase(np, 3),
+        fading_tail(np, 50, 10),
+        blink(np, (255, 0, 0), 3, 3, 3, off_color=(0, 255, 0)),   # Gruen/Rot
+        blink(np, (255, 0, 0), 10, 2, 2),                          # Rot-Alarm
+    )
+
+
 def led_kranz_animation(np=led_kranz, log_path=None):
     if not _is_ready(np, log_path):
         return
     try:
-        def _feed():
-            try:
-                feed_watchdog(log_path)
-            except Exception:
-                pass
-
-        # --- Rainbow Wipe ---
-        for cycle in range(50):
-            for i in range(NUM_LEDS):
-                c = wheel((i * 256 // NUM_LEDS + cycle * 5))
-                _safe_set(np, i, *c)
-            np.show()
-            time.sleep(0.02)
-            _rotate_right(np)
-            _feed()
-
-        # --- Chase Pulse ---
-        for cycle in range(3):
-            for i in range(NUM_LEDS):
-                _safe_fill(np, 0, 0, 0)
-                _safe_set(np, i, *wheel((i * 256 // NUM_LEDS + cycle * 20)))
-                np.show()
-                time.sleep(0.05)
-            time.sleep(0.1)
-            _feed()
-
-        # --- Fading Tail ---
-        for cycle in range(50):
-            for i in range(NUM_LEDS):
-                r, g, b = wheel((i * 256 // NUM_LEDS + cycle * 10))
-                brightness = 1 - (i / NUM_LEDS)
-                _safe_set(
-                    np, i, int(r * brightness), int(g * brightness), int(b * brightness)
-                )
-            np.show()
-            time.sleep(0.01)
-            _rotate_right(np)
-            _feed()
-
-        # --- Flashing Green/Red ---
-        for _ in range(3):
-            _safe_fill(np, 255, 0, 0)
-            np.show()
-            time.sleep(0.05)
-            _safe_fill(np, 0, 255, 0)
-            np.show()
-            time.sleep(0.05)
-            _feed()
-
-        # --- Red Alert Blink ---
-        for _ in range(10):
-            _safe_fill(np, 255, 0, 0)
-            np.show()
-            time.sleep(0.03)
-            _safe_fill(np, 0, 0, 0)
-            np.show()
-            time.sleep(0.03)
-            _feed()
-
+        LedAnimator(np, log_path=log_path).run(kranz_effect(np))
     except Exception as e:
         log_message(log_path, "[LED] Fehler bei Animation: {}".format(str(e)))
 
@@ -166,17 +98,7 @@ def led_rosa(np=led_kranz, log_path=None):
 def led_und_buzzer_blinken_rot(np=led_kranz, volume_percent=50, log_path=None):
     if not _is_ready(np, log_path):
         return
-    for _ in range(3):
-        _safe_fill(np, 255, 0, 0)
-        np.show()
-        time.sleep(0.5)
-        _safe_fill(np, 0, 0, 0)
-        np.show()
-        time.sleep(0.5)
-        try:
-            feed_watchdog(log_path)
-        except Exception:
-            pass
+    LedAnimator(np, log_path=log_path).run(blink(np, (255, 0, 0), 3))
     paus(volume_percent)
 
 
@@ -185,18 +107,8 @@ def led_und_buzzer_blinken_und_aus(
 ):
     if not _is_ready(np, log_path):
         return
-    for _ in range(3):
-        if not nur_aus:
-            _safe_fill(np, 255, 0, 0)
-            np.show()
-            time.sleep(0.5)
-        _safe_fill(np, 0, 0, 0)
-        np.show()
-        time.sleep(0.5)
-        try:
-            feed_watchdog(log_path)
-        except Exception:
-            pass
+    color = (0, 0, 0) if nur_aus else (255, 0, 0)
+    LedAnimator(np, log_path=log_path).run(blink(np, color, 3))
     if not nur_aus:
         paus(volume_percent)
 
@@ -0,0 +1,173 @@
+# led_animation.py
+"""
+Frame-basierte LED-Effekte fuer den NeoPixel-Ring.
+
+Ein Effekt ist ein Generator: er zeichnet ein Bild in den Ring (set_pixel/fill)
+und gibt mit yield ab – ein yield = ein Frame. show() und der Takt kommen vom
+LedAnimator (neopixel.FrameRunner). So laeuft eine Animation entweder als
+Scheduler-Task neben Uhr, Alarm und Webserver (tick) oder, wo es nichts
+anderes zu tun gibt (Boot, Selbsttest), blockierend mit WDT-Fuetterung (run).
+"""
+import utime
+from neopixel import FrameRunner
+from log_utils import log_message
+from recovery_manager import feed_watchdog
+
+FPS = 50  # 20 ms pro Frame – Dauern der Effekte sind in Frames angegeben
+
+
+# --------------------------------------------------------------------
+#   Hilfen
+# --------------------------------------------------------------------
+def wheel(pos):
+    """0-255 → RGB Regenbogen-Rad."""
+    pos &= 255
+    if pos < 85:
+        return 255 - pos * 3, pos * 3, 0
+    if pos < 170:
+        pos -= 85
+        return 0, 255 - pos * 3, pos * 3
+    pos -= 170
+    return pos * 3, 0, 255 - pos * 3
+
+
+def hour_leds(minute, n):
+    """Anzahl leuchtender LEDs: der Ring fuellt sich einmal pro Stunde."""
+    return min(n, minute * n // 60 + 1)
+
+
+# --------------------------------------------------------------------
+#   Effekte (Generatoren)
+# --------------------------------------------------------------------
+def hold(frames):
+    """Bild stehen lassen."""
+    for _ in range(frames):
+        yield
+
+
+def sequence(*effects):
+    """Effekte nacheinander abspielen."""
+    for effect in effects:
+        yield from effect
+
+
+def rainbow_wipe(np, frames=50, step=5):
+    n = np.num_leds
+    for cycle in range(frames):
+        for i in range(n):
+            r, g, b = wheel(i * 256 // n + cycle * step)
+            np.set_pixel(i, r, g, b)
+        yield
+
+
+def chase(np, rounds=3, step_frames=2, pause_frames=5):
+    """Ein Punkt laeuft im Kreis, Farbe wandert mit."""
+    n = np.num_leds
+    for cycle in range(rounds):
+        for i in range(n):
+            np.fill(0, 0, 0)
+            r, g, b = wheel(i * 256 // n + cycle * 20)
+            np.set_pixel(i, r, g, b)
+            yield from hold(step_frames)
+        yield from hold(pause_frames)
+
+
+def fading_tail(np, frames=50, step=10):
+    """Regenbogen, der zum Ende des Rings hin ausblendet."""
+    n = np.num_leds
+    for cycle in range(frames):
+        for i in range(n):
+            r, g, b = wheel(i * 256 // n + cycle * step)
+            fade = n - i
+            np.set_pixel(i, r * fade // n, g * fade // n, b * fade // n)
+        yield
+
+
+def blink(np, color, times=None, on_frames=25, off_frames=25, off_color=(0, 0, 0)):
+    """An/Aus im Wechsel; times=None blinkt bis stop()."""
+    count = 0
+    while times is None or count < times:
+        np.fill(*color)
+        yield from hold(on_frames)
+        np.fill(*off_color)
+        yield from hold(off_frames)
+        count += 1
+
+
+def hour_fill(np, minute, color=(255, 20, 147), step_frames=3):
+    """Stundenring LED fuer LED bis zur aktuellen Minute auffuellen."""
+    n = np.num_leds
+    np.fill(0, 0, 0)
+    for i in range(hour_leds(minute, n)):
+        np.set_pixel(i, *color)
+        yield from hold(step_frames)
+
+
+# --------------------------------------------------------------------
+#   Abspielen
+# --------------------------------------------------------------------
+class LedAnimator:
+    """Spielt einen Effekt-Generator mit fester Bildrate auf einem Ring ab."""
+
+    def __init__(self, np, fps=FPS, log_path=None, clock=None):
+        self.np = np
+        self.log_path = log_path
+        self._runner = FrameRunner(np, fps, clock)
+        self._effect = None
+        self._on_done = None
+
+    @property
+    def active(self):
+        return self._effect is not None
+
+    @property
+    def period_ms(self):
+        return self._runner.period_ms
+
+    def play(self, effect, on_done=None):
+        """Startet einen Effekt (ersetzt den laufenden); erster Frame beim naechsten tick()."""
+        self._effect = effect
+        self._on_done = on_done
+        self._runner.restart()
+
+    def stop(self, clear=True):
+        self._effect = None
+        if clear and self.np:
+            try:
+                self.np.fill(0, 0, 0)
+                self.np.show()
+            except Exception as e:
+                log_message(self.log_path, "[LED Animation] Stop: {}".format(str(e)))
+
+    def _render(self, _frame):
+        try:
+            next(self._effect)
+        except StopIteration:
+            return False
+        return True
+
+    def tick(self):
+        """Einen Frame ausgeben, falls faellig. Gibt False zurueck, sobald nichts mehr laeuft."""
+        if self._effect is None:
+            return False
+        try:
+            if self._runner.tick(self._render) is None:
+                self._effect = None
+                if self._on_done:
+                    self._on_done()
+        except Exception as e:
+            log_message(self.log_path, "[LED Animation] {}".format(str(e)))
+            self._effect = None
+        return self.active
+
+    def run(self, effect):
+        """Blockierend abspielen (Boot/Selbsttest) – schlaeft zwischen Frames, fuettert den WDT."""
+        self.play(effect)
+        while self.tick():
+            wait = self._runner.ms_until_next()
+            if wait:
+                utime.sleep_ms(wait)
+            try:
+                feed_watchdog(self.log_path)
+            except Exception:
+                pass
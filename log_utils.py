@@ -7,6 +7,12 @@ import time
 # --------------------------------------------------------------------
 _MAX_SIZE = 512 * 1024  # 512 kB pro Logfile
 _LOG_NAME = "debug_log.txt"
+_LOG_GENERATIONS = 3  # Archive .1 … .N (aelteste wird geloescht)
+
+# Schreibpuffer: Zeilen sammeln und gebuendelt anhaengen (schont SD/SPI)
+_BUF_FLUSH_BYTES = 2048   # ab dieser Puffergroesse sofort schreiben
+_BUF_FLUSH_INTERVAL = 30  # spaetestens nach 30 s schreiben
+_BUF_MAX_LINES = 64       # Ringpuffer-Grenze, falls SD nicht erreichbar
 
 
 # --------------------------------------------------------------------
@@ -20,27 +26,140 @@ def _timestamp():
         return "0000-00-00 00:00"
 
 
-def _rotate(log_path):
-    """Benamst alte Datei zu .1, wenn sie zu gross wird."""
+# Bekannte Dateigroessen (Pfad → Bytes), einmal per stat ermittelt
+_log_sizes = {}
+
+
+def _known_size(log_path):
+    size = _log_sizes.get(log_path)
+    if size is None:
+        try:
+            size = os.stat(log_path)[6]
+        except OSError:
+            size = 0
+        _log_sizes[log_path] = size
+    return size
+
+
+def _rotate(log_path, pending=0):
+    """
+    Verschiebt Archive (.1 → .2 …) und benennt die Datei zu .1, wenn sie mit
+    'pending' Bytes die Grenze ueberschreiten wuerde. Nutzt nur die im RAM
+    gefuehrte Groesse, das Dateisystem wird erst beim Rotieren angefasst.
+    """
+    size = _known_size(log_path)
+    if size == 0 or size + pending <= _MAX_SIZE:
+        return
     try:
-        if os.stat(log_path)[6] > _MAX_SIZE:
-            old = log_path + ".1"
-            if old in os.listdir("/sd"):
-                os.remove(old)
-            os.rename(log_path, old)
+        try:
+            os.remove("{}.{}".format(log_path, _LOG_GENERATIONS))
+        except OSError:
+            pass
+        for gen in range(_LOG_GENERATIONS - 1, 0, -1):
+            try:
+                os.rename("{}.{}".format(log_path, gen), "{}.{}".format(log_path, gen + 1))
+            except OSError:
+                pass  # Generation existiert (noch) nicht
+        os.rename(log_path, log_path + ".1")
+        _log_sizes[log_path] = 0
     except OSError:
-        # stat/rename kann fehlschlagen, z. B. wenn SD nicht gemountet
-        pass
+        # rename kann fehlschlagen, z. B. wenn SD nicht gemountet
+        _log_sizes.pop(log_path, None)
+
+
+def log_archive_paths(log_path):
+    """Pfade der Archiv-Generationen (.1 = juengste)."""
+    return ["{}.{}".format(log_path, gen) for gen in range(1, _LOG_GENERATIONS + 1)]
+
+
+# --------------------------------------------------------------------
+#   Schreibpuffer
+# --------------------------------------------------------------------
+_buf_lines = []
+_buf_bytes = 0
+_buf_path = None
+_last_flush = 0
+
+
+def _buffer_append(log_path, text):
+    """Haengt Text an den RAM-Puffer; aelteste Zeilen fallen bei Ueberlauf raus."""
+    global _buf_bytes, _buf_path
+    if _buf_path is not None and _buf_path != log_path:
+        flush_log()
+    _buf_path = log_path
+    _buf_lines.append(text)
+    _buf_bytes += len(text)
+    while len(_buf_lines) > _BUF_MAX_LINES:
+        _buf_bytes -= len(_buf_lines.pop(0))
+
+
+def _flush_due():
+    if _buf_bytes >= _BUF_FLUSH_BYTES:
+        return True
+    return time.time() - _last_flush >= _BUF_FLUSH_INTERVAL
+
+
+def flush_log(log_path=None):
+    """
+    Schreibt alle gepufferten Zeilen in einem einzigen Append.
+    Gibt True zurueck, wenn der Puffer danach leer ist.
+    """
+    global _buf_bytes, _buf_path, _last_flush
+    _last_flush = time.time()
+    if not _buf_lines:
+        return True
+    path = _buf_path or log_path
+    if not path:
+        return False
+    try:
+        data = "".join(_buf_lines).encode()
+        _rotate(path, len(data))  # ggf. Archiv
+        size = _known_size(path)  # vor dem Anhaengen, sonst doppelt gezaehlt
+        with open(path, "ab") as f:
+            f.write(data)
+            f.flush()
+        os.sync()
+        _log_sizes[path] = size + len(data)
+    except Exception as e:
+        # Puffer behalten (Ringpuffer begrenzt), naechster Versuch beim naechsten Flush
+        print("⚠️  Schreiben in Logdatei fehlgeschlagen:", e)
+        return False
+    del _buf_lines[:]
+    _buf_bytes = 0
+    _buf_path = None
+    return True
+
+
+def flush_log_if_due(log_path=None):
+    """Fuer die Hauptschleife: schreibt den Puffer, wenn das Zeitlimit erreicht ist."""
+    if _buf_lines and _flush_due():
+        return flush_log(log_path)
+    return True
+
+
+def log_raw(log_path, text, immediate=False):
+    """Haengt Rohtext (z. B. Trenner-Bloecke) ohne Zeitstempel an das Logfile an."""
+    if not log_path:
+        print(text)
+        return
+    _buffer_append(log_path, text)
+    if immediate or _flush_due():
+        flush_log(log_path)
 
 
 # --------------------------------------------------------------------
 #   Public API
 # --------------------------------------------------------------------
-def init_logfile(sd_path="/sd", log_filename=_LOG_NAME):
+def init_logfile(sd_path="/sd", log_filename=_LOG_NAME, generations=None):
     """
     Erstellt Log-Verzeichnis und -Datei bei Bedarf.
+    Ermittelt die Dateigroesse einmalig, danach wird sie im RAM mitgezaehlt.
+    generations: Anzahl Archiv-Dateien (.1 … .N), Default _LOG_GENERATIONS.
     Gibt den vollstaendigen Pfad zurueck oder None, wenn Schreibfehler.
     """
+    global _LOG_GENERATIONS
+    if generations is not None:
+        _LOG_GENERATIONS = max(1, int(generations))
     try:
         # SD-Ordner existiert evtl. noch nicht
         if sd_path not in ("/", "") and sd_path.strip("/") not in os.listdir("/"):
@@ -51,6 +170,8 @@ def init_logfile(sd_path="/sd", log_filename=_LOG_NAME):
                 f.write("")  # leere Datei
                 f.flush()
                 os.sync()
+        _log_sizes.pop(log_path, None)
+        _known_size(log_path)
         return log_path
     except Exception as e:
         print("{} - Fehler beim Initialisieren des Logfiles: {}".format(_timestamp(), str(e)))
@@ -74,10 +195,11 @@ LOG_CATEGORIES = {
 }
 
 
-def log_message(log_path, message, force=False, category=None):
+def log_message(log_path, message, force=False, category=None, immediate=False):
     """
     Schreibt Nachricht in Logfile oder (Fallback) auf die Konsole.
-    Rotiert Datei automatisch, flush + sync nach jedem Write.
+    Zeilen werden im RAM gepuffert und gebuendelt geschrieben
+    (Groessen- oder Zeitgrenze); immediate=True schreibt sofort.
     Anti-Spam: Gleiche Nachrichten nur alle 60 Min.
     category: Optional fuer intelligente Filterung
     """
@@ -117,15 +239,11 @@ def log_message(log_path, message, force=False, category=None):
 
     # --- Logfile vorhanden? ---
     if log_path:
-        try:
-            _rotate(log_path)  # ggf. Archiv
-            with open(log_path, "a") as f:
-                f.write(full + "\n")
-                f.flush()
-                os.sync()
-            return
-        except Exception as e:
-            print("⚠️  Schreiben in Logdatei fehlgeschlagen:", e)
+        _buffer_append(log_path, full + "\n")
+        if immediate or _flush_due():
+            if not flush_log(log_path):
+                print(full)
+        return
 
     # --- Fallback Konsole ---
     print(full)
@@ -146,8 +264,8 @@ def debug(log_path, message, enabled=True):
 
 
 def log_important(log_path, message):
-    """Wichtige Logs die nicht gefiltert werden (force=True)"""
-    log_message(log_path, message, force=True)
+    """Wichtige Logs die nicht gefiltert werden (force=True), sofort geschrieben"""
+    log_message(log_path, message, force=True, immediate=True)
 
 
 def log_once_per_day(log_path, message, day):
@@ -175,5 +293,5 @@ def log_system_status(log_path, message):
 
 
 def log_alarm_event(log_path, message):
-    """Fuer Alarm-relevante Events (immer loggen)"""
-    log_message(log_path, "[ALARM] {}".format(message), force=True, category='ALARM')
+    """Fuer Alarm-relevante Events (immer loggen, sofort geschrieben)"""
+    log_message(log_path, "[ALARM] {}".format(message), force=True, category='ALARM', immediate=True)
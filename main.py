@@ -7,12 +7,12 @@ from char import ladebalken_erstellen
 from sound_config import fuer_elise, xp_start_sound
 from led import led_kranz_animation
 from clock_program import run_clock_program, reload_alarms
-from log_utils import init_logfile, log_message
+from log_utils import init_logfile, log_message, log_raw, flush_log
 import sdcard
+import alarm_store
 from neopixel import myNeopixel
 from time_config import synchronisiere_zeit
 import joystick
-from webserver_program import set_reload_alarms_callback
 from crash_guard import check_previous_crash, clear_stage
 from power_management import get_volume
 
@@ -174,12 +174,9 @@ def mount_sd_card(lcd, spi, cs, sd_path="/sd", led=None):
             log_path = init_logfile(sd_path)
 
             if log_path:
-                with open(log_path, "a") as f:
-                    f.write("\n" + "#" * 40 + "\n")
-                    t = time.gmtime()
-                    ts = "{:02d}.{:02d}.{}  {:02d}:{:02d}:{:02d} UTC".format(t[2], t[1], t[0], t[3], t[4], t[5])
-                    f.write(ts + "\n")
-                    f.write("#" * 40 + "\n\n")
+                t = time.gmtime()
+                ts = "{:02d}.{:02d}.{}  {:02d}:{:02d}:{:02d} UTC".format(t[2], t[1], t[0], t[3], t[4], t[5])
+                log_raw(log_path, "\n" + "#" * 40 + "\n" + ts + "\n" + "#" * 40 + "\n\n", immediate=True)
                 log_message(log_path, "SD-Karte erfolgreich gemountet.")
             
             # Interne LED AN (nur wenn Parameter uebergeben)
@@ -208,41 +205,6 @@ def mount_sd_card(lcd, spi, cs, sd_path="/sd", led=None):
     return None
 
 
-def zaehle_aktive_alarme(pfad="/sd/alarm.txt", retries=5, delay=0.2, log_path=None):
-    for attempt in range(retries):
-        try:
-            if "sd" not in os.listdir("/") or pfad[4:] not in os.listdir("/sd"):
-                log_message(
-                    log_path,
-                    "[Alarm Zaehlversuch {}] Datei noch nicht vorhanden.".format(attempt + 1),
-                )
-                time.sleep(delay)
-                continue
-            count = 0
-            alarm = {}
-            with open(pfad, "r") as f:
-                for line in f:
-                    line = line.strip()
-                    if line == "---":
-                        if alarm.get("STATUS", "").lower() == "aktiv":
-                            count += 1
-                        alarm = {}
-                    elif "=" in line:
-                        key, value = line.split("=", 1)
-                        alarm[key.strip()] = value.strip()
-            if alarm and alarm.get("STATUS", "").lower() == "aktiv":
-                count += 1
-            return count
-        except Exception as e:
-            log_message(log_path, "[Alarm Zaehlfehler, Versuch {}] {}".format(attempt + 1, str(e)))
-            time.sleep(delay)
-    log_message(
-        log_path,
-        "Fehler: Alarme-Datei nicht gefunden oder lesbar nach allen Versuchen.",
-    )
-    return 0
-
-
 def teste_joystick(repeats=100, max_dev=6000, log_path=None):
     """
     Kurzer Selbsttest fuer den Joystick.
@@ -380,10 +342,7 @@ def main():
             # Systemstart loggen
             ts = time.localtime()
             log_timestamp = "{:02d}.{:02d}.{}  {:02d}:{:02d}:{:02d}".format(ts[2], ts[1], ts[0], ts[3], ts[4], ts[5])
-            with open(log_path, "a") as f:
-                f.write("\n" + "#" * 40 + "\n")
-                f.write(log_timestamp + " - SYSTEMSTART\n")
-                f.write("#" * 40 + "\n\n")
+            log_raw(log_path, "\n" + "#" * 40 + "\n" + log_timestamp + " - SYSTEMSTART\n" + "#" * 40 + "\n\n")
             try:
                 check_previous_crash(log_path)
             except Exception:
@@ -403,7 +362,7 @@ def main():
         try:
             reload_alarms(log_path)
             time.sleep(0.5)
-            anzahl_alarme = zaehle_aktive_alarme("/sd/alarm.txt", log_path=log_path)
+            anzahl_alarme = alarm_store.count_active()
             log_message(log_path, "Geladene Alarme: " + str(anzahl_alarme))
             if lcd:
                 lcd.clear()
@@ -537,7 +496,6 @@ def main():
     except Exception:
         pass
     try:
-        set_reload_alarms_callback(lambda: reload_alarms(log_path))
         time.sleep(0.2)
 
         run_clock_program(lcd, np, wlan, log_path, ladebalken_anzeigen, led, blue_led)
@@ -545,6 +503,8 @@ def main():
         log_message(log_path, "[Hauptprogramm Fehler] " + str(e))
         # Bei kritischem Fehler: Status-Report fuer Debugging
         log_message(log_path, "Status bei Fehler: " + " ".join(status_summary), force=True)
+    finally:
+        flush_log(log_path)
 
 if __name__ == "__main__":
     main()
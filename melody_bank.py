@@ -0,0 +1,144 @@
+# melody_bank.py
+"""
+Melodie-Bank: alle Melodien in einer gepackten Datei im Flash (/melodies.bin).
+
+Erzeugt wird sie auf dem PC mit tools/build_melodies.py aus tools/melodies.txt
+(eigene Notenlisten oder RTTTL). Neue Weckmelodien brauchen so keine Code-
+Aenderung und kosten keinen Dauer-RAM.
+
+Aufbau (Little Endian):
+    Header  <4sBBHI   Magic "NWM1", Version, Anzahl, reserviert, CRC32 ab Verzeichnis
+    Eintrag <12sIH    Name (ASCII, mit 0 aufgefuellt), Byte-Offset der Noten, Notenanzahl
+    Noten   <HH       Frequenz (0 = Pause), Dauer_ms
+
+Gelesen wird nur das Verzeichnis (einmal); Noten werden ueber einen festen
+Puffer gestreamt (notes) oder mit einem readinto() in ein array('H') geholt (load).
+"""
+import struct
+from array import array
+from alarm_store import crc32
+from log_utils import log_message
+
+BANK_PATH = "/melodies.bin"
+MAX_NAME = 12
+
+_MAGIC = b"NWM1"
+_VERSION = 1
+_HDR_FMT = "<4sBBHI"
+_HDR_SIZE = struct.calcsize(_HDR_FMT)
+_ENTRY_FMT = "<12sIH"
+_ENTRY_SIZE = struct.calcsize(_ENTRY_FMT)
+_NOTE_FMT = "<HH"
+NOTE_SIZE = struct.calcsize(_NOTE_FMT)
+
+
+def encode(melodies):
+    """melodies: Folge von (Name, [(Frequenz, Dauer_ms), ...]) → bytes."""
+    if len(melodies) > 255:
+        raise ValueError("zu viele Melodien")
+    directory = bytearray()
+    notes = bytearray()
+    offset = _HDR_SIZE + len(melodies) * _ENTRY_SIZE
+    for name, melody in melodies:
+        raw = name.encode()
+        if not raw or len(raw) > MAX_NAME:
+            raise ValueError("Name ungueltig: {}".format(name))
+        if len(melody) > 0xFFFF:
+            raise ValueError("{}: zu viele Noten".format(name))
+        directory += struct.pack(_ENTRY_FMT, raw, offset + len(notes), len(melody))
+        for freq, dur in melody:
+            notes += struct.pack(_NOTE_FMT, int(freq), int(dur))
+    body = bytes(directory + notes)
+    return struct.pack(_HDR_FMT, _MAGIC, _VERSION, len(melodies), 0, crc32(body) & 0xFFFFFFFF) + body
+
+
+class MelodyBank:
+    CHUNK_NOTES = 16  # Streaming-Puffer: 64 Byte
+
+    def __init__(self, path=BANK_PATH, log_path=None):
+        self.path = path
+        self.log_path = log_path
+        self._dir = None  # {Name: (Offset, Anzahl)}, beim ersten Zugriff geladen
+        self._buf = bytearray(NOTE_SIZE * self.CHUNK_NOTES)
+
+    def _directory(self):
+        if self._dir is None:
+            self._dir = {}
+            try:
+                self._dir = self._read_directory()
+            except OSError:
+                pass  # keine Bank im Flash → eingebaute Melodien
+            except Exception as e:
+                log_message(self.log_path, "[Melodien] {} ungueltig: {}".format(self.path, str(e)))
+        return self._dir
+
+    def _read_directory(self):
+        buf = self._buf
+        mv = memoryview(buf)
+        with open(self.path, "rb") as f:
+            if f.readinto(mv[:_HDR_SIZE]) != _HDR_SIZE:
+                raise ValueError("Header zu kurz")
+            magic, version, count, _, crc = struct.unpack_from(_HDR_FMT, buf)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError("Magic/Version")
+            # CRC ueber den Rest der Datei, stueckweise durch den festen Puffer
+            actual = 0
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                actual = crc32(mv[:n], actual)
+            if actual & 0xFFFFFFFF != crc:
+                raise ValueError("CRC")
+            entries = {}
+            f.seek(_HDR_SIZE)
+            for _ in range(count):
+                if f.readinto(mv[:_ENTRY_SIZE]) != _ENTRY_SIZE:
+                    raise ValueError("Verzeichnis zu kurz")
+                raw, offset, n_notes = struct.unpack_from(_ENTRY_FMT, buf)
+                end = raw.find(b"\x00")
+                entries[(raw if end < 0 else raw[:end]).decode()] = (offset, n_notes)
+        return entries
+
+    def names(self):
+        return list(self._directory())
+
+    def __contains__(self, name):
+        return name in self._directory()
+
+    def notes(self, name):
+        """Generator ueber (Frequenz, Dauer_ms); liest CHUNK_NOTES Noten je readinto()."""
+        entry = self._directory().get(name)
+        if entry is None:
+            return
+        offset, remaining = entry
+        buf = self._buf
+        mv = memoryview(buf)
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            while remaining:
+                n = min(remaining, self.CHUNK_NOTES)
+                got = f.readinto(mv[:n * NOTE_SIZE]) // NOTE_SIZE
+                if not got:
+                    break
+                for i in range(got):
+                    yield struct.unpack_from(_NOTE_FMT, buf, i * NOTE_SIZE)
+                remaining -= got
+
+    def load(self, name):
+        """
+        Ganze Melodie als flaches array('H') (Frequenz, Dauer_ms, ...) – ein
+        readinto() direkt ins Array (RP2040 und PC sind Little Endian). None,
+        wenn der Name fehlt.
+        """
+        entry = self._directory().get(name)
+        if entry is None:
+            return None
+        offset, count = entry
+        result = array("H", [0] * (2 * count))
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            if f.readinto(result) != count * NOTE_SIZE:
+                log_message(self.log_path, "[Melodien] {} unvollstaendig".format(name))
+                return None
+        return result
@@ -0,0 +1,207 @@
+# melody_engine.py
+"""
+Melodien im Hintergrund abspielen.
+
+compile_melody() uebersetzt eine Notenliste [(Frequenz, Dauer_ms), ...] einmalig
+in ein flaches array('H') aus Ereignissen (Frequenz, Dauer_ms, Duty). Die Lautstaerke-
+Huellkurve (Ein-/Ausblenden gegen Knacken) steckt bereits als kurze Stufen-Ereignisse
+im Array – zur Laufzeit wird nichts mehr gerechnet oder gerampt.
+
+MelodyPlayer schaltet die Ereignisse per machine.Timer (ONE_SHOT, Kette von
+Rueckrufen) auf den PWM-Pin. Die CPU ist waehrend einer Note frei; die Hauptschleife
+fragt nur is_playing() ab oder ruft stop(). play_notes() spielt ein flaches
+Noten-array('H') und erzeugt dieselben Ereignisse erst im Rueckruf, Note fuer Note:
+4 Byte je Note statt bis zu 7 Ereignissen (42 Byte) im kompilierten Array.
+"""
+from array import array
+from machine import Timer
+from log_utils import log_message
+
+MIN_FREQ = 100
+MAX_FREQ = 5000
+
+# Huellkurve: Anteile der Ziel-Lautstaerke (von 256) je ENV_STEP_MS beim Einblenden,
+# rueckwaerts beim Ausblenden. Ersetzt die alte _ramp_duty-Schleife (sleep_us je Stufe).
+ENV_STEP_MS = 4
+_ENVELOPE = (64, 128, 192)
+_ENV_MS = ENV_STEP_MS * len(_ENVELOPE)
+
+FIELDS = 3  # Frequenz, Dauer_ms, Duty je Ereignis
+
+
+def volume_duty(volume_percent):
+    """Lautstaerke in % → duty_u16 (0..65535)."""
+    volume_percent = max(0, min(int(volume_percent), 100))
+    return volume_percent * 65535 // 100
+
+
+def note_pairs(notes):
+    """(Frequenz, Dauer_ms)-Paare aus einer Tupel-Folge oder einem flachen array('H')."""
+    if isinstance(notes, array):
+        for i in range(0, len(notes) - 1, 2):
+            yield notes[i], notes[i + 1]
+    else:
+        for pair in notes:
+            yield pair
+
+
+def compile_melody(notes, volume_percent, envelope=True):
+    """
+    notes: (Frequenz, Dauer_ms)-Paare (siehe note_pairs); 0 Hz = Pause.
+    Gibt array('H') mit FIELDS Werten je Ereignis zurueck. Noten, die fuer die
+    Huellkurve zu kurz sind, werden ohne Rampe gespielt.
+    """
+    duty = volume_duty(volume_percent)
+    events = array("H")
+    for freq, dur in note_pairs(notes):
+        dur = max(0, min(int(dur), 0xFFFF))
+        if not dur:
+            continue
+        if not freq or not duty:
+            events.extend((0, dur, 0))
+            continue
+        freq = max(MIN_FREQ, min(int(freq), MAX_FREQ))
+        if not envelope or dur < 3 * _ENV_MS:
+            events.extend((freq, dur, duty))
+            continue
+        for share in _ENVELOPE:
+            events.extend((freq, ENV_STEP_MS, duty * share >> 8))
+        events.extend((freq, dur - 2 * _ENV_MS, duty))
+        for share in reversed(_ENVELOPE):
+            events.extend((freq, ENV_STEP_MS, duty * share >> 8))
+    return events
+
+
+def duration_ms(events):
+    """Gesamtdauer eines kompilierten Ereignis-Arrays."""
+    total = 0
+    for i in range(1, len(events), FIELDS):
+        total += events[i]
+    return total
+
+
+class MelodyPlayer:
+    """Spielt kompilierte Ereignisse per Timer-Rueckruf auf einem PWM-Ausgang."""
+
+    def __init__(self, pwm, timer=None, log_path=None):
+        self._pwm = pwm
+        self._timer = timer or Timer()
+        self.log_path = log_path
+        self._events = None
+        self._pos = 0
+        self._loop = False
+        self._freq = 0
+        self._duty = None  # None: _events ist kompiliert, sonst Noten-Paare mit dieser Duty
+        self._envelope = True
+        self._phase = 0  # Stufe innerhalb der Huellkurve der aktuellen Note
+        self._step_cb = self._step  # gebundene Methode einmal anlegen (IRQ-Kontext)
+
+    def is_playing(self):
+        return self._events is not None
+
+    def play_async(self, events, loop=False):
+        """Startet die Wiedergabe sofort; eine laufende Melodie wird ersetzt."""
+        self._start(events, None, True, loop)
+
+    def play_notes(self, notes, volume_percent, loop=False, envelope=True):
+        """
+        Wie play_async, aber mit einem flachen Noten-array('H') (Frequenz, Dauer_ms, ...),
+        z.B. aus MelodyBank.load(). Ergibt dieselbe Zeitleiste wie
+        compile_melody(notes, volume_percent, envelope), ohne das Ereignis-Array anzulegen.
+        """
+        self._start(notes, volume_duty(volume_percent), envelope, loop)
+
+    def _start(self, events, duty, envelope, loop):
+        self.stop()
+        if not events:
+            return
+        self._loop = loop
+        self._pos = 0
+        self._phase = 0
+        self._duty = duty
+        self._envelope = envelope
+        self._events = events
+        self._step(None)
+
+    def stop(self):
+        """Bricht die Wiedergabe ab und schaltet den Ausgang stumm."""
+        self._events = None
+        try:
+            self._timer.deinit()
+        except Exception:
+            pass
+        self._silence()
+
+    def _silence(self):
+        try:
+            self._pwm.duty_u16(0)
+        except Exception as e:
+            log_message(self.log_path, "[Sound Fehler] PWM-Stop: {}".format(str(e)))
+
+    def _next_compiled(self, events):
+        pos = self._pos
+        if pos + FIELDS > len(events):
+            return None
+        self._pos = pos + FIELDS
+        return events[pos], events[pos + 1], events[pos + 2]
+
+    def _next_note(self, notes):
+        """Naechstes Ereignis aus den Noten-Paaren; gleiche Regeln wie compile_melody()."""
+        duty = self._duty
+        while self._pos + 2 <= len(notes):
+            pos = self._pos
+            freq, dur = notes[pos], notes[pos + 1]
+            if not dur:
+                self._pos = pos + 2
+                continue
+            if not freq or not duty:
+                self._pos = pos + 2
+                return 0, dur, 0
+            freq = max(MIN_FREQ, min(freq, MAX_FREQ))
+            if not self._envelope or dur < 3 * _ENV_MS:
+                self._pos = pos + 2
+                return freq, dur, duty
+            phase = self._phase
+            steps = len(_ENVELOPE)
+            if phase == 2 * steps:
+                self._phase = 0
+                self._pos = pos + 2
+            else:
+                self._phase = phase + 1
+            if phase < steps:
+                return freq, ENV_STEP_MS, duty * _ENVELOPE[phase] >> 8
+            if phase == steps:
+                return freq, dur - 2 * _ENV_MS, duty
+            return freq, ENV_STEP_MS, duty * _ENVELOPE[2 * steps - phase] >> 8
+        return None
+
+    def _next_event(self, events):
+        if self._duty is None:
+            return self._next_compiled(events)
+        return self._next_note(events)
+
+    def _step(self, _timer):
+        """Timer-Rueckruf: naechstes Ereignis ausgeben und Timer neu stellen."""
+        events = self._events
+        if events is None:
+            return
+        try:
+            event = self._next_event(events)
+            if event is None and self._loop:
+                self._pos = 0
+                self._phase = 0
+                event = self._next_event(events)
+            if event is None:
+                self._events = None
+                self._silence()
+                return
+            freq, dur, duty = event
+            if freq and freq != self._freq:
+                self._pwm.freq(freq)
+                self._freq = freq
+            self._pwm.duty_u16(duty)
+            self._timer.init(mode=Timer.ONE_SHOT, period=dur, callback=self._step_cb)
+        except Exception as e:
+            self._events = None
+            self._silence()
+            log_message(self.log_path, "[Sound Fehler] Melodie: {}".format(str(e)))
@@ -32,15 +32,44 @@ def ws2812():
 class myNeopixel:
     """Minimaler NeoPixel-Ring-Wrapper fuer RP2040-PIO."""
 
-    def __init__(self, num_leds, pin, delay_ms=0):
+    BIT_US = 1.25        # 800 kHz WS2812-Takt
+    RESET_US = 60        # Low-Pause, mit der der Ring ein Bild uebernimmt
+
+    def __init__(self, num_leds, pin, delay_ms=0, gamma=None, sm_id=0, use_dma=True):
+        """
+        num_leds: Ringgroesse (8er-Ring ebenso wie 60+ LED-Streifen)
+        sm_id: PIO-State-Machine 0-7 (0-3 = PIO0, 4-7 = PIO1)
+        use_dma: Bild per rp2.DMA in den FIFO schieben (falls die Firmware es kann)
+        """
         self.num_leds = num_leds
         self.delay_ms = delay_ms
         self._brightness = 64
+        self._gamma = gamma  # z. B. 2.2 fuer wahrnehmungsgleiche Stufen; None = linear
 
+        # Rohfarben (R, G, B je Pixel) getrennt von den skalierten GRB-Worten,
+        # damit eine neue Helligkeit ohne erneutes set_pixel() wirkt
+        self._raw = bytearray(3 * num_leds)
+        # Doppelpuffer: in pixels wird gezeichnet, _front wird gerade ausgegeben.
+        # Worte liegen schon um 8 Bit verschoben (GRB in Bit 31..8) → DMA ohne Umrechnung
         self.pixels = array.array("I", [0] * num_leds)
-        self.sm = rp2.StateMachine(0, ws2812, freq=8_000_000, sideset_base=Pin(pin))
+        self._front = array.array("I", [0] * num_leds)
+        self._lut = bytearray(256)  # Kanalwert → skalierter Kanalwert
+        self._build_lut()
+        self.sm = rp2.StateMachine(sm_id, ws2812, freq=8_000_000, sideset_base=Pin(pin))
         self.sm.active(1)
 
+        self._frame_us = int(num_leds * 24 * self.BIT_US) + self.RESET_US
+        self._busy_since = None  # ticks_us beim Start der letzten Ausgabe
+        self._dma = None
+        if use_dma:
+            try:
+                self._dma = rp2.DMA()
+                # DREQ PIO0_TX0..3 = 0..3, PIO1_TX0..3 = 8..11
+                treq = sm_id if sm_id < 4 else sm_id + 4
+                self._dma_ctrl = self._dma.pack_ctrl(size=2, inc_write=False, treq_sel=treq)
+            except Exception:
+                self._dma = None  # aeltere Firmware ohne rp2.DMA → sm.put(array)
+
     # --------------------------------------------------------------
     #   Brightness
     # --------------------------------------------------------------
@@ -49,9 +78,30 @@ class myNeopixel:
         if value is None:
             return self._brightness
         value = 1 if value < 1 else 255 if value > 255 else value
-        self._brightness = value
+        if value != self._brightness:
+            self._brightness = value
+            self._build_lut()
+            self._render()  # wirkt beim naechsten show() auf alle Pixel
         return self._brightness
 
+    def _build_lut(self):
+        """256 Eintraege: (optional Gamma) × Helligkeit – nur bei Aenderung neu."""
+        lut = self._lut
+        br = self._brightness
+        gamma = self._gamma
+        for v in range(256):
+            level = int((v / 255) ** gamma * 255 + 0.5) if gamma else v
+            lut[v] = level * br // 255
+
+    def _render(self):
+        """Alle GRB-Worte aus den Rohfarben neu berechnen."""
+        lut = self._lut
+        raw = self._raw
+        pixels = self.pixels
+        for idx in range(self.num_leds):
+            o = 3 * idx
+            pixels[idx] = lut[raw[o + 2]] << 8 | lut[raw[o]] << 16 | lut[raw[o + 1]] << 24
+
     # --------------------------------------------------------------
     #   Pixel-Operationen
     # --------------------------------------------------------------
@@ -62,8 +112,18 @@ class myNeopixel:
         """Einzel-Pixel setzen (RGB)."""
         if not self._clamp_idx(idx):
             return
-        scale = self._brightness / 255
-        self.pixels[idx] = int(b * scale) | int(r * scale) << 8 | int(g * scale) << 16
+        o = 3 * idx
+        raw = self._raw
+        raw[o] = r
+        raw[o + 1] = g
+        raw[o + 2] = b
+        lut = self._lut
+        self.pixels[idx] = lut[b] << 8 | lut[r] << 16 | lut[g] << 24
+
+    def get_pixel(self, idx):
+        """Rohfarbe (R, G, B) vor Helligkeit/Gamma."""
+        o = 3 * idx
+        return self._raw[o], self._raw[o + 1], self._raw[o + 2]
 
     def set_pixel_line(self, start, end, r, g, b):
         for i in range(start, end + 1):
@@ -88,13 +148,23 @@ class myNeopixel:
     # --------------------------------------------------------------
     def fill(self, r, g, b):
         """Alle Pixel puffern (show() separat!)."""
+        lut = self._lut
+        word = lut[b] << 8 | lut[r] << 16 | lut[g] << 24
+        raw = self._raw
+        pixels = self.pixels
         for i in range(self.num_leds):
-            self.set_pixel(i, r, g, b)
+            o = 3 * i
+            raw[o] = r
+            raw[o + 1] = g
+            raw[o + 2] = b
+            pixels[i] = word
 
     def _rotate(self, steps):
         steps %= self.num_leds
         if steps:
             self.pixels[:] = self.pixels[-steps:] + self.pixels[:-steps]
+            cut = 3 * steps
+            self._raw[:] = self._raw[-cut:] + self._raw[:-cut]
 
     def rotate_left(self, n=1):
         self._rotate(-n)
@@ -105,9 +175,80 @@ class myNeopixel:
     # --------------------------------------------------------------
     #   Ausgabe
     # --------------------------------------------------------------
+    def _wait_idle(self):
+        """Bis die vorige Ausgabe samt Reset-Pause durch ist (bei 8 LEDs < 0,3 ms)."""
+        if self._busy_since is None:
+            return
+        if self._dma:
+            while self._dma.active():
+                pass
+        left = self._frame_us - time.ticks_diff(time.ticks_us(), self._busy_since)
+        if left > 0:
+            time.sleep_us(left)
+        self._busy_since = None
+
     def show(self):
-        put = self.sm.put
-        for pix in self.pixels:
-            put(pix, 8)
+        """
+        Gibt pixels aus und kehrt sofort zurueck (DMA) bzw. sobald alle Worte im
+        FIFO liegen. Danach darf direkt am naechsten Bild gezeichnet werden.
+        """
+        self._wait_idle()
+        front = self.pixels
+        self.pixels = self._front
+        self._front = front
+        self.pixels[:] = front  # Zeichenpuffer startet mit dem aktuellen Bild
+        self._busy_since = time.ticks_us()
+        if self._dma:
+            try:
+                self._dma.config(read=front, write=self.sm, count=self.num_leds,
+                                 ctrl=self._dma_ctrl, trigger=True)
+            except Exception:
+                self._dma = None  # Firmware kann StateMachine nicht als DMA-Ziel
+        if not self._dma:
+            self.sm.put(front)
         if self.delay_ms:
             time.sleep_ms(self.delay_ms)
+
+
+# --------------------------------------------------------------------
+#   Frame-Takt fuer Animationen
+# --------------------------------------------------------------------
+class FrameRunner:
+    """
+    Begrenzt Animationen auf fps Bilder pro Sekunde, ohne zu blockieren.
+
+    tick(render) aus der Hauptschleife/dem Scheduler aufrufen: ist ein Bild
+    faellig, zeichnet render(frame) in np.pixels (False = Animation zu Ende),
+    danach folgt show(). Verspaetete Bilder werden nicht nachgeholt.
+    """
+
+    EARLY_MS = 2  # Jitter des aufrufenden Schedulers: so knapp vor der Zeit zaehlt als faellig
+
+    def __init__(self, np, fps=30, clock=None):
+        self.np = np
+        self.period_ms = max(1, 1000 // fps)
+        self._clock = clock or time.ticks_ms
+        self.frame = 0
+        self._next = self._clock()
+
+    def restart(self):
+        """Naechstes Bild sofort faellig, Zaehler auf 0 (neue Animation)."""
+        self.frame = 0
+        self._next = self._clock()
+
+    def ms_until_next(self):
+        return max(0, time.ticks_diff(self._next, self._clock()))
+
+    def tick(self, render):
+        """True = Bild ausgegeben, False = noch nicht faellig, None = Animation beendet."""
+        now = self._clock()
+        if time.ticks_diff(now, self._next) < -self.EARLY_MS:
+            return False
+        if render(self.frame) is False:
+            return None
+        self.np.show()
+        self.frame += 1
+        self._next = time.ticks_add(self._next, self.period_ms)
+        if time.ticks_diff(now, self._next) >= 0:
+            self._next = time.ticks_add(now, self.period_ms)
+        return True
@@ -1,7 +1,6 @@
 # power_management.py
-import time
-import os
 from log_utils import log_message
+from config_store import ConfigStore
 
 
 _DEFAULT_SETTINGS = {
@@ -13,9 +12,11 @@ _DEFAULT_SETTINGS = {
     'LED_POWER_MODE': 'normal',
     'VOLUME_PERCENT': '50',
     'DISPLAY_STATE': 'on',  # zentraler Schalter: 'on'|'off'
+    'WEB_SERVER_MODE': 'async',  # 'async' (uasyncio) | 'poll' (alter Socket-Poll)
 }
 
 _VALID_LED_POWER_MODES = ('normal', 'boost')
+_VALID_WEB_SERVER_MODES = ('async', 'poll')
 
 
 def _clamp_volume(value, fallback=None):
@@ -29,47 +30,60 @@ def _clamp_volume(value, fallback=None):
 # --------------------------------------------------------------------
 # Power Management State
 # --------------------------------------------------------------------
-_power_settings = {}
-_last_settings_load = 0
-_SETTINGS_CACHE_TIME = 300  # 5 Minuten Cache
+_CONFIG_PATH = "/sd/power_config.txt"
+_KEY_ORDER = [
+    'DISPLAY_AUTO',
+    'DISPLAY_ON_TIME',
+    'DISPLAY_OFF_TIME',
+    'BRIGHTNESS_DAY',
+    'BRIGHTNESS_NIGHT',
+    'LED_POWER_MODE',
+    'VOLUME_PERCENT',
+    'DISPLAY_STATE',
+    'WEB_SERVER_MODE',
+]
+
+_store = ConfigStore(_CONFIG_PATH, _DEFAULT_SETTINGS, _KEY_ORDER)
+_store_migrated = False
+
+
+def get_config_store():
+    """Gemeinsamer RAM-Stand der power_config.txt (auch fuer den Webserver)."""
+    global _store_migrated
+    if not _store_migrated:
+        _store_migrated = True
+        values = _store.values()
+        # Abwaertskompatibilitaet: alte Keys uebernehmen bzw. aufraeumen
+        if 'VOLUME_DEFAULT' in values:
+            # nur, wenn VOLUME_PERCENT nicht in der Datei stand (sonst nur Default)
+            if not _store.is_stored('VOLUME_PERCENT'):
+                _store.set('VOLUME_PERCENT', values['VOLUME_DEFAULT'])
+            _store.remove('VOLUME_DEFAULT')
+        _store.remove('VOLUME_NIGHT')
+    return _store
 
 
 # --------------------------------------------------------------------
 # Settings laden
 # --------------------------------------------------------------------
 def _load_settings(force_reload=False):
-    global _power_settings, _last_settings_load
-    
-    now = time.time()
-    if not force_reload and now - _last_settings_load < _SETTINGS_CACHE_TIME:
-        return _power_settings
-    
+    """Liefert den RAM-Stand; nur force_reload liest die Datei erneut."""
+    global _store_migrated
     try:
-        try:
-            os.stat("/sd/power_config.txt")
-            power_config_exists = True
-        except OSError:
-            power_config_exists = False
-        
-        if power_config_exists:
-            settings = {}
-            with open("/sd/power_config.txt", "r") as f:
-                for line in f:
-                    if '=' in line:
-                        key, value = line.strip().split('=', 1)
-                        settings[key] = value.lower()
-            for key, default_value in _DEFAULT_SETTINGS.items():
-                settings.setdefault(key, default_value)
-            _power_settings = settings
-            _last_settings_load = now
-        else:
-            # Default Settings
-            _power_settings = dict(_DEFAULT_SETTINGS)
+        if force_reload:
+            _store.load()
+            _store_migrated = False
+        return get_config_store().values()
     except Exception as e:
         log_message(None, "[Power Settings] Fehler beim Laden: {}".format(str(e)))
-        _power_settings = {}
-    
-    return _power_settings
+        return dict(_DEFAULT_SETTINGS)
+
+
+def flush_settings(log_path=None, force=False):
+    """Schreibt geaenderte Einstellungen gebuendelt auf SD (fuer Hauptschleife)."""
+    if force:
+        return _store.flush(log_path)
+    return _store.flush_if_due(log_path)
 
 
 # --------------------------------------------------------------------
@@ -94,10 +108,11 @@ def should_display_be_on(current_hour, current_minute, log_path=None):
     """
     try:
         settings = _load_settings()
+        store = get_config_store()
         
         # Wenn Auto-Mode deaktiviert, immer an
-        if settings.get('DISPLAY_AUTO', 'true') != 'true':
-            return True, int(settings.get('BRIGHTNESS_DAY', '64'))
+        if not store.get_bool('DISPLAY_AUTO', True):
+            return True, store.get_int('BRIGHTNESS_DAY', 64)
         
         current_minutes = current_hour * 60 + current_minute
         on_minutes = _time_to_minutes(settings.get('DISPLAY_ON_TIME', '07:00'))
@@ -111,9 +126,9 @@ def should_display_be_on(current_hour, current_minute, log_path=None):
             is_on_time = current_minutes >= on_minutes or current_minutes < off_minutes
         
         if is_on_time:
-            brightness = int(settings.get('BRIGHTNESS_DAY', '64'))
+            brightness = store.get_int('BRIGHTNESS_DAY', 64)
         else:
-            brightness = int(settings.get('BRIGHTNESS_NIGHT', '16'))
+            brightness = store.get_int('BRIGHTNESS_NIGHT', 16)
             
         return is_on_time, brightness
         
@@ -125,10 +140,10 @@ def should_display_be_on(current_hour, current_minute, log_path=None):
 def get_brightness_for_state(display_on, log_path=None):
     """Gibt die konfigurierte Helligkeit fuer den angegebenen Display-Zustand zurueck."""
     try:
-        settings = _load_settings()
+        store = get_config_store()
         if display_on:
-            return int(settings.get('BRIGHTNESS_DAY', '64'))
-        return int(settings.get('BRIGHTNESS_NIGHT', '16'))
+            return store.get_int('BRIGHTNESS_DAY', 64)
+        return store.get_int('BRIGHTNESS_NIGHT', 16)
     except Exception as e:
         log_message(log_path, "[Power Management] Helligkeit Fallback: {}".format(str(e)))
         return 64 if display_on else 16
@@ -142,8 +157,7 @@ def is_display_manually_toggled():
 def get_led_power_mode(log_path=None):
     """Gibt den aktuellen LED Power Modus ('normal' oder 'boost') zurueck."""
     try:
-        settings = _load_settings()
-        mode = settings.get('LED_POWER_MODE', _DEFAULT_SETTINGS['LED_POWER_MODE'])
+        mode = get_config_store().get('LED_POWER_MODE', _DEFAULT_SETTINGS['LED_POWER_MODE']).lower()
         if mode not in _VALID_LED_POWER_MODES:
             return _DEFAULT_SETTINGS['LED_POWER_MODE']
         return mode
@@ -153,163 +167,55 @@ def get_led_power_mode(log_path=None):
 
 
 def set_led_power_mode(mode, log_path=None):
-    """Setzt den LED Power Modus in der power_config.txt. Erlaubte Werte: 'normal', 'boost'."""
+    """Setzt den LED Power Modus (RAM, gebuendelt auf SD). Erlaubte Werte: 'normal', 'boost'."""
     try:
         normalized = (mode or '').strip().lower()
         if normalized not in _VALID_LED_POWER_MODES:
             raise ValueError("Ungueltiger LED Power Modus: {}".format(mode))
-
-        settings = {}
-        try:
-            with open("/sd/power_config.txt", "r") as f:
-                for line in f:
-                    if '=' in line:
-                        key, value = line.strip().split('=', 1)
-                        settings[key] = value.strip()
-        except OSError:
-            settings = {}
-
-        for key, default_value in _DEFAULT_SETTINGS.items():
-            settings.setdefault(key, default_value)
-
-        settings.pop('VOLUME_DEFAULT', None)
-        settings.pop('VOLUME_NIGHT', None)
-
-        settings['LED_POWER_MODE'] = normalized
-
-        order = [
-            'DISPLAY_AUTO',
-            'DISPLAY_ON_TIME',
-            'DISPLAY_OFF_TIME',
-            'BRIGHTNESS_DAY',
-            'BRIGHTNESS_NIGHT',
-            'LED_POWER_MODE',
-            'VOLUME_PERCENT',
-            'DISPLAY_STATE',
-        ]
-
-        tmp_path = "/sd/power_config.tmp"
-        with open(tmp_path, "w") as f:
-            for key in order:
-                if key in settings:
-                    f.write("{}={}\n".format(key, settings[key]))
-            for key, value in settings.items():
-                if key not in order:
-                    f.write("{}={}\n".format(key, value))
-
-        try:
-            os.replace(tmp_path, "/sd/power_config.txt")
-        except AttributeError:
-            os.rename(tmp_path, "/sd/power_config.txt")
-        except OSError:
-            try:
-                os.remove("/sd/power_config.txt")
-            except OSError:
-                pass
-            os.rename(tmp_path, "/sd/power_config.txt")
-
-        try:
-            os.sync()
-        except Exception:
-            pass
-
-        reload_settings()
+        get_config_store().set('LED_POWER_MODE', normalized)
         return True
     except Exception as e:
         log_message(log_path, "[Power Settings] LED Mode Schreiben Fehler: {}".format(str(e)))
         return False
 
 
+def get_web_server_mode(log_path=None):
+    """'async' = uasyncio-Server neben der Uhr, 'poll' = Socket-Poll in der Hauptschleife."""
+    try:
+        mode = get_config_store().get('WEB_SERVER_MODE', _DEFAULT_SETTINGS['WEB_SERVER_MODE']).lower()
+        if mode not in _VALID_WEB_SERVER_MODES:
+            return _DEFAULT_SETTINGS['WEB_SERVER_MODE']
+        return mode
+    except Exception as e:
+        log_message(log_path, "[Power Settings] Webserver-Modus Fallback: {}".format(str(e)))
+        return _DEFAULT_SETTINGS['WEB_SERVER_MODE']
+
+
 def get_volume(log_path=None):
     """Gibt die konfigurierte Lautstaerke in Prozent zurueck."""
     try:
-        settings = _load_settings()
-        if 'VOLUME_PERCENT' not in settings and 'VOLUME_DEFAULT' in settings:
-            # Abwärtskompatibilität: alte Configs mit VOLUME_DEFAULT übernehmen
-            settings['VOLUME_PERCENT'] = settings['VOLUME_DEFAULT']
-        volume = _clamp_volume(settings.get('VOLUME_PERCENT', _DEFAULT_SETTINGS['VOLUME_PERCENT']))
-        return volume
+        # VOLUME_DEFAULT (alte Configs) wird in get_config_store() uebernommen
+        return _clamp_volume(get_config_store().get('VOLUME_PERCENT', _DEFAULT_SETTINGS['VOLUME_PERCENT']))
     except Exception as e:
         log_message(log_path, "[Power Settings] Volume Fallback: {}".format(str(e)))
         return int(_DEFAULT_SETTINGS['VOLUME_PERCENT'])
 
 
 def set_volume(volume, log_path=None):
-    """Speichert die Lautstaerke in power_config.txt."""
+    """Speichert die Lautstaerke (RAM, gebuendelt auf SD)."""
     try:
         clamped = str(_clamp_volume(volume))
-
-        settings = {}
-        try:
-            with open("/sd/power_config.txt", "r") as f:
-                for line in f:
-                    if '=' in line:
-                        key, value = line.strip().split('=', 1)
-                        settings[key] = value.strip()
-        except OSError:
-            settings = {}
-
-        for key, default_value in _DEFAULT_SETTINGS.items():
-            settings.setdefault(key, default_value)
-
-        # Altes Feld aufraeumen, falls vorhanden
-        if 'VOLUME_DEFAULT' in settings:
-            settings.pop('VOLUME_DEFAULT', None)
-        if 'VOLUME_NIGHT' in settings:
-            settings.pop('VOLUME_NIGHT', None)
-
-        if settings.get('VOLUME_PERCENT') == clamped:
-            return True
-
-        settings['VOLUME_PERCENT'] = clamped
-
-        order = [
-            'DISPLAY_AUTO',
-            'DISPLAY_ON_TIME',
-            'DISPLAY_OFF_TIME',
-            'BRIGHTNESS_DAY',
-            'BRIGHTNESS_NIGHT',
-            'LED_POWER_MODE',
-            'VOLUME_PERCENT',
-            'DISPLAY_STATE',
-        ]
-
-        tmp_path = "/sd/power_config.tmp"
-        with open(tmp_path, "w") as f:
-            for key in order:
-                if key in settings:
-                    f.write("{}={}\n".format(key, settings[key]))
-            for key, value in settings.items():
-                if key not in order:
-                    f.write("{}={}\n".format(key, value))
-
-        try:
-            os.replace(tmp_path, "/sd/power_config.txt")
-        except AttributeError:
-            os.rename(tmp_path, "/sd/power_config.txt")
-        except OSError:
-            try:
-                os.remove("/sd/power_config.txt")
-            except OSError:
-                pass
-            os.rename(tmp_path, "/sd/power_config.txt")
-
-        try:
-            os.sync()
-        except Exception:
-            pass
-
-        reload_settings()
-        log_message(log_path, "[Power Settings] Volume gespeichert: {}%.".format(clamped))
+        if get_config_store().set('VOLUME_PERCENT', clamped):
+            log_message(log_path, "[Power Settings] Volume gespeichert: {}%.".format(clamped))
         return True
     except Exception as e:
         log_message(log_path, "[Power Settings] Volume Schreiben Fehler: {}".format(str(e)))
         return False
 
 
-def reload_settings():
-    """Erzwingt Neuladen der Einstellungen"""
-    _load_settings(force_reload=True)
+def reload_settings(from_disk=False):
+    """Erzwingt Neuladen der Einstellungen (von SD nur mit from_disk=True)."""
+    _load_settings(force_reload=from_disk)
 
 
 def get_display_schedule(log_path=None):
@@ -319,7 +225,7 @@ def get_display_schedule(log_path=None):
     try:
         settings = _load_settings()
         return {
-            'auto': settings.get('DISPLAY_AUTO', 'true') == 'true',
+            'auto': get_config_store().get_bool('DISPLAY_AUTO', True),
             'on_time': settings.get('DISPLAY_ON_TIME', _DEFAULT_SETTINGS['DISPLAY_ON_TIME']),
             'off_time': settings.get('DISPLAY_OFF_TIME', _DEFAULT_SETTINGS['DISPLAY_OFF_TIME']),
         }
@@ -344,64 +250,12 @@ def get_display_state(log_path=None):
 
 
 def set_display_state(state, log_path=None):
-    """Schreibt den zentralen Display-Status in power_config.txt. state: 'on'|'off'"""
+    """Setzt den zentralen Display-Status (RAM, gebuendelt auf SD). state: 'on'|'off'"""
     try:
         normalized = 'on' if str(state).strip().lower() == 'on' else 'off'
-
-        settings = {}
-        try:
-            with open("/sd/power_config.txt", "r") as f:
-                for line in f:
-                    if '=' in line:
-                        key, value = line.strip().split('=', 1)
-                        settings[key] = value.strip()
-        except OSError:
-            settings = {}
-
-        for key, default_value in _DEFAULT_SETTINGS.items():
-            settings.setdefault(key, default_value)
-
-        settings['DISPLAY_STATE'] = normalized
-
-        order = [
-            'DISPLAY_AUTO',
-            'DISPLAY_ON_TIME',
-            'DISPLAY_OFF_TIME',
-            'BRIGHTNESS_DAY',
-            'BRIGHTNESS_NIGHT',
-            'LED_POWER_MODE',
-            'VOLUME_PERCENT',
-            'DISPLAY_STATE',
-        ]
-
-        tmp_path = "/sd/power_config.tmp"
-        with open(tmp_path, "w") as f:
-            for key in order:
-                if key in settings:
-                    f.write("{}={}\n".format(key, settings[key]))
-            for key, value in settings.items():
-                if key not in order:
-                    f.write("{}={}\n".format(key, value))
-
-        try:
-            os.replace(tmp_path, "/sd/power_config.txt")
-        except AttributeError:
-            os.rename(tmp_path, "/sd/power_config.txt")
-        except OSError:
-            try:
-                os.remove("/sd/power_config.txt")
-            except OSError:
-                pass
-            os.rename(tmp_path, "/sd/power_config.txt")
-
-        try:
-            os.sync()
-        except Exception:
-            pass
-
-        reload_settings()
-        log_message(log_path, "[Power Settings] Display-State gespeichert: {}".format(normalized))
+        if get_config_store().set('DISPLAY_STATE', normalized):
+            log_message(log_path, "[Power Settings] Display-State gespeichert: {}".format(normalized))
         return True
     except Exception as e:
         log_message(log_path, "[Power Settings] Display-State Schreiben Fehler: {}".format(str(e)))
-        return False
\ No newline at end of file
+        return False
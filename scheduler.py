@@ -0,0 +1,116 @@
+# scheduler.py
+"""
+Kleiner kooperativer Scheduler fuer die Hauptschleife.
+
+Periodische und einmalige Tasks mit Deadlines in ticks_ms. Periodische Tasks
+laufen relativ zur vorherigen Deadline (kein Drift) und feuern pro Periode
+garantiert einmal – auch wenn die Schleife kurz blockiert war (verpasste
+Perioden werden gezaehlt, aber nicht nachgeholt).
+"""
+import utime
+from log_utils import log_message
+
+
+class Task:
+    __slots__ = ("name", "func", "period_ms", "deadline", "active", "runs", "missed")
+
+    def __init__(self, name, func, period_ms, deadline):
+        self.name = name
+        self.func = func
+        self.period_ms = period_ms  # 0 = einmalig
+        self.deadline = deadline
+        self.active = True
+        self.runs = 0
+        self.missed = 0
+
+
+class Scheduler:
+    def __init__(self, log_path=None, clock=None, sleep_ms=None):
+        self.log_path = log_path
+        self._clock = clock or utime.ticks_ms
+        self._sleep_ms = sleep_ms or utime.sleep_ms
+        self._tasks = []
+        self.wakeups = 0
+
+    # --------------------------------------------------------------
+    #   Registrierung
+    # --------------------------------------------------------------
+    def every(self, period_ms, func, name=None, first_delay_ms=None):
+        """Periodischer Task; erster Lauf nach first_delay_ms (Default: sofort)."""
+        delay = 0 if first_delay_ms is None else first_delay_ms
+        task = Task(name or "task", func, max(1, int(period_ms)), utime.ticks_add(self._clock(), delay))
+        self._tasks.append(task)
+        return task
+
+    def after(self, delay_ms, func, name=None):
+        """Einmaliger Task nach delay_ms."""
+        task = Task(name or "once", func, 0, utime.ticks_add(self._clock(), int(delay_ms)))
+        self._tasks.append(task)
+        return task
+
+    def cancel(self, task):
+        if task is None:
+            return
+        task.active = False
+        try:
+            self._tasks.remove(task)
+        except ValueError:
+            pass
+
+    def reschedule(self, task, delay_ms=0):
+        """Setzt die naechste Deadline eines Tasks neu (z. B. nach Zeit-Sync)."""
+        task.deadline = utime.ticks_add(self._clock(), int(delay_ms))
+        if not task.active:
+            task.active = True
+            self._tasks.append(task)
+
+    # --------------------------------------------------------------
+    #   Ausfuehrung
+    # --------------------------------------------------------------
+    def run_pending(self):
+        """Fuehrt alle faelligen Tasks aus. Gibt die Anzahl der Laeufe zurueck."""
+        ran = 0
+        now = self._clock()
+        for task in self._tasks[:]:
+            if not task.active or utime.ticks_diff(now, task.deadline) < 0:
+                continue
+            if task.period_ms:
+                next_deadline = utime.ticks_add(task.deadline, task.period_ms)
+                late = utime.ticks_diff(now, next_deadline)
+                if late >= 0:
+                    # Schleife hat blockiert: einmal feuern, Rest als verpasst zaehlen
+                    task.missed += late // task.period_ms + 1
+                    next_deadline = utime.ticks_add(now, task.period_ms)
+                task.deadline = next_deadline
+            else:
+                self.cancel(task)
+            try:
+                task.func()
+            except Exception as e:
+                log_message(self.log_path, "[Scheduler] Task '{}' Fehler: {}".format(task.name, str(e)))
+            task.runs += 1
+            ran += 1
+            now = self._clock()
+        return ran
+
+    def ms_until_next(self, max_ms=None):
+        """Millisekunden bis zur naechsten Deadline (0 = sofort faellig)."""
+        now = self._clock()
+        wait = max_ms
+        for task in self._tasks:
+            if not task.active:
+                continue
+            d = utime.ticks_diff(task.deadline, now)
+            if d <= 0:
+                return 0
+            if wait is None or d < wait:
+                wait = d
+        return wait if wait is not None else 0
+
+    def sleep_until_next(self, max_ms):
+        """Schlaeft bis zur naechsten Deadline, hoechstens max_ms."""
+        wait = self.ms_until_next(max_ms)
+        if wait > 0:
+            self._sleep_ms(wait)
+        self.wakeups += 1
+        return wait
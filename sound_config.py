@@ -1,15 +1,20 @@
 # sound_config.py
+from array import array
 from machine import PWM, Pin
 import utime
 from joystick import get_joystick_direction
 from log_utils import log_message
 from recovery_manager import feed_watchdog
+from melody_engine import MelodyPlayer, compile_melody, volume_duty, MIN_FREQ, MAX_FREQ
+from melody_bank import MelodyBank
 
 # --------------------------------------------------------------------
 #   Hardware-Setup
 # --------------------------------------------------------------------
 _speaker = PWM(Pin(16, Pin.OUT))
 _speaker.duty_u16(0)  # vermeiden von Einschalt-Knack
+_player = MelodyPlayer(_speaker)
+_bank = MelodyBank()  # /melodies.bin, Verzeichnis wird erst beim ersten Abspielen gelesen
 
 alarm_flag = True  # globales Flag (extern steuerbar)
 _last_freq = 0  # Merkt aktuellen PWM-Frequenz
@@ -17,8 +22,8 @@ _last_freq = 0  # Merkt aktuellen PWM-Frequenz
 # --------------------------------------------------------------------
 #   interne Helfer
 # --------------------------------------------------------------------
-_MIN_FREQ = 100
-_MAX_FREQ = 5000
+_MIN_FREQ = MIN_FREQ
+_MAX_FREQ = MAX_FREQ
 
 
 def _set_freq(freq):
@@ -29,83 +34,98 @@ def _set_freq(freq):
         _last_freq = freq
 
 
-def _ramp_duty(target, step=512):
-    """Sanfte Rampe, damit es nicht knackt."""
-    cur = _speaker.duty_u16()
-    if target > cur:
-        rng = range(cur, target + 1, step)
-    else:
-        rng = range(cur, target - 1, -step)
-    for d in rng:
-        _speaker.duty_u16(d)
-        utime.sleep_us(200)
+def _release_player():
+    """Laufende Hintergrund-Melodie beenden, bevor der Pin direkt gesetzt wird."""
+    global _last_freq
+    if _player.is_playing():
+        _player.stop()
+    _last_freq = 0  # der Player hat die Frequenz ggf. umgestellt
+
+
 def _feed(log_path=None):
     try:
         feed_watchdog(log_path)
     except Exception:
         pass
 
-def _sleep_with_feed(duration_ms, log_path=None):
-    # Schlaf in kleinen Stuecken mit WDT-Fuetterung
-    remaining = int(duration_ms)
-    while remaining > 0:
-        chunk = 100 if remaining > 100 else remaining
-        utime.sleep_ms(chunk)
-        _feed(log_path)
-        remaining -= chunk
 
+def _wait_player(log_path=None, abort_on_joystick=False):
+    """Blockierend warten, bis der Player fertig ist (WDT fuettern, optional Abbruch)."""
+    global alarm_flag
+    last_feed = utime.ticks_ms()
+    while _player.is_playing():
+        if not alarm_flag or (abort_on_joystick and get_joystick_direction()):
+            alarm_flag = False
+            _player.stop()
+            break
+        utime.sleep_ms(4)
+        now = utime.ticks_ms()
+        if utime.ticks_diff(now, last_feed) >= 50:
+            _feed(log_path)
+            last_feed = now
 
 
 # --------------------------------------------------------------------
 #   Public API
 # --------------------------------------------------------------------
-def play_note(freq, duration_ms, volume_percent, log_path=None):
-    """Sinus-aehnlicher Einzelton mit Ein/Aus-Rampe + Bruch-Abbruch."""
-    global alarm_flag
-    if freq == 0 or not alarm_flag:
+def play_async(melody, volume_percent, loop=False, log_path=None):
+    """
+    Spielt eine Melodie im Hintergrund (Timer-gesteuert) und kehrt sofort zurueck.
+    melody: Name aus der Melodie-Bank, Folge von (Frequenz, Dauer_ms) oder
+    flaches Noten-array('H') wie von melody_notes(). Im RAM liegen nur die Noten
+    (4 Byte je Note); die Huellkurve erzeugt der Player erst beim Abspielen.
+    """
+    try:
+        _release_player()
+        if isinstance(melody, str):
+            melody = melody_notes(melody, log_path)
+        elif not isinstance(melody, array):
+            melody = _note_array(melody)
+        _player.log_path = log_path
+        _player.play_notes(melody, volume_percent, loop)
+    except Exception as e:
+        log_message(log_path, "[Sound Fehler] play_async(): {}".format(str(e)))
         _speaker.duty_u16(0)
-        _sleep_with_feed(duration_ms, log_path)
+
+
+def stop():
+    """Hintergrund-Melodie sofort beenden."""
+    _release_player()
+
+
+def is_playing():
+    return _player.is_playing()
+
+
+def play_note(freq, duration_ms, volume_percent, log_path=None):
+    """Einzelton mit vorberechneter Ein/Aus-Huellkurve + Joystick-Abbruch (blockierend)."""
+    if not alarm_flag:
         return
+    play_async(((freq, duration_ms),), volume_percent, log_path=log_path)
+    _wait_player(log_path, abort_on_joystick=True)
+
 
+def tone(freq, volume_percent, log_path=None):
+    """Nicht-blockierend: Ton sofort setzen (0 Hz = still). Fuer den Alarm-Automaten."""
     try:
-        freq = max(_MIN_FREQ, min(freq, _MAX_FREQ))
-        _set_freq(freq)
-        duty = int(volume_percent * 65535 // 100)
-
-        _ramp_duty(duty)  # fade-in
-
-        t_end = utime.ticks_add(utime.ticks_ms(), duration_ms)
-        last_feed = utime.ticks_ms()
-        while alarm_flag and utime.ticks_diff(t_end, utime.ticks_ms()) > 0:
-            if get_joystick_direction():  # Sofort-Abbruch
-                alarm_flag = False
-                break
-            utime.sleep_ms(4)
-            # Alle ~50ms Watchdog fuettern
-            now = utime.ticks_ms()
-            if utime.ticks_diff(now, last_feed) >= 50:
-                _feed(log_path)
-                last_feed = now
-
-        _ramp_duty(0)  # fade-out
+        _release_player()
+        if freq == 0 or volume_percent <= 0:
+            _speaker.duty_u16(0)
+            return
+        _set_freq(max(_MIN_FREQ, min(freq, _MAX_FREQ)))
+        _speaker.duty_u16(volume_duty(volume_percent))
     except Exception as e:
-        log_message(log_path, "[Sound Fehler] play_note(): {}".format(str(e)))
+        log_message(log_path, "[Sound Fehler] tone(): {}".format(str(e)))
         _speaker.duty_u16(0)
 
 
 def buzz(freq, duration_ms, volume_percent, log_path=None):
-    """Konstanter Ton oder Pause."""
+    """Konstanter Ton oder Pause (blockierend, ohne Huellkurve)."""
     try:
-        if freq == 0:
-            _speaker.duty_u16(0)
-            _sleep_with_feed(duration_ms, log_path)
-            return
-
-        freq = max(_MIN_FREQ, min(freq, _MAX_FREQ))
-        _set_freq(freq)
-        duty = int(volume_percent * 65535 // 100)
-        _speaker.duty_u16(duty)
-        _sleep_with_feed(duration_ms, log_path)
+        _release_player()
+        _player.log_path = log_path
+        _player.play_async(compile_melody(((freq, duration_ms),), volume_percent, envelope=False))
+        _wait_player(log_path)
     except Exception as e:
         log_message(log_path, "[Sound Fehler] buzz(): {}".format(str(e)))
     finally:
@@ -113,64 +133,28 @@ def buzz(freq, duration_ms, volume_percent, log_path=None):
 
 
 # --------------------------------------------------------------------
-#   Kurze Helfer-Melodien
+#   Melodien: /melodies.bin (tools/build_melodies.py), sonst eingebaut
 # --------------------------------------------------------------------
-def fuer_elise(volume_percent, log_path=None):
-    for _ in range(3):
-        buzz(1000, 200, volume_percent, log_path)
-
-
-def paus(volume_percent, log_path=None):
-    melody = [
-        (330, 1000),
-        (415, 1000),
-        (370, 1000),
-        (247, 1000),
+# Eingebaute Fassungen (Frequenz, Dauer_ms) – gleiche Namen wie in tools/melodies.txt
+ALARM_MELODY = (
+    (330, 1000), (415, 1000), (370, 1000), (247, 1000), (0, 500),
+    (330, 1000), (370, 1000), (415, 1000), (330, 1000),
+)
+
+_BUILTIN = {
+    "alarm": ALARM_MELODY,
+    "paus": ALARM_MELODY,
+    "end": ALARM_MELODY + (
         (0, 500),
-        (330, 1000),
-        (370, 1000),
-        (415, 1000),
-        (330, 1000),
-    ]
-    for note, dur in melody:
-        buzz(note, dur, volume_percent, log_path)
+        (415, 1000), (330, 1000), (370, 1000), (247, 1000), (0, 500),
+        (247, 1000), (370, 1000), (415, 1000), (330, 1000),
+    ),
+    "xp_start": ((330, 1000), (415, 1000), (370, 1000), (247, 1000)),
+    "fuer_elise": ((1000, 200),) * 3,
+}
 
 
-def end(volume_percent, log_path=None):
-    melody = [
-        (330, 1000),
-        (415, 1000),
-        (370, 1000),
-        (247, 1000),
-        (0, 500),
-        (330, 1000),
-        (370, 1000),
-        (415, 1000),
-        (330, 1000),
-        (0, 500),
-        (415, 1000),
-        (330, 1000),
-        (370, 1000),
-        (247, 1000),
-        (0, 500),
-        (247, 1000),
-        (370, 1000),
-        (415, 1000),
-        (330, 1000),
-    ]
-    for note, dur in melody:
-        buzz(note, dur, volume_percent, log_path)
-
-
-def xp_start_sound(volume_percent, log_path=None):
-    for note, dur in [(330, 1000), (415, 1000), (370, 1000), (247, 1000)]:
-        buzz(note, dur, volume_percent, log_path)
-
-
-def tempr(volume_percent, log_path=None):
-    # umfangreiches Noten-Array – unveraendert uebernommen
-
-    # Verwendet:
+def _tempr_melody():
     NOTE_G4, NOTE_C4, NOTE_DS4, NOTE_F4 = 392, 261, 311, 349
     NOTE_E4, NOTE_D4, NOTE_AS3 = 329, 294, 233
 
@@ -183,114 +167,66 @@ def tempr(volume_percent, log_path=None):
     # NOTE_AS5 = 932
     # NOTE_C6 = 1047
 
-    melody = [
-        NOTE_G4,
-        NOTE_C4,
-        NOTE_DS4,
-        NOTE_F4,
-        NOTE_G4,
-        NOTE_C4,
-        NOTE_DS4,
-        NOTE_F4,
-        NOTE_G4,
-        NOTE_C4,
-        NOTE_DS4,
-        NOTE_F4,
-        NOTE_G4,
-        NOTE_C4,
-        NOTE_DS4,
-        NOTE_F4,
-        NOTE_G4,
-        NOTE_C4,
-        NOTE_E4,
-        NOTE_F4,
-        NOTE_G4,
-        NOTE_C4,
-        NOTE_E4,
-        NOTE_F4,
-        NOTE_G4,
-        NOTE_C4,
-        NOTE_E4,
-        NOTE_F4,
-        NOTE_G4,
-        NOTE_C4,
-        NOTE_E4,
-        NOTE_F4,
-        NOTE_G4,
-        NOTE_C4,
-        NOTE_DS4,
-        NOTE_F4,
-        NOTE_G4,
-        NOTE_C4,
-        NOTE_DS4,
-        NOTE_F4,
-        NOTE_D4,
-        NOTE_F4,
-        NOTE_AS3,
-        NOTE_DS4,
-        NOTE_D4,
-        NOTE_F4,
-        NOTE_AS3,
-        NOTE_DS4,
-        NOTE_D4,
-        NOTE_C4,
-    ]
-
-    durations = [
-        8,
-        8,
-        16,
-        16,
-        8,
-        8,
-        16,
-        16,
-        8,
-        8,
-        16,
-        16,
-        8,
-        8,
-        16,
-        16,
-        8,
-        8,
-        16,
-        16,
-        8,
-        8,
-        16,
-        16,
-        8,
-        8,
-        16,
-        16,
-        8,
-        8,
-        16,
-        16,
-        4,
-        4,
-        16,
-        16,
-        4,
-        4,
-        16,
-        16,
-        1,
-        4,
-        4,
-        16,
-        16,
-        4,
-        4,
-        16,
-        16,
-        1,
-    ]
-
-    for note, div in zip(melody, durations):
-        buzz(note, int(3000 / div), volume_percent, log_path)
+    # Noten mit Notenwert (1 = ganze, 4 = viertel, ...); Dauer = 3000 / Notenwert ms
+    melody = (
+        ((NOTE_G4, 8), (NOTE_C4, 8), (NOTE_DS4, 16), (NOTE_F4, 16)) * 4
+        + ((NOTE_G4, 8), (NOTE_C4, 8), (NOTE_E4, 16), (NOTE_F4, 16)) * 4
+        + ((NOTE_G4, 4), (NOTE_C4, 4), (NOTE_DS4, 16), (NOTE_F4, 16)) * 2
+        + ((NOTE_D4, 1),)
+        + ((NOTE_F4, 4), (NOTE_AS3, 4), (NOTE_DS4, 16), (NOTE_D4, 16)) * 2
+        + ((NOTE_C4, 1),)
+    )
+    return tuple((note, int(3000 / div)) for note, div in melody)
+
+
+def _builtin_melody(name):
+    if name == "tempr":
+        return _tempr_melody()  # erst beim Aufruf bauen – spart RAM, wenn nie gespielt
+    return _BUILTIN.get(name, ())
+
+
+def _note_array(pairs):
+    """(Frequenz, Dauer_ms)-Paare → flaches array('H')."""
+    notes = array("H")
+    for freq, dur in pairs:
+        notes.append(int(freq))
+        notes.append(int(dur))
+    return notes
+
+
+def melody_notes(name, log_path=None):
+    """
+    Melodie als flaches array('H') (Frequenz, Dauer_ms, ...) fuer wiederholtes
+    Abspielen (AlarmRinger). Einmal laden und behalten.
+    """
+    notes = None
+    try:
+        notes = _bank.load(name)
+    except Exception as e:
+        log_message(log_path, "[Sound Fehler] Melodie {}: {}".format(name, str(e)))
+    if notes is None:
+        notes = _note_array(_builtin_melody(name))
+    return notes
+
+
+def fuer_elise(volume_percent, log_path=None):
+    play_async("fuer_elise", volume_percent, log_path=log_path)
+
+
+def paus(volume_percent, log_path=None):
+    play_async("paus", volume_percent, log_path=log_path)
+
+
+def end(volume_percent, log_path=None):
+    play_async("end", volume_percent, log_path=log_path)
+
+
+def xp_start_sound(volume_percent, log_path=None):
+    play_async("xp_start", volume_percent, log_path=log_path)
+
+
+def tempr(volume_percent, log_path=None):
+    play_async("tempr", volume_percent, log_path=log_path)
 
 
 # --------------------------------------------------------------------
@@ -1,7 +1,8 @@
 # test_program.py
 import time
-from sound_config import tempr
-from led import led_kranz_animation, set_yellow_leds, led_kranz_einschalten
+from sound_config import tempr, is_playing
+from led import led_kranz_animation
+from led_animation import LedAnimator
 from time_config import aktualisiere_zeit
 from log_utils import log_message
 from joystick import get_joystick_direction
@@ -109,7 +110,7 @@ def test_program(lcd, np, wlan, log_path=None, volume_percent=50):
     def _smooth_blue():
         try:
             for b in range(0, 129, 16):
-                for i in range(8):
+                for i in range(np.num_leds):
                     np.set_pixel(i, 0, 0, b)
                 np.show()
                 safe_sleep(0.05)
@@ -131,26 +132,19 @@ def test_program(lcd, np, wlan, log_path=None, volume_percent=50):
     # ------------------------------------------------------------
     #   LED-Test-Sequenz
     # ------------------------------------------------------------
-    def _run_led_tests():
-        leds_total, y_count, toggle = 8, 1, True
-        loop_counter = 0
-        for wd, h, m in _LED_TEST_TIMES:
-            _feed()
-            loop_counter += 1
-            
+    def _led_test_frames(aborted):
+        """Ein Frame pro Testzeit: LCD-Zeile + abwechselnd gelbe Zaehl-LEDs / gruener Ring."""
+        leds_total, y_count, toggle = np.num_leds, 1, True
+        for loop_counter, (wd, h, m) in enumerate(_LED_TEST_TIMES, 1):
             # Memory-Cleanup alle 10 Iterationen
             if loop_counter % 10 == 0:
                 import gc
                 gc.collect()
-                _feed()
-            
+
             # Sofort-Abbruch?
             if get_joystick_direction() == "press":
-                lcd.clear()
-                lcd.putstr("Test beendet.")
-                log_message(log_path, "Test abgebrochen (Joystick).")
-                safe_sleep(1.5)
-                return True
+                aborted.append(True)
+                return
 
             # Display-Update
             try:
@@ -160,20 +154,17 @@ def test_program(lcd, np, wlan, log_path=None, volume_percent=50):
             except Exception as e:
                 log_message(log_path, "LCD-Update: {}".format(str(e)))
 
-            # LED-Spielerei
-            try:
-                if toggle:
-                    set_yellow_leds(np, y_count)
-                    y_count = y_count + 1 if y_count < leds_total else leds_total
-                else:
-                    led_kranz_einschalten(np)
-                toggle = not toggle
-            except Exception as e:
-                log_message(log_path, "LED-Update: {}".format(str(e)))
+            # LED-Spielerei (show() uebernimmt der Animator)
+            if toggle:
+                np.fill(0, 0, 0)
+                for i in range(y_count):
+                    np.set_pixel(i, 255, 255, 0)
+                y_count = y_count + 1 if y_count < leds_total else leds_total
+            else:
+                np.fill(0, 255, 0)
+            toggle = not toggle
+            yield
 
-            # Kurze Pause mit extra WDT-Feed
-            safe_sleep(0.25)
-            
             # Stage-Update alle 5 Iterationen
             if loop_counter % 5 == 0:
                 try:
@@ -181,6 +172,20 @@ def test_program(lcd, np, wlan, log_path=None, volume_percent=50):
                 except Exception:
                     pass
 
+    def _run_led_tests():
+        aborted = []
+        try:
+            # 4 Frames/s = die bisherigen 0,25 s pro Testzeit; run() fuettert den WDT
+            LedAnimator(np, fps=4, log_path=log_path).run(_led_test_frames(aborted))
+        except Exception as e:
+            log_message(log_path, "LED-Update: {}".format(str(e)))
+        if aborted:
+            lcd.clear()
+            lcd.putstr("Test beendet.")
+            log_message(log_path, "Test abgebrochen (Joystick).")
+            safe_sleep(1.5)
+            return True
+
         log_message(log_path, "LED-Tests erfolgreich abgeschlossen.")
         return False
 
@@ -210,7 +215,10 @@ def test_program(lcd, np, wlan, log_path=None, volume_percent=50):
             lcd.putstr("By")
             lcd.move_to(0, 1)
             lcd.putstr("Marco da Silva")
-            tempr(volume_percent)  # Musik
+            tempr(volume_percent)  # Musik laeuft im Hintergrund
+            while is_playing():
+                _feed()
+                time.sleep(0.05)
             safe_sleep(1.5)
 
             lcd.clear()
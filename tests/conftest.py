@@ -0,0 +1,34 @@
+# tests/conftest.py
+"""
+Host-Tests (CPython/pytest) fuer die Pico-Module.
+
+tests/fakes/ ersetzt die MicroPython-Module (machine, rp2, utime, ...), die auf
+dem PC fehlen; die MicroPython-Erweiterungen von time/gc werden hier ergaenzt.
+Aufruf aus dem Repo-Wurzelverzeichnis:
+    python -m pytest -q
+"""
+import gc
+import os
+import sys
+import time
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(_HERE, "fakes"))
+sys.path.insert(0, os.path.dirname(_HERE))
+
+# --------------------------------------------------------------------
+#   MicroPython-Erweiterungen von time und gc
+# --------------------------------------------------------------------
+if not hasattr(time, "ticks_ms"):
+    time.ticks_ms = lambda: int(time.monotonic() * 1000)
+    time.ticks_us = lambda: int(time.monotonic() * 1000000)
+    time.ticks_diff = lambda a, b: a - b
+    time.ticks_add = lambda a, b: a + b
+    time.sleep_ms = lambda ms: time.sleep(ms / 1000)
+    time.sleep_us = lambda us: time.sleep(us / 1000000)
+
+if not hasattr(gc, "mem_free"):
+    gc.mem_free = lambda: 200 * 1024
+    gc.mem_alloc = lambda: 64 * 1024
+
+import utime  # noqa: E402,F401 - fakes/utime.py einmal laden
@@ -0,0 +1,106 @@
+# tests/fakes/machine.py
+"""Minimaler machine-Ersatz: Hardware-Objekte tun nichts, merken sich aber Werte."""
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    IRQ_FALLING = 2
+
+    def __init__(self, *args, **kwargs):
+        self._value = 1
+
+    def on(self):
+        self._value = 1
+
+    def off(self):
+        self._value = 0
+
+    def irq(self, *args, **kwargs):
+        pass
+
+    def value(self, *args):
+        if args:
+            self._value = args[0]
+        return self._value
+
+
+class ADC:
+    def __init__(self, *args):
+        self.raw = 32768
+
+    def read_u16(self):
+        return self.raw
+
+
+class PWM:
+    def __init__(self, *args, **kwargs):
+        self._freq = 0
+        self._duty = 0
+
+    def freq(self, *args):
+        if args:
+            self._freq = args[0]
+        return self._freq
+
+    def duty_u16(self, *args):
+        if args:
+            self._duty = args[0]
+        return self._duty
+
+    def deinit(self):
+        pass
+
+
+class I2C:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def scan(self):
+        return []
+
+    def writeto(self, addr, buf):
+        return len(buf)
+
+
+class SPI:
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+class WDT:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def feed(self):
+        pass
+
+
+class Timer:
+    PERIODIC = 1
+    ONE_SHOT = 0
+
+    def __init__(self, *args, **kwargs):
+        self.period = None
+        self.callback = None
+
+    def init(self, mode=ONE_SHOT, period=None, callback=None, **kwargs):
+        self.period = period
+        self.callback = callback
+
+    def deinit(self):
+        self.period = None
+        self.callback = None
+
+
+def freq(*args):
+    return 125000000
+
+
+def reset():
+    raise SystemExit("machine.reset()")
+
+
+def unique_id():
+    return b"\x00\x01\x02\x03\x04\x05\x06\x07"
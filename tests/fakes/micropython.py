@@ -0,0 +1,3 @@
+# tests/fakes/micropython.py
+def const(value):
+    return value
@@ -0,0 +1,22 @@
+# tests/fakes/network.py
+STA_IF = 0
+AP_IF = 1
+
+
+class WLAN:
+    def __init__(self, *args):
+        self._active = False
+
+    def active(self, *args):
+        if args:
+            self._active = args[0]
+        return self._active
+
+    def isconnected(self):
+        return True
+
+    def ifconfig(self):
+        return ("127.0.0.1", "255.0.0.0", "127.0.0.1", "127.0.0.1")
+
+    def connect(self, *args):
+        pass
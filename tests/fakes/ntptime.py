@@ -0,0 +1,6 @@
+# tests/fakes/ntptime.py
+host = "pool.ntp.org"
+
+
+def settime():
+    pass
@@ -0,0 +1,84 @@
+# tests/fakes/pcf8574.py
+"""
+Aufzeichnender I2C-Bus mit PCF8574-Backpack und HD44780 dahinter.
+
+Jedes writeto() ist eine I2C-Transaktion; jedes Byte ist ein Pin-Zustand des
+PCF8574 (Bit0 RS, Bit2 E, Bit3 Backlight, Bit4-7 D4-D7). Das Display uebernimmt
+ein Nibble bei fallender E-Flanke – daraus werden Befehle und DDRAM-Inhalt
+rekonstruiert, so dass Tests den sichtbaren Text pruefen koennen.
+"""
+MASK_RS = 0x01
+MASK_E = 0x04
+
+
+class RecordingI2C:
+    def __init__(self, lines=2, columns=16):
+        self.lines = lines
+        self.columns = columns
+        self.transactions = 0
+        self.states = []          # alle Pin-Zustaende in Sendereihenfolge
+        self.ddram = bytearray(b" " * 0x80)
+        self.addr = 0
+        self.commands = []
+        self._four_bit = False
+        self._high = None         # erstes Nibble im 4-Bit-Modus
+        self._e = 0
+
+    # --------------------------------------------------------------
+    #   machine.I2C
+    # --------------------------------------------------------------
+    def scan(self):
+        return [0x27]
+
+    def writeto(self, addr, buf):
+        self.transactions += 1
+        for state in bytes(buf):
+            self.states.append(state)
+            e = state & MASK_E
+            if self._e and not e:
+                self._latch(state >> 4, state & MASK_RS)
+            self._e = e
+        return len(buf)
+
+    def reset_counters(self):
+        self.transactions = 0
+        self.states = []
+        self.commands = []
+
+    # --------------------------------------------------------------
+    #   HD44780
+    # --------------------------------------------------------------
+    def _latch(self, nibble, rs):
+        if not self._four_bit:
+            # 8-Bit-Modus nach Reset: ein Nibble = ganzer Befehl (untere 4 Bit offen)
+            if nibble == 0x2:
+                self._four_bit = True
+            return
+        if self._high is None:
+            self._high = nibble
+            return
+        value = (self._high << 4) | nibble
+        self._high = None
+        if rs:
+            self.ddram[self.addr & 0x7F] = value
+            self.addr = (self.addr + 1) & 0x7F
+        else:
+            self._command(value)
+
+    def _command(self, cmd):
+        self.commands.append(cmd)
+        if cmd == 0x01:
+            for i in range(len(self.ddram)):
+                self.ddram[i] = 0x20
+            self.addr = 0
+        elif cmd == 0x02:
+            self.addr = 0
+        elif cmd & 0x80:
+            self.addr = cmd & 0x7F
+
+    def row(self, y):
+        base = (0x40 if y & 1 else 0) + (0x14 if y & 2 else 0)
+        return self.ddram[base:base + self.columns].decode("latin-1")
+
+    def screen(self):
+        return [self.row(y) for y in range(self.lines)]
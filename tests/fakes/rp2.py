@@ -0,0 +1,62 @@
+# tests/fakes/rp2.py
+"""
+rp2-Ersatz: StateMachine zeichnet jedes Wort auf, das in den TX-FIFO ginge
+(put mit Einzelwert oder Array, Shift wie auf dem Pico); DMA kopiert in die
+Ziel-StateMachine und bleibt fuer busy_polls Abfragen aktiv.
+"""
+
+
+class PIO:
+    OUT_LOW = 0
+    OUT_HIGH = 1
+    SHIFT_LEFT = 0
+    SHIFT_RIGHT = 1
+
+
+def asm_pio(**kwargs):
+    return lambda func: func
+
+
+class StateMachine:
+    def __init__(self, sm_id, program=None, freq=None, **kwargs):
+        self.sm_id = sm_id
+        self.freq = freq
+        self.words = []
+        self.puts = 0  # Aufrufe von put() (Python-Overhead)
+
+    def active(self, *args):
+        return 1
+
+    def put(self, value, shift=0):
+        self.puts += 1
+        if isinstance(value, int):
+            self.words.append((value << shift) & 0xFFFFFFFF)
+        else:
+            self.words.extend((v << shift) & 0xFFFFFFFF for v in value)
+
+    def tx_fifo(self):
+        return 0
+
+
+class DMA:
+    busy_polls = 2
+    transfers = []  # (Kanal, Worte) – fuer Tests
+
+    def __init__(self):
+        self._busy = 0
+
+    def pack_ctrl(self, **kwargs):
+        return kwargs
+
+    def config(self, read=None, write=None, count=None, ctrl=None, trigger=False):
+        assert ctrl["size"] == 2 and not ctrl["inc_write"], ctrl
+        words = list(read[:count])
+        write.words.extend(words)
+        DMA.transfers.append((self, words))
+        if trigger:
+            self._busy = self.busy_polls
+
+    def active(self):
+        if self._busy:
+            self._busy -= 1
+        return self._busy > 0
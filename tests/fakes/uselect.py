@@ -0,0 +1,2 @@
+# tests/fakes/uselect.py
+from select import *  # noqa: F401,F403
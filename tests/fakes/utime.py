@@ -0,0 +1,33 @@
+# tests/fakes/utime.py
+"""utime fuer den PC: dieselben Funktionen wie time (siehe conftest.py)."""
+import time as _time
+
+
+def ticks_ms():
+    return _time.ticks_ms()
+
+
+def ticks_us():
+    return _time.ticks_us()
+
+
+def ticks_diff(a, b):
+    return a - b
+
+
+def ticks_add(a, b):
+    return a + b
+
+
+def sleep_ms(ms):
+    _time.sleep_ms(ms)
+
+
+def sleep_us(us):
+    _time.sleep_us(us)
+
+
+sleep = _time.sleep
+localtime = _time.localtime
+mktime = _time.mktime
+time = _time.time
@@ -0,0 +1,125 @@
+# tests/test_alarm_index.py
+"""
+user-006: Wochentag-Index fuer check_alarm gegen den alten linearen Scan.
+
+old_check_alarm ist die Schleife von vor dem Index (Tagesname in der Liste,
+Minutenabstand je Alarm). Beide muessen fuer jede Minute der Woche dasselbe
+liefern; der Benchmark zaehlt Aufrufe pro Sekunde wie in der Hauptschleife
+(viele Aufrufe innerhalb derselben Minute).
+"""
+import random
+import time
+
+import I2C_LCD
+import alarm_store
+import clock_program as cp
+from alarm_store import Alarm
+from pcf8574 import RecordingI2C
+
+_TAGE = ("So", "Mo", "Di", "Mi", "Do", "Fr", "Sa")
+
+
+def old_check_alarm(hour, minute, aktueller_tag, weckzeiten, weckstatus):
+    tag_name = _TAGE[aktueller_tag % 7]
+    aktuelle_minuten = hour * 60 + minute
+    for index, (w_h, w_m, text, tage) in enumerate(weckzeiten):
+        if weckstatus[index]:
+            continue
+        if tag_name not in tage:
+            continue
+        alarm_minuten = w_h * 60 + w_m
+        if abs(alarm_minuten - aktuelle_minuten) <= 1:
+            return index, text
+    return None, None
+
+
+def _old_format(alarms):
+    return [(a.hour, a.minute, a.text, a.day_names() if a.active else []) for a in alarms]
+
+
+def _random_alarms(rnd):
+    alarms = []
+    for i in range(alarm_store.MAX_ALARMS):
+        alarms.append(Alarm(rnd.randrange(24), rnd.randrange(60), rnd.randrange(1, 128),
+                            rnd.random() < 0.8, "Alarm {}".format(i)))
+    return alarms
+
+
+def test_index_matches_linear_scan_for_every_minute_of_the_week():
+    rnd = random.Random(6)
+    for _ in range(5):
+        alarms = _random_alarms(rnd)
+        alarms[1] = Alarm(alarms[0].hour, alarms[0].minute, alarms[0].days, True, "gleiche Zeit")
+        old = _old_format(alarms)
+        status = [rnd.random() < 0.2 for _ in alarms]
+        for tag in range(7):
+            for m in range(24 * 60):
+                expected = old_check_alarm(m // 60, m % 60, tag, old, status)
+                got = cp.check_alarm(m // 60, m % 60, tag, alarms, status, None)
+                if expected[0] is None:
+                    assert got == (None, None)
+                else:
+                    # Reihenfolge innerhalb des +-1-Minuten-Fensters darf abweichen
+                    assert got[0] is not None and not status[got[0]]
+                    assert abs(alarms[got[0]].minute_of_day() - m) <= 1
+                    assert alarms[got[0]].rings_on(tag)
+
+
+def test_next_alarm_wraps_over_the_week(monkeypatch):
+    alarms = [Alarm(7, 0, alarm_store.days_to_mask(["Mo"]), True, "Montag"),
+              Alarm(6, 30, alarm_store.days_to_mask(["Fr"]), True, "Freitag"),
+              Alarm(5, 0, alarm_store.days_to_mask(["Sa"]), False, "aus")]
+    monkeypatch.setattr(cp, "weckzeiten", alarms)
+    assert cp.next_alarm(6, 0, 1) == (0, 7, 0, "Montag", 0)
+    assert cp.next_alarm(7, 0, 1) == (4, 6, 30, "Freitag", 1)  # Mo 07:00 → Fr 06:30
+    assert cp.next_alarm(7, 0, 5) == (3, 7, 0, "Montag", 0)    # Fr → Mo, Sa inaktiv
+
+
+def test_lcd_idle_line_shows_next_alarm(monkeypatch):
+    monkeypatch.setattr(I2C_LCD, "sleep_ms", lambda ms: None)
+    bus = RecordingI2C()
+    lcd = I2C_LCD.I2CLcd(bus, 0x27, 2, 16)
+    alarms = [Alarm(7, 0, alarm_store.days_to_mask(["Mo"]), True, "Montag"),
+              Alarm(6, 30, alarm_store.days_to_mask(["Fr"]), True, "Freitag")]
+    monkeypatch.setattr(cp, "weckzeiten", alarms)
+    cp.update_display(lcd, _TAGE, 1, 6, 0)
+    assert bus.row(0) == "Neuza      07:00"       # heute: nur die Uhrzeit
+    cp.update_display(lcd, _TAGE, 1, 7, 0)
+    assert bus.row(0) == "Neuza   Fr 06:30"       # spaeter: mit Wochentag
+    monkeypatch.setattr(cp, "weckzeiten", [])
+    cp.update_display(lcd, _TAGE, 1, 7, 1)
+    assert bus.row(0) == "Neuza".ljust(16)
+    assert bus.row(1).strip() == "Mo 07:01"
+
+
+def _calls_per_second(func, minutes, calls_per_minute):
+    n = 0
+    t0 = time.perf_counter()
+    for m in minutes:
+        for _ in range(calls_per_minute):
+            func(m)
+            n += 1
+    return n / (time.perf_counter() - t0)
+
+
+def test_benchmark_index_vs_scan():
+    rnd = random.Random(7)
+    alarms = [Alarm(6 + i, 15 * i, alarm_store.ALL_DAYS, True, "Alarm {}".format(i))
+              for i in range(alarm_store.MAX_ALARMS)]
+    old = _old_format(alarms)
+    status = [False] * len(alarms)
+    minutes = [rnd.randrange(7 * 1440) for _ in range(200)]
+    per_minute = 150  # 250-ms-Ticks + Eingabe-Polls innerhalb einer Minute
+
+    def scan(m):
+        return old_check_alarm(m % 1440 // 60, m % 60, m // 1440, old, status)
+
+    def index(m):
+        return cp.check_alarm(m % 1440 // 60, m % 60, m // 1440, alarms, status, None)
+
+    cp.compile_alarm_index(alarms)
+    best_scan = max(_calls_per_second(scan, minutes, per_minute) for _ in range(3))
+    best_index = max(_calls_per_second(index, minutes, per_minute) for _ in range(3))
+    print("\ncheck_alarm bei {} Alarmen: Scan {:.0f}/s, Index {:.0f}/s ({:.1f}x)".format(
+        len(alarms), best_scan, best_index, best_index / best_scan))
+    assert best_index > 1.5 * best_scan
@@ -0,0 +1,187 @@
+# tests/test_alarm_model.py
+"""
+user-019: gemeinsames Alarm-Modell fuer Uhr, Webserver und Boot.
+
+Eine Liste im RAM, einmal geladen; commit()/reload() melden jede Aenderung
+an die Abonnenten (clock_program, Index-Cache des Webservers). Dazu die
+Semantik von DAYS=- und das 5-Alarm-Limit an allen Eingangswegen.
+"""
+import json
+
+import pytest
+
+import alarm_store
+import clock_program as cp
+import webserver_program as web
+from alarm_store import ALL_DAYS, Alarm
+from web_harness import call, setup_sd
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    env = setup_sd(tmp_path, monkeypatch)
+    monkeypatch.setattr(alarm_store, "_listeners", list(alarm_store._listeners))
+    for name in ("weckzeiten", "weckstatus", "_alarm_index", "_alarm_index_src", "_alarm_check_key"):
+        monkeypatch.setattr(cp, name, getattr(cp, name))
+    env.loads = 0
+    real_load = alarm_store.load
+
+    def counting_load(*args, **kwargs):
+        env.loads += 1
+        return real_load(*args, **kwargs)
+
+    monkeypatch.setattr(alarm_store, "load", counting_load)
+    return env
+
+
+def _block(time, days, status, text="x"):
+    return ["TIME=" + time, "TEXT=" + text, "DAYS=" + days, "STATUS=" + status, "---"]
+
+
+# --------------------------------------------------------------------
+#   Laden einmal, danach nur RAM
+# --------------------------------------------------------------------
+def test_loaded_once_and_shared(env):
+    first = alarm_store.alarms()
+    assert len(first) == 5
+    assert alarm_store.alarms() is first
+    assert alarm_store.count_active() == 3
+    call("GET", "/api/alarms")
+    call("GET", "/")
+    assert env.loads == 1  # Webseite und API lesen die gemeinsame Liste
+
+
+def test_commit_notifies_without_reparse(env):
+    alarm_store.alarms()
+    seen = []
+    alarm_store.subscribe(seen.append)
+    new = [Alarm(6, 0, 0b0000010, True, "Mo"), Alarm(7, 0, ALL_DAYS, False, "aus")]
+    assert alarm_store.commit(new)
+    assert seen == [new]
+    assert alarm_store.alarms() == new and seen[0] is alarm_store.alarms()
+    assert env.loads == 1
+    # Uhr und Webserver haben die Liste ohne eigenen SD-Zugriff uebernommen
+    assert cp.weckzeiten is alarm_store.alarms()
+    assert cp.weckstatus == [False, False]
+    assert web._index_cache_valid is False
+
+
+def test_reload_notifies(env):
+    seen = []
+    alarm_store.subscribe(lambda alarms: seen.append(len(alarms)))
+    alarm_store.reload()
+    alarm_store.reload()
+    assert seen == [5, 5] and env.loads == 2
+
+
+def test_failing_subscriber_does_not_block_others(env, monkeypatch):
+    logged = []
+    monkeypatch.setattr(alarm_store, "log_message", lambda path, msg: logged.append(msg))
+    seen = []
+
+    def broken(alarms):
+        raise RuntimeError("kaputt")
+
+    alarm_store.subscribe(broken)
+    alarm_store.subscribe(seen.append)
+    assert alarm_store.commit([Alarm(6, 0, 1)])
+    assert len(seen) == 1
+    assert any("kaputt" in msg for msg in logged)
+
+
+def test_failed_commit_keeps_list_and_is_silent(env, monkeypatch):
+    before = alarm_store.alarms()
+    seen = []
+    alarm_store.subscribe(seen.append)
+    monkeypatch.setattr(alarm_store, "save", lambda *a, **k: False)
+    assert not alarm_store.commit([Alarm(6, 0, 1)])
+    assert alarm_store.alarms() is before and seen == []
+
+
+def test_clock_sees_web_change(env):
+    """Alarm per API auf jetzt+1 Minute → check_alarm der Uhr findet ihn sofort."""
+    alarm_store.alarms()
+    body = json.dumps({"time": "10:31", "text": "Pause", "days": ["Mi"], "active": True})
+    assert call("PUT", "/api/alarms/0", body).code == 200
+    assert cp.check_alarm(10, 30, 3, cp.weckzeiten, cp.weckstatus, None) == (0, "Pause")
+    assert cp.next_alarm(10, 0, 3)[:4] == (0, 10, 31, "Pause")
+
+
+# --------------------------------------------------------------------
+#   Abfragen
+# --------------------------------------------------------------------
+def test_count_active_and_by_weekday(env):
+    alarms = [
+        Alarm(9, 0, 0b0000011, True, "So+Mo spaet"),
+        Alarm(6, 0, 0b0000010, True, "Mo frueh"),
+        Alarm(7, 0, ALL_DAYS, False, "inaktiv"),
+        Alarm(8, 0, 0, True, "ohne Tage"),       # wird inaktiv
+        Alarm(23, 59, 0b1000000, True, "Sa"),
+    ]
+    assert alarm_store.commit(alarms)
+    assert alarm_store.count_active() == 3
+    assert alarm_store.by_weekday() == [[0], [1, 0], [], [], [], [], [4]]
+    assert alarm_store.by_weekday([]) == [[] for _ in range(7)]
+    assert alarm_store.serialize() == alarm_store.format_text(alarms)
+
+
+def test_alarm_slots():
+    alarm = Alarm(6, 0, 1)
+    with pytest.raises(AttributeError):
+        alarm.extra = 1
+    assert not hasattr(alarm, "__dict__")
+
+
+# --------------------------------------------------------------------
+#   DAYS=-
+# --------------------------------------------------------------------
+def test_days_dash_semantics():
+    aktiv, inaktiv = alarm_store.parse_text(_block("06:00", "-", "Aktiv") + _block("07:00", "-", "Inaktiv"))
+    assert aktiv.days == ALL_DAYS and aktiv.active
+    assert all(aktiv.rings_on(w) for w in range(7))
+    assert inaktiv.days == 0 and not inaktiv.active
+    assert not any(inaktiv.rings_on(w) for w in range(7))
+
+
+def test_days_dash_round_trip():
+    """Web speichert 'keine Tage' als DAYS=- / Inaktiv – das bleibt beim Import so."""
+    ohne = Alarm(6, 0, 0, True, "ohne Tage")
+    text = alarm_store.format_text([ohne])
+    assert "DAYS=-" in text and "STATUS=Inaktiv" in text
+    assert alarm_store.parse_text(text.splitlines()) == [ohne]
+
+
+def test_days_dash_via_all_entry_points(env):
+    with open(env.path("alarm.txt"), "w") as f:
+        f.write("\n".join(_block("06:00", "-", "Aktiv") + _block("07:00", "-", "Inaktiv")) + "\n")
+    alarm_store.reload()
+    data = json.loads(call("GET", "/api/alarms").body)
+    assert data[0]["days"] == ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"] and data[0]["active"]
+    assert data[1]["days"] == [] and not data[1]["active"]
+    assert alarm_store.by_weekday()[3] == [0]
+
+
+# --------------------------------------------------------------------
+#   5-Alarm-Limit
+# --------------------------------------------------------------------
+def test_limit_everywhere(env):
+    many = [Alarm(6, i, 1, True, str(i)) for i in range(8)]
+    block = []
+    for i in range(8):
+        block += _block("06:{:02d}".format(i), "Mo", "Aktiv", str(i))
+
+    assert len(alarm_store.parse_text(block)) == 5                      # Textimport
+    assert alarm_store.format_text(many).count("---") == 5               # Export
+    data = alarm_store.encode(many)
+    assert len(alarm_store.decode(data, len(data))) == 5                 # Binaerformat
+    assert alarm_store.commit(many) and len(alarm_store.alarms()) == 5   # commit/save
+    assert len(alarm_store.load()) == 5
+
+    form = "\n".join("06:{:02d},t{},Mo,Aktiv".format(i, i) for i in range(8))
+    assert call("POST", "/save_alarms", form).code == 200               # Formular
+    assert len(alarm_store.alarms()) == 5
+    one = json.dumps({"time": "06:00", "days": ["Mo"], "active": True})
+    assert call("PUT", "/api/alarms/5", one).code == 404                 # REST einzeln
+    assert call("PUT", "/api/alarms", "[" + ",".join([one] * 6) + "]").code == 400  # REST Liste
+    page = call("GET", "/").text()
+    assert page.count('<input type="text"') == 5                      # Web-Formular
@@ -0,0 +1,221 @@
+# tests/test_alarm_ringer.py
+"""
+user-020: AlarmRinger als Zustandsautomat, simuliert mit FakeClock und Scheduler.
+
+FakePwm zeichnet jeden tone()-Aufruf mit Zeitstempel auf, FakeJoystick liefert
+ab einem Zeitpunkt eine Richtung (wie get_joystick_direction()). Die
+Stopp-Latenz wird fuer viele zufaellige Druckzeitpunkte gemessen und mit der
+alten Schleife verglichen, in der play_note() jede Note blockierend spielte und
+der Joystick nur zwischen zwei Noten abgefragt wurde.
+"""
+import random
+
+import sound_config as sc
+from alarm_ringer import AlarmRinger
+from scheduler import Scheduler
+
+
+class FakeClock:
+    def __init__(self, start=0):
+        self.now = start
+
+    def ticks_ms(self):
+        return self.now
+
+    def sleep_ms(self, ms):
+        self.now += ms
+
+
+class FakePwm:
+    """tone(freq, volume) → Ereignisliste [(t, freq, volume)]."""
+    def __init__(self, clock):
+        self.clock = clock
+        self.events = []
+
+    def tone(self, freq, volume):
+        self.events.append((self.clock.now, freq, volume))
+
+
+class FakeJoystick:
+    def __init__(self, clock):
+        self.clock = clock
+        self.press_at = None
+
+    def direction(self):
+        if self.press_at is not None and self.clock.now >= self.press_at:
+            return "up"
+        return None
+
+
+class Sim:
+    """Hauptschleife wie in run_clock_program: Alarm-Task alle TICK_MS, Eingabe-Poll 100 ms."""
+    def __init__(self, melody, leds=False, task_cost_ms=0):
+        self.clock = FakeClock()
+        self.sched = Scheduler(clock=self.clock.ticks_ms, sleep_ms=self.clock.sleep_ms)
+        self.pwm = FakePwm(self.clock)
+        self.joystick = FakeJoystick(self.clock)
+        self.led_events = []
+        self.stops = []
+        self.ringer = AlarmRinger(
+            melody, self.pwm.tone,
+            (lambda cycle: self.led_events.append((self.clock.now, cycle))) if leds else None,
+            lambda: bool(self.joystick.direction()),
+            on_stop=lambda idx, text, manual: self.stops.append((self.clock.now, idx, manual)),
+            clock=self.clock.ticks_ms,
+        )
+        self.task = None
+        if task_cost_ms:
+            # Uhr-Task, der bei jedem Lauf Zeit kostet (LCD, RTC)
+            self.sched.every(200, self._busy(task_cost_ms), "clock")
+
+    def _busy(self, cost):
+        def work():
+            self.clock.now += cost
+        return work
+
+    def _tick(self):
+        if not self.ringer.tick():
+            self.sched.cancel(self.task)
+            self.task = None
+
+    def ring(self, idx=0, text="Aufstehen", volume=50):
+        self.ringer.start(idx, text, volume)
+        if self.task is None:
+            self.task = self.sched.every(AlarmRinger.TICK_MS, self._tick, "alarm")
+
+    def run_until(self, done, limit_ms):
+        while not done() and self.clock.now < limit_ms:
+            self.sched.run_pending()
+            self.sched.sleep_until_next(100)
+
+
+def _melody():
+    return sc.melody_notes("alarm")
+
+
+def _old_stop_time(melody, press_at):
+    """Alte Schleife: Joystick erst nach dem Ende der laufenden Note → Stoppzeitpunkt."""
+    t = 0
+    i = 0
+    while t < press_at:
+        t += melody[i + 1]
+        i = (i + 2) % len(melody)
+    return t
+
+
+# --------------------------------------------------------------------
+#   Stopp-Latenz
+# --------------------------------------------------------------------
+def test_stop_latency_bounded_by_one_tick():
+    melody = _melody()
+    rnd = random.Random(20)
+    presses = [rnd.randrange(1, 30000) for _ in range(200)]
+    new, old = [], []
+    for press in presses:
+        sim = Sim(melody)
+        sim.ring()
+        sim.joystick.press_at = press
+        sim.run_until(lambda: sim.stops, 60000)
+        t, idx, manual = sim.stops[0]
+        assert manual and idx == 0
+        assert sim.pwm.events[-1][1:] == (0, 0)  # PWM aus
+        assert sim.task is None  # Alarm-Task abgemeldet
+        new.append(t - press)
+        old.append(_old_stop_time(melody, press) - press)
+
+    longest_note = max(melody[1::2])
+    print("\nStopp-Latenz ({} Druecke): neu max {} ms / Mittel {:.1f} ms, alt max {} ms / Mittel {:.1f} ms".format(
+        len(presses), max(new), sum(new) / len(new), max(old), sum(old) / len(old)))
+    assert 0 <= min(new) and max(new) <= AlarmRinger.TICK_MS
+    assert max(old) > longest_note - AlarmRinger.TICK_MS
+    assert sum(new) * 20 < sum(old)
+
+
+def test_stop_latency_with_busy_main_loop():
+    """Ein Task mit Laufzeit verlaengert die Latenz hoechstens um diese Laufzeit."""
+    melody = _melody()
+    rnd = random.Random(21)
+    worst = 0
+    for _ in range(100):
+        sim = Sim(melody, task_cost_ms=35)
+        sim.ring()
+        sim.joystick.press_at = rnd.randrange(1, 20000)
+        sim.run_until(lambda: sim.stops, 60000)
+        worst = max(worst, sim.stops[0][0] - sim.joystick.press_at)
+    print("\nStopp-Latenz mit 35-ms-Uhr-Task: max {} ms".format(worst))
+    assert worst <= AlarmRinger.TICK_MS + 35
+
+
+def test_alarm_flag_stops_like_the_button():
+    """Der Taster-IRQ setzt sc.alarm_flag = False; das Praedikat in clock_program prueft beides."""
+    sim = Sim(_melody())
+    flag = {"on": True}
+    sim.ringer._stop_requested = lambda: bool(sim.joystick.direction()) or not flag["on"]
+    sim.ring()
+    sim.run_until(lambda: sim.clock.now >= 1510, 5000)
+    flag["on"] = False
+    sim.run_until(lambda: sim.stops, 5000)
+    assert sim.stops[0][2] is True
+    assert sim.stops[0][0] - 1510 <= AlarmRinger.TICK_MS
+
+
+# --------------------------------------------------------------------
+#   Noten, LEDs, Warteschlange, Maximaldauer
+# --------------------------------------------------------------------
+def test_note_timeline_follows_melody_without_drift():
+    melody = _melody()
+    sim = Sim(melody, task_cost_ms=7)
+    sim.ring(volume=70)
+    cycle = sum(melody[1::2])
+    sim.run_until(lambda: False, 10 * cycle)
+    sim.ringer.stop()
+
+    notes = sim.pwm.events[:-1]
+    expected = []
+    t = 0
+    i = 0
+    while t < 10 * cycle:
+        expected.append((t, melody[i]))
+        t += melody[i + 1]
+        i = (i + 2) % len(melody)
+    assert [f for _, f, _ in notes] == [f for _, f in expected[:len(notes)]]
+    assert len(notes) >= len(expected) - 1
+    # jede Note spaetestens einen Tick (+ Task-Laufzeit) nach ihrem Soll-Zeitpunkt, kein Aufsummieren
+    lateness = [got - want for (got, _, _), (want, _) in zip(notes, expected)]
+    assert 0 <= min(lateness) and max(lateness) <= AlarmRinger.TICK_MS + 7
+    assert all(v == 70 for _, _, v in notes)
+
+
+def test_led_blink_period():
+    sim = Sim(_melody(), leds=True)
+    sim.ring()
+    sim.run_until(lambda: False, 6000)
+    times = [t for t, _ in sim.led_events]
+    cycles = [c for _, c in sim.led_events]
+    assert cycles[:4] == [0, 1, 0, 1]
+    assert len(times) == 6000 // AlarmRinger.LED_PERIOD_MS
+    assert all(t - k * AlarmRinger.LED_PERIOD_MS < AlarmRinger.TICK_MS for k, t in enumerate(times))
+
+
+def test_queued_alarm_rings_after_timeout(monkeypatch):
+    monkeypatch.setattr(AlarmRinger, "MAX_DURATION_MS", 3000)
+    monkeypatch.setattr("alarm_ringer.log_message", lambda path, msg: None)
+    sim = Sim(_melody())
+    sim.ring(0, "erster")
+    sim.ring(1, "zweiter")
+    sim.ring(1, "zweiter")  # doppelt → nur einmal in der Warteschlange
+    sim.run_until(lambda: sim.task is None, 20000)
+    assert [(idx, manual) for _, idx, manual in sim.stops] == [(0, False), (1, False)]
+    assert 3000 <= sim.stops[0][0] < 3000 + AlarmRinger.TICK_MS
+    assert sim.stops[1][0] - sim.stops[0][0] <= 3000 + AlarmRinger.TICK_MS
+    assert not sim.ringer.active
+
+
+def test_manual_stop_clears_queue():
+    sim = Sim(_melody())
+    sim.ring(0, "erster")
+    sim.ring(1, "zweiter")
+    sim.joystick.press_at = 2500
+    sim.run_until(lambda: sim.task is None, 20000)
+    assert [(idx, manual) for _, idx, manual in sim.stops] == [(0, True)]
+    assert not sim.ringer.active
@@ -0,0 +1,224 @@
+# tests/test_alarm_store.py
+"""
+user-018: Binaerformat alarms.bin und Textimport aus alarm.txt.
+
+Round-Trip fuer zufaellige Listen (auch mehrbytige UTF-8-Texte), jede
+Einzelbyte-Beschaedigung muss an CRC/Header scheitern, und load() muss in
+allen Faellen (fehlend, kaputt, alarm.txt von Hand geaendert) auf den
+Textimport zurueckfallen und alarms.bin neu schreiben.
+"""
+import binascii
+import os
+import random
+import shutil
+import sys
+
+import pytest
+
+import alarm_store
+from alarm_store import Alarm
+from web_harness import ROOT
+
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+import migrate_alarms  # noqa: E402
+
+_TEXTS = ("Guten Morgen :)", "", "Bettzeit! Schlaf gut.", "Grüße aus Lissabon – até já",
+          "\U0001F600" * 32, "x" * 32, "Komma, und = Gleich")
+
+
+def _random_alarms(rnd, count=None):
+    count = rnd.randrange(alarm_store.MAX_ALARMS + 1) if count is None else count
+    return [Alarm(rnd.randrange(24), rnd.randrange(60), rnd.randrange(128), rnd.random() < 0.7,
+                  rnd.choice(_TEXTS)) for _ in range(count)]
+
+
+@pytest.fixture
+def sd(tmp_path):
+    shutil.copy(os.path.join(ROOT, "sd", "alarm.txt"), str(tmp_path / "alarm.txt"))
+    return tmp_path
+
+
+def _paths(sd):
+    return str(sd / "alarm.txt"), str(sd / "alarms.bin")
+
+
+# --------------------------------------------------------------------
+#   Binaerformat
+# --------------------------------------------------------------------
+def test_round_trip_random_lists():
+    rnd = random.Random(18)
+    for _ in range(300):
+        alarms = _random_alarms(rnd)
+        stamp = (rnd.randrange(1 << 32), rnd.randrange(1 << 32))
+        data = alarm_store.encode(alarms, stamp)
+        assert len(data) <= len(alarm_store._buf)
+        assert alarm_store.decode(data, len(data), stamp) == alarms
+        assert alarm_store.decode(data, len(data)) == alarms  # ohne Stempelpruefung
+
+
+def test_record_layout():
+    data = alarm_store.encode([Alarm(6, 45, 0b0111110, True, "Hi")], (10, 20))
+    assert data[:4] == b"NWA1"
+    assert len(data) == alarm_store._HDR_SIZE + alarm_store._REC_SIZE + 2
+    assert data[alarm_store._HDR_SIZE:alarm_store._HDR_SIZE + 4] == bytes([6, 45, 0b0111110, 1])
+
+
+def test_every_single_byte_corruption_is_detected():
+    rnd = random.Random(1)
+    alarms = _random_alarms(rnd, 5)
+    data = bytearray(alarm_store.encode(alarms, (123, 456)))
+    for pos in range(len(data)):
+        for flip in (0x01, 0x80, 0xFF):
+            broken = bytearray(data)
+            broken[pos] ^= flip
+            assert alarm_store.decode(broken, len(broken), (123, 456)) is None, (pos, flip)
+
+
+def test_truncated_and_padded_data():
+    data = alarm_store.encode(_random_alarms(random.Random(2), 3))
+    for n in range(len(data)):
+        assert alarm_store.decode(data[:n], n) is None
+    assert alarm_store.decode(data + b"\0", len(data) + 1) is None
+
+
+def test_header_checks():
+    data = bytearray(alarm_store.encode([Alarm(7, 0, 1)], (1, 2)))
+    assert alarm_store.decode(data, len(data), (1, 3)) is None   # alarm.txt geaendert
+    data[5] = alarm_store.MAX_ALARMS + 1                         # Anzahl
+    assert alarm_store.decode(data, len(data)) is None
+
+
+def test_crc_fallback_matches_binascii(monkeypatch):
+    """Die reine Python-Variante (Ports ohne binascii) gegen die Referenz."""
+    import importlib.util
+    monkeypatch.setitem(sys.modules, "binascii", None)
+    # als eigene Kopie laden: ein reload() wuerde die Alarm-Klasse der anderen Tests ersetzen
+    spec = importlib.util.spec_from_file_location("alarm_store_ohne_binascii", alarm_store.__file__)
+    fallback = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(fallback)
+    assert fallback.crc32 is not binascii.crc32
+    payload = bytes(range(256)) * 3
+    assert fallback.crc32(payload) == binascii.crc32(payload)
+    assert fallback.crc32(b"") == 0
+    data = fallback.encode([fallback.Alarm(6, 0, 1)])
+    assert alarm_store.decode(data, len(data)) == [Alarm(6, 0, 1)]
+
+
+# --------------------------------------------------------------------
+#   Textformat
+# --------------------------------------------------------------------
+def test_import_shipped_alarm_txt(sd):
+    with open(str(sd / "alarm.txt")) as f:
+        alarms = alarm_store.parse_text(f)
+    assert [(a.time_str(), a.active) for a in alarms] == [
+        ("06:45", True), ("07:15", True), ("19:45", True), ("22:03", False), ("08:00", False)]
+    assert alarms[3].day_names() == ["Mo", "Di", "Fr", "Sa", "So"]
+    assert alarms[1].text == "Hab einen schoenen Tag!"
+
+
+def test_text_import_edge_cases():
+    lines = [
+        "TIME=06:00", "TEXT=ohne Trenner am Ende", "DAYS=Mo", "STATUS=Aktiv", "---",
+        "TIME=24:10", "TEXT=kaputte Zeit", "DAYS=Mo", "STATUS=Aktiv", "---",
+        "TIME=07:00", "TEXT=fehlender Status", "DAYS=Mo", "---",
+        "  TIME = 08:30 ", "TEXT=Gleich=Zeichen", "DAYS=Sa,So,Xy", "STATUS=aktiv",
+    ]
+    alarms = alarm_store.parse_text(lines)
+    assert [(a.time_str(), a.text, a.day_names(), a.active) for a in alarms] == [
+        ("06:00", "ohne Trenner am Ende", ["Mo"], True),
+        ("08:30", "Gleich=Zeichen", ["Sa", "So"], True),
+    ]
+
+
+def test_text_import_caps_at_max_alarms():
+    block = ["TIME=06:00", "TEXT=x", "DAYS=Mo", "STATUS=Aktiv", "---"]
+    assert len(alarm_store.parse_text(block * 8)) == alarm_store.MAX_ALARMS
+
+
+def test_format_and_parse_round_trip():
+    rnd = random.Random(3)
+    for _ in range(100):
+        alarms = [a for a in _random_alarms(rnd) if a.text.strip() == a.text and a.text]
+        assert alarm_store.parse_text(alarm_store.format_text(alarms).splitlines()) == alarms
+
+
+# --------------------------------------------------------------------
+#   load() / save()
+# --------------------------------------------------------------------
+def test_first_load_migrates_and_second_reads_binary(sd, monkeypatch):
+    text_path, bin_path = _paths(sd)
+    first = alarm_store.load(text_path, bin_path)
+    assert len(first) == 5 and os.path.exists(bin_path)
+
+    def no_text(*args, **kwargs):
+        raise AssertionError("Textimport trotz gueltiger alarms.bin")
+
+    monkeypatch.setattr(alarm_store, "parse_text", no_text)
+    assert alarm_store.load(text_path, bin_path) == first
+
+
+@pytest.mark.parametrize("damage", ["flip", "truncate", "empty", "garbage"])
+def test_corrupt_binary_falls_back_to_text(sd, damage):
+    text_path, bin_path = _paths(sd)
+    expected = alarm_store.load(text_path, bin_path)
+    with open(bin_path, "rb") as f:
+        data = bytearray(f.read())
+    if damage == "flip":
+        data[-3] ^= 0x20
+    elif damage == "truncate":
+        data = data[:-5]
+    elif damage == "empty":
+        data = b""
+    else:
+        data = os.urandom(len(data))
+    with open(bin_path, "wb") as f:
+        f.write(data)
+    assert alarm_store.load(text_path, bin_path) == expected
+    with open(bin_path, "rb") as f:
+        repaired = f.read()
+    assert alarm_store.decode(repaired, len(repaired)) == expected
+
+
+def test_hand_edited_text_is_reimported(sd):
+    text_path, bin_path = _paths(sd)
+    alarm_store.load(text_path, bin_path)
+    with open(text_path, "a") as f:
+        f.write("TIME=09:09\nTEXT=neu\nDAYS=So\nSTATUS=Aktiv\n---\n")
+    with open(text_path) as f:
+        shortened = f.read().split("---\n", 1)[1]  # ersten Alarm loeschen → 5 Alarme
+    with open(text_path, "w") as f:
+        f.write(shortened)
+    alarms = alarm_store.load(text_path, bin_path)
+    assert alarms[-1].text == "neu" and alarms[0].time_str() == "07:15"
+
+
+def test_missing_files(tmp_path):
+    assert alarm_store.load(str(tmp_path / "alarm.txt"), str(tmp_path / "alarms.bin")) == []
+
+
+def test_save_writes_both_files(sd):
+    text_path, bin_path = _paths(sd)
+    alarms = _random_alarms(random.Random(4), 4)
+    assert alarm_store.save(alarms, text_path, bin_path)
+    assert sorted(os.listdir(str(sd))) == ["alarm.txt", "alarms.bin"]  # keine .tmp-Reste
+    with open(text_path) as f:
+        assert alarm_store.parse_text(f) == alarms
+    assert alarm_store.load(text_path, bin_path) == alarms
+
+
+def test_save_failure_reports_false(sd):
+    assert not alarm_store.save([Alarm(6, 0, 1)], str(sd / "fehlt" / "alarm.txt"), str(sd / "alarms.bin"))
+
+
+def test_migrate_tool_round_trip(sd, capsys):
+    text_path, bin_path = _paths(sd)
+    migrate_alarms.main(["migrate", text_path, bin_path])
+    back = str(sd / "zurueck.txt")
+    migrate_alarms.main(["migrate", bin_path, back])
+    with open(text_path) as a, open(back) as b:
+        assert alarm_store.parse_text(a) == alarm_store.parse_text(b)
+    with open(bin_path, "r+b") as f:
+        f.seek(-1, 2)
+        f.write(b"\xff")
+    with pytest.raises(SystemExit):
+        migrate_alarms.read_records(bin_path)
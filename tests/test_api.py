@@ -0,0 +1,289 @@
+# tests/test_api.py
+"""
+user-017: JSON-API gegen ein tmp-/sd.
+
+Die Handler laufen ueber call() (Parser + Routing-Tabelle wie im Poll-Modus).
+alarm_store.save wird mitgezaehlt: unveraenderte Anfragen duerfen nicht auf
+die SD schreiben, ungueltige nichts veraendern.
+"""
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+import alarm_store
+import power_management
+import webserver_program as web
+from web_harness import ROOT, build_request, call, setup_sd
+
+ALARM = {"time": "05:30", "text": "Fruehsport", "days": ["Mo", "Mi"], "active": True}
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    env = setup_sd(tmp_path, monkeypatch)
+    env.saves = []
+    real_save = alarm_store.save
+
+    def counting_save(alarms, *args, **kwargs):
+        env.saves.append(list(alarms))
+        return real_save(alarms, *args, **kwargs)
+
+    monkeypatch.setattr(alarm_store, "save", counting_save)
+    return env
+
+
+def _json(method, path, obj=None):
+    resp = call(method, path, "" if obj is None else json.dumps(obj),
+                {"Content-Type": "application/json"} if obj is not None else None)
+    data = json.loads(resp.body) if resp.body else None
+    return resp.code, data
+
+
+def _on_sd(env):
+    """Was nach einem Neustart geladen wuerde (alarms.bin, sonst alarm.txt)."""
+    return [web._alarm_json(i, a) for i, a in enumerate(alarm_store.load(log_path=None))]
+
+
+# --------------------------------------------------------------------
+#   GET
+# --------------------------------------------------------------------
+def test_list_and_single(env):
+    code, data = _json("GET", "/api/alarms")
+    assert code == 200 and len(data) == 5
+    assert data[0] == {"id": 0, "time": "06:45", "text": "Guten Morgen :)",
+                       "days": ["Mo", "Di", "Mi", "Do", "Fr"], "active": True}
+    assert data[3]["active"] is False
+    assert _json("GET", "/api/alarms/4")[1] == data[4]
+    assert _json("GET", "/api/alarms/5")[0] == 404
+    assert _json("GET", "/api/alarms/x")[0] == 404
+    assert env.saves == []
+
+
+# --------------------------------------------------------------------
+#   PUT / PATCH / DELETE einzelner Alarme
+# --------------------------------------------------------------------
+def test_put_replaces_one_alarm(env):
+    code, data = _json("PUT", "/api/alarms/1", ALARM)
+    assert code == 200 and data == dict(ALARM, id=1)
+    assert len(env.saves) == 1
+    assert _on_sd(env)[1] == dict(ALARM, id=1)
+    assert alarm_store.alarms()[1].time_str() == "05:30"  # gemeinsame Liste sofort aktuell
+
+
+def test_put_same_alarm_does_not_write(env):
+    current = _json("GET", "/api/alarms/0")[1]
+    code, data = _json("PUT", "/api/alarms/0", current)
+    assert code == 200 and data == current
+    assert env.saves == []
+
+
+def test_patch_changes_only_given_fields(env):
+    code, data = _json("PATCH", "/api/alarms/2", {"active": False})
+    assert code == 200
+    assert data == {"id": 2, "time": "19:45", "text": "Bettzeit! Schlaf gut.",
+                    "days": ["Mo", "Di", "Mi", "Do", "Fr"], "active": False}
+    code, data = _json("PATCH", "/api/alarms/2", {"time": "20:00", "text": "Zaehne<putzen>"})
+    assert data["time"] == "20:00" and data["text"] == "Zaehne_putzen_"
+    assert data["active"] is False
+    assert len(env.saves) == 2
+
+
+def test_patch_without_days_stays_inactive(env):
+    code, data = _json("PATCH", "/api/alarms/0", {"days": [], "active": True})
+    assert code == 200 and data["active"] is False and data["days"] == []
+
+
+def test_delete_and_create_next_free_slot(env):
+    code, _ = _json("DELETE", "/api/alarms/4")
+    assert code == 204 and len(_on_sd(env)) == 4
+    assert _json("DELETE", "/api/alarms/4")[0] == 404
+    # PUT auf den naechsten freien Platz legt an, eine Luecke dahinter nicht
+    assert _json("PUT", "/api/alarms/6", ALARM)[0] == 404
+    code, data = _json("PUT", "/api/alarms/4", ALARM)
+    assert code == 201 and data["id"] == 4
+    # voll: Platz 5 gibt es nicht
+    assert _json("PUT", "/api/alarms/5", ALARM)[0] == 404
+    assert _json("PATCH", "/api/alarms/5", {"active": True})[0] == 404
+    assert len(_on_sd(env)) == alarm_store.MAX_ALARMS
+
+
+@pytest.mark.parametrize("body,message", [
+    ("kein json", "JSON-Objekt erwartet"),
+    ("[1, 2]", "JSON-Objekt erwartet"),
+    (json.dumps(dict(ALARM, farbe="rot")), "Unbekanntes Feld: farbe"),
+    (json.dumps(dict(ALARM, time="25:00")), "Ungueltige Zeit (HH:MM)"),
+    (json.dumps(dict(ALARM, time=630)), "Ungueltige Zeit (HH:MM)"),
+    (json.dumps(dict(ALARM, days=["Mo", "Montag"])), "Ungueltige Tage"),
+    (json.dumps(dict(ALARM, days="Mo")), "Ungueltige Tage"),
+    (json.dumps(dict(ALARM, active="ja")), "Ungueltiger Status"),
+    (json.dumps(dict(ALARM, text=5)), "Ungueltiger Text"),
+])
+def test_single_alarm_400(env, body, message):
+    for method in ("PUT", "PATCH"):
+        resp = call(method, "/api/alarms/0", body)
+        assert resp.code == 400
+        assert json.loads(resp.body) == {"error": message}
+    assert env.saves == []
+
+
+def test_body_limits_per_route():
+    big = json.dumps(dict(ALARM, text="x" * 400))
+    assert web._split_request(build_request("PUT", "/api/alarms/0", big))[0] == "too_large"
+    five = json.dumps([dict(ALARM, text="x" * 200)] * 5)
+    assert len(five) > web._API_MAX_BODY
+    assert web._split_request(build_request("PUT", "/api/alarms", five))[0] == "ok"
+
+
+# --------------------------------------------------------------------
+#   PUT /api/alarms: ganze Liste in einem Schritt
+# --------------------------------------------------------------------
+def test_bulk_put_commits_once(env):
+    wanted = [ALARM, dict(ALARM, time="06:00", days=["Sa", "So"]), dict(ALARM, active=False)]
+    code, data = _json("PUT", "/api/alarms", wanted)
+    assert code == 200
+    assert data == [dict(w, id=i) for i, w in enumerate(wanted)]
+    assert len(env.saves) == 1
+    assert _on_sd(env) == data
+
+
+def test_bulk_put_empty_list_clears(env):
+    code, data = _json("PUT", "/api/alarms", [])
+    assert code == 200 and data == []
+    assert _on_sd(env) == []
+    assert alarm_store.alarms() == []
+
+
+def test_bulk_put_unchanged_does_not_write(env):
+    current = _json("GET", "/api/alarms")[1]
+    assert _json("PUT", "/api/alarms", current)[1] == current
+    assert env.saves == []
+
+
+@pytest.mark.parametrize("body,message", [
+    ({"time": "06:00"}, "JSON-Liste erwartet"),
+    ([ALARM] * 6, "Maximal 5 Alarme"),
+    ([ALARM, "06:00"], "Alarm 1: JSON-Objekt erwartet"),
+    ([ALARM, ALARM, dict(ALARM, time="6:00")], "Alarm 2: Ungueltige Zeit (HH:MM)"),
+])
+def test_bulk_put_400_changes_nothing(env, body, message):
+    before = _on_sd(env)
+    code, data = _json("PUT", "/api/alarms", body)
+    assert code == 400 and data == {"error": message}
+    assert env.saves == [] and _on_sd(env) == before
+
+
+def test_bulk_put_write_failure_keeps_old_list(env, monkeypatch):
+    before = list(alarm_store.alarms())
+    monkeypatch.setattr(alarm_store, "save", lambda *a, **k: False)
+    code, data = _json("PUT", "/api/alarms", [ALARM])
+    assert code == 503
+    assert alarm_store.alarms() == before
+
+
+def test_form_post_still_supported(env):
+    resp = call("POST", "/save_alarms", "06:10,Frueh,Mo,Di,Aktiv\n21:00,Spaet,Inaktiv")
+    assert resp.code == 200
+    assert [(a["time"], a["days"], a["active"]) for a in _on_sd(env)] == [
+        ("06:10", ["Mo", "Di"], True), ("21:00", [], False)]
+
+
+# --------------------------------------------------------------------
+#   /api/settings
+# --------------------------------------------------------------------
+def test_settings_get_and_patch(env):
+    code, data = _json("GET", "/api/settings")
+    assert code == 200
+    assert data == {"display_auto": True, "display_on": "07:00", "display_off": "22:00",
+                    "led_mode": "normal", "volume": 50}
+    code, data = _json("PATCH", "/api/settings", {"display_auto": False, "display_off": "23:30"})
+    assert code == 200
+    assert data["display_auto"] is False and data["display_off"] == "23:30"
+    assert data["display_on"] == "07:00"
+    with open(env.path("power_config.txt")) as f:
+        text = f.read()
+    assert "DISPLAY_AUTO=false" in text and "DISPLAY_OFF_TIME=23:30" in text
+    assert power_management.get_config_store().get("DISPLAY_OFF_TIME") == "23:30"
+
+
+@pytest.mark.parametrize("body", [
+    {"display_on": "7 Uhr"}, {"display_auto": "ja"}, {"led_mode": "eco"}, {"volume": 80}, [1],
+])
+def test_settings_patch_400(env, body):
+    before = _json("GET", "/api/settings")[1]
+    code, data = _json("PATCH", "/api/settings", body)
+    assert code == 400 and "error" in data
+    assert _json("GET", "/api/settings")[1] == before
+
+
+# --------------------------------------------------------------------
+#   app.js (mit node, falls vorhanden)
+# --------------------------------------------------------------------
+_APP_DRIVER = r"""
+const fs = require('fs');
+const [appPath, serverJson, fieldsJson] = process.argv.slice(-3);
+const sent = [];
+const server = JSON.parse(serverJson);
+function field(time, text, days) {
+  const boxes = ['Mo','Di','Mi','Do','Fr','Sa','So'].map(d => ({checked: days.includes(d), parentElement: {textContent: d}}));
+  return {querySelector: sel => sel.includes('time') ? {value: time} : {value: text},
+          querySelectorAll: () => boxes};
+}
+const fields = JSON.parse(fieldsJson).map(a => field(a[0], a[1], a[2]));
+const button = {addEventListener: (e, f) => { button.click = f; }};
+global.document = {
+  readyState: 'complete',
+  getElementById: id => id === 'saveButton' ? button : null,
+  querySelectorAll: () => fields,
+};
+global.setTimeout = () => {};
+global.XMLHttpRequest = function() {
+  this.open = (m, u) => { this.m = m; this.u = u; };
+  this.setRequestHeader = () => {};
+  this.send = body => {
+    sent.push([this.m, this.u, body || null]);
+    this.readyState = 4; this.status = 200;
+    this.responseText = this.m === 'GET' ? JSON.stringify(server) : (this.m === 'PUT' ? body : '{}');
+    this.onreadystatechange();
+  };
+};
+global.window = {};
+eval(fs.readFileSync(appPath, 'utf8'));
+sent.length = 0;
+button.click();
+console.log(JSON.stringify({sent: sent, label: button.textContent}));
+"""
+
+
+def _run_app(server, fields):
+    node = shutil.which("node")
+    if not node:
+        pytest.skip("node nicht installiert")
+    out = subprocess.run([node, "-e", _APP_DRIVER, os.path.join(ROOT, "web_assets", "app.js"),
+                          json.dumps(server), json.dumps(fields)],
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.splitlines()[-1])
+
+
+def test_app_js_sends_whole_list_once():
+    server = [dict(ALARM, id=0)]
+    result = _run_app(server, [["05:30", "Fruehsport", ["Mo", "Mi"]], ["06:00", "Zweiter", ["Sa"]]])
+    puts = [s for s in result["sent"] if s[0] == "PUT"]
+    assert len(puts) == 1 and puts[0][1] == "/api/alarms"
+    assert [a["time"] for a in json.loads(puts[0][2])] == ["05:30", "06:00"]
+    assert not any(s[0] == "DELETE" for s in result["sent"])
+    assert result["label"] == "Gespeichert"
+
+
+def test_app_js_sends_empty_list():
+    result = _run_app([dict(ALARM, id=0)], [])
+    assert ["PUT", "/api/alarms", "[]"] in result["sent"]
+
+
+def test_app_js_skips_unchanged_list():
+    fields = [["05:30", "Fruehsport", ["Mo", "Mi"]]]
+    result = _run_app([dict(ALARM, id=0)], fields)
+    assert not any(s[0] == "PUT" for s in result["sent"])
+    assert result["label"] == "Gespeichert"
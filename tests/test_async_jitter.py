@@ -0,0 +1,103 @@
+# tests/test_async_jitter.py
+"""
+user-005: Webserver als uasyncio-Task – die Uhr-Schleife darf nicht blockieren.
+
+Vier langsame Clients (kleiner Empfangspuffer, lesen in kleinen Portionen)
+holen gleichzeitig Bild, Log, CSS und Index-Seite. Gemessen wird die
+Verspaetung eines 20-ms-Uhr-Ticks (Request-Logs gehen in eine eigene
+Datei, damit das ausgelieferte debug_log.txt in beiden Modi gleich bleibt): im Async-Modus als Koroutine neben dem
+Server, im Poll-Modus als Dauer der handle_website_connection()-Aufrufe, die
+die Hauptschleife zwischen zwei Ticks aufhalten. Die Index-Seite ist vorab
+gerendert (passiert einmal nach jeder Aenderung, synchron, wird separat
+ausgegeben).
+"""
+import asyncio
+import threading
+import time
+
+import webserver_program as web
+from web_harness import build_request, http_exchange, listen, setup_sd, start_async_server
+
+TICK_S = 0.02
+PATHS = ("/neuza.webp", "/debug_log.txt", "/styles.css", "/")
+SNDBUF = 8192
+
+
+def _slow_get(port, path):
+    raw = build_request("GET", path, headers={"Connection": "close"})
+    data = http_exchange(port, raw, rcvbuf=4096, read_delay_s=0.001, read_size=2048)
+    assert data.startswith(b"HTTP/1.1 200"), data[:40]
+    return len(data)
+
+
+def _async_lateness(env):
+    async def main():
+        server, port = await start_async_server(env.path("server.log"), sndbuf=SNDBUF)
+        lateness = []
+        done = False
+
+        async def clock():
+            due = time.perf_counter()
+            while not done:
+                due += TICK_S
+                await asyncio.sleep(max(0, due - time.perf_counter()))
+                lateness.append(time.perf_counter() - due)
+
+        task = asyncio.ensure_future(clock())
+        loop = asyncio.get_running_loop()
+        sizes = await asyncio.gather(*[loop.run_in_executor(None, _slow_get, port, p) for p in PATHS])
+        done = True
+        await task
+        server.close()
+        await server.wait_closed()
+        return lateness, sizes
+
+    return asyncio.run(main())
+
+
+def _poll_stalls(env):
+    sock = listen(sndbuf=SNDBUF)
+    port = sock.getsockname()[1]
+    sizes = []
+    clients = [threading.Thread(target=lambda p=p: sizes.append(_slow_get(port, p))) for p in PATHS]
+    for t in clients:
+        t.start()
+    stalls = []
+    try:
+        while any(t.is_alive() for t in clients):
+            t0 = time.perf_counter()
+            web.handle_website_connection(sock, env.path("server.log"))
+            stalls.append(time.perf_counter() - t0)
+            time.sleep(TICK_S)
+    finally:
+        for t in clients:
+            t.join()
+        web._close_all_connections()
+        sock.close()
+    return stalls, sizes
+
+
+def test_clock_tick_jitter_async_vs_poll(tmp_path, monkeypatch):
+    env = setup_sd(tmp_path, monkeypatch, log_bytes=256 * 1024)
+    t0 = time.perf_counter()
+    assert web._ensure_index_cache(env.path("server.log"))
+    render_s = time.perf_counter() - t0
+    lateness, async_sizes = _async_lateness(env)
+    stalls, poll_sizes = _poll_stalls(env)
+
+    assert sorted(async_sizes) == sorted(poll_sizes)  # gleiche Antworten in beiden Modi
+    lateness.sort()
+    worst_async = lateness[-1]
+    p95_async = lateness[int(len(lateness) * 0.95)]
+    worst_poll = max(stalls)
+    print("\nTick-Verspaetung async: p95 {:.1f} ms, max {:.1f} ms ({} Ticks); "
+          "Poll-Modus blockiert bis {:.1f} ms am Stueck; {} kB uebertragen; "
+          "Index-Rendern {:.1f} ms".format(
+              p95_async * 1000, worst_async * 1000, len(lateness), worst_poll * 1000,
+              sum(async_sizes) // 1024, render_s * 1000))
+
+    # Poll-Modus: ein langsamer Download haelt die Uhr ueber viele Ticks an
+    assert worst_poll > 5 * TICK_S
+    # Async-Modus: der Server gibt zwischen den Bloecken ab, die Uhr laeuft weiter
+    assert worst_async * 3 < worst_poll
+    assert p95_async < TICK_S
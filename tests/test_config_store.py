@@ -0,0 +1,151 @@
+# tests/test_config_store.py
+"""
+user-003: ConfigStore (RAM-Stand mit verzoegertem, atomarem Zurueckschreiben).
+
+Die Uhr (time.time) ist eine FakeTime, os.replace wird mitgezaehlt – so laesst
+sich pruefen, dass mehrere Setter innerhalb von write_delay_s genau einen
+tmp+replace-Schreibvorgang ausloesen. Am Ende die Migration alter Keys in
+power_management.get_config_store().
+"""
+import os
+
+import pytest
+
+import config_store
+import power_management
+from config_store import ConfigStore
+
+DEFAULTS = {"A": "1", "B": "zwei", "VOLUME_PERCENT": "50"}
+
+
+class FakeTime:
+    def __init__(self, start=1000.0):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(config_store, "time", clock)
+    replaces = []
+    real_replace = os.replace
+
+    def counting_replace(src, dst):
+        replaces.append((os.path.basename(src), os.path.basename(dst)))
+        real_replace(src, dst)
+
+    monkeypatch.setattr(config_store.os, "replace", counting_replace)
+    path = tmp_path / "power_config.txt"
+    return clock, replaces, path
+
+
+def _read(path):
+    return path.read_text().splitlines()
+
+
+def test_only_changes_mark_dirty(env):
+    _, replaces, path = env
+    path.write_text("A=1\nB=zwei\n")
+    store = ConfigStore(str(path), DEFAULTS, ["B", "A"])
+    store.values()  # erstes Laden zaehlt als Aenderung (version)
+    version = store.version
+    assert store.set("A", 1) is False  # gleicher Wert (als String verglichen)
+    assert store.set("B", " zwei ") is False
+    assert store.update({"A": "1", "B": "zwei"}) is False
+    assert not store.is_dirty() and store.version == version
+    assert store.flush() is True and replaces == []  # nichts zu schreiben
+
+    assert store.set("A", 2) is True
+    assert store.is_dirty() and store.version == version + 1
+    assert store.remove("FEHLT") is False and store.version == version + 1
+
+
+def test_setters_within_window_give_one_write(env):
+    clock, replaces, path = env
+    path.write_text("A=1\nX=unbekannt\n")
+    store = ConfigStore(str(path), DEFAULTS, ["A", "B", "VOLUME_PERCENT"], write_delay_s=2)
+    for i in range(10):
+        store.set("VOLUME_PERCENT", 10 * i)
+        store.set("B", True)
+        clock.now += 0.1
+        assert store.flush_if_due() is True
+    assert replaces == []
+    clock.now += 2
+    assert store.flush_if_due() is True
+    assert replaces == [("power_config.tmp", "power_config.txt")]
+    assert not store.is_dirty()
+    # Reihenfolge aus order, unbekannte Keys bleiben erhalten
+    assert _read(path) == ["A=1", "B=true", "VOLUME_PERCENT=90", "X=unbekannt"]
+    assert not os.path.exists(store.tmp_path)
+    clock.now += 10
+    store.flush_if_due()
+    assert len(replaces) == 1
+
+
+def test_flush_if_due_waits_for_last_change(env):
+    clock, replaces, path = env
+    store = ConfigStore(str(path), DEFAULTS, write_delay_s=2)
+    store.set("A", "5")
+    clock.now += 1.9
+    store.flush_if_due()
+    assert replaces == []
+    store.set("A", "6")  # Fenster beginnt neu
+    clock.now += 1.9
+    store.flush_if_due()
+    assert replaces == []
+    clock.now += 0.1
+    store.flush_if_due()
+    assert len(replaces) == 1
+    assert "A=6" in _read(path)
+
+
+def test_failed_write_stays_dirty(env, monkeypatch):
+    clock, _, path = env
+    logged = []
+    monkeypatch.setattr(config_store, "log_message", lambda p, msg: logged.append(msg))
+    store = ConfigStore(str(path.parent / "fehlt" / "x.txt"), DEFAULTS)
+    store.set("A", "7")
+    clock.now += 5
+    assert store.flush_if_due() is False
+    assert store.is_dirty() and logged
+
+
+# --------------------------------------------------------------------
+#   Migration in power_management
+# --------------------------------------------------------------------
+def _power_store(monkeypatch, path, text):
+    path.write_text(text)
+    store = ConfigStore(str(path), power_management._DEFAULT_SETTINGS, power_management._KEY_ORDER)
+    monkeypatch.setattr(power_management, "_store", store)
+    monkeypatch.setattr(power_management, "_store_migrated", False)
+    return store
+
+
+def test_migration_keeps_real_volume(env, monkeypatch):
+    _, _, path = env
+    store = _power_store(monkeypatch, path, "VOLUME_PERCENT=80\nVOLUME_DEFAULT=30\nVOLUME_NIGHT=5\n")
+    assert power_management.get_volume() == 80
+    values = store.values()
+    assert "VOLUME_DEFAULT" not in values and "VOLUME_NIGHT" not in values
+    assert store.is_dirty()  # alte Keys werden beim naechsten Flush entfernt
+    store.flush()
+    assert "VOLUME_PERCENT=80" in _read(path)
+    assert not any(line.startswith(("VOLUME_DEFAULT", "VOLUME_NIGHT")) for line in _read(path))
+
+
+def test_migration_takes_legacy_volume_when_missing(env, monkeypatch):
+    _, _, path = env
+    _power_store(monkeypatch, path, "VOLUME_DEFAULT=30\n")
+    assert power_management.get_volume() == 30
+
+
+def test_migration_without_legacy_keys_is_clean(env, monkeypatch):
+    _, replaces, path = env
+    store = _power_store(monkeypatch, path, "VOLUME_PERCENT=70\n")
+    assert power_management.get_volume() == 70
+    assert not store.is_dirty()
+    power_management.flush_settings(force=True)
+    assert replaces == []
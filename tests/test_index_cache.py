@@ -0,0 +1,158 @@
+# tests/test_index_cache.py
+"""
+user-010: Index-Seite einmal rendern, danach als Datei ausliefern.
+
+Harness: 100 aufeinanderfolgende GET / (Latenz und Allokationen per
+tracemalloc) mit Cache gegen Rendern bei jedem Aufruf. Dazu der Fall, dass
+waehrend eines laufenden Streams neu gerendert wird: der Client muss genau die
+Generation bekommen, deren Content-Length/ETag er erhalten hat.
+"""
+import asyncio
+import os
+import time
+import tracemalloc
+
+import power_management
+import webserver_program as web
+from web_harness import RecordingSink, build_request, call, http_exchange, parse_response, setup_sd, \
+    start_async_server
+
+
+class CountingSink(web._ResponseFraming):
+    """Zaehlt nur Bytes, damit tracemalloc die Allokationen des Servers misst."""
+    def __init__(self):
+        self.size = 0
+        self.head = None
+        self.start_response(False)
+
+    def sendall(self, data):
+        data = self._frame(data)
+        if self.head is None:
+            self.head = len(data)  # erster Aufruf = Header (ETag enthaelt die Renderzeit)
+        else:
+            self.size += len(data)
+
+
+def _gets(n, log_path, cold):
+    status, req, _ = web._split_request(build_request("GET", "/"))
+    times = []
+    peaks = []
+    sizes = set()
+    for _ in range(n):
+        if cold:
+            web.invalidate_index_cache()
+        sink = CountingSink()
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        web._route_request(sink, req, log_path)
+        times.append(time.perf_counter() - t0)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        sizes.add(sink.size)
+    return times, peaks, sizes
+
+
+def test_100_sequential_gets_latency_and_allocations(tmp_path, monkeypatch):
+    env = setup_sd(tmp_path, monkeypatch)
+    log = env.path("server.log")
+    call("GET", "/", log_path=log)  # erstes Rendern nach dem Boot
+
+    warm_t, warm_peak, warm_sizes = _gets(100, log, cold=False)
+    cold_t, cold_peak, cold_sizes = _gets(20, log, cold=True)
+
+    assert len(warm_sizes) == 1 and warm_sizes == cold_sizes
+    mean = lambda xs: sum(xs) / len(xs)  # noqa: E731
+    print("\nGET / x100: Cache {:.2f} ms (max {:.2f}), Peak {:.1f} kB; "
+          "ohne Cache (20x) {:.2f} ms (max {:.2f}), Peak {:.1f} kB".format(
+              mean(warm_t) * 1000, max(warm_t) * 1000, max(warm_peak) / 1024,
+              mean(cold_t) * 1000, max(cold_t) * 1000, max(cold_peak) / 1024))
+    assert mean(warm_t) * 2 < mean(cold_t)
+    assert max(warm_peak) < max(cold_peak)
+    # nur eine Cache-Datei auf der SD
+    assert [n for n in os.listdir(env.sd) if n.startswith("index_cache")] == [
+        os.path.basename(web._index_cache_path)]
+
+
+def test_etag_revalidation(tmp_path, monkeypatch):
+    setup_sd(tmp_path, monkeypatch)
+    first = call("GET", "/")
+    again = call("GET", "/", headers={"If-None-Match": first.headers["etag"]})
+    assert again.code == 304 and again.body == b""
+    power_management._store.set("DISPLAY_ON_TIME", "06:15")
+    changed = call("GET", "/", headers={"If-None-Match": first.headers["etag"]})
+    assert changed.code == 200 and changed.headers["etag"] != first.headers["etag"]
+
+
+def test_rerender_while_stream_is_open(tmp_path, monkeypatch):
+    setup_sd(tmp_path, monkeypatch)
+    # Client A hat den Header der Generation 1 bekommen, der Body ist noch offen
+    sink = RecordingSink()
+    path_a = web._prepare_index_response(sink, None, {})
+    head_a = parse_response(sink.out)
+
+    # Einstellungen aendern sich, Client B loest das Neu-Rendern aus
+    power_management._store.set("DISPLAY_ON_TIME", "06:15")
+    resp_b = call("GET", "/")
+    assert resp_b.headers["etag"] != head_a.headers["etag"]
+    assert web._index_cache_path != path_a
+
+    # A liest weiter seine Generation: vollstaendig und zum Header passend
+    with open(path_a, "rb") as f:
+        body_a = f.read()
+    assert len(body_a) == int(head_a.headers["content-length"])
+    assert b"06:15" in resp_b.body and b"06:15" not in body_a
+
+    web._release_index_file(path_a)
+    assert not os.path.exists(path_a)  # letzte Referenz → alte Generation weg
+    assert os.path.exists(web._index_cache_path)
+
+
+def test_async_slow_client_gets_consistent_body(tmp_path, monkeypatch):
+    setup_sd(tmp_path, monkeypatch)
+    # Seite gross genug, dass der Stream ueber viele drain()-Runden laeuft
+    monkeypatch.setattr(web, "_SEND_BLOCK", 256)
+
+    async def main():
+        server, port = await start_async_server(None, sndbuf=4096)
+        loop = asyncio.get_running_loop()
+        slow = loop.run_in_executor(None, lambda: http_exchange(
+            port, build_request("GET", "/"), rcvbuf=2048, read_delay_s=0.002, read_size=256))
+        await asyncio.sleep(0.02)  # A steckt mitten im Body
+        power_management._store.set("DISPLAY_OFF_TIME", "23:45")
+        fast = await loop.run_in_executor(None, lambda: http_exchange(port, build_request("GET", "/")))
+        raw = await slow
+        server.close()
+        await server.wait_closed()
+        return parse_response(raw), parse_response(fast)
+
+    a, b = asyncio.run(main())
+    assert a.code == b.code == 200
+    assert len(a.body) == int(a.headers["content-length"])
+    assert a.body.rstrip().endswith(b"</html>")
+    assert b"23:45" in b.body and a.headers["etag"] != b.headers["etag"]
+    assert web._index_readers == {}
+
+
+def test_stale_generations_are_removed_at_first_render(tmp_path, monkeypatch):
+    env = setup_sd(tmp_path, monkeypatch)
+    for name in ("index_cache.html", "index_cache.html.tmp", "index_cache.7.html"):
+        with open(env.path(name), "w") as f:
+            f.write("alt")
+    call("GET", "/")
+    assert sorted(n for n in os.listdir(env.sd) if n.startswith("index_cache")) == ["index_cache.1.html"]
+
+
+def test_render_failure_falls_back_to_direct_stream(tmp_path, monkeypatch):
+    env = setup_sd(tmp_path, monkeypatch)
+    real = web._send_html_chunks
+
+    def broken(sink, log_path=None):
+        if isinstance(sink, web._FileSink):
+            sink.sendall(b"<!DOCTYPE")
+            raise OSError(28, "ENOSPC")
+        return real(sink, log_path)
+
+    monkeypatch.setattr(web, "_send_html_chunks", broken)
+    resp = call("GET", "/")
+    assert resp.code == 200 and b"Neuza Wecker" in resp.body
+    assert not [n for n in os.listdir(env.sd) if n.startswith("index_cache")]
@@ -0,0 +1,119 @@
+# tests/test_lcd_framebuffer.py
+"""
+user-008: Dirty-Region-Framebuffer im LcdApi.
+
+Der RecordingI2C-Fake dekodiert die PCF8574-Strobes zurueck in HD44780-Befehle
+und DDRAM, so dass der sichtbare Text geprueft und die I2C-Transaktionen
+gezaehlt werden koennen. Benchmark: ein Tag Minutenanzeige mit update_display
+(write_at + flush) gegen die alte Variante (clear() + alles neu schreiben).
+"""
+import pytest
+
+import I2C_LCD
+import clock_program
+from pcf8574 import RecordingI2C
+
+WOCHENTAGE = ["So", "Mo", "Di", "Mi", "Do", "Fr", "Sa"]
+
+
+@pytest.fixture
+def lcd(monkeypatch):
+    monkeypatch.setattr(I2C_LCD, "sleep_ms", lambda ms: None)
+    monkeypatch.setattr(clock_program, "weckzeiten", [])  # Zeile 0 ohne naechsten Alarm
+    bus = RecordingI2C()
+    display = I2C_LCD.I2CLcd(bus, 0x27, 2, 16)
+    bus.reset_counters()
+    return display, bus
+
+
+def old_update_display(lcd, wochentage, aktueller_tag, hour, minute):
+    """update_display vor dem Framebuffer."""
+    lcd.clear()
+    lcd.move_to(0, 0)
+    lcd.putstr("Neuza")
+    lcd.move_to(0, 1)
+    wochentag_str = wochentage[aktueller_tag % 7]
+    uhrzeit_str = "{:02d}:{:02d}".format(hour, minute)
+    lcd.putstr(" " * 16)
+    lcd.move_to(0, 1)
+    leer = max(0, (16 - (len(wochentag_str) + 1 + len(uhrzeit_str))) // 2)
+    display_text = " " * leer + wochentag_str + " " + uhrzeit_str
+    lcd.putstr(display_text[:16])
+
+
+def _expected(tag, hour, minute):
+    line = "{} {:02d}:{:02d}".format(WOCHENTAGE[tag], hour, minute)
+    return ["Neuza".ljust(16), (" " * ((16 - len(line)) // 2) + line).ljust(16)]
+
+
+def _day(update, display, bus, tag=1):
+    for m in range(24 * 60):
+        update(display, WOCHENTAGE, tag, m // 60, m % 60)
+        assert bus.screen() == _expected(tag, m // 60, m % 60)
+    return bus.transactions, len(bus.states), bus.commands.count(0x01)
+
+
+def test_day_of_clock_ticks_old_vs_dirty_region(lcd, monkeypatch):
+    display, bus = lcd
+    old = _day(old_update_display, display, bus)
+
+    bus.reset_counters()
+    new = _day(clock_program.update_display, display, bus)
+
+    print("\nI2C pro Tag: alt {} Transaktionen / {} Bytes / {} clear(); "
+          "Framebuffer {} Transaktionen / {} Bytes / {} clear()".format(*(old + new)))
+    assert new[2] == 0                 # kein clear() (5 ms Pause, Flackern)
+    assert new[0] * 3 < old[0]
+    assert new[1] * 5 < old[1]
+
+
+def test_unchanged_screen_sends_nothing(lcd):
+    display, bus = lcd
+    display.write_at(0, 0, "System")
+    display.flush()
+    bus.reset_counters()
+    display.clear_buffer()
+    display.write_at(0, 0, "System")
+    assert display.flush() == 0
+    assert bus.transactions == 0
+
+
+def test_one_cell_gaps_are_merged(lcd):
+    display, bus = lcd
+    display.write_at(0, 1, "12:34")
+    display.flush()
+    bus.reset_counters()
+    display.write_at(0, 1, "13:44")  # Aenderungen in Spalte 1 und 3, Luecke in Spalte 2
+    assert display.flush() == 3       # ein Run "3:4" statt zwei
+    assert bus.commands == [0x80 | 0x41]
+    assert bus.screen()[1].startswith("13:44")
+    bus.reset_counters()
+    display.write_at(0, 1, "23:45")  # Spalten 0 und 4: Luecke von 3 → zwei Runs
+    assert display.flush() == 2
+    assert bus.commands == [0x80 | 0x40, 0x80 | 0x44]
+
+
+def test_flush_to_last_column_keeps_cursor_in_range(lcd):
+    display, bus = lcd
+    display.write_at(10, 0, "ABCDEF")  # Run endet in Spalte 15
+    display.flush()
+    assert 0 <= display.cursor_x < display.num_columns
+    assert (display.cursor_x, display.cursor_y) == (0, 1)
+    display.putstr("xy")  # direkte Ausgabe geht am Anfang der naechsten Zeile weiter
+    assert bus.screen() == ["          ABCDEF", "xy              "]
+    display.putchar("z")
+    assert bus.screen()[1].startswith("xyz")
+
+
+def test_direct_writes_keep_buffers_in_sync(lcd):
+    display, bus = lcd
+    display.move_to(3, 0)
+    display.putstr("Alarm")
+    bus.reset_counters()
+    display.clear_buffer()
+    display.write_at(3, 0, "Alarm")
+    assert display.flush() == 0
+    display.clear()
+    display.write_at(0, 1, "x")
+    display.flush()
+    assert bus.screen() == [" " * 16, "x" + " " * 15]
@@ -0,0 +1,104 @@
+# tests/test_lcd_strobes.py
+"""
+user-009: Strobe-Sequenz eines ganzen Strings in einem writeto().
+
+OldI2CLcd ist der HAL von vorher (jede E-Flanke ein eigenes writeto, Strings
+Zeichen fuer Zeichen). Beide HALs laufen dasselbe Programm ab; die Folge der
+PCF8574-Pin-Zustaende muss identisch sein, nur die Zahl der I2C-Transaktionen
+sinkt.
+"""
+import pytest
+
+import I2C_LCD
+from I2C_LCD import MASK_E, MASK_RS, SHIFT_BACKLIGHT, SHIFT_DATA
+from LCD_API import LcdApi
+from pcf8574 import RecordingI2C
+
+
+class OldI2CLcd(I2C_LCD.I2CLcd):
+    def hal_write_command(self, cmd):
+        high = (((cmd >> 4) & 0x0F) << SHIFT_DATA) | (self.backlight << SHIFT_BACKLIGHT)
+        low = ((cmd & 0x0F) << SHIFT_DATA) | (self.backlight << SHIFT_BACKLIGHT)
+        for half in (high, low):
+            self._write(half | MASK_E)
+            self._write(half)
+        if cmd <= 3:
+            I2C_LCD.sleep_ms(5)
+
+    def hal_write_data(self, data):
+        high = MASK_RS | (self.backlight << SHIFT_BACKLIGHT) | (((data >> 4) & 0x0F) << SHIFT_DATA)
+        low = MASK_RS | (self.backlight << SHIFT_BACKLIGHT) | ((data & 0x0F) << SHIFT_DATA)
+        for half in (high, low):
+            self._write(half | MASK_E)
+            self._write(half)
+
+    hal_write_data_bulk = LcdApi.hal_write_data_bulk  # Zeichen fuer Zeichen
+
+
+def _program(lcd):
+    lcd.move_to(0, 0)
+    lcd.putstr("Hallo Welt 12:34")       # volle Zeile
+    lcd.putstr("ab\ncd")                  # Zeilenumbruch per \n
+    lcd.custom_char(1, [0x00, 0x0A, 0x1F, 0x1F, 0x0E, 0x04, 0x00, 0x00])
+    lcd.backlight_off()
+    lcd.move_to(4, 1)
+    lcd.putchar(chr(1))
+    lcd.backlight_on()
+    lcd.clear_buffer()
+    lcd.write_at(0, 0, "Neuza")
+    lcd.write_at(5, 1, "Mo 07:15")
+    lcd.flush()
+    lcd.write_at(5, 1, "Mo 07:16")
+    lcd.flush()
+    lcd.clear()
+    lcd.putstr("x" * 40)                  # ueber beide Zeilen hinaus
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(I2C_LCD, "sleep_ms", lambda ms: None)
+
+
+def _run(cls):
+    bus = RecordingI2C()
+    lcd = cls(bus, 0x27, 2, 16)
+    init = (bus.transactions, list(bus.states))
+    bus.reset_counters()
+    _program(lcd)
+    return bus, init
+
+
+def test_same_pin_waveform_fewer_transactions():
+    old, old_init = _run(OldI2CLcd)
+    new, new_init = _run(I2C_LCD.I2CLcd)
+
+    assert new_init[1] == old_init[1]            # Init-Sequenz unveraendert
+    assert new.states == old.states              # jede Flanke in derselben Reihenfolge
+    assert new.screen() == old.screen()
+    assert new.commands == old.commands
+    print("\nI2C-Transaktionen: Init alt {} / neu {}; Programm alt {} / neu {} ({} Pin-Zustaende)".format(
+        old_init[0], new_init[0], old.transactions, new.transactions, len(new.states)))
+    assert new.transactions * 8 < old.transactions
+
+
+def test_bulk_write_is_one_transaction_per_row():
+    bus = RecordingI2C()
+    lcd = I2C_LCD.I2CLcd(bus, 0x27, 2, 16)
+    lcd.move_to(0, 1)
+    bus.reset_counters()
+    lcd.putstr("Hallo Welt 12:34")
+    # 16 Zeichen = 64 Zustaende in einem writeto, danach Umbruch (move_to)
+    assert bus.transactions == 2
+    assert len(bus.states) == 16 * 4 + 4
+    assert bus.row(1) == "Hallo Welt 12:34"
+
+
+def test_each_nibble_is_latched_on_falling_edge():
+    bus = RecordingI2C()
+    lcd = I2C_LCD.I2CLcd(bus, 0x27, 2, 16)
+    bus.reset_counters()
+    lcd.putstr("A")
+    high, high_off, low, low_off = bus.states
+    bl = 1 << SHIFT_BACKLIGHT
+    assert (high, high_off) == (0x40 | MASK_RS | bl | MASK_E, 0x40 | MASK_RS | bl)
+    assert (low, low_off) == (0x10 | MASK_RS | bl | MASK_E, 0x10 | MASK_RS | bl)
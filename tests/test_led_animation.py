@@ -0,0 +1,211 @@
+# tests/test_led_animation.py
+"""
+user-025: Frame-Generator-Effekte und LedAnimator.
+
+render() spielt einen Effekt ohne Takt ab und haelt nach jedem yield die
+Rohfarben des Rings als Frame-Array fest – daran werden die Pixel der Effekte
+geprueft. Fuer den Takt laeuft der LedAnimator als Scheduler-Task auf einer
+FakeClock; ein aufzeichnendes show() liefert Zeitstempel und Bild jedes Frames.
+"""
+import pytest
+
+import led
+import led_animation as A
+from led_animation import LedAnimator
+from neopixel import FrameRunner, myNeopixel
+from scheduler import Scheduler
+
+
+class FakeClock:
+    def __init__(self, start=0):
+        self.now = start
+
+    def ticks_ms(self):
+        return self.now
+
+    def sleep_ms(self, ms):
+        self.now += ms
+
+
+def _ring(n=8):
+    np = myNeopixel(n, 28, use_dma=False)
+    np.brightness(255)
+    return np
+
+
+def _pixels(np):
+    return [np.get_pixel(i) for i in range(np.num_leds)]
+
+
+def render(np, effect):
+    """Effekt ohne Takt abspielen → Liste der Frames (je Frame die RGB-Rohfarben)."""
+    return [_pixels(np) for _ in effect]
+
+
+def _record_shows(np, clock):
+    shown = []
+    show = np.show
+
+    def recording_show():
+        shown.append((clock.now, _pixels(np)))
+        show()
+
+    np.show = recording_show
+    return shown
+
+
+def _lit(frame):
+    return [i for i, rgb in enumerate(frame) if rgb != (0, 0, 0)]
+
+
+# --------------------------------------------------------------------
+#   Pixel-Ausgabe der Effekte
+# --------------------------------------------------------------------
+def test_wheel_and_hour_leds():
+    assert A.wheel(0) == (255, 0, 0) and A.wheel(85) == (0, 255, 0) and A.wheel(170) == (0, 0, 255)
+    assert A.wheel(256) == A.wheel(0)
+    assert all(sum(A.wheel(p)) == 255 for p in range(256))
+    assert [A.hour_leds(m, 8) for m in (0, 7, 8, 45, 59)] == [1, 1, 2, 7, 8]
+    assert A.hour_leds(59, 60) == 60
+
+
+@pytest.mark.parametrize("n", [8, 60])
+def test_rainbow_wipe_frames(n):
+    np = _ring(n)
+    frames = render(np, A.rainbow_wipe(np, frames=10, step=5))
+    assert len(frames) == 10
+    for k, frame in enumerate(frames):
+        assert frame == [A.wheel(i * 256 // n + k * 5) for i in range(n)]
+
+
+def test_chase_frames():
+    np = _ring()
+    frames = render(np, A.chase(np, rounds=2, step_frames=2, pause_frames=5))
+    assert len(frames) == 2 * (8 * 2 + 5)
+    # Runde 0: je Position zwei gleiche Frames, genau eine LED an
+    for i in range(8):
+        for f in (frames[2 * i], frames[2 * i + 1]):
+            assert _lit(f) == [i] and f[i] == A.wheel(i * 32)
+    assert _lit(frames[21 + 3 * 2]) == [3] and frames[21 + 6][3] == A.wheel(3 * 32 + 20)
+
+
+def test_fading_tail_frames():
+    np = _ring()
+    frames = render(np, A.fading_tail(np, frames=3, step=10))
+    for k, frame in enumerate(frames):
+        for i, rgb in enumerate(frame):
+            fade = 8 - i
+            assert rgb == tuple(c * fade // 8 for c in A.wheel(i * 32 + k * 10))
+
+
+def test_blink_frames():
+    np = _ring()
+    frames = render(np, A.blink(np, (255, 0, 0), times=2, on_frames=3, off_frames=2, off_color=(0, 255, 0)))
+    colours = [f[0] for f in frames]
+    assert colours == [(255, 0, 0)] * 3 + [(0, 255, 0)] * 2 + [(255, 0, 0)] * 3 + [(0, 255, 0)] * 2
+    assert all(len(set(f)) == 1 for f in frames)  # ganzer Ring gleich
+
+
+def test_hour_fill_frames():
+    np = _ring()
+    frames = render(np, A.hour_fill(np, 45, step_frames=3))
+    assert len(frames) == 7 * 3
+    for k, frame in enumerate(frames):
+        assert _lit(frame) == list(range(k // 3 + 1))
+    assert frames[-1][6] == (255, 20, 147) and frames[-1][7] == (0, 0, 0)
+
+
+def test_kranz_effect_length():
+    np = _ring()
+    frames = render(np, led.kranz_effect(np))
+    expected = 50 + 3 * (8 * 2 + 5) + 50 + 3 * 6 + 10 * 4
+    assert len(frames) == expected
+    print("\nkranz_effect: {} Frames = {} ms bei {} fps".format(
+        len(frames), len(frames) * 1000 // A.FPS, A.FPS))
+
+
+# --------------------------------------------------------------------
+#   Takt im Scheduler
+# --------------------------------------------------------------------
+def _sim(np, effect, extra=None):
+    clock = FakeClock()
+    sched = Scheduler(clock=clock.ticks_ms, sleep_ms=clock.sleep_ms)
+    shown = _record_shows(np, clock)
+    animator = LedAnimator(np, clock=clock.ticks_ms)
+    done = []
+    animator.play(effect, on_done=lambda: done.append(clock.now))
+    state = {"task": None}
+
+    def tick():
+        if not animator.tick():
+            sched.cancel(state["task"])
+            state["task"] = None
+
+    state["task"] = sched.every(animator.period_ms, tick, "leds")
+    clock_runs = []
+    sched.every(200, lambda: clock_runs.append(clock.now) or (extra and extra(clock)), "clock")
+    while state["task"] is not None and clock.now < 60000:
+        sched.run_pending()
+        sched.sleep_until_next(100)
+    return shown, clock_runs, done
+
+
+def test_frames_every_20_ms_while_clock_keeps_running():
+    np = _ring()
+    shown, clock_runs, done = _sim(np, A.blink(np, (255, 0, 0), times=2, on_frames=15, off_frames=15))
+    times = [t for t, _ in shown]
+    assert len(shown) == 60
+    assert times == [k * 1000 // A.FPS for k in range(60)]
+    assert shown[0][1][0] == (255, 0, 0) and shown[15][1][0] == (0, 0, 0) and shown[30][1][0] == (255, 0, 0)
+    # Uhr-Task lief waehrend der Animation weiter (alle 200 ms)
+    assert clock_runs[:6] == [0, 200, 400, 600, 800, 1000]
+    assert done == [1200]
+
+
+def test_slow_task_drops_frames_without_catch_up():
+    np = _ring()
+    effect = A.rainbow_wipe(np, frames=40, step=5)
+    shown, _, _ = _sim(np, effect, extra=lambda clock: setattr(clock, "now", clock.now + 70))
+    times = [t for t, _ in shown]
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    assert min(gaps) >= 20 - FrameRunner.EARLY_MS
+    assert max(gaps) <= 20 + 70  # hoechstens eine Task-Laufzeit zu spaet, nie ein Schwall
+    assert len(shown) == 40  # jeder Frame einmal gezeigt, keiner doppelt
+    assert [f[0] for _, f in shown] == [A.wheel(k * 5) for k in range(40)]
+
+
+def test_stop_and_failing_effect(monkeypatch):
+    np = _ring()
+    clock = FakeClock()
+    logged = []
+    monkeypatch.setattr(A, "log_message", lambda path, msg: logged.append(msg))
+    animator = LedAnimator(np, clock=clock.ticks_ms)
+    animator.play(A.blink(np, (0, 0, 255)))  # endlos
+    for _ in range(5):
+        assert animator.tick()
+        clock.now += 20
+    animator.stop()
+    assert not animator.active and _pixels(np) == [(0, 0, 0)] * 8
+
+    def broken():
+        yield
+        raise ValueError("kaputt")
+
+    animator.play(broken())
+    assert animator.tick()
+    clock.now += 20
+    assert not animator.tick()
+    assert logged and "kaputt" in logged[0]
+
+
+def test_blocking_run_sleeps_and_feeds_watchdog(monkeypatch):
+    np = _ring()
+    clock = FakeClock()
+    feeds = []
+    monkeypatch.setattr(A.utime, "sleep_ms", clock.sleep_ms)
+    monkeypatch.setattr(A, "feed_watchdog", lambda path: feeds.append(clock.now))
+    shown = _record_shows(np, clock)
+    LedAnimator(np, clock=clock.ticks_ms).run(A.chase(np, rounds=1, step_frames=2, pause_frames=0))
+    assert len(shown) == 16
+    assert [t for t, _ in shown] == [k * 20 for k in range(16)]
+    assert len(feeds) >= len(shown)
@@ -0,0 +1,76 @@
+# tests/test_load_test.py
+"""
+user-015: tools/load_test.py gegen den Loopback-Server (Poll- und Async-Modus).
+
+Prueft, dass Keep-Alive und Pipelining die ganze Seite ueber eine Verbindung
+liefern und dieselben Bytes ankommen wie mit einer Verbindung pro Datei.
+Die Zeiten werden nur ausgegeben (-s); auf dem Pico zaehlt vor allem die
+Zahl der accept()-Runden.
+"""
+import asyncio
+
+import pytest
+
+from web_harness import PollServer, RecordingSink, setup_sd, start_async_server
+
+import load_test  # tools/ liegt ueber web_harness im Pfad
+import webserver_program as web
+
+_ROUNDS = 5
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    env = setup_sd(tmp_path, monkeypatch)
+    # Index vorab rendern, gemessen wird nur das Ausliefern
+    path = web._prepare_index_response(RecordingSink(), None, {})
+    if path:
+        web._release_index_file(path)
+    return env
+
+
+def _check(results, label):
+    print("\n" + label)
+    by_mode = {}
+    for stats in results:
+        print("  " + stats.line(_ROUNDS))
+        by_mode[stats.mode] = stats
+        assert stats.errors == 0
+        assert stats.responses == _ROUNDS * len(load_test.PAGE_SET)
+    assert by_mode["close"].connections == _ROUNDS * len(load_test.PAGE_SET)
+    assert by_mode["keepalive"].connections == _ROUNDS
+    assert by_mode["pipeline"].connections == _ROUNDS
+    assert len({s.body_bytes for s in results}) == 1
+
+
+@pytest.mark.parametrize("gzip", [False, True])
+def test_poll_mode(env, gzip):
+    with PollServer(env.path("server.log")) as server:
+        results = load_test.run("127.0.0.1", server.port, _ROUNDS, gzip=gzip)
+    _check(results, "Poll-Modus (gzip={})".format(gzip))
+    # jede neue Verbindung wartet auf den naechsten handle_website_connection()-Durchlauf
+    close, keep_alive, pipeline = results
+    assert keep_alive.seconds < close.seconds and pipeline.seconds < close.seconds
+
+
+def test_async_mode(env):
+    async def main():
+        server, port = await start_async_server(env.path("server.log"))
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, load_test.run, "127.0.0.1", port, _ROUNDS)
+        finally:
+            server.close()
+            await server.wait_closed()
+    _check(asyncio.run(main()), "Async-Modus")
+
+
+def test_request_cap_reconnects(env, monkeypatch):
+    """Mehr Anfragen als _KEEPALIVE_MAX_REQUESTS: der Client verbindet neu, nichts geht verloren."""
+    paths = load_test.PAGE_SET * 4
+    with PollServer(env.path("server.log")) as server:
+        for fetch in (load_test.fetch_keep_alive, load_test.fetch_pipelined):
+            stats = load_test.Stats("cap")
+            fetch("127.0.0.1", server.port, paths, stats)
+            assert stats.errors == 0 and stats.responses == len(paths)
+            assert stats.connections == -(-len(paths) // web._KEEPALIVE_MAX_REQUESTS)
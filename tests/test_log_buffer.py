@@ -0,0 +1,148 @@
+# tests/test_log_buffer.py
+"""
+user-001: RAM-Puffer fuer log_message.
+
+Fake-/sd ist ein tmp-Verzeichnis; open() und os.sync() in log_utils werden
+gezaehlt. Benchmark: Syscalls und geschriebene Bytes pro Logzeile,
+ungepuffert (immediate=True wie vorher) gegen gepuffert.
+"""
+import builtins
+import os
+import time
+
+import pytest
+
+import log_utils
+
+_real_sync = os.sync
+
+
+class SyscallCounter:
+    def __init__(self, monkeypatch):
+        self.opens = 0
+        self.syncs = 0
+        self.bytes = 0
+        counter = self
+
+        class _File:
+            def __init__(self, f):
+                self._f = f
+
+            def write(self, data):
+                counter.bytes += len(data)
+                return self._f.write(data)
+
+            def __getattr__(self, name):
+                return getattr(self._f, name)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                self._f.close()
+
+        def _open(path, mode="r", *args, **kwargs):
+            counter.opens += 1
+            return _File(builtins.open(path, mode, *args, **kwargs))
+
+        def _sync():
+            counter.syncs += 1
+            _real_sync()
+
+        monkeypatch.setattr(log_utils, "open", _open, raising=False)
+        monkeypatch.setattr(log_utils.os, "sync", _sync)
+
+    @property
+    def syscalls(self):
+        return self.opens + self.syncs
+
+
+@pytest.fixture
+def sd(tmp_path, monkeypatch):
+    """Leerer Log-Zustand und ein frisches debug_log.txt im tmp-Verzeichnis."""
+    monkeypatch.setattr(log_utils, "_buf_lines", [])
+    monkeypatch.setattr(log_utils, "_buf_bytes", 0)
+    monkeypatch.setattr(log_utils, "_buf_path", None)
+    monkeypatch.setattr(log_utils, "_last_flush", time.time())
+    monkeypatch.setattr(log_utils, "_log_sizes", {})
+    monkeypatch.setattr(log_utils, "_last_messages", {})
+    path = str(tmp_path / "debug_log.txt")
+    open(path, "w").close()
+    return path
+
+
+def _lines(n):
+    return ["Zeile {:04d} [Webserver] GET /styles.css".format(i) for i in range(n)]
+
+
+def test_lines_are_buffered_until_size_threshold(sd):
+    log_utils.log_message(sd, "erste Zeile")
+    assert os.path.getsize(sd) == 0
+    assert log_utils._buf_lines
+
+    for line in _lines(200):
+        log_utils.log_message(sd, line)
+    # 2-kB-Grenze mehrfach erreicht → geschrieben, Rest im Puffer
+    assert os.path.getsize(sd) >= log_utils._BUF_FLUSH_BYTES
+    assert log_utils._buf_bytes < log_utils._BUF_FLUSH_BYTES
+
+    assert log_utils.flush_log()
+    with open(sd) as f:
+        text = f.read()
+    assert text.count("\n") == 201
+    assert text.index("erste Zeile") < text.index("Zeile 0199")
+
+
+def test_time_threshold_flushes(sd, monkeypatch):
+    log_utils.log_message(sd, "alt")
+    assert log_utils.flush_log_if_due(sd) is True
+    assert os.path.getsize(sd) == 0  # noch nicht faellig
+    monkeypatch.setattr(log_utils, "_last_flush", time.time() - log_utils._BUF_FLUSH_INTERVAL)
+    log_utils.flush_log_if_due(sd)
+    assert os.path.getsize(sd) > 0
+
+
+def test_important_and_alarm_lines_are_written_immediately(sd):
+    log_utils.log_message(sd, "normal")
+    log_utils.log_important(sd, "wichtig")
+    with open(sd) as f:
+        text = f.read()
+    # der Puffer geht mit, Reihenfolge bleibt erhalten
+    assert text.index("normal") < text.index("wichtig")
+    log_utils.log_alarm_event(sd, "Alarm 0")
+    with open(sd) as f:
+        assert "[ALARM] Alarm 0" in f.read()
+    assert not log_utils._buf_lines
+
+
+def test_ring_buffer_drops_oldest_when_sd_fails(sd, monkeypatch):
+    monkeypatch.setattr(log_utils, "_BUF_FLUSH_BYTES", 10 ** 9)
+
+    def _broken(*args, **kwargs):
+        raise OSError(5, "EIO")
+
+    monkeypatch.setattr(log_utils, "open", _broken, raising=False)
+    for line in _lines(log_utils._BUF_MAX_LINES + 10):
+        log_utils.log_message(sd, line)
+    assert not log_utils.flush_log()
+    assert len(log_utils._buf_lines) == log_utils._BUF_MAX_LINES
+    assert "Zeile 0010" in log_utils._buf_lines[0]
+    assert log_utils._buf_bytes == sum(len(x) for x in log_utils._buf_lines)
+
+
+def test_benchmark_syscalls_per_line(sd, monkeypatch):
+    n = 500
+    unbuffered = SyscallCounter(monkeypatch)
+    for line in _lines(n):
+        log_utils.log_message(sd, "u " + line, immediate=True)
+
+    buffered = SyscallCounter(monkeypatch)
+    for line in _lines(n):
+        log_utils.log_message(sd, "b " + line)
+    log_utils.flush_log()
+
+    print("\nSyscalls/Zeile: ungepuffert {:.2f}, gepuffert {:.3f}; Bytes/Zeile {:.1f}".format(
+        unbuffered.syscalls / n, buffered.syscalls / n, buffered.bytes / n))
+    assert unbuffered.syscalls == 2 * n            # open + sync pro Zeile
+    assert buffered.syscalls * 20 < unbuffered.syscalls
+    assert buffered.bytes == unbuffered.bytes      # gleiche Daten, nur gebuendelt
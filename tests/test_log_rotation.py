@@ -0,0 +1,98 @@
+# tests/test_log_rotation.py
+"""
+user-002: Logrotation mit N Generationen und im RAM mitgezaehlter Groesse.
+
+/sd ist ein tmp-Verzeichnis (relativer Pfad, wie init_logfile ihn anlegt);
+_MAX_SIZE wird verkleinert, damit wenige Zeilen zum Rotieren reichen.
+"""
+import os
+
+import pytest
+
+import log_utils
+
+_MAX = 1024
+
+
+@pytest.fixture
+def sd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(log_utils, "_MAX_SIZE", _MAX)
+    monkeypatch.setattr(log_utils, "_LOG_GENERATIONS", log_utils._LOG_GENERATIONS)
+    monkeypatch.setattr(log_utils, "_buf_lines", [])
+    monkeypatch.setattr(log_utils, "_buf_bytes", 0)
+    monkeypatch.setattr(log_utils, "_buf_path", None)
+    monkeypatch.setattr(log_utils, "_log_sizes", {})
+    return tmp_path / "sd"
+
+
+def _fill(log_path, blocks, size=400):
+    """Schreibt 'blocks' Bloecke je size Bytes; Block i beginnt mit '#i'."""
+    for i in range(blocks):
+        text = "#{:03d} ".format(i)
+        log_utils.log_raw(log_path, text + "x" * (size - len(text) - 1) + "\n", immediate=True)
+
+
+def _first_block(path):
+    with open(path) as f:
+        return int(f.read(4)[1:])
+
+
+@pytest.mark.parametrize("generations", [1, 3, 5])
+def test_keeps_exactly_n_generations(sd, generations):
+    log_path = log_utils.init_logfile("sd", generations=generations)
+    assert log_path == "sd/debug_log.txt"
+    assert log_utils.log_archive_paths(log_path) == [
+        "{}.{}".format(log_path, g) for g in range(1, generations + 1)]
+
+    _fill(log_path, 40)  # 2 Bloecke pro Datei → 19 Rotationen
+
+    names = sorted(os.listdir(str(sd)))
+    assert names == ["debug_log.txt"] + ["debug_log.txt.{}".format(g) for g in range(1, generations + 1)]
+    for path in [log_path] + log_utils.log_archive_paths(log_path):
+        assert os.path.getsize(path) <= _MAX
+    # .1 ist die juengste Generation, jede weitere zwei Bloecke aelter
+    assert _first_block(log_path) == 38
+    for g, archive in enumerate(log_utils.log_archive_paths(log_path), 1):
+        assert _first_block(archive) == 38 - 2 * g
+
+
+def test_size_is_tracked_in_ram(sd, monkeypatch):
+    log_path = log_utils.init_logfile("sd", generations=2)
+    stats = []
+    real_stat = os.stat
+
+    def _stat(path, *args, **kwargs):
+        stats.append(path)
+        return real_stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(log_utils.os, "stat", _stat)
+    _fill(log_path, 10)
+    assert stats == []  # Groesse nur beim init_logfile per stat
+    assert log_utils._log_sizes[log_path] == os.path.getsize(log_path)
+
+
+def test_existing_log_is_measured_once_at_init(sd):
+    os.mkdir(str(sd))
+    with open(str(sd / "debug_log.txt"), "w") as f:
+        f.write("a" * 900)
+    log_path = "sd/debug_log.txt"
+    log_utils._log_sizes.pop(log_path, None)
+    log_utils._known_size(log_path)
+    _fill(log_path, 1, size=200)  # 900 + 200 > 1024 → vor dem Anhaengen rotieren
+    assert os.path.getsize(log_path + ".1") == 900
+    assert os.path.getsize(log_path) == 200
+
+
+def test_rotation_failure_keeps_logging(sd, monkeypatch):
+    log_path = log_utils.init_logfile("sd", generations=2)
+    _fill(log_path, 2)
+
+    def _broken(*args):
+        raise OSError(5, "EIO")
+
+    monkeypatch.setattr(log_utils.os, "rename", _broken)
+    _fill(log_path, 1)  # Rotation scheitert, Zeile landet trotzdem im Log
+    assert log_utils._log_sizes[log_path] == 1200  # nach Fehler neu ermittelt, nicht doppelt
+    assert os.path.getsize(log_path) == 1200
+    assert not os.path.exists(log_path + ".1")
@@ -0,0 +1,187 @@
+# tests/test_log_view.py
+"""
+user-013: /logs vom Dateiende her mit Byte-Offset-Paging.
+
+old_serve_log ist die Ausgabe von vor der Umstellung (zeilenweise von vorn,
+fuenf replace() je Zeile, ein sendall pro Zeile, Abbruch nach 500 Zeilen).
+Der Benchmark laeuft auf einem synthetischen 512-kB-Log und misst die Zeit
+bis zum ersten Log-Byte und bis die neueste Zeile beim Client ist.
+"""
+import html
+import time
+import tracemalloc
+
+import pytest
+
+from web_harness import setup_sd
+
+import webserver_program as web
+
+_LOG_SIZE = 512 * 1024
+
+
+def old_serve_log(cl, path, max_lines=500):
+    cl.sendall(b"HTTP/1.1 200 OK\r\nContent-Type:text/html\r\nConnection: close\r\n"
+               b"X-Content-Type-Options: nosniff\r\n"
+               b"X-Frame-Options: DENY\r\n\r\n"
+               b"<html><head><meta charset='UTF-8'><title>Logs</title></head><body><pre>")
+    line_count = 0
+    with open(path) as f:
+        for line in f:
+            if max_lines and line_count >= max_lines:
+                cl.sendall(b"\n--- LOG GEKUERZT (max " + str(max_lines).encode() + b" Zeilen) ---")
+                break
+            cl.sendall(web.html_escape(line).encode())
+            line_count += 1
+    cl.sendall(b"</pre><p><a href='/'>&#x2190; Zurueck</a></p></body></html>")
+
+
+class TimedSink:
+    """Merkt sich Zeitpunkt und Inhalt jedes sendall()."""
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.sends = []
+
+    def sendall(self, data):
+        self.sends.append((time.perf_counter() - self.t0, bytes(data)))
+
+    @property
+    def body(self):
+        return b"".join(data for _, data in self.sends)
+
+    def time_until(self, needle):
+        """Sekunden bis needle vollstaendig gesendet ist (None: nie)."""
+        seen = b""
+        for t, data in self.sends:
+            seen = seen[-len(needle):] + data
+            if needle in seen:
+                return t
+        return None
+
+
+def write_log(path, size):
+    """Nummerierte Zeilen, jede siebte mit HTML-Sonderzeichen."""
+    lines = []
+    written = 0
+    n = 0
+    while written < size:
+        extra = " <b>\"a&b\" 'c'</b>" if n % 7 == 3 else ""
+        line = "{:06d} [Test] Messwert ok{} {}\n".format(n, extra, "x" * (n % 40))
+        lines.append(line)
+        written += len(line)
+        n += 1
+    with open(path, "w") as f:
+        f.write("".join(lines))
+    return lines
+
+
+@pytest.fixture
+def log(tmp_path, monkeypatch):
+    env = setup_sd(tmp_path, monkeypatch)
+    lines = write_log(env.log_path, _LOG_SIZE)
+    old = write_log(env.log_path + ".1", 40000)
+    return env, lines, old
+
+
+def _view(query):
+    sink = TimedSink()
+    web._serve_log_file(sink, None, query)
+    return sink
+
+
+def _text(body):
+    """Inhalt des <pre>-Blocks, unescaped."""
+    start = body.index(b"<pre>") + 5
+    return html.unescape(body[start:body.rindex(b"</pre>")].decode())
+
+
+@pytest.mark.parametrize("n", [1, 200, 2000])
+def test_tail_returns_last_lines(log, n):
+    _, lines, _ = log
+    query = "tail={}".format(n)
+    assert _text(_view(query).body) == "".join(lines[-n:])
+
+
+def test_default_view_is_tail(log):
+    _, lines, _ = log
+    assert _text(_view("").body) == "".join(lines[-web._LOG_TAIL_DEFAULT:])
+
+
+@pytest.mark.parametrize("gen,key", [(0, "lines"), (1, "old")])
+def test_offset_paging_reassembles_file(log, gen, key):
+    _, lines, old = log
+    expected = "".join(lines if key == "lines" else old)
+    gen_arg = "&gen={}".format(gen) if gen else ""
+    pages = []
+    offset = 0
+    while offset < len(expected):
+        body = _view("offset={}&len=4096{}".format(offset, gen_arg)).body
+        pages.append(_text(body))
+        if offset + 4096 < len(expected):
+            assert "offset={}&len=4096{}".format(offset + 4096, gen_arg).encode() in body
+        offset += 4096
+    assert "".join(pages) == expected
+
+
+def test_navigation_between_generations(log):
+    body = _view("offset=0&len=100").body
+    assert b"/logs?tail=200&gen=1" in body
+    body = _view("offset=0&len=100&gen=1").body
+    assert b"/logs?tail=200&gen=2" in body  # Link auch ohne Datei; dort dann 404
+    tail = _view("gen=1").body
+    assert b"/logs?offset=0&len=8192'>Neuere" in tail  # zurueck zur aktuellen Datei
+
+
+def test_invalid_queries_are_clamped(log):
+    _, lines, _ = log
+    assert _text(_view("tail=abc").body) == "".join(lines[-web._LOG_TAIL_DEFAULT:])
+    assert len(_text(_view("offset=0&len=999999").body)) == web._LOG_PAGE_MAX
+    assert _text(_view("offset=99999999&len=10").body) == ""
+    # gen wird auf die konfigurierten Generationen begrenzt; .3 existiert hier nicht
+    assert _view("gen=7").body.startswith(b"HTTP/1.1 404")
+
+
+def _measure(run):
+    """Zeitmessung ohne tracemalloc (verfaelscht Python-Schleifen), Peak-RAM im zweiten Lauf."""
+    sink = TimedSink()
+    run(sink)
+    tracemalloc.start()
+    run(TimedSink())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return sink, peak
+
+
+def test_ttfb_benchmark_on_512k_log(log):
+    env, lines, _ = log
+    newest = web.html_escape(lines[-1]).encode()
+    first_of_tail = web.html_escape(lines[-web._LOG_TAIL_DEFAULT]).encode()
+
+    old, old_peak = _measure(lambda s: old_serve_log(s, env.log_path))
+    old_all, old_all_peak = _measure(lambda s: old_serve_log(s, env.log_path, max_lines=0))
+    new, new_peak = _measure(lambda s: web._serve_log_file(s, None, ""))
+    page, page_peak = _measure(lambda s: web._serve_log_file(s, None, "offset={}&len=8192".format(
+        _LOG_SIZE // 2)))
+
+    first_line = web.html_escape(lines[0]).encode()
+    rows = (
+        ("alt (500 Zeilen)", old, old.time_until(first_line), old_peak),
+        ("alt ohne Limit", old_all, old_all.time_until(first_line), old_all_peak),
+        ("neu tail=200", new, new.time_until(first_of_tail), new_peak),
+        ("neu offset/8k", page, page.sends[2][0], page_peak),
+    )
+    print("\n512-kB-Log: erstes Log-Byte / neueste Zeile / sendall / Bytes / Peak-RAM inkl. Sink")
+    for name, sink, first, peak in rows:
+        last = sink.time_until(newest)
+        print("  {:<17} {:7.2f} ms / {:>9} / {:6d} / {:7d} / {:6d} B".format(
+            name, first * 1000, "nie" if last is None else "{:.2f} ms".format(last * 1000),
+            len(sink.sends), len(sink.body), peak))
+
+    # alt: die neueste Zeile kommt nie an (oder erst nach der ganzen Datei)
+    assert old.time_until(newest) is None
+    assert new.time_until(newest) is not None
+    assert new.time_until(newest) * 5 < old_all.time_until(newest)
+    # grosse Chunks statt eines sendall pro Zeile
+    assert len(new.sends) * 10 < len(old.sends)
+    assert len(page.sends) <= 4 + 8192 // web._LOG_BLOCK
+    assert new_peak < old_all_peak
@@ -0,0 +1,232 @@
+# tests/test_melody_bank.py
+"""
+user-022: Melodie-Bank (melodies.bin) und tools/build_melodies.py.
+
+encode() → Datei → MelodyBank.notes()/load() muss die Definitionen Note fuer
+Note zurueckgeben. RTTTL wird gegen bekannte Frequenzen und Dauern geprueft,
+parse_definitions gegen fehlerhafte Zeilen. Eine beschaedigte Datei (CRC,
+Magic) wird verworfen – sound_config spielt dann die eingebauten Melodien.
+Zuletzt die Grenzen des Formats (Namenslaenge, Anzahl Melodien und Noten).
+"""
+import io
+import os
+
+import pytest
+
+from web_harness import ROOT  # setzt tools/ auf sys.path
+import build_melodies
+import melody_bank
+import sound_config as sc
+from melody_bank import MelodyBank
+from melody_engine import note_pairs
+
+
+def _definitions():
+    with open(os.path.join(ROOT, "tools", "melodies.txt")) as f:
+        return build_melodies.parse_definitions(f)
+
+
+def _write(tmp_path, melodies, name="melodies.bin"):
+    path = tmp_path / name
+    path.write_bytes(melody_bank.encode(melodies))
+    return str(path)
+
+
+@pytest.fixture
+def logged(monkeypatch):
+    messages = []
+    monkeypatch.setattr(melody_bank, "log_message", lambda path, msg: messages.append(msg))
+    return messages
+
+
+# --------------------------------------------------------------------
+#   Rundreise encode → MelodyBank
+# --------------------------------------------------------------------
+def test_round_trip_melodies_txt(tmp_path):
+    melodies = _definitions()
+    melodies.append(build_melodies.parse_rtttl("lang:d=16,o=5,b=180:" + ",".join(["c", "e", "g"] * 15)))
+    bank = MelodyBank(_write(tmp_path, melodies))
+    assert bank.names() == [name for name, _ in melodies]
+    for name, notes in melodies:
+        assert name in bank
+        assert list(bank.notes(name)) == notes, name
+        assert list(note_pairs(bank.load(name))) == notes, name
+    # 45 Noten → drei Streaming-Bloecke zu CHUNK_NOTES
+    assert len(dict(melodies)["lang"]) > 2 * MelodyBank.CHUNK_NOTES
+
+
+def test_unknown_name_and_missing_file(tmp_path, logged):
+    bank = MelodyBank(_write(tmp_path, [("a", [(440, 100)])]))
+    assert "b" not in bank
+    assert bank.load("b") is None and list(bank.notes("b")) == []
+    missing = MelodyBank(str(tmp_path / "fehlt.bin"))
+    assert missing.names() == [] and missing.load("a") is None
+    assert logged == []  # fehlende Bank ist kein Fehler
+
+
+def test_build_melodies_verify_accepts_written_bank(tmp_path):
+    melodies = _definitions()
+    build_melodies.verify(_write(tmp_path, melodies), melodies)
+    with pytest.raises(SystemExit):
+        build_melodies.verify(_write(tmp_path, melodies[:-1], "kurz.bin"), melodies)
+
+
+# --------------------------------------------------------------------
+#   RTTTL und Definitionsdatei
+# --------------------------------------------------------------------
+def test_rtttl_frequencies_and_durations():
+    # b=120 → ganze Note 2000 ms
+    name, notes = build_melodies.parse_rtttl("Test : d=4,o=5,b=120:a4,8a5,c6,4e.5,p,8c#,a,2g#4.,16b6")
+    assert name == "Test"
+    assert notes == [
+        (440, 500),    # a4 = Kammerton
+        (880, 250),    # Achtel, eine Oktave hoeher
+        (1047, 500),   # c6 = 1046,5 Hz
+        (659, 750),    # punktierte Viertel
+        (0, 500),      # Pause
+        (554, 250),    # c#5, Oktave aus o=5
+        (880, 500),    # Vorgaben d=4, o=5
+        (415, 1500),   # Punkt nach der Oktave
+        (1976, 125),   # b6
+    ]
+
+
+def test_rtttl_defaults():
+    # ohne Angaben: d=4, o=6, b=63 → Viertel = 60000/63 ms
+    assert build_melodies.parse_rtttl("x::a,8p")[1] == [(1760, 952), (0, 476)]
+
+
+@pytest.mark.parametrize("token", ["h5", "4a9x", "a##", "x4"])
+def test_rtttl_invalid_note(token):
+    with pytest.raises(ValueError):
+        build_melodies.parse_rtttl("x:d=4,o=5,b=120:c," + token)
+
+
+def test_parse_definitions_continuation_and_comments():
+    text = (
+        "# Kommentar\n"
+        "eins = 330:100 0:50\n"
+        "       415:200\n"
+        "\n"
+        "zwei:d=8,o=5,b=240:a,p\n"
+    )
+    assert build_melodies.parse_definitions(io.StringIO(text)) == [
+        ("eins", [(330, 100), (0, 50), (415, 200)]),
+        ("zwei", [(880, 125), (0, 125)]),
+    ]
+
+
+@pytest.mark.parametrize("text,message", [
+    ("a = 330:100\nb = 330-100\n", "Zeile 2"),
+    ("a = 330:100 x:5\n", "Zeile 1"),
+    ("a:d=4,o=5,b=120:h\n", "Zeile 1"),
+    ("a:d=4,o=5,b=zz:c\n", "Zeile 1"),
+    ("a = 330:100\na:d=4,o=5,b=120:c\n", "doppelt"),
+])
+def test_parse_definitions_errors(text, message):
+    with pytest.raises(SystemExit) as exc:
+        build_melodies.parse_definitions(io.StringIO(text))
+    assert message in str(exc.value)
+
+
+# --------------------------------------------------------------------
+#   Beschaedigte Datei → eingebaute Melodien
+# --------------------------------------------------------------------
+def _corrupt(path, offset):
+    data = bytearray(open(path, "rb").read())
+    data[offset] ^= 0x01
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+@pytest.mark.parametrize("where,reason", [
+    ("magic", "Magic"),
+    ("version", "Magic"),
+    ("directory", "CRC"),
+    ("notes", "CRC"),
+])
+def test_corrupted_byte_rejects_bank(tmp_path, logged, where, reason):
+    melodies = _definitions()
+    path = _write(tmp_path, melodies)
+    size = os.path.getsize(path)
+    offset = {"magic": 0, "version": 4, "directory": melody_bank._HDR_SIZE + 2, "notes": size - 3}[where]
+    _corrupt(path, offset)
+    bank = MelodyBank(path)
+    assert bank.names() == [] and "alarm" not in bank
+    assert bank.load("alarm") is None
+    assert len(logged) == 1 and reason in logged[0]
+
+
+def test_truncated_bank_is_rejected(tmp_path, logged):
+    path = _write(tmp_path, _definitions())
+    data = open(path, "rb").read()
+    with open(path, "wb") as f:
+        f.write(data[:-4])
+    assert MelodyBank(path).names() == []
+    with open(path, "wb") as f:
+        f.write(data[:6])
+    assert MelodyBank(path).names() == []
+    assert len(logged) == 2
+
+
+class RecordingPlayer:
+    def __init__(self):
+        self.played = []
+        self.log_path = None
+
+    def is_playing(self):
+        return False
+
+    def stop(self):
+        pass
+
+    def play_notes(self, notes, volume_percent, loop=False, envelope=True):
+        self.played.append((list(note_pairs(notes)), volume_percent, loop))
+
+
+def test_corrupted_bank_falls_back_to_builtin(tmp_path, logged, monkeypatch):
+    # Bank mit abweichender "alarm"-Melodie, damit die Quelle unterscheidbar ist
+    path = _write(tmp_path, [("alarm", [(999, 10)]), ("tempr", [(888, 10)])])
+    player = RecordingPlayer()
+    monkeypatch.setattr(sc, "_player", player)
+    monkeypatch.setattr(sc, "_bank", MelodyBank(path))
+    assert list(note_pairs(sc.melody_notes("alarm"))) == [(999, 10)]
+    sc.play_async("tempr", 40)
+    assert player.played[-1][0] == [(888, 10)]
+
+    _corrupt(path, os.path.getsize(path) - 1)
+    monkeypatch.setattr(sc, "_bank", MelodyBank(path))
+    assert list(note_pairs(sc.melody_notes("alarm"))) == list(sc.ALARM_MELODY)
+    sc.play_async("tempr", 40, loop=True)
+    assert player.played[-1] == (list(sc._builtin_melody("tempr")), 40, True)
+    assert len(logged) == 1  # Verzeichnis nur einmal gelesen und verworfen
+
+
+# --------------------------------------------------------------------
+#   Grenzen des Formats
+# --------------------------------------------------------------------
+def test_name_length_limit(tmp_path):
+    longest = "x" * melody_bank.MAX_NAME
+    bank = MelodyBank(_write(tmp_path, [(longest, [(440, 100)])]))
+    assert bank.names() == [longest]
+    for name in (longest + "y", "", "ueberü" * 2):
+        with pytest.raises(ValueError):
+            melody_bank.encode([(name, [(440, 100)])])
+
+
+def test_melody_count_limit(tmp_path):
+    melodies = [("m{}".format(i), [(100 + i, 10)]) for i in range(255)]
+    bank = MelodyBank(_write(tmp_path, melodies))
+    assert len(bank.names()) == 255
+    assert list(bank.notes("m254")) == [(354, 10)]
+    with pytest.raises(ValueError):
+        melody_bank.encode(melodies + [("zuviel", [(440, 10)])])
+
+
+def test_note_count_limit(tmp_path):
+    notes = [(i % 5000, 1 + i % 7) for i in range(0xFFFF)]
+    bank = MelodyBank(_write(tmp_path, [("lang", notes)]))
+    flat = bank.load("lang")
+    assert len(flat) == 2 * 0xFFFF and list(note_pairs(flat)) == notes
+    with pytest.raises(ValueError):
+        melody_bank.encode([("zulang", notes + [(440, 1)])])
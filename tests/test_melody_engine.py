@@ -0,0 +1,237 @@
+# tests/test_melody_engine.py
+"""
+user-021: Melodie-Engine mit emuliertem Timer und PWM.
+
+FakeTimer nimmt den ONE_SHOT-Rueckruf entgegen und ruft ihn nach period ms
+virtueller Zeit auf; FakePwm zeichnet jede Duty-Aenderung als (t, Frequenz,
+Duty) auf. Die so entstehende Zeitleiste wird Note fuer Note gegen die
+Definitionen geprueft – eingebaute Melodien aus sound_config und die Bank aus
+tools/melodies.txt (ueber melodies.bin und MelodyBank).
+"""
+import os
+
+import pytest
+
+from web_harness import ROOT  # setzt tools/ auf sys.path
+import build_melodies
+import melody_bank
+import melody_engine as M
+import sound_config as sc
+from machine import Timer
+
+
+class FakeTimer:
+    def __init__(self):
+        self.pending = None
+        self.inits = 0
+
+    def init(self, mode=Timer.ONE_SHOT, period=None, callback=None):
+        assert mode == Timer.ONE_SHOT and period > 0
+        self.inits += 1
+        self.pending = (period, callback)
+
+    def deinit(self):
+        self.pending = None
+
+
+class FakePwm:
+    def __init__(self):
+        self.t = 0
+        self.f = 0
+        self.log = []
+
+    def freq(self, f):
+        self.f = f
+
+    def duty_u16(self, duty):
+        self.log.append((self.t, self.f, duty))
+
+
+def _run(pwm, timer, limit_ms=None):
+    """Timer-Kette abarbeiten, bis nichts mehr geplant ist (oder limit_ms erreicht)."""
+    while timer.pending and (limit_ms is None or pwm.t < limit_ms):
+        period, callback = timer.pending
+        timer.pending = None
+        pwm.t += period
+        callback(timer)
+
+
+def _emulate(notes, volume=50):
+    pwm, timer = FakePwm(), FakeTimer()
+    player = M.MelodyPlayer(pwm, timer)
+    player.play_async(M.compile_melody(notes, volume))
+    _run(pwm, timer)
+    assert not player.is_playing()
+    return pwm, timer
+
+
+def _check_timeline(log, notes, volume):
+    """Jede Note: Ereignisse genau in [Start, Start+Dauer), richtige Frequenz, volle Lautstaerke."""
+    duty = M.volume_duty(volume)
+    end = sum(d for _, d in notes)
+    assert log[-1] == (end, log[-1][1], 0)  # am Ende stumm
+    body = log[:-1]
+    if len(body) > 1 and body[0][2] == 0 and body[1][0] == 0:
+        body = body[1:]  # play_async() schaltet vor dem Start stumm (stop)
+    t = 0
+    i = 0
+    for freq, dur in notes:
+        assert body[i][0] == t, (freq, dur, body[i])
+        segment = []
+        while i < len(body) and body[i][0] < t + dur:
+            segment.append(body[i])
+            i += 1
+        if freq == 0 or duty == 0:
+            assert all(d == 0 for _, _, d in segment)
+        else:
+            assert all(f == max(M.MIN_FREQ, min(freq, M.MAX_FREQ)) for _, f, _ in segment)
+            assert max(d for _, _, d in segment) == duty
+            if dur >= 3 * M._ENV_MS:
+                # Ein-/Ausblenden: steigend bis zur Ziel-Lautstaerke, dann fallend
+                duties = [d for _, _, d in segment]
+                top = duties.index(duty)
+                assert duties[:top + 1] == sorted(duties[:top + 1])
+                assert duties[top:] == sorted(duties[top:], reverse=True)
+                assert duties[0] < duty and duties[-1] < duty
+        t += dur
+    assert i == len(body) and t == end
+
+
+def _definitions():
+    with open(os.path.join(ROOT, "tools", "melodies.txt")) as f:
+        return build_melodies.parse_definitions(f)
+
+
+# --------------------------------------------------------------------
+#   Zeitleiste gegen die Definitionen
+# --------------------------------------------------------------------
+@pytest.mark.parametrize("name", ["alarm", "paus", "end", "xp_start", "fuer_elise", "tempr"])
+@pytest.mark.parametrize("volume", [0, 30, 100])
+def test_builtin_timeline(name, volume):
+    notes = sc._builtin_melody(name)
+    pwm, timer = _emulate(notes, volume)
+    _check_timeline(pwm.log, notes, volume)
+    # eine Note = hoechstens 7 Timer-Rueckrufe statt einer blockierten CPU
+    assert timer.inits <= 7 * len(notes)
+
+
+def test_builtins_match_melodies_txt():
+    for name, notes in _definitions():
+        if sc._builtin_melody(name):
+            assert list(sc._builtin_melody(name)) == notes, name
+
+
+def test_bank_playback_matches_definitions(tmp_path, monkeypatch):
+    """melodies.txt → melodies.bin → sc.play_async(Name) → PWM-Zeitleiste."""
+    melodies = _definitions()
+    path = str(tmp_path / "melodies.bin")
+    with open(path, "wb") as f:
+        f.write(melody_bank.encode(melodies))
+    pwm, timer = FakePwm(), FakeTimer()
+    monkeypatch.setattr(sc, "_bank", melody_bank.MelodyBank(path))
+    monkeypatch.setattr(sc, "_speaker", pwm)
+    monkeypatch.setattr(sc, "_player", M.MelodyPlayer(pwm, timer))
+    print()
+    for name, notes in melodies:
+        pwm.log = []
+        pwm.t = 0
+        sc.play_async(name, 60)
+        assert sc.is_playing()
+        _run(pwm, timer)
+        assert not sc.is_playing()
+        _check_timeline(pwm.log, notes, 60)
+        events = M.compile_melody(notes, 60)
+        print("{:<12} {:>3} Noten {:>4} Ereignisse {:>5} Bytes {:>6} ms".format(
+            name, len(notes), len(events) // M.FIELDS, len(events) * 2, pwm.t))
+        assert M.duration_ms(events) == pwm.t
+    # flaches array('H') aus melody_notes() ergibt dieselbe Zeitleiste
+    flat = sc.melody_notes("alarm")
+    assert list(M.note_pairs(flat)) == dict(melodies)["alarm"]
+
+
+@pytest.mark.parametrize("envelope", [True, False])
+@pytest.mark.parametrize("volume", [0, 30, 100])
+def test_play_notes_matches_compiled_timeline(volume, envelope):
+    """play_notes() erzeugt die Huellkurve erst im Rueckruf – Zeitleiste wie kompiliert."""
+    print()
+    for name in ("alarm", "end", "fuer_elise", "tempr"):
+        notes = sc._builtin_melody(name) + ((20, 100), (9000, 60), (440, 0), (440, 5))
+        flat = sc._note_array(notes)
+        logs = []
+        for play in ("compiled", "lazy"):
+            pwm, timer = FakePwm(), FakeTimer()
+            player = M.MelodyPlayer(pwm, timer)
+            if play == "compiled":
+                events = M.compile_melody(notes, volume, envelope)
+                player.play_async(events)
+            else:
+                player.play_notes(flat, volume, envelope=envelope)
+            _run(pwm, timer)
+            assert not player.is_playing()
+            logs.append(pwm.log)
+        assert logs[0] == logs[1], name
+        if volume and envelope:
+            print("{:<12} {:>3} Noten: kompiliert {:>5} Bytes, play_notes {:>4} Bytes".format(
+                name, len(notes), len(events) * events.itemsize, len(flat) * flat.itemsize))
+            assert len(flat) * 7 < len(events) * 2
+
+
+def test_play_notes_loop_and_stop():
+    pwm, timer = FakePwm(), FakeTimer()
+    player = M.MelodyPlayer(pwm, timer)
+    notes = sc._builtin_melody("xp_start")
+    cycle = sum(d for _, d in notes)
+    player.play_notes(sc._note_array(notes), 50, loop=True)
+    _run(pwm, timer, limit_ms=2 * cycle + 1)
+    assert player.is_playing()
+    second = [e for e in pwm.log if cycle <= e[0] < 2 * cycle]
+    first = [e for e in pwm.log if 0 < e[0] < cycle]
+    assert [(t + cycle, f, d) for t, f, d in first] == second[1:] and second[0][1] == notes[0][0]
+    player.stop()
+    assert not player.is_playing() and timer.pending is None
+    # nur Pausen/Nullnoten: Schleife endet statt leer zu kreisen
+    player.play_notes(sc._note_array(((440, 0),)), 50, loop=True)
+    assert not player.is_playing()
+
+
+# --------------------------------------------------------------------
+#   Schleife, Stopp, Uebergabe an tone()
+# --------------------------------------------------------------------
+def test_loop_and_stop():
+    pwm, timer = FakePwm(), FakeTimer()
+    player = M.MelodyPlayer(pwm, timer)
+    notes = sc._builtin_melody("alarm")
+    cycle = sum(d for _, d in notes)
+    player.play_async(M.compile_melody(notes, 50), loop=True)
+    _run(pwm, timer, limit_ms=3 * cycle + 1)
+    assert player.is_playing()
+    # zweiter Durchlauf beginnt genau nach einem Zyklus mit der ersten Note
+    starts = [t for t, _, _ in pwm.log]
+    assert cycle in starts and 2 * cycle in starts
+    first = [e for e in pwm.log if e[0] == cycle][0]
+    assert first[1] == notes[0][0]
+    player.stop()
+    assert not player.is_playing() and timer.pending is None
+    assert pwm.log[-1][2] == 0
+
+
+def test_clamping_and_zero_durations():
+    events = M.compile_melody(((20, 100), (9000, 100), (440, 0), (440, 5)), 50)
+    freqs = [events[i] for i in range(0, len(events), M.FIELDS)]
+    assert set(freqs[:-1]) <= {M.MIN_FREQ, M.MAX_FREQ}
+    assert freqs[-1] == 440  # zu kurz fuer die Huellkurve → ein Ereignis
+    assert M.duration_ms(events) == 205
+
+
+def test_tone_and_stop_release_player(monkeypatch):
+    pwm, timer = FakePwm(), FakeTimer()
+    monkeypatch.setattr(sc, "_speaker", pwm)
+    monkeypatch.setattr(sc, "_player", M.MelodyPlayer(pwm, timer))
+    sc.play_async(sc._builtin_melody("paus"), 30)
+    assert sc.is_playing()
+    sc.tone(440, 50)
+    assert not sc.is_playing() and timer.pending is None
+    assert pwm.f == 440 and pwm.log[-1][2] == M.volume_duty(50)
+    sc.play_async(sc._builtin_melody("paus"), 30)
+    sc.stop()
+    assert not sc.is_playing() and pwm.log[-1][2] == 0
@@ -0,0 +1,136 @@
+# tests/test_neopixel_lut.py
+"""
+user-023: Helligkeits-LUT in myNeopixel.
+
+Der rp2-Fake (tests/fakes/rp2.py) zeichnet jedes Wort auf, das in den TX-FIFO
+der StateMachine ginge. Geprueft wird, dass die lineare LUT bitgleich zur alten
+Float-Skalierung int(v * Helligkeit / 255) ausgibt, dass eine neue Helligkeit
+ohne erneutes set_pixel() wirkt und die Gamma-Kurve. Micro-Benchmark: set_pixel
+und fill gegen die alte Klasse (als Referenz unten nachgebaut).
+"""
+import time
+
+import pytest
+import rp2
+
+from neopixel import myNeopixel
+
+
+class OldNeopixel:
+    """myNeopixel vor der LUT: Float-Skalierung je Pixel, show() mit put(pix, 8)."""
+    def __init__(self, num_leds):
+        self.num_leds = num_leds
+        self._brightness = 64
+        self.pixels = [0] * num_leds
+        self.sm = rp2.StateMachine(0)
+
+    def brightness(self, value):
+        self._brightness = value
+
+    def set_pixel(self, idx, r, g, b):
+        if not 0 <= idx < self.num_leds:
+            return
+        scale = self._brightness / 255
+        self.pixels[idx] = int(b * scale) | int(r * scale) << 8 | int(g * scale) << 16
+
+    def fill(self, r, g, b):
+        for i in range(self.num_leds):
+            self.set_pixel(i, r, g, b)
+
+    def show(self):
+        put = self.sm.put
+        for pix in self.pixels:
+            put(pix, 8)
+
+
+def _new(num_leds=8, **kwargs):
+    return myNeopixel(num_leds, 28, use_dma=False, **kwargs)
+
+
+@pytest.mark.parametrize("br", [1, 17, 64, 128, 200, 255])
+def test_linear_lut_matches_float_scaling(br):
+    np = _new()
+    old = OldNeopixel(8)
+    np.brightness(br)
+    old.brightness(br)
+    for v in range(256):
+        np.set_pixel(v % 8, v, 255 - v, v // 2)
+        old.set_pixel(v % 8, v, 255 - v, v // 2)
+        assert np.pixels[v % 8] == old.pixels[v % 8] << 8
+    np.show()
+    old.show()
+    assert np.sm.words == old.sm.words  # gleicher Wortstrom im FIFO
+
+
+def test_fill_matches_set_pixel():
+    np = _new(12)
+    np.brightness(99)
+    np.fill(255, 20, 147)
+    words = list(np.pixels)
+    for i in range(12):
+        np.set_pixel(i, 255, 20, 147)
+    assert list(np.pixels) == words
+    assert [np.get_pixel(i) for i in range(12)] == [(255, 20, 147)] * 12
+
+
+def test_brightness_rerenders_without_set_pixel(monkeypatch):
+    np = _new()
+    np.set_pixel(3, 255, 20, 147)
+    np.brightness(255)
+    np.show()
+    assert np.sm.words[3] == (20 << 24 | 255 << 16 | 147 << 8)
+
+    builds = []
+    orig = myNeopixel._build_lut
+    monkeypatch.setattr(myNeopixel, "_build_lut", lambda self: builds.append(1) or orig(self))
+    np.brightness(10)
+    np.brightness(10)  # unveraendert → keine neue LUT
+    assert len(builds) == 1
+    np.show()
+    assert np.sm.words[8 + 3] == ((20 * 10 // 255) << 24 | (255 * 10 // 255) << 16 | (147 * 10 // 255) << 8)
+    assert np.get_pixel(3) == (255, 20, 147)  # Rohfarbe bleibt
+
+
+def test_rotation_moves_raw_colours():
+    np = _new()
+    np.set_pixel(3, 255, 20, 147)
+    np.rotate_right(1)
+    assert np.get_pixel(4) == (255, 20, 147) and np.get_pixel(3) == (0, 0, 0)
+    np.brightness(200)  # Neu-Rendern aus den rotierten Rohfarben
+    assert np.pixels[4] and not np.pixels[3]
+    np.rotate_left(2)
+    assert np.get_pixel(2) == (255, 20, 147)
+
+
+def test_gamma_lut():
+    np = _new(gamma=2.2)
+    np.brightness(255)
+    levels = list(np._lut)
+    assert levels[0] == 0 and levels[255] == 255
+    assert levels == sorted(levels)
+    assert 50 <= levels[128] <= 60  # (128/255)^2.2 * 255 ≈ 56
+    np.brightness(128)
+    assert np._lut[255] == 128 and np._lut[1] == 0
+
+
+def _bench(make, frames, num_leds):
+    np = make(num_leds)
+    np.brightness(64)
+    start = time.perf_counter()
+    for f in range(frames):
+        for i in range(num_leds):
+            np.set_pixel(i, (f + i) & 255, 20, 147)  # wie led_kranz_animation
+        np.fill(f & 255, 0, 0)
+    return (time.perf_counter() - start) / (frames * 2 * num_leds) * 1e6
+
+
+def test_benchmark_lut_vs_float():
+    print()
+    for num_leds in (8, 60):
+        frames = 24000 // num_leds
+        old = min(_bench(OldNeopixel, frames, num_leds) for _ in range(3))
+        new = min(_bench(_new, frames, num_leds) for _ in range(3))
+        print("{:>2} LEDs: alt {:.2f} us/Pixel, LUT {:.2f} us/Pixel ({:.1f}x)".format(
+            num_leds, old, new, old / new))
+        assert new < old
+
@@ -0,0 +1,199 @@
+# tests/test_neopixel_show.py
+"""
+user-024: show() per DMA bzw. ein sm.put(array), Doppelpuffer, FrameRunner.
+
+Der rp2-Fake zeichnet den Wortstrom im TX-FIFO auf; DMA.config() kopiert die
+Worte sofort und bleibt fuer busy_polls Abfragen aktiv. FakeTime ersetzt
+time in neopixel (ticks_us/sleep_us), so dass die Wartezeit bis zum Ende der
+vorigen Ausgabe (60 LEDs × 24 Bit × 1,25 us + Reset) nachgerechnet werden kann.
+"""
+import pytest
+import rp2
+
+import neopixel
+from neopixel import FrameRunner, myNeopixel
+
+LEDS = 60
+
+
+class FakeTime:
+    def __init__(self):
+        self.us = 0
+        self.slept_us = []
+
+    def ticks_us(self):
+        return self.us
+
+    def ticks_ms(self):
+        return self.us // 1000
+
+    def ticks_diff(self, a, b):
+        return a - b
+
+    def ticks_add(self, a, b):
+        return a + b
+
+    def sleep_us(self, us):
+        self.slept_us.append(us)
+        self.us += us
+
+    def sleep_ms(self, ms):
+        self.sleep_us(ms * 1000)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(neopixel, "time", fake)
+    monkeypatch.setattr(rp2.DMA, "transfers", [])
+    return fake
+
+
+def _grb(r, g, b):
+    """Wort, wie es der PIO (Shift links, 24 Bit) erwartet: GRB in Bit 31..8."""
+    return g << 24 | r << 16 | b << 8
+
+
+def _frame(k):
+    return [((i * 4 + k) & 255, (i * 7) & 255, (255 - i - k) & 255) for i in range(LEDS)]
+
+
+def _draw(np, colours):
+    for i, (r, g, b) in enumerate(colours):
+        np.set_pixel(i, r, g, b)
+
+
+@pytest.mark.parametrize("use_dma", [True, False])
+def test_word_stream_60_leds(clock, use_dma):
+    np = myNeopixel(LEDS, 28, use_dma=use_dma)
+    np.brightness(255)
+    assert (np._dma is not None) == use_dma
+    expected = []
+    for k in range(5):
+        colours = _frame(k)
+        _draw(np, colours)
+        np.show()
+        expected += [_grb(*c) for c in colours]
+        clock.us += 5000  # naechstes Bild erst nach der Ausgabe
+    assert np.sm.words == expected
+    if use_dma:
+        assert np.sm.puts == 0
+        assert [len(words) for _, words in rp2.DMA.transfers] == [LEDS] * 5
+    else:
+        assert np.sm.puts == 5  # ein put(array) je Bild statt 60 put(pix, 8)
+        assert rp2.DMA.transfers == []
+
+
+@pytest.mark.parametrize("use_dma", [True, False])
+def test_double_buffer_swap(clock, monkeypatch, use_dma):
+    np = myNeopixel(LEDS, 28, use_dma=use_dma)
+    np.brightness(255)
+    handed = []
+    if use_dma:
+        config = rp2.DMA.config
+        monkeypatch.setattr(rp2.DMA, "config", lambda self, **kw: handed.append(kw["read"]) or config(self, **kw))
+    else:
+        put = np.sm.put
+        monkeypatch.setattr(np.sm, "put", lambda value, shift=0: handed.append(value) or put(value, shift))
+
+    _draw(np, _frame(0))
+    first = list(np.pixels)
+    np.show()
+    out = handed[-1]
+    assert out is np._front and out is not np.pixels
+    # Zeichenpuffer startet mit dem aktuellen Bild; Zeichnen veraendert die Ausgabe nicht
+    assert list(np.pixels) == first
+    np.set_pixel(1, 9, 9, 9)
+    assert list(out) == first
+    assert np.pixels[1] == _grb(9, 9, 9)
+
+    clock.us += 5000
+    np.show()
+    assert handed[-1] is not out  # Puffer getauscht
+    assert np.sm.words[LEDS:] == first[:1] + [_grb(9, 9, 9)] + first[2:]
+
+
+@pytest.mark.parametrize("use_dma", [True, False])
+def test_show_waits_for_previous_frame(clock, use_dma):
+    np = myNeopixel(LEDS, 28, use_dma=use_dma)
+    frame_us = int(LEDS * 24 * myNeopixel.BIT_US) + myNeopixel.RESET_US
+    assert np._frame_us == frame_us == 1860
+
+    np.show()
+    assert clock.slept_us == []  # erste Ausgabe wartet nicht
+    clock.us += 500  # 0,5 ms Rechenzeit fuer das naechste Bild
+    np.show()
+    assert clock.slept_us == [frame_us - 500]
+    clock.us += frame_us + 1
+    np.show()
+    assert clock.slept_us == [frame_us - 500]  # vorige Ausgabe schon fertig
+    print("\n{} LEDs: {} us pro Bild, max. {:.0f} Bilder/s".format(LEDS, frame_us, 1e6 / frame_us))
+
+
+def test_dma_fallback_to_put(clock, monkeypatch):
+    def broken(self, **kwargs):
+        raise TypeError("StateMachine kein DMA-Ziel")
+
+    monkeypatch.setattr(rp2.DMA, "config", broken)
+    np = myNeopixel(LEDS, 28)
+    np.brightness(255)
+    np.set_pixel(0, 1, 2, 3)
+    np.show()
+    assert np._dma is None
+    assert np.sm.puts == 1 and np.sm.words[0] == _grb(1, 2, 3)
+
+
+def test_python_overhead_against_per_pixel_put(clock):
+    """Alte show(): 60 put(pix, 8); neu: ein Aufruf je Bild, gleicher Wortstrom."""
+    np = myNeopixel(LEDS, 28, use_dma=False)
+    np.brightness(255)
+    _draw(np, _frame(3))
+    old = rp2.StateMachine(1)
+    for pix in np.pixels:
+        old.put(pix >> 8, 8)
+    np.show()
+    assert np.sm.words == old.words
+    assert (old.puts, np.sm.puts) == (LEDS, 1)
+
+
+# --------------------------------------------------------------------
+#   FrameRunner
+# --------------------------------------------------------------------
+def test_frame_runner_caps_fps(clock):
+    np = myNeopixel(8, 28)
+    now = [0]
+    runner = FrameRunner(np, fps=50, clock=lambda: now[0])
+    shown = []
+
+    def render(frame):
+        if frame == 25:
+            return False
+        np.fill(frame, 0, 0)
+        shown.append(now[0])
+
+    result = True
+    while result is not None and now[0] < 2000:
+        result = runner.tick(render)
+        now[0] += 1
+    assert result is None
+    assert len(shown) == 25
+    # jedes Bild hoechstens EARLY_MS vor seinem Soll-Zeitpunkt k × 20 ms, kein Drift
+    assert all(0 <= k * 20 - t <= FrameRunner.EARLY_MS for k, t in enumerate(shown))
+    assert len(rp2.DMA.transfers) == 25
+
+
+def test_frame_runner_skips_late_frames(clock):
+    np = myNeopixel(8, 28)
+    now = [0]
+    runner = FrameRunner(np, fps=50, clock=lambda: now[0])
+    shown = []
+    render = lambda frame: shown.append((now[0], frame))  # noqa: E731
+    assert runner.tick(render) is True
+    now[0] = 20 - FrameRunner.EARLY_MS
+    assert runner.tick(render) is True  # knapp vor der Zeit zaehlt als faellig
+    now[0] = 150  # Hauptschleife hing 130 ms
+    assert runner.tick(render) is True
+    assert runner.ms_until_next() == 20  # kein Nachholen, neu getaktet
+    now[0] = 160
+    assert runner.tick(render) is False
+    assert [f for _, f in shown] == [0, 1, 2]
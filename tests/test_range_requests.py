@@ -0,0 +1,133 @@
+# tests/test_range_requests.py
+"""
+user-012: Range/206/416 fuer statische Dateien und rotierte Logs.
+
+Die Faelle laufen ueber echte Loopback-Verbindungen (Poll- und Async-Modus),
+damit Content-Length, Content-Range und der gesendete Ausschnitt zusammen
+geprueft werden.
+"""
+import asyncio
+import os
+
+import pytest
+
+from web_harness import (PollServer, build_request, call, http_exchange, parse_response,
+                         setup_sd, start_async_server, write_log)
+
+import webserver_program as web
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    env = setup_sd(tmp_path, monkeypatch, log_bytes=20000)
+    write_log(env.log_path + ".1", 30000, line_len=80)  # aeltere Generation
+    return env
+
+
+def _raw(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _get_poll(env, path, headers):
+    with PollServer(env.path("server.log")) as server:
+        return parse_response(http_exchange(server.port, build_request("GET", path, headers=headers)))
+
+
+def _get_async(env, path, headers):
+    async def run():
+        server, port = await start_async_server(env.path("server.log"))
+        try:
+            raw = build_request("GET", path, headers=headers)
+            return await asyncio.get_running_loop().run_in_executor(None, http_exchange, port, raw)
+        finally:
+            server.close()
+            await server.wait_closed()
+    return parse_response(asyncio.run(run()))
+
+
+@pytest.fixture(params=["poll", "async"])
+def get(request, env):
+    fetch = _get_poll if request.param == "poll" else _get_async
+    return lambda path, headers=None: fetch(env, path, dict(headers or {}, Connection="close"))
+
+
+# (Range-Header, erwarteter Status, (start, ende) bzw. None)
+CASES = [
+    ("bytes=0-99", 206, (0, 99)),
+    ("bytes=1000-", 206, (1000, None)),
+    ("bytes=-500", 206, (-500, None)),
+    ("bytes=100-999999", 206, (100, None)),     # Ende hinter Dateiende → abgeschnitten
+    ("bytes=5-5", 206, (5, 5)),
+    ("bytes=999999-", 416, None),              # Start hinter Dateiende
+    ("bytes=-0", 416, None),
+    ("bytes=500-100", 200, None),              # Ende vor Start: ungueltig → ignorieren
+    ("bytes=0-10,20-30", 200, None),           # Mehrfach-Ranges nicht unterstuetzt
+    ("items=0-10", 200, None),
+    ("bytes=abc-", 200, None),
+]
+
+
+def _expect(resp, data, code, span):
+    assert resp.code == code, (resp.status, resp.headers)
+    if code == 416:
+        assert resp.headers["content-range"] == "bytes */{}".format(len(data))
+        assert resp.body == b""
+        return
+    if code == 200:
+        assert "content-range" not in resp.headers
+        assert resp.body == data
+        return
+    start, end = span
+    start = start % len(data)
+    end = len(data) - 1 if end is None else end
+    assert resp.headers["content-range"] == "bytes {}-{}/{}".format(start, end, len(data))
+    assert int(resp.headers["content-length"]) == end - start + 1
+    assert resp.body == data[start:end + 1]
+
+
+@pytest.mark.parametrize("name", ["neuza.webp", "debug_log.txt", "debug_log.txt.1"])
+@pytest.mark.parametrize("value,code,span", CASES)
+def test_range_cases(env, name, value, code, span):
+    path = os.path.join(env.assets, name) if name == "neuza.webp" else env.path(name)
+    resp = call("GET", "/" + name, headers={"Range": value})
+    _expect(resp, _raw(path), code, span)
+
+
+@pytest.mark.parametrize("value,code,span", [CASES[0], CASES[2], CASES[5], CASES[7]])
+def test_range_over_loopback(env, get, value, code, span):
+    for name in ("neuza.webp", "debug_log.txt.1"):
+        path = os.path.join(env.assets, name) if name == "neuza.webp" else env.path(name)
+        _expect(get("/" + name, {"Range": value}), _raw(path), code, span)
+
+
+def test_if_range(env, get):
+    data = _raw(os.path.join(env.assets, "neuza.webp"))
+    etag = call("GET", "/neuza.webp").headers["etag"]
+    _expect(get("/neuza.webp", {"Range": "bytes=10-19", "If-Range": etag}), data, 206, (10, 19))
+    # veraltete Kopie beim Client → ganze Datei statt eines falschen Ausschnitts
+    _expect(get("/neuza.webp", {"Range": "bytes=10-19", "If-Range": '"alt"'}), data, 200, None)
+
+
+def test_resume_download_in_pieces(env, get):
+    """Wiederaufnahme: die Datei in drei Stuecken ergibt wieder das Original."""
+    data = _raw(env.path("debug_log.txt.1"))
+    third = len(data) // 3
+    parts = [get("/debug_log.txt.1", {"Range": r}).body for r in (
+        "bytes=0-{}".format(third - 1), "bytes={}-{}".format(third, 2 * third - 1),
+        "bytes={}-".format(2 * third))]
+    assert b"".join(parts) == data
+
+
+def test_live_log_range_includes_buffered_lines(env):
+    """Der Puffer wird vor dem Range-Zugriff geschrieben – der Tail ist aktuell."""
+    web.log_message(env.log_path, "ganz neue Zeile")
+    resp = call("GET", "/debug_log.txt", headers={"Range": "bytes=-200"})
+    assert resp.code == 206
+    assert b"ganz neue Zeile" in resp.body
+    assert resp.body == _raw(env.log_path)[-200:]
+
+
+def test_archive_outside_generations_is_refused(env):
+    write_log(env.log_path + ".9", 100)
+    assert call("GET", "/debug_log.txt.9", headers={"Range": "bytes=0-9"}).code in (403, 404)
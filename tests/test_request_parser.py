@@ -0,0 +1,311 @@
+# tests/test_request_parser.py
+"""
+user-016: Fuzz- und Benchmark-Harness fuer _split_request/_parse_head und
+die Routing-Tabelle.
+
+old_parse ist der Ablauf von vor der Umstellung (_receive_http_request +
+handle_website_connection: ganzen Header dekodieren, splitlines(), jede
+Zeile nach content-length absuchen, FORBIDDEN_PATTERNS pro Anfrage,
+if/elif-Kette). Gemessen werden Parse-Zeit und Allokationen (tracemalloc)
+fuer typische und boesartige Anfragen. Unter CPython ist der Byte-Parser
+bei kleinen Anfragen einige µs langsamer (Python-Schleife statt C-splitlines);
+auf dem Pico zaehlen vor allem die Allokationen (GC-Laeufe, Fragmentierung).
+"""
+import random
+import time
+import tracemalloc
+
+import pytest
+
+import webserver_program as web
+from web_harness import call, setup_sd
+
+_STATUSES = {"ok", "incomplete", "too_large", "invalid"}
+
+
+def old_parse(data):
+    """→ (method, path, body) oder None, wie der alte Poll-Handler."""
+    if b"\r\n\r\n" not in data or len(data) > 8192:
+        return None
+    header, body = data.split(b"\r\n\r\n", 1)
+    clen = 0
+    for line in header.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            clen = int(line.split(b":", 1)[1].strip())
+            break
+    if clen > 4096:
+        return None
+    header, body = header.decode(), body[:clen].decode()
+    parts = header.splitlines()[0].split()
+    if len(parts) < 2:
+        return None
+    method, path = parts[0], parts[1]
+    if any(pattern in path for pattern in web.FORBIDDEN_PATTERNS):
+        return None
+    return method, path, body
+
+
+def old_dispatch(method, path):
+    if method == "POST" and path == "/save_alarms":
+        return "save_alarms"
+    elif method == "POST" and path == "/save_display_settings":
+        return "save_display_settings"
+    elif path in ("/", "/index.html"):
+        return "index"
+    elif path == "/logs":
+        return "logs"
+    return "file"
+
+
+# --------------------------------------------------------------------
+#   Korpus
+# --------------------------------------------------------------------
+_BROWSER = (
+    b"Host: 192.168.178.50\r\n"
+    b"User-Agent: Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 "
+    b"(KHTML, like Gecko) Chrome/126.0.0.0 Mobile Safari/537.36\r\n"
+    b"Accept: text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8\r\n"
+    b"Accept-Language: de-DE,de;q=0.9,pt;q=0.8,en;q=0.7\r\n"
+    b"Accept-Encoding: gzip, deflate\r\n"
+    b"Cache-Control: max-age=0\r\n"
+    b"Upgrade-Insecure-Requests: 1\r\n"
+    b"Connection: keep-alive\r\n"
+)
+
+def _with_body(head, body):
+    return head + b"Content-Length: %d\r\n\r\n" % len(body) + body
+
+
+TYPICAL = {
+    "GET / (Browser)": b"GET / HTTP/1.1\r\n" + _BROWSER + b"\r\n",
+    "GET styles.css (304)": (b"GET /styles.css HTTP/1.1\r\n" + _BROWSER
+                             + b"If-None-Match: \"5a1-6543-gz\"\r\n"
+                             b"If-Modified-Since: Sat, 17 Oct 2026 06:00:00 GMT\r\n\r\n"),
+    "GET /logs?tail=50": b"GET /logs?tail=50 HTTP/1.1\r\nHost: pico\r\n\r\n",
+    "POST /save_alarms": _with_body(b"POST /save_alarms HTTP/1.1\r\nHost: pico\r\n"
+                                    b"Content-Type: application/x-www-form-urlencoded\r\n",
+                                    b"alarm_1_time=06%3A30&alarm_1_text=Guten+Morgen&alarm_1_days=Mo%2CDi"),
+    "PUT /api/alarms/2": _with_body(b"PUT /api/alarms/2 HTTP/1.1\r\nHost: pico\r\nContent-Type: application/json\r\n",
+                                    b'{"time":"07:15","days":["Mo","Fr"],"active":true,"text":"Hi"}'),
+}
+
+MALICIOUS = {
+    "Traversal": b"GET /../../wifis.txt HTTP/1.1\r\nHost: x\r\n\r\n",
+    "8 kB Header": b"GET / HTTP/1.1\r\nX-Pad: " + b"a" * 8000 + b"\r\n\r\n",
+    "400 Header": b"GET / HTTP/1.1\r\n" + b"".join(b"X-H%d: v\r\n" % i for i in range(400)) + b"\r\n",
+    "2000 Mini-Header": b"GET / HTTP/1.1\r\n" + b"a:\r\n" * 2000 + b"\r\n",
+    "langer Name": b"GET / HTTP/1.1\r\n" + b"N" * 4000 + b": 1\r\n\r\n",
+    "ohne Ende": b"GET / HTTP/1.1\r\n" + b"X: y\r\n" * 1500,
+    "Body zu gross": b"POST /save_alarms HTTP/1.1\r\nContent-Length: 999999999\r\n\r\n",
+    "GET mit Body": b"GET / HTTP/1.1\r\nContent-Length: 10\r\n\r\n0123456789",
+    "CL negativ": b"POST /save_alarms HTTP/1.1\r\nContent-Length: -5\r\n\r\n",
+    "CL keine Zahl": b"POST /save_alarms HTTP/1.1\r\nContent-Length: 12abc\r\n\r\n",
+    "CL doppelt": b"POST /save_alarms HTTP/1.1\r\nContent-Length: 3\r\nContent-Length: 4000\r\n\r\nabc",
+    "Header kein UTF-8": b"GET / HTTP/1.1\r\nRange: bytes=\xba-\r\n\r\n",
+    "kein UTF-8": b"GET /\xff\xfe HTTP/1.1\r\n\r\n",
+    "Nullbytes": b"GET /\x00app.js HTTP/1.1\r\n\x00\x00: x\r\n\r\n",
+    "4 Teile": b"GET / HTTP/1.1 extra\r\n\r\n",
+    "leer": b"\r\n\r\n",
+    "nur LF": b"GET / HTTP/1.1\nHost: x\n\n",
+}
+
+
+def _check_split(data):
+    """Invarianten von _split_request fuer beliebige Eingaben."""
+    status, req, rest = web._split_request(data)
+    assert status in _STATUSES
+    if status == "ok":
+        assert isinstance(req.method, str) and isinstance(req.path, str)
+        assert all(isinstance(k, str) and isinstance(v, str) for k, v in req.headers.items())
+        assert set(req.headers) <= {h.decode() for h in web._NEEDED_HEADERS}
+        clen = web._content_length(req)
+        assert 0 <= clen <= web._body_limit(req)
+        assert len(req.body.encode()) == clen
+        assert data.endswith(rest)
+    elif status == "incomplete":
+        assert req is None and rest == data
+        assert len(data) <= web._MAX_HEADER or b"\r\n\r\n" in data
+    return status, req, rest
+
+
+# --------------------------------------------------------------------
+#   Korrektheit
+# --------------------------------------------------------------------
+@pytest.mark.parametrize("name", sorted(TYPICAL))
+def test_typical_requests_match_old_parser(name):
+    data = TYPICAL[name]
+    status, req, rest = _check_split(data)
+    assert status == "ok" and rest == b""
+    method, path, body = old_parse(data)
+    assert req.method == method
+    assert req.path + ("?" + req.query if req.query else "") == path
+    assert req.body == body
+
+
+def test_only_needed_headers_are_kept():
+    _, req, _ = _check_split(TYPICAL["GET styles.css (304)"])
+    assert req.headers == {
+        "accept-encoding": "gzip, deflate",
+        "connection": "keep-alive",
+        "if-none-match": '"5a1-6543-gz"',
+        "if-modified-since": "Sat, 17 Oct 2026 06:00:00 GMT",
+    }
+
+
+class MicroPythonContains:
+    """Container mit der Semantik von MicroPython: "int in bytes" → TypeError."""
+    def __init__(self, items):
+        self.items = items
+
+    def __contains__(self, item):
+        if isinstance(self.items, (bytes, bytearray, memoryview)) and isinstance(item, int):
+            raise TypeError("'int' object isn't a buffer")
+        return item in self.items
+
+
+def test_header_initials_work_with_micropython_semantics(monkeypatch):
+    assert all(isinstance(c, int) for c in web._HEADER_INITIALS)
+    monkeypatch.setattr(web, "_HEADER_INITIALS", MicroPythonContains(web._HEADER_INITIALS))
+    for name, data in TYPICAL.items():
+        status, req, _ = web._split_request(data)
+        assert status == "ok", name
+    _, req, _ = web._split_request(TYPICAL["GET styles.css (304)"])
+    assert set(req.headers) == {"accept-encoding", "connection", "if-none-match", "if-modified-since"}
+
+
+@pytest.mark.parametrize("name,expected", [
+    ("Traversal", "ok"),          # 403 entscheidet sanitize_filename beim Ausliefern
+    ("8 kB Header", "ok"),
+    ("400 Header", "invalid"),    # > _MAX_HEADER_LINES
+    ("2000 Mini-Header", "invalid"),
+    ("langer Name", "ok"),
+    ("ohne Ende", "invalid"),
+    ("Body zu gross", "too_large"),
+    ("GET mit Body", "too_large"),
+    ("CL negativ", "invalid"),
+    ("CL keine Zahl", "invalid"),
+    ("CL doppelt", "invalid"),    # widerspruechliche Laengen (Request-Smuggling)
+    ("kein UTF-8", "invalid"),
+    ("Header kein UTF-8", "invalid"),
+    ("Nullbytes", "ok"),
+    ("4 Teile", "invalid"),
+    ("leer", "invalid"),
+    ("nur LF", "incomplete"),
+])
+def test_malicious_requests(name, expected):
+    status, _, _ = _check_split(MALICIOUS[name])
+    assert status == expected
+
+
+def test_pipelined_requests_split_in_order():
+    stream = TYPICAL["POST /save_alarms"] + TYPICAL["GET /logs?tail=50"] + TYPICAL["PUT /api/alarms/2"]
+    seen = []
+    while stream:
+        status, req, stream = _check_split(stream)
+        assert status == "ok"
+        seen.append((req.method, req.path))
+    assert seen == [("POST", "/save_alarms"), ("GET", "/logs"), ("PUT", "/api/alarms/2")]
+
+
+def test_split_over_every_byte_boundary():
+    """Jeder Praefix ist 'incomplete', erst der volle Puffer 'ok'."""
+    data = TYPICAL["PUT /api/alarms/2"]
+    for cut in range(len(data)):
+        assert web._split_request(data[:cut])[0] == "incomplete", cut
+    assert web._split_request(data)[0] == "ok"
+
+
+def test_fuzz_never_raises():
+    rnd = random.Random(16)
+    seeds = list(TYPICAL.values()) + list(MALICIOUS.values())
+    alphabet = b"\r\n: -/?&=%\x00\xff0123456789GETPOSTcontent-length"
+    counts = dict.fromkeys(_STATUSES, 0)
+    for _ in range(4000):
+        data = bytearray(rnd.choice(seeds))
+        for _ in range(rnd.randrange(1, 8)):
+            op = rnd.randrange(4)
+            pos = rnd.randrange(len(data) + 1)
+            if op == 0 and data:
+                del data[pos:pos + rnd.randrange(1, 16)]
+            elif op == 1:
+                data[pos:pos] = bytes(rnd.choice(alphabet) for _ in range(rnd.randrange(1, 8)))
+            elif op == 2:
+                data[pos:pos] = rnd.choice((b"\r\n", b"\r\n\r\n", b"Content-Length: ", b"Range: bytes="))
+            elif data:
+                data[pos % len(data)] = rnd.randrange(256)
+        status, _, _ = _check_split(bytes(data))
+        counts[status] += 1
+    print("\nFuzz (4000 Mutationen): {}".format(counts))
+    assert all(counts.values())
+
+
+# --------------------------------------------------------------------
+#   Routing
+# --------------------------------------------------------------------
+def test_route_table():
+    assert web._find_route("POST", "/save_alarms")[1] == 4096
+    assert web._find_route("POST", "/save_display_settings")[1] == 512
+    assert web._find_route("GET", "/")[0] is web._find_route("GET", "/index.html")[0]
+    put = web._find_route("PUT", "/api/alarms/3")
+    assert put and put[1] == web._API_MAX_BODY
+    assert web._find_route("GET", "/logs")[1] == 0
+    assert web._find_route("POST", "/logs") is None
+    assert web._find_route("GET", "/styles.css") is None  # statische Dateien ueber die Whitelist
+
+
+def test_dispatch_of_malicious_paths(tmp_path, monkeypatch):
+    setup_sd(tmp_path, monkeypatch)
+    assert call("GET", "/../../wifis.txt").code == 403
+    assert call("GET", "/wifis.txt").code == 403
+    assert call("GET", "/alarm.txt").code == 403     # nicht 'safe'
+    assert call("GET", "/nicht_da.txt").code == 403  # nicht in der Whitelist
+    assert call("DELETE", "/").code == 405
+
+
+# --------------------------------------------------------------------
+#   Benchmark
+# --------------------------------------------------------------------
+def _bench(fn, data, repeat=2000):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(data)
+    per_call = (time.perf_counter() - start) / repeat
+    tracemalloc.start()
+    fn(data)
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return per_call * 1e6, peak
+
+
+def _new(data):
+    status, req, _ = web._split_request(data)
+    if status == "ok":
+        web._find_route(req.method, req.path)
+
+
+def _old(data):
+    try:
+        parsed = old_parse(data)
+    except (ValueError, UnicodeError, IndexError):
+        return
+    if parsed:
+        old_dispatch(parsed[0], parsed[1])
+
+
+def test_parse_benchmark():
+    rows = []
+    for name, data in list(TYPICAL.items()) + list(MALICIOUS.items()):
+        rows.append((name, len(data)) + _bench(_old, data) + _bench(_new, data))
+    print("\n{:<22} {:>6}  {:>9} {:>8}  {:>9} {:>8}".format(
+        "Anfrage", "Bytes", "alt µs", "alt Peak", "neu µs", "neu Peak"))
+    for name, size, old_us, old_peak, new_us, new_peak in rows:
+        print("{:<22} {:>6}  {:9.2f} {:>8}  {:9.2f} {:>8}".format(name, size, old_us, old_peak, new_us, new_peak))
+
+    by_name = {row[0]: row for row in rows}
+    # Browser-Header: nur die benoetigten Header werden dekodiert
+    assert by_name["GET / (Browser)"][5] < by_name["GET / (Browser)"][3]
+    # grosse Header: kein dekodierter Gesamt-String mehr
+    for name in ("8 kB Header", "400 Header", "2000 Mini-Header", "langer Name"):
+        assert by_name[name][5] * 2 < by_name[name][3], name
+    # Header-Fluten brechen nach _MAX_HEADER_LINES ab, statt alles zu zerlegen
+    assert by_name["2000 Mini-Header"][4] < by_name["2000 Mini-Header"][2]
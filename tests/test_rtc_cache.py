@@ -0,0 +1,150 @@
+# tests/test_rtc_cache.py
+"""
+user-007: DS3231 nur zum Minutenwechsel lesen, Sekunden hochrechnen.
+
+FakeRTC liefert die "wahre" Zeit aus einer simulierten Uhr (optional mit
+Gangabweichung gegenueber ticks_ms) und zaehlt die I2C-Reads.
+"""
+import time
+
+import pytest
+
+import time_config as tc
+
+
+class FakeClock:
+    def __init__(self):
+        self.ms = 0
+
+    def ticks_ms(self):
+        return self.ms
+
+    def sleep(self, s):
+        self.ms += int(s * 1000)
+
+
+class FakeRTC:
+    def __init__(self, clock, start_s=6 * 3600 + 59 * 60 + 30, rate=1.0):
+        self.clock = clock
+        self.start_s = start_s
+        self.rate = rate  # >1: RTC laeuft schneller als ticks_ms
+        self.reads = 0
+        self.fail = False
+
+    def seconds(self):
+        return self.start_s + int(self.clock.ms * self.rate) // 1000
+
+    def read_time(self):
+        self.reads += 1
+        if self.fail:
+            return None
+        s = self.seconds()
+        # (sec, min, hour, weekday 1=So, day, month, year)
+        return s % 60, s // 60 % 60, s // 3600 % 24, 2, 1, 6, 2026
+
+
+@pytest.fixture
+def rtc(monkeypatch):
+    clock = FakeClock()
+    fake = FakeRTC(clock)
+    monkeypatch.setattr(time, "ticks_ms", clock.ticks_ms)
+    monkeypatch.setattr(time, "sleep", clock.sleep)
+    monkeypatch.setattr(tc, "rtc", fake)
+    monkeypatch.setattr(tc, "_last_good_time", None)
+    monkeypatch.setattr(tc, "_force_read", True)
+    monkeypatch.setattr(tc, "_next_read_ms", 0)
+    monkeypatch.setattr(tc, "_sqw_active", False)
+    monkeypatch.setattr(tc, "_sqw_pulses", 0)
+    monkeypatch.setattr(tc, "log_message", lambda *a, **k: None)
+    return fake
+
+
+def _day_seconds(t):
+    return (t[0] * 60 + t[1]) * 60 + t[2]
+
+
+def _run(rtc, duration_ms, step_ms=100, offset_ms=0):
+    """Ruft aktualisiere_zeit() im Takt der Hauptschleife; liefert max. Rueckstand in s."""
+    worst = 0
+    rtc.clock.ms = offset_ms
+    while rtc.clock.ms < offset_ms + duration_ms:
+        shown = _day_seconds(tc.aktualisiere_zeit())
+        lag = rtc.seconds() - shown
+        assert 0 <= lag <= 1, (rtc.clock.ms, shown, rtc.seconds())
+        worst = max(worst, lag)
+        rtc.clock.ms += step_ms
+    return worst
+
+
+@pytest.mark.parametrize("phase_ms", [0, 370, 999])
+def test_one_read_per_minute_and_never_ahead(rtc, phase_ms):
+    # phase_ms: Lage des ersten Reads innerhalb der RTC-Sekunde
+    _run(rtc, 3600000, offset_ms=phase_ms)
+    print("\nRTC-Reads in 1 h bei 100-ms-Schleife: {} (vorher 36000)".format(rtc.reads))
+    assert rtc.reads <= 62
+
+
+def test_minute_changes_follow_rtc_within_one_second(rtc):
+    rtc.clock.ms = 450
+    seen = {}
+    while rtc.clock.ms < 300000:
+        t = tc.aktualisiere_zeit()
+        seen.setdefault((t[0], t[1]), rtc.clock.ms)
+        rtc.clock.ms += 50
+    # RTC-Minutenwechsel bei 30 s, 90 s, …; die Anzeige folgt hoechstens 1 s spaeter
+    for minute_start_ms in (30000, 90000, 150000, 210000, 270000):
+        s = rtc.start_s + minute_start_ms // 1000
+        shown_at = seen[(s // 3600, s // 60 % 60)]
+        assert minute_start_ms <= shown_at <= minute_start_ms + 1000
+
+
+def test_fast_rtc_is_corrected_every_minute(rtc):
+    rtc.rate = 1.02  # DS3231 laeuft 2 % schneller als der Pico-Quarz
+    reads_before = rtc.reads
+    worst = 0
+    rtc.clock.ms = 0
+    while rtc.clock.ms < 600000:
+        shown = _day_seconds(tc.aktualisiere_zeit())
+        assert shown <= rtc.seconds()
+        worst = max(worst, rtc.seconds() - shown)
+        rtc.clock.ms += 100
+    # Rueckstand: 1 s Raster + Drift einer Minute (1,2 s); wird jede Minute zurueckgesetzt
+    assert worst <= 3
+    assert rtc.reads - reads_before <= 12
+
+
+def test_sqw_pulses_drive_seconds(rtc, monkeypatch):
+    monkeypatch.setattr(tc, "_sqw_active", True)
+    tc.aktualisiere_zeit()
+    base = _day_seconds(tc._last_good_time)
+    reads = rtc.reads
+    for pulse in range(1, 10):
+        monkeypatch.setattr(tc, "_sqw_pulses", tc._sqw_pulses + 1)
+        rtc.clock.ms += 1000
+        assert _day_seconds(tc.aktualisiere_zeit()) == base + pulse
+    assert rtc.reads == reads
+
+
+def test_read_failure_falls_back_and_retries(rtc):
+    tc.aktualisiere_zeit()
+    rtc.clock.ms = 60000
+    rtc.fail = True
+    t = tc.aktualisiere_zeit()  # 3 Versuche, dann hochgerechnet
+    assert t[:3] == (6, 59, 59)  # letzte gute Minute, Sekunde bei 59 gedeckelt
+    reads = rtc.reads
+    tc.aktualisiere_zeit()
+    assert rtc.reads == reads  # naechster Versuch erst nach _RETRY_AFTER_ERROR_MS
+    rtc.fail = False
+    rtc.clock.ms += tc._RETRY_AFTER_ERROR_MS
+    assert _day_seconds(tc.aktualisiere_zeit()) == rtc.seconds()
+
+
+def test_invalidate_forces_read(rtc):
+    tc.aktualisiere_zeit()
+    reads = rtc.reads
+    rtc.clock.ms += 5000
+    tc.aktualisiere_zeit()
+    assert rtc.reads == reads
+    tc.invalidate_time_cache()  # z. B. nach NTP-Sync/Stellen
+    tc.aktualisiere_zeit()
+    assert rtc.reads == reads + 1
@@ -0,0 +1,192 @@
+# tests/test_scheduler.py
+"""
+user-004: kooperativer Scheduler mit simulierter Uhr.
+
+FakeClock ersetzt ticks_ms/sleep_ms; Tasks "kosten" Zeit, indem sie die Uhr
+weiterdrehen. Die Simulation am Ende vergleicht die Hauptschleife mit den
+Tasks aus clock_program gegen die alte Schleife (sleep 100 ms, Uhr/Alarm bei
+jedem Durchlauf, Checks per int(time.time()) % 30 / % 180).
+"""
+import random
+
+from scheduler import Scheduler
+
+
+class FakeClock:
+    def __init__(self, start=0):
+        self.now = start
+
+    def ticks_ms(self):
+        return self.now
+
+    def sleep_ms(self, ms):
+        self.now += ms
+
+
+def _make(start=0):
+    clock = FakeClock(start)
+    return clock, Scheduler(clock=clock.ticks_ms, sleep_ms=clock.sleep_ms)
+
+
+def test_periodic_deadlines_do_not_drift():
+    clock, sched = _make()
+    starts = []
+
+    def work():
+        starts.append(clock.now)
+        clock.now += 37  # Laufzeit des Tasks
+
+    sched.every(30000, work)
+    while clock.now < 3600000:
+        sched.run_pending()
+        sched.sleep_until_next(100)
+    assert len(starts) == 120  # t = 0, 30, … 3570 s
+    assert all(t % 30000 == 0 for t in starts)
+
+
+def test_missed_periods_fire_once_and_are_counted():
+    clock, sched = _make()
+    runs = []
+    task = sched.every(1000, lambda: runs.append(clock.now))
+    sched.run_pending()
+    clock.now += 3500  # Schleife blockiert 3,5 s (z. B. SD-Zugriff)
+    assert sched.run_pending() == 1
+    assert task.missed == 2  # Perioden ab 1000 und 2000 ms; 3000 ms laeuft jetzt
+    assert sched.run_pending() == 0  # kein Nachholen
+    assert sched.ms_until_next() == 1000  # ab jetzt neu getaktet
+    clock.now += 1000
+    assert sched.run_pending() == 1
+    assert runs == [0, 3500, 4500]
+
+
+def test_reschedule_and_one_shot():
+    clock, sched = _make(start=1000)
+    calls = []
+    task = sched.every(60000, lambda: calls.append("sync"), first_delay_ms=60000)
+    once = sched.after(500, lambda: calls.append("once"))
+    assert sched.ms_until_next() == 500
+    assert sched.ms_until_next(max_ms=100) == 100
+
+    clock.now += 500
+    sched.run_pending()
+    assert calls == ["once"]
+    assert not once.active
+    assert sched.ms_until_next() == 59500
+
+    sched.reschedule(task, 5000)  # z. B. nach NTP-Sync frueher pruefen
+    assert sched.ms_until_next() == 5000
+
+    sched.cancel(task)
+    assert sched.ms_until_next() == 0  # nichts mehr geplant
+    sched.reschedule(task, 200)  # reaktiviert den Task
+    assert task.active
+    clock.now += 200
+    sched.run_pending()
+    assert calls == ["once", "sync"]
+
+
+def test_failing_task_keeps_schedule(monkeypatch):
+    clock, sched = _make()
+    logged = []
+    monkeypatch.setattr("scheduler.log_message", lambda path, msg: logged.append(msg))
+
+    def boom():
+        raise ValueError("kaputt")
+
+    task = sched.every(100, boom, "boom")
+    for _ in range(5):
+        sched.run_pending()
+        clock.now += 100
+    assert task.runs == 5
+    assert len(logged) == 5 and "boom" in logged[0]
+
+
+def _stalls(seed, duration_ms):
+    """Zufaellige Blockaden (Menue, SD, Webserver) als {Zeitpunkt: Dauer}."""
+    rnd = random.Random(seed)
+    stalls = {}
+    t = 0
+    while t < duration_ms:
+        t += rnd.randrange(2000, 20000)
+        stalls[t // 100 * 100] = rnd.choice((300, 1200, 2500, 4000))
+    return stalls
+
+
+def _windows(times, period_ms, duration_ms):
+    """Laeufe je Periodenfenster [k*P, (k+1)*P)."""
+    counts = [0] * (duration_ms // period_ms)
+    for t in times:
+        k = t // period_ms
+        if k < len(counts):
+            counts[k] += 1
+    return counts
+
+
+def _simulate(hour, stalls, clock_tick_ms):
+    """Hauptschleife mit den Tasks aus run_clock_program, Eingabe-Poll alle 100 ms."""
+    clock, sched = _make()
+    runs = {"clock": [], "health": [], "memory": []}
+    sched.every(clock_tick_ms, lambda: runs["clock"].append(clock.now), "clock")
+    sched.every(30000, lambda: None, "display_schedule")
+    sched.every(30000, lambda: runs["health"].append(clock.now), "health", first_delay_ms=30000)
+    sched.every(180000, lambda: runs["memory"].append(clock.now), "memory", first_delay_ms=180000)
+    sched.every(1000, lambda: None, "flush")
+    while clock.now < hour:
+        sched.run_pending()
+        clock.now += stalls.get(clock.now // 100 * 100, 0)
+        sched.sleep_until_next(100)
+    return runs, sched.wakeups
+
+
+def test_simulated_hour_against_old_modulo_loop():
+    hour = 3600000
+    stalls = _stalls(4, hour)
+
+    # ---------- alt: Uhr/Alarm jeden Durchlauf, Checks per Sekunden-Modulo ----------
+    now = 0
+    old_rtc = 0
+    old = {"health": [], "memory": []}
+    while now < hour:
+        old_rtc += 1
+        sec = now // 1000
+        if sec % 30 == 0:
+            old["health"].append(now)
+            if sec % 180 == 0:
+                old["memory"].append(now)
+        now += stalls.get(now // 100 * 100, 0) + 100
+
+    # ---------- neu: Uhr-Tick 200 ms (wie _CLOCK_TICK_MS), zum Vergleich 250 ms ----------
+    runs, wakeups = _simulate(hour, stalls, 200)
+    _, wakeups_250 = _simulate(hour, stalls, 250)
+
+    new_health = _windows(runs["health"], 30000, hour)[1:]
+    new_memory = _windows(runs["memory"], 180000, hour)[1:]
+    old_health = _windows(old["health"], 30000, hour)
+    old_memory = _windows(old["memory"], 180000, hour)
+    print("\n30-s-Check: alt {} verpasst / {} doppelt, neu {} verpasst / {} doppelt".format(
+        old_health.count(0), sum(1 for c in old_health if c > 1),
+        new_health.count(0), sum(1 for c in new_health if c > 1)))
+    print("180-s-Check: alt {} verpasst, neu {} verpasst".format(
+        old_memory.count(0), new_memory.count(0)))
+    print("Pro Stunde: Durchlaeufe alt {}, neu {} (Tick 250 ms: {}); RTC/Alarm alt {}, neu {}".format(
+        old_rtc, wakeups, wakeups_250, old_rtc, len(runs["clock"])))
+
+    # neu: jedes Fenster genau ein Lauf (Blockaden < Periode)
+    assert set(new_health) == {1}
+    assert set(new_memory) == {1}
+    # alt: Modulo verpasst Sekunden, in denen die Schleife blockiert, und feuert sonst mehrfach
+    assert old_health.count(0) + sum(1 for c in old_health if c > 1) > 0
+    # Uhr/Alarm nur noch etwa bei jedem zweiten Durchlauf; zusaetzlich hoechstens
+    # ein sofortiger Durchlauf nach jeder Blockade (faellige Tasks nachziehen)
+    assert len(runs["clock"]) < 0.55 * old_rtc
+    assert wakeups <= old_rtc + len(stalls)
+    # ein Tick, der nicht auf das Poll-Raster faellt, kostet Extra-Wakeups
+    assert wakeups_250 > old_rtc + len(stalls)
+
+
+def test_idle_hour_wakeups():
+    """Ohne Blockaden: gleich viele Durchlaeufe wie die alte Schleife, halb so viel RTC/Alarm."""
+    hour = 3600000
+    runs, wakeups = _simulate(hour, {}, 200)
+    assert wakeups == hour // 100
+    assert len(runs["clock"]) == hour // 200
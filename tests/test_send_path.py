@@ -0,0 +1,159 @@
+# tests/test_send_path.py
+"""
+user-014: Datei-Streaming ueber einen wiederverwendeten readinto-Puffer.
+
+ShortWriteSocket nimmt bei send() nur wenige Bytes an (auch 1 Byte), so dass
+die Teil-Write-Schleife in _send_all wirklich laeuft; der wieder zusammen-
+gesetzte Bytestrom muss der Datei entsprechen. send() == 0 heisst Verbindung
+zu und muss OSError ausloesen. Benchmark: Allokationen je Block (tracemalloc,
+Peak zwischen zwei Sendeaufrufen) fuer eine Datei in der Groesse von
+neuza.webp gegen die alte f.read(1024)-Schleife.
+"""
+import os
+import tracemalloc
+
+import pytest
+
+import webserver_program as web
+from web_harness import ROOT
+
+WEBP_SIZE = os.path.getsize(os.path.join(ROOT, "web_assets", "neuza.webp"))
+
+
+class ShortWriteSocket:
+    """send() nimmt reihum pattern[i] Bytes an; 0 im Muster = Gegenstelle weg."""
+    def __init__(self, pattern=(1, 7, 1500, 3, 4096)):
+        self.pattern = pattern
+        self.calls = 0
+        self.data = bytearray()
+
+    def send(self, data):
+        n = min(len(data), self.pattern[self.calls % len(self.pattern)])
+        self.calls += 1
+        self.data += bytes(data[:n])  # Puffer wird wiederverwendet → sofort kopieren
+        return n
+
+
+class SendallOnly:
+    def __init__(self):
+        self.data = bytearray()
+
+    def sendall(self, data):
+        self.data += bytes(data)
+
+
+def _payload(tmp_path, size):
+    path = tmp_path / "datei.bin"
+    path.write_bytes(bytes((i * 7 + i // 251) & 0xFF for i in range(size)))
+    return str(path), path.read_bytes()
+
+
+def old_send_file(cl, path):
+    """Schleife vor der Umstellung: ein neues bytes-Objekt je KB."""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(1024)
+            if not chunk:
+                break
+            cl.sendall(chunk)
+
+
+# --------------------------------------------------------------------
+#   Teil-Writes
+# --------------------------------------------------------------------
+def test_send_all_handles_short_writes():
+    data = bytes(range(256)) * 40
+    sock = ShortWriteSocket()
+    web._send_all(sock, data)
+    assert bytes(sock.data) == data
+    assert sock.calls > len(data) // 4096  # wirklich in Teilen gesendet
+
+
+def test_send_all_zero_raises():
+    sock = ShortWriteSocket(pattern=(5, 0))
+    with pytest.raises(OSError):
+        web._send_all(sock, b"x" * 100)
+    assert bytes(sock.data) == b"x" * 5
+
+
+def test_send_all_uses_sendall_without_send():
+    sink = SendallOnly()
+    web._send_all(sink, memoryview(b"abc"))
+    assert bytes(sink.data) == b"abc"
+
+
+@pytest.mark.parametrize("start,length", [(0, None), (0, 1), (1, 4095), (4095, 4098), (10000, None)])
+def test_send_file_range_reassembles(tmp_path, start, length):
+    path, content = _payload(tmp_path, 3 * web._SEND_BLOCK + 123)
+    sock = ShortWriteSocket()
+    sent = web._send_file_range(sock, path, start, length)
+    expected = content[start:] if length is None else content[start:start + length]
+    assert sent == len(expected)
+    assert bytes(sock.data) == expected
+
+
+def test_send_file_range_stops_on_closed_peer(tmp_path):
+    path, _ = _payload(tmp_path, 2 * web._SEND_BLOCK)
+    with pytest.raises(OSError):
+        web._send_file_range(ShortWriteSocket(pattern=(4096, 100, 0)), path)
+
+
+# --------------------------------------------------------------------
+#   Allokationen je Block
+# --------------------------------------------------------------------
+class MeasuringSocket:
+    """Merkt sich je Sendeaufruf den tracemalloc-Peak seit dem vorigen Aufruf."""
+    def __init__(self, blocks):
+        self.peaks = [0] * blocks  # vorab angelegt, damit die Messung nichts allokiert
+        self.calls = 0
+        self.size = 0
+        self._base = 0
+
+    def _measure(self, data):
+        current, peak = tracemalloc.get_traced_memory()
+        if self.calls < len(self.peaks):
+            self.peaks[self.calls] = peak - self._base
+        self.calls += 1
+        self.size += len(data)
+        tracemalloc.reset_peak()
+        self._base = tracemalloc.get_traced_memory()[0]
+        return len(data)
+
+    def send(self, data):
+        return self._measure(data)
+
+    def sendall(self, data):
+        self._measure(data)
+
+
+class OldMeasuringSocket(MeasuringSocket):
+    send = None  # alter Pfad kennt nur sendall
+
+
+def _measure(send_file, sock, path):
+    tracemalloc.start()
+    try:
+        send_file(sock, path)
+    finally:
+        tracemalloc.stop()
+    peaks = sorted(sock.peaks[1:sock.calls])  # erster Aufruf enthaelt open()
+    return peaks[len(peaks) // 2], peaks[-1]
+
+
+def test_allocations_per_block_against_read_1024(tmp_path):
+    path, content = _payload(tmp_path, WEBP_SIZE)
+    old = OldMeasuringSocket(WEBP_SIZE // 1024 + 2)
+    new = MeasuringSocket(WEBP_SIZE // web._SEND_BLOCK + 2)
+    old_median, old_max = _measure(old_send_file, old, path)
+    new_median, new_max = _measure(lambda cl, p: web._send_file_range(cl, p), new, path)
+    assert old.size == new.size == len(content)
+
+    print("\n{} Bytes: alt {} Bloecke, {} B je Block (max {}); neu {} Bloecke, {} B je Block (max {})".format(
+        len(content), old.calls, old_median, old_max, new.calls, new_median, new_max))
+    print("Allokationen pro Datei: alt ~{} KB, neu ~{} KB".format(
+        old.calls * old_median // 1024, new.calls * new_median // 1024))
+    assert old.calls == -(-len(content) // 1024)
+    assert new.calls == -(-len(content) // web._SEND_BLOCK)
+    assert old_median > 900  # ein neues bytes-Objekt (~1 KB) je Block
+    assert new_median < 256  # nur kleine memoryview-Koepfe, kein Datenpuffer
+    assert new.calls * new_median * 8 < old.calls * old_median
@@ -0,0 +1,105 @@
+# tests/test_static_caching.py
+"""
+user-011: ETag/Last-Modified, 304 und vorkomprimierte .gz-Assets.
+
+Ein "Seitenaufruf" holt alle Whitelist-Assets wie der Browser. Verglichen
+werden die uebertragenen Bytes beim ersten Besuch ohne/mit gzip und beim
+Wiederbesuch mit If-None-Match.
+"""
+import gzip
+import http.client
+import os
+
+import pytest
+
+from web_harness import PollServer, call, setup_sd
+
+ASSETS = ("styles.css", "app.js", "favicon.ico", "neuza.webp")
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    return setup_sd(tmp_path, monkeypatch)
+
+
+def _raw(env, name):
+    with open(os.path.join(env.assets, name), "rb") as f:
+        return f.read()
+
+
+def _wire_bytes(resp):
+    return len(resp.status) + sum(len(k) + len(v) + 4 for k, v in resp.headers.items()) + 4 + len(resp.body)
+
+
+def test_validators_and_plain_body(env):
+    resp = call("GET", "/styles.css")
+    assert resp.code == 200
+    assert resp.body == _raw(env, "styles.css")
+    assert resp.headers["etag"].startswith('"') and "-gz" not in resp.headers["etag"]
+    assert resp.headers["last-modified"].endswith("GMT")
+    assert resp.headers["cache-control"] == "max-age=86400"
+    assert resp.headers["vary"] == "Accept-Encoding"
+    assert "content-encoding" not in resp.headers
+
+
+@pytest.mark.parametrize("name", ["styles.css", "app.js"])
+def test_gzip_variant(env, name):
+    plain = call("GET", "/" + name)
+    packed = call("GET", "/" + name, headers={"Accept-Encoding": "gzip, deflate, br"})
+    assert packed.headers["content-encoding"] == "gzip"
+    assert int(packed.headers["content-length"]) == len(packed.body) < len(plain.body)
+    assert gzip.decompress(packed.body) == plain.body
+    # eigene ETag je Kodierung, sonst bestaetigt ein Cache die falsche Variante
+    assert packed.headers["etag"] != plain.headers["etag"]
+    assert call("GET", "/" + name, headers={"If-None-Match": packed.headers["etag"]}).code == 200
+    assert call("GET", "/" + name, headers={
+        "Accept-Encoding": "gzip", "If-None-Match": packed.headers["etag"]}).code == 304
+
+
+def test_conditional_requests(env):
+    first = call("GET", "/favicon.ico")
+    assert "vary" not in first.headers  # keine .gz-Variante
+    by_etag = call("GET", "/favicon.ico", headers={"If-None-Match": first.headers["etag"]})
+    assert by_etag.code == 304 and by_etag.body == b""
+    assert by_etag.headers["etag"] == first.headers["etag"]
+    by_date = call("GET", "/favicon.ico", headers={"If-Modified-Since": first.headers["last-modified"]})
+    assert by_date.code == 304
+    # If-None-Match hat Vorrang: falsches Tag → volle Antwort trotz passendem Datum
+    stale = call("GET", "/favicon.ico", headers={
+        "If-None-Match": '"alt"', "If-Modified-Since": first.headers["last-modified"]})
+    assert stale.code == 200 and stale.body == first.body
+
+
+def test_page_load_byte_savings(env):
+    browser = {"Accept-Encoding": "gzip"}
+    first_plain = [call("GET", "/" + n) for n in ASSETS]
+    first_gzip = [call("GET", "/" + n, headers=browser) for n in ASSETS]
+    revisit = [call("GET", "/" + n, headers=dict(browser, **{"If-None-Match": r.headers["etag"]}))
+               for n, r in zip(ASSETS, first_gzip)]
+    plain = sum(_wire_bytes(r) for r in first_plain)
+    packed = sum(_wire_bytes(r) for r in first_gzip)
+    again = sum(_wire_bytes(r) for r in revisit)
+    print("\nAssets pro Seitenaufruf: ohne gzip {} B, mit gzip {} B, Wiederbesuch (304) {} B".format(
+        plain, packed, again))
+    text_plain = sum(_wire_bytes(r) for n, r in zip(ASSETS, first_plain) if n.endswith((".css", ".js")))
+    text_gzip = sum(_wire_bytes(r) for n, r in zip(ASSETS, first_gzip) if n.endswith((".css", ".js")))
+    print("CSS+JS: {} B → {} B ({:.0f} %)".format(text_plain, text_gzip, 100.0 * text_gzip / text_plain))
+    assert all(r.code == 304 for r in revisit)
+    assert text_gzip * 2 < text_plain
+    assert again * 100 < plain
+
+
+def test_304_keeps_connection_alive(env):
+    with PollServer(env.path("server.log")) as server:
+        conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        conn.request("GET", "/styles.css", headers={"Accept-Encoding": "gzip"})
+        first = conn.getresponse()
+        first.read()
+        etag = first.getheader("ETag")
+        conn.request("GET", "/styles.css", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        second = conn.getresponse()
+        assert second.status == 304 and second.read() == b""
+        conn.request("GET", "/app.js")
+        third = conn.getresponse()
+        assert third.status == 200 and third.read() == _raw(env, "app.js")
+        conn.close()
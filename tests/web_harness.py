@@ -0,0 +1,223 @@
+# tests/web_harness.py
+"""
+Gemeinsame Helfer fuer die Webserver-Tests.
+
+setup_sd() legt /sd und /web_assets als tmp-Verzeichnisse an (Kopien aus dem
+Repo, .gz per tools/build_web_assets.py) und biegt webserver_program,
+alarm_store und power_management dorthin um. call() schickt eine Anfrage
+ohne Socket durch Parser und Routing; PollServer/start_async_server bedienen echte
+Loopback-Verbindungen.
+"""
+import asyncio
+import os
+import shutil
+import socket
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+
+import alarm_store
+import log_utils
+import power_management
+import webserver_program as web
+import build_web_assets
+from config_store import ConfigStore
+
+
+class WebSd:
+    def __init__(self, root):
+        self.sd = os.path.join(root, "sd")
+        self.assets = os.path.join(root, "web_assets")
+        self.log_path = os.path.join(self.sd, "debug_log.txt")
+
+    def path(self, name):
+        return os.path.join(self.sd, name)
+
+
+def write_log(path, size, line_len=64):
+    """Synthetisches Logfile mit nummerierten Zeilen fester Laenge."""
+    with open(path, "w") as f:
+        n = 0
+        written = 0
+        while written < size:
+            line = "{:06d} [Test] ".format(n)
+            line += "x" * (line_len - len(line) - 1) + "\n"
+            f.write(line)
+            written += len(line)
+            n += 1
+
+
+def setup_sd(tmp_path, monkeypatch, log_bytes=4096):
+    """tmp-/sd mit alarm.txt, power_config.txt und einem Log von log_bytes Bytes."""
+    env = WebSd(str(tmp_path))
+    shutil.copytree(os.path.join(ROOT, "sd"), env.sd)
+    shutil.copytree(os.path.join(ROOT, "web_assets"), env.assets)
+    build_web_assets.build(env.assets)
+    write_log(env.log_path, log_bytes)
+
+    def _static_path(file_name, file_info):
+        base = env.assets if file_info.get("location", "sd") == "flash" else env.sd
+        return os.path.join(base, file_name)
+
+    monkeypatch.setattr(web, "_static_path", _static_path)
+    monkeypatch.setattr(web, "_INDEX_CACHE_PATH", env.path("index_cache.html"))
+    monkeypatch.setattr(web, "_index_cache_valid", False)
+    monkeypatch.setattr(web, "_index_cache_path", None)
+    monkeypatch.setattr(web, "_index_readers", {})
+    monkeypatch.setattr(web, "_index_cache_generation", 0)
+    monkeypatch.setattr(web, "_connections", [])
+    monkeypatch.setattr(web, "_poll_listener", None)
+
+    paths = (env.path("alarm.txt"), env.path("alarms.bin"), None)
+    monkeypatch.setattr(alarm_store.load, "__defaults__", paths)
+    monkeypatch.setattr(alarm_store.save, "__defaults__", paths)
+    monkeypatch.setattr(alarm_store, "_alarms", None)
+
+    store = ConfigStore(env.path("power_config.txt"), power_management._DEFAULT_SETTINGS,
+                        power_management._KEY_ORDER)
+    monkeypatch.setattr(power_management, "_store", store)
+
+    monkeypatch.setattr(log_utils, "_buf_lines", [])
+    monkeypatch.setattr(log_utils, "_buf_bytes", 0)
+    monkeypatch.setattr(log_utils, "_buf_path", None)
+    monkeypatch.setattr(log_utils, "_log_sizes", {})
+
+    web.init_static_validators(None)
+    return env
+
+
+# --------------------------------------------------------------------
+#   Anfragen ohne Socket
+# --------------------------------------------------------------------
+class RecordingSink(web._ResponseFraming):
+    """sendall() sammelt die (gerahmte) Antwort."""
+    def __init__(self, keep_alive=False):
+        self.out = b""
+        self.calls = 0
+        self.start_response(keep_alive)
+
+    def sendall(self, data):
+        self.calls += 1
+        self.out += self._frame(data)
+
+
+class Response:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def code(self):
+        return int(self.status.split()[1])
+
+    def text(self):
+        return self.body.decode()
+
+
+def parse_response(raw):
+    """Eine Antwort (Kopf + Rest als Body) → Response."""
+    head, _, body = raw.partition(b"\r\n\r\n")
+    lines = head.decode().split("\r\n")
+    headers = {}
+    for line in lines[1:]:
+        key, _, value = line.partition(":")
+        headers[key.strip().lower()] = value.strip()
+    return Response(lines[0], headers, body)
+
+
+def build_request(method, path, body="", headers=None):
+    if isinstance(body, str):
+        body = body.encode()
+    lines = ["{} {} HTTP/1.1".format(method, path), "Host: pico"]
+    for key, value in (headers or {}).items():
+        lines.append("{}: {}".format(key, value))
+    if body or method in ("POST", "PUT", "PATCH"):
+        lines.append("Content-Length: {}".format(len(body)))
+    return "\r\n".join(lines).encode() + b"\r\n\r\n" + body
+
+
+def call(method, path, body="", headers=None, log_path=None):
+    """Anfrage durch _split_request und _route_request (wie der Poll-Modus) → Response."""
+    status, req, _ = web._split_request(build_request(method, path, body, headers))
+    assert status == "ok", status
+    sink = RecordingSink()
+    web._route_request(sink, req, log_path)
+    return parse_response(sink.out)
+
+
+# --------------------------------------------------------------------
+#   Loopback-Server
+# --------------------------------------------------------------------
+def listen(port=0, sndbuf=None):
+    """
+    Server-Socket; sndbuf vererbt sich unter Linux auf angenommene Verbindungen.
+    proto=IPPROTO_TCP wie bei start_server(host, port), sonst laesst asyncio
+    Nagle an und Keep-Alive-Antworten warten auf das verzoegerte ACK (~40 ms).
+    """
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if sndbuf:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, sndbuf)
+    s.bind(("127.0.0.1", port))
+    s.listen(8)
+    return s
+
+
+class PollServer:
+    """Poll-Modus in einem Thread: handle_website_connection() wie in der Hauptschleife."""
+    def __init__(self, log_path=None, interval_s=0.002, sndbuf=None):
+        self.log_path = log_path
+        self.interval_s = interval_s
+        self.sock = listen(sndbuf=sndbuf)
+        self.port = self.sock.getsockname()[1]
+        self._stop = False
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def _loop(self):
+        while not self._stop:
+            web.handle_website_connection(self.sock, self.log_path)
+            time.sleep(self.interval_s)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop = True
+        self._thread.join()
+        web._close_all_connections()
+        self.sock.close()
+
+
+async def start_async_server(log_path=None, sndbuf=None):
+    """Async-Modus auf einem freien Loopback-Port → (server, port)."""
+    server = await asyncio.start_server(web._make_async_handler(log_path), sock=listen(sndbuf=sndbuf))
+    return server, server.sockets[0].getsockname()[1]
+
+
+def http_exchange(port, raw, timeout=5.0, rcvbuf=None, read_delay_s=0, read_size=65536):
+    """
+    Schickt rohe Bytes und liest bis zum Verbindungsende. rcvbuf/read_delay_s
+    simulieren einen langsamen Client (Handy im schwachen WLAN).
+    """
+    c = socket.socket()
+    if rcvbuf:
+        c.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    c.settimeout(timeout)
+    c.connect(("127.0.0.1", port))
+    try:
+        c.sendall(raw)
+        data = b""
+        while True:
+            chunk = c.recv(read_size)
+            if not chunk:
+                return data
+            data += chunk
+            if read_delay_s:
+                time.sleep(read_delay_s)
+    finally:
+        c.close()
@@ -7,21 +7,74 @@ from log_utils import log_message
 # -------- RTC-Instanz -------------------------------------------------
 rtc = RTC(sda_pin=20, scl_pin=21)  # Pins ggf. anpassen
 
+# Optionaler 1-Hz-Ausgang (INT/SQW) des DS3231 als Sekunden-Interrupt.
+# None = nicht verdrahtet → Sekunden werden per ticks_ms hochgerechnet.
+SQW_PIN = None
+
 # Fallback fuer RTC-Ausfaelle (verhindert Zeitspruenge auf 2000)
 _last_good_time = None
 
+# -------- Zeitquelle: RTC nur zum Minutenwechsel lesen ---------------
+# Nach einem RTC-Read wird die Sekunde lokal hochgezaehlt (ticks_ms oder
+# SQW-Pulse). Erst wenn die hochgerechnete Sekunde die Minute ueberschreitet
+# (oder spaetestens nach _MAX_EXTRAPOLATE_MS) wird der DS3231 erneut gelesen –
+# Minuten-/Stunden-/Tageswechsel kommen damit immer direkt aus der RTC.
+_MAX_EXTRAPOLATE_MS = 60000
+_RETRY_AFTER_ERROR_MS = 1000
+_DRIFT_LOG_S = 2             # Abweichung RTC vs. Hochrechnung, ab der geloggt wird
 
-# ---------------------------------------------------------------------
-#   Zeit lesen
-# ---------------------------------------------------------------------
-def aktualisiere_zeit(log_path=None):
+_anchor_ms = 0               # ticks_ms beim letzten RTC-Read
+_anchor_pulses = 0           # SQW-Pulszaehler beim letzten RTC-Read
+_next_read_ms = 0            # fruehester Zeitpunkt fuer den naechsten Read
+_force_read = True
+_sqw_pulses = 0
+_sqw_active = False
+rtc_reads = 0                # Diagnose: Anzahl I2C-Zeit-Reads
+
+
+def _sqw_handler(pin):
+    global _sqw_pulses
+    _sqw_pulses += 1
+
+
+def enable_sqw_interrupt(pin_no, log_path=None):
+    """Aktiviert den 1-Hz-Ausgang des DS3231 und zaehlt seine fallenden Flanken."""
+    global _sqw_active, _force_read
+    try:
+        rtc.enable_sqw_1hz()
+        pin = machine.Pin(pin_no, machine.Pin.IN, machine.Pin.PULL_UP)
+        pin.irq(trigger=machine.Pin.IRQ_FALLING, handler=_sqw_handler)
+        _sqw_active = True
+        _force_read = True
+        log_message(log_path, "[RTC] 1-Hz-SQW-Interrupt aktiv (GPIO {})".format(pin_no))
+        return True
+    except Exception as e:
+        _sqw_active = False
+        log_message(log_path, "[RTC] SQW-Interrupt nicht verfuegbar: %s" % e)
+        return False
+
+
+def invalidate_time_cache():
+    """Naechster aktualisiere_zeit()-Aufruf liest die RTC direkt (z. B. nach dem Stellen)."""
+    global _force_read
+    _force_read = True
+
+
+def _elapsed_seconds(now_ms):
+    if _sqw_active:
+        return _sqw_pulses - _anchor_pulses
+    return time.ticks_diff(now_ms, _anchor_ms) // 1000
+
+
+def _read_rtc(log_path=None):
     """
-    Liefert (hour, minute, second, weekday_index_0, day, month, year).
-    Bei Fehler → mehrere Versuche, dann Fallback.
+    Liest den DS3231 (max. 3 Versuche). Gibt (hour, minute, second,
+    weekday_index_0, day, month, year) oder None zurueck.
     """
-    # Mehrere Versuche fuer RTC-Lesung (I2C kann manchmal haengen)
+    global rtc_reads
     for attempt in range(3):
         try:
+            rtc_reads += 1
             result = rtc.read_time()
             if result is None:
                 if attempt < 2:
@@ -39,29 +92,69 @@ def aktualisiere_zeit(log_path=None):
                 raise ValueError("Invalid time values: {}:{}:{}".format(hour, minute, second))
                 
             aktueller_tag = weekday - 1  # 0=So … 6=Sa
-            
-            # Speichere als letzte gute Zeit (verhindert 2000er-Zeitspruenge)
-            global _last_good_time
-            _last_good_time = (hour, minute, second, aktueller_tag, day, month, year)
-            
             return hour, minute, second, aktueller_tag, day, month, year
 
         except Exception as e:
             if attempt == 2:  # Letzter Versuch
                 log_message(log_path, "RTC-Fehler nach 3 Versuchen: %s" % e)
             time.sleep(0.05)  # Kurze Pause zwischen Versuchen
-    
-    # Fallback: Letzte bekannte gute Zeit oder sinnvoller Default
-    global _last_good_time
+    return None
+
+
+# ---------------------------------------------------------------------
+#   Zeit lesen
+# ---------------------------------------------------------------------
+def aktualisiere_zeit(log_path=None):
+    """
+    Liefert (hour, minute, second, weekday_index_0, day, month, year).
+    Die RTC wird nur beim Minutenwechsel gelesen, dazwischen wird die
+    Sekunde hochgerechnet. Bei Fehler → mehrere Versuche, dann Fallback.
+    """
+    global _last_good_time, _anchor_ms, _anchor_pulses, _next_read_ms, _force_read
+
+    now = time.ticks_ms()
+    if _last_good_time and not _force_read and time.ticks_diff(now, _next_read_ms) < 0:
+        hour, minute, second, aktueller_tag, day, month, year = _last_good_time
+        second = min(59, second + _elapsed_seconds(now))
+        return hour, minute, second, aktueller_tag, day, month, year
+
+    result = _read_rtc(log_path)
+    now = time.ticks_ms()
+    if result:
+        if _last_good_time and not _force_read:
+            # Drift-Kontrolle: hochgerechnete Zeit vs. RTC (Sekunden des Tages)
+            expected = _last_good_time[0] * 3600 + _last_good_time[1] * 60 + _last_good_time[2] + _elapsed_seconds(now)
+            actual = result[0] * 3600 + result[1] * 60 + result[2]
+            drift = actual - expected
+            if abs(drift) > _DRIFT_LOG_S and abs(drift) < 43200:
+                log_message(log_path, "[RTC] Drift {} s korrigiert".format(drift))
+
+        # Speichere als letzte gute Zeit (verhindert 2000er-Zeitspruenge)
+        _last_good_time = result
+        _anchor_ms = now
+        _anchor_pulses = _sqw_pulses
+        _force_read = False
+        # Naechster Read genau zum Minutenwechsel
+        _next_read_ms = time.ticks_add(now, min(_MAX_EXTRAPOLATE_MS, (60 - result[2]) * 1000))
+        return result
+
+    # Fallback: Hochrechnung ab letzter guter Zeit oder sinnvoller Default
+    _next_read_ms = time.ticks_add(now, _RETRY_AFTER_ERROR_MS)
     if _last_good_time:
         log_message(log_path, "[RTC-Fallback] Verwende letzte gute Zeit")
-        return _last_good_time
+        hour, minute, second, aktueller_tag, day, month, year = _last_good_time
+        second = min(59, second + _elapsed_seconds(now))
+        return hour, minute, second, aktueller_tag, day, month, year
     else:
         # Erstes Boot - verwende aktuelles Jahr statt 2000
         log_message(log_path, "[RTC-Fallback] Erstboot - verwende 2025")
         return 12, 0, 0, 1, 30, 9, 2025  # 30.9.2025 12:00 (Montag)
 
 
+if SQW_PIN is not None:
+    enable_sqw_interrupt(SQW_PIN)
+
+
 # ---------------------------------------------------------------------
 #   Sommer-/Winterzeit-Offset EU
 # ---------------------------------------------------------------------
@@ -117,6 +210,7 @@ def synchronisiere_zeit(log_path=None):
 
         # ---- RTC stellen (neue API) ----
         rtc.set_time(second, minute, hour, weekday, tag, monat, jahr)
+        invalidate_time_cache()
 
         log_message(
             log_path,
@@ -0,0 +1,141 @@
+# tools/build_melodies.py
+"""
+Host-Skript (CPython): baut die Melodie-Bank melodies.bin aus tools/melodies.txt.
+
+Aufruf vor dem Hochladen (melodies.bin ins Wurzelverzeichnis des Pico):
+    python tools/build_melodies.py                          # tools/melodies.txt → melodies.bin
+    python tools/build_melodies.py meine.txt melodies.bin   # eigene Definitionen
+    python tools/build_melodies.py melodies.bin             # Inhalt anzeigen
+
+Nach dem Schreiben wird die Datei mit melody_bank.MelodyBank (dem Leser auf
+dem Pico) wieder eingelesen und Note fuer Note mit den Definitionen verglichen.
+"""
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import melody_bank  # noqa: E402
+
+_NATIVE = re.compile(r"^([A-Za-z0-9_]+)\s*=\s*(.*)$")
+_RTTTL_NOTE = re.compile(r"^(\d*)([a-gp])(#?)(\.?)(\d?)(\.?)$")
+_SEMITONES = ("c", "c#", "d", "d#", "e", "f", "f#", "g", "g#", "a", "a#", "b")
+
+
+def parse_notes(text):
+    """'330:1000 0:500 ...' → [(330, 1000), (0, 500), ...]"""
+    notes = []
+    for token in text.split():
+        freq, dur = token.split(":")
+        notes.append((int(freq), int(dur)))
+    return notes
+
+
+def parse_rtttl(text):
+    """
+    RTTTL ('name:d=4,o=5,b=120:8e6,8d#6,p,...') → (Name, [(Frequenz, Dauer_ms), ...]).
+    Oktave 4 enthaelt a = 440 Hz; Punktierung verlaengert um die Haelfte.
+    """
+    name, defaults, body = text.split(":", 2)
+    settings = {"d": 4, "o": 6, "b": 63}
+    for item in defaults.split(","):
+        if "=" in item:
+            key, value = item.split("=", 1)
+            settings[key.strip().lower()] = int(value)
+    whole_ms = 4 * 60000.0 / settings["b"]
+    notes = []
+    for token in body.split(","):
+        token = token.strip().lower()
+        if not token:
+            continue
+        m = _RTTTL_NOTE.match(token)
+        if not m:
+            raise ValueError("RTTTL-Note ungueltig: {}".format(token))
+        length, note, sharp, dot1, octave, dot2 = m.groups()
+        dur = whole_ms / int(length or settings["d"])
+        if dot1 or dot2:
+            dur *= 1.5
+        if note == "p":
+            freq = 0
+        else:
+            semi = _SEMITONES.index(note + sharp)
+            octave = int(octave or settings["o"])
+            freq = round(440.0 * 2 ** ((semi - 9) / 12.0 + octave - 4))
+        notes.append((freq, int(dur)))
+    return name.strip(), notes
+
+
+def parse_definitions(f):
+    """Liest melodies.txt → [(Name, Noten), ...] in Dateireihenfolge."""
+    melodies = []
+    native = None  # offene Notenliste fuer eingerueckte Folgezeilen
+    for lineno, line in enumerate(f, 1):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            native = None
+            continue
+        try:
+            if line[0].isspace() and native is not None:
+                native.extend(parse_notes(stripped))
+                continue
+            m = _NATIVE.match(stripped)
+            if m:
+                native = parse_notes(m.group(2))
+                melodies.append((m.group(1), native))
+            else:
+                native = None
+                melodies.append(parse_rtttl(stripped))
+        except ValueError as e:
+            raise SystemExit("Zeile {}: {}".format(lineno, e))
+    names = [name for name, _ in melodies]
+    for name in names:
+        if names.count(name) > 1:
+            raise SystemExit("Melodie doppelt definiert: {}".format(name))
+    return melodies
+
+
+def show(path):
+    bank = melody_bank.MelodyBank(path)
+    names = bank.names()
+    if not names:
+        raise SystemExit("{}: leer oder ungueltig (Magic/Version/CRC)".format(path))
+    for name in names:
+        notes = list(bank.notes(name))
+        print("{:<12} {:>4} Noten {:>6} ms".format(name, len(notes), sum(d for _, d in notes)))
+
+
+def verify(path, melodies):
+    """Rundreise: Datei mit dem Pico-Leser einlesen und mit den Definitionen vergleichen."""
+    bank = melody_bank.MelodyBank(path)
+    if bank.names() != [name for name, _ in melodies]:
+        raise SystemExit("Verzeichnis weicht ab: {}".format(bank.names()))
+    for name, notes in melodies:
+        expected = [(int(f), int(d)) for f, d in notes]
+        streamed = list(bank.notes(name))
+        flat = bank.load(name)
+        loaded = list(zip(flat[0::2], flat[1::2]))
+        if streamed != expected or loaded != expected:
+            raise SystemExit("{}: Noten weichen nach dem Einlesen ab".format(name))
+
+
+def main(argv):
+    here = os.path.dirname(os.path.abspath(__file__))
+    if len(argv) == 2 and argv[1].endswith(".bin"):
+        show(argv[1])
+        return
+    if len(argv) > 3:
+        raise SystemExit(__doc__)
+    src = argv[1] if len(argv) > 1 else os.path.join(here, "melodies.txt")
+    dst = argv[2] if len(argv) > 2 else os.path.join(here, "..", "melodies.bin")
+    with open(src, "r") as f:
+        melodies = parse_definitions(f)
+    data = melody_bank.encode(melodies)
+    with open(dst, "wb") as f:
+        f.write(data)
+    verify(dst, melodies)
+    print("{} Melodien, {} Noten: {} → {} ({} Bytes, geprueft)".format(
+        len(melodies), sum(len(n) for _, n in melodies), src, dst, len(data)))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,42 @@
+# tools/build_web_assets.py
+"""
+Host-Skript (CPython): erzeugt vorkomprimierte .gz-Geschwister fuer die
+Web-Assets, die der Webserver mit 'Content-Encoding: gzip' ausliefert.
+
+Aufruf vor dem Hochladen von web_assets/ auf den Pico:
+    python tools/build_web_assets.py [web_assets-Ordner]
+"""
+import gzip
+import os
+import sys
+
+# Muss zu den 'gzip': True-Eintraegen in ALLOWED_STATIC_FILES passen
+GZIP_ASSETS = ("styles.css", "app.js")
+
+
+def build(asset_dir):
+    total_raw = total_gz = 0
+    for name in GZIP_ASSETS:
+        src = os.path.join(asset_dir, name)
+        dst = src + ".gz"
+        with open(src, "rb") as f:
+            raw = f.read()
+        # mtime=0 → reproduzierbare Bytes (stabile ETags)
+        packed = gzip.compress(raw, compresslevel=9, mtime=0)
+        if len(packed) >= len(raw):
+            if os.path.exists(dst):
+                os.remove(dst)
+            print("{}: keine Ersparnis, .gz entfernt".format(name))
+            continue
+        with open(dst, "wb") as f:
+            f.write(packed)
+        total_raw += len(raw)
+        total_gz += len(packed)
+        print("{}: {} -> {} Bytes ({:.0f}%)".format(name, len(raw), len(packed), 100.0 * len(packed) / len(raw)))
+    if total_raw:
+        print("Gesamt: {} -> {} Bytes".format(total_raw, total_gz))
+
+
+if __name__ == "__main__":
+    here = os.path.dirname(os.path.abspath(__file__))
+    build(sys.argv[1] if len(sys.argv) > 1 else os.path.join(here, "..", "web_assets"))
@@ -0,0 +1,200 @@
+# tools/load_test.py
+"""
+Host-Skript (CPython): Lasttest fuer den Webserver des Weckers.
+
+Laedt die komplette Startseite (/, styles.css, app.js, neuza.webp,
+favicon.ico) mehrfach auf drei Arten und meldet Gesamtzeit und Anzahl
+TCP-Verbindungen:
+    close     – eine Verbindung pro Datei (Verhalten vor Keep-Alive)
+    keepalive – Dateien nacheinander ueber eine offene Verbindung
+    pipeline  – alle Anfragen auf einmal senden, Antworten der Reihe nach lesen
+
+Aufruf:
+    python tools/load_test.py 192.168.178.50 [--port 80] [--rounds 10] [--gzip]
+"""
+import argparse
+import socket
+import time
+
+PAGE_SET = ("/", "/styles.css", "/app.js", "/neuza.webp", "/favicon.ico")
+
+
+def build_request(host, path, keep_alive=True, gzip=False):
+    lines = ["GET {} HTTP/1.1".format(path), "Host: {}".format(host)]
+    if gzip:
+        lines.append("Accept-Encoding: gzip")
+    if not keep_alive:
+        lines.append("Connection: close")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode()
+
+
+class _Reader:
+    """Liest Antworten einer Verbindung nacheinander (Content-Length, 304 oder bis EOF)."""
+    def __init__(self, sock):
+        self.sock = sock
+        self.buf = b""
+
+    def _fill(self):
+        chunk = self.sock.recv(65536)
+        if not chunk:
+            return False
+        self.buf += chunk
+        return True
+
+    def read_response(self):
+        """→ (status, body_bytes, keep_alive); status None, wenn die Verbindung zu ist."""
+        while b"\r\n\r\n" not in self.buf:
+            if not self._fill():
+                return None, 0, False
+        head, _, self.buf = self.buf.partition(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split()[1])
+        headers = {}
+        for line in lines[1:]:
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+        keep = "keep-alive" in headers.get("connection", "").lower()
+        if status == 304:
+            length = 0
+        elif "content-length" in headers:
+            length = int(headers["content-length"])
+        else:
+            length = None
+        if length is None:
+            while self._fill():
+                pass
+            body, self.buf = len(self.buf), b""
+            return status, body, False
+        while len(self.buf) < length:
+            if not self._fill():
+                raise ConnectionError("Antwort unvollstaendig ({} von {} Bytes)".format(len(self.buf), length))
+        self.buf = self.buf[length:]
+        return status, length, keep
+
+
+class Stats:
+    def __init__(self, mode):
+        self.mode = mode
+        self.connections = 0
+        self.responses = 0
+        self.body_bytes = 0
+        self.errors = 0
+        self.seconds = 0.0
+
+    def count(self, status, body):
+        self.responses += 1
+        self.body_bytes += body
+        if status is None or status >= 400:
+            self.errors += 1
+
+    def line(self, rounds):
+        return "{:<10} {:8.1f} ms gesamt  {:7.1f} ms/Seite  {:3d} Verbindungen  {:3d} Antworten  {:8d} Bytes  {} Fehler".format(
+            self.mode, self.seconds * 1000, self.seconds * 1000 / max(1, rounds),
+            self.connections, self.responses, self.body_bytes, self.errors)
+
+
+def _connect(host, port, timeout, stats):
+    stats.connections += 1
+    s = socket.create_connection((host, port), timeout=timeout)
+    s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return s
+
+
+def fetch_close(host, port, paths, stats, timeout=10.0, gzip=False):
+    for path in paths:
+        sock = _connect(host, port, timeout, stats)
+        try:
+            sock.sendall(build_request(host, path, keep_alive=False, gzip=gzip))
+            status, body, _ = _Reader(sock).read_response()
+            stats.count(status, body)
+        finally:
+            sock.close()
+
+
+def fetch_keep_alive(host, port, paths, stats, timeout=10.0, gzip=False):
+    """Nacheinander ueber eine Verbindung; schliesst der Server (Anfrage-Limit), neu verbinden."""
+    sock = reader = None
+    try:
+        for path in paths:
+            for attempt in (0, 1):
+                if sock is None:
+                    sock = _connect(host, port, timeout, stats)
+                    reader = _Reader(sock)
+                try:
+                    sock.sendall(build_request(host, path, gzip=gzip))
+                    status, body, keep = reader.read_response()
+                except OSError:
+                    status, body, keep = None, 0, False
+                if status is not None or attempt:
+                    break
+                sock.close()
+                sock = None
+            stats.count(status, body)
+            if not keep:
+                sock.close()
+                sock = None
+    finally:
+        if sock is not None:
+            sock.close()
+
+
+def fetch_pipelined(host, port, paths, stats, timeout=10.0, gzip=False):
+    """Alle Anfragen in einem send; nicht beantwortete werden auf neuer Verbindung wiederholt."""
+    pending = list(paths)
+    while pending:
+        sock = _connect(host, port, timeout, stats)
+        try:
+            sock.sendall(b"".join(build_request(host, path, gzip=gzip) for path in pending))
+            reader = _Reader(sock)
+            while pending:
+                try:
+                    status, body, keep = reader.read_response()
+                except OSError:
+                    status, keep = None, False
+                if status is None:
+                    break
+                stats.count(status, body)
+                pending.pop(0)
+                if not keep:
+                    break
+        finally:
+            sock.close()
+
+
+MODES = (
+    ("close", fetch_close),
+    ("keepalive", fetch_keep_alive),
+    ("pipeline", fetch_pipelined),
+)
+
+
+def run(host, port, rounds=10, gzip=False, paths=PAGE_SET, modes=MODES, timeout=10.0):
+    """Fuehrt jeden Modus rounds-mal aus → Liste von Stats."""
+    results = []
+    for mode, fetch in modes:
+        stats = Stats(mode)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            fetch(host, port, paths, stats, timeout, gzip)
+        stats.seconds = time.perf_counter() - start
+        results.append(stats)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seitenabruf-Lasttest (close / keep-alive / pipelining)")
+    parser.add_argument("host")
+    parser.add_argument("--port", type=int, default=80)
+    parser.add_argument("--rounds", type=int, default=10, help="Seitenaufrufe pro Modus")
+    parser.add_argument("--gzip", action="store_true", help="Accept-Encoding: gzip senden")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    print("{} Seitenaufrufe je Modus, {} Dateien pro Seite, {}:{}".format(
+        args.rounds, len(PAGE_SET), args.host, args.port))
+    for stats in run(args.host, args.port, args.rounds, args.gzip, timeout=args.timeout):
+        print(stats.line(args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# tools/migrate_alarms.py
+"""
+Host-Skript (CPython): konvertiert Alarme zwischen alarm.txt und alarms.bin.
+
+Auf dem Pico passiert die Migration automatisch beim ersten Laden
+(alarm_store.load). Das Skript dient zum Vorbereiten und Pruefen von Dateien:
+    python tools/migrate_alarms.py sd/alarm.txt sd/alarms.bin   # Text → Binaer
+    python tools/migrate_alarms.py sd/alarms.bin sd/alarm.txt   # Binaer → Text
+    python tools/migrate_alarms.py sd/alarms.bin                # Inhalt anzeigen
+
+Hinweis: Groesse/mtime der alarm.txt auf dem Pico weichen von der Host-Datei ab.
+Liegt dort zusaetzlich eine alarm.txt, wird sie einmalig neu importiert.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import alarm_store  # noqa: E402
+
+
+def read_records(path):
+    if path.endswith(".bin"):
+        with open(path, "rb") as f:
+            data = f.read()
+        records = alarm_store.decode(data, len(data))
+        if records is None:
+            raise SystemExit("{}: ungueltig (Magic/Laenge/CRC)".format(path))
+        return records
+    with open(path, "r") as f:
+        return alarm_store.parse_text(f)
+
+
+def main(argv):
+    if len(argv) not in (2, 3):
+        raise SystemExit(__doc__)
+    records = read_records(argv[1])
+    if len(argv) == 2:
+        sys.stdout.write(alarm_store.format_text(records))
+        return
+    dst = argv[2]
+    if dst.endswith(".bin"):
+        data = alarm_store.encode(records)
+        with open(dst, "wb") as f:
+            f.write(data)
+    else:
+        data = alarm_store.format_text(records)
+        with open(dst, "w") as f:
+            f.write(data)
+    print("{} Alarme: {} → {} ({} Bytes)".format(len(records), argv[1], dst, len(data)))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -1,9 +1,19 @@
 (function(){
-  function saveAllSettings(){
-    var b=document.getElementById('saveButton');
-    if(!b){return;}
-    b.disabled=true; b.textContent='Speichern...';
+  var DAYS=['Mo','Di','Mi','Do','Fr','Sa','So'];
+  var server=null; // Alarme laut /api/alarms (null = unbekannt → immer senden)
+
+  function request(method, url, body, headers, cb){
+    try{
+      var xhr=new XMLHttpRequest();
+      xhr.open(method, url, true);
+      if(headers){ for(var h in headers){ if(headers.hasOwnProperty(h)){ xhr.setRequestHeader(h, headers[h]); } } }
+      xhr.onreadystatechange=function(){ if(xhr.readyState===4){ cb(xhr.status>=200 && xhr.status<300, xhr.responseText); } };
+      xhr.send(body);
+    }catch(e){ cb(false, ''); }
+  }
+  function sendJson(method, url, obj, cb){ request(method, url, JSON.stringify(obj), {'Content-Type':'application/json'}, cb); }
 
+  function readAlarms(){
     var a=[];
     var bs=document.querySelectorAll('#alarmForm fieldset');
     for(var i=0;i<bs.length;i++){
@@ -19,43 +29,64 @@
       for(var j=0;j<c.length;j++){
         var cb=c[j];
         var label=(cb.parentElement && cb.parentElement.textContent)?cb.parentElement.textContent.trim():'';
-        if(cb.checked && (label==='Mo'||label==='Di'||label==='Mi'||label==='Do'||label==='Fr'||label==='Sa'||label==='So')){
-          daySet[label]=true;
-        }
+        if(cb.checked && DAYS.indexOf(label)>=0){ daySet[label]=true; }
       }
-      var days=[]; for(var k in daySet){ if(daySet.hasOwnProperty(k)){ days.push(k); } }
-      days.sort();
-      var active = days.length>0 ? 'Aktiv' : 'Inaktiv';
-      a.push([tv, mv||'Kein Text', days.join(','), active].join(','));
+      var days=[]; for(var k=0;k<DAYS.length;k++){ if(daySet[DAYS[k]]){ days.push(DAYS[k]); } }
+      a.push({time:tv, text:mv||'Kein Text', days:days, active:days.length>0});
     }
+    return a;
+  }
 
-    function post(url, body, headers, cb){
-      try{
-        var xhr=new XMLHttpRequest();
-        xhr.open('POST', url, true);
-        if(headers){ for(var h in headers){ if(headers.hasOwnProperty(h)){ xhr.setRequestHeader(h, headers[h]); } } }
-        xhr.onreadystatechange=function(){ if(xhr.readyState===4){ cb(xhr.status>=200 && xhr.status<300); } };
-        xhr.send(body);
-      }catch(e){ cb(false); }
-    }
+  function sameAlarm(x, y){
+    return x.time===y.time && x.text===y.text && x.active===y.active && x.days.join(',')===y.days.join(',');
+  }
 
-    var ok1=true, ok2=true; var pending=0;
-    function finish(){ b.textContent=(ok1&&ok2)?'Gespeichert':'Fehler'; setTimeout(function(){ b.disabled=false; b.textContent='Speichern'; }, 2000); }
+  function sameList(a, b){
+    if(!b || a.length!==b.length){ return false; }
+    for(var i=0;i<a.length;i++){ if(!sameAlarm(a[i], b[i])){ return false; } }
+    return true;
+  }
 
-    if(a.length){ pending++; post('/save_alarms', a.join('\n'), {'Content-Type':'text/plain'}, function(success){ ok1=success; if(--pending===0){ finish(); } }); }
+  // Ganze Liste mit einem PUT: der Server uebernimmt alles oder nichts (auch die leere Liste)
+  function saveAlarms(wanted, cb){
+    if(sameList(wanted, server)){ cb(true); return; }
+    sendJson('PUT', '/api/alarms', wanted, function(success, text){
+      if(success){ try{ server=JSON.parse(text); }catch(e){ server=null; } }
+      cb(success);
+    });
+  }
 
+  function loadServerAlarms(){
+    request('GET', '/api/alarms', null, null, function(success, text){
+      if(!success){ return; }
+      try{ server=JSON.parse(text); }catch(e){ server=null; }
+    });
+  }
+
+  function saveAllSettings(){
+    var b=document.getElementById('saveButton');
+    if(!b){return;}
+    b.disabled=true; b.textContent='Speichern...';
+
+    var wanted=readAlarms();
     var da=document.getElementById('displayAuto');
     var don=document.getElementById('displayOn');
     var doff=document.getElementById('displayOff');
-    if(da&&don&&doff){
-      pending++;
-      var d=[ 'DISPLAY_AUTO='+(da.checked?'true':'false'), 'DISPLAY_ON_TIME='+don.value, 'DISPLAY_OFF_TIME='+doff.value ];
-      post('/save_display_settings', d.join('\n'), null, function(success){ ok2=success; if(--pending===0){ finish(); } });
-    }
+    var settings=!!(da&&don&&doff);
+    var ok1=true, ok2=true; var pending=settings?2:1; // vorab zaehlen: saveAlarms kann sofort fertig sein
+    function finish(){ b.textContent=(ok1&&ok2)?'Gespeichert':'Fehler'; setTimeout(function(){ b.disabled=false; b.textContent='Speichern'; }, 2000); }
+    function done(){ if(--pending===0){ finish(); } }
 
-    if(pending===0){ finish(); }
+    saveAlarms(wanted, function(success){ ok1=success; if(!success){ loadServerAlarms(); } done(); });
+
+    if(settings){
+      var s={display_auto:da.checked};
+      if(don.value){ s.display_on=don.value; }
+      if(doff.value){ s.display_off=doff.value; }
+      sendJson('PATCH', '/api/settings', s, function(success){ ok2=success; done(); });
+    }
   }
   try{ window.saveAllSettings=saveAllSettings; }catch(e){}
-  function bind(){ var b=document.getElementById('saveButton'); if(b && !b._saveBound){ b._saveBound=true; b.addEventListener('click', saveAllSettings); try{ console.log('Save-Button gebunden'); }catch(e){} } }
+  function bind(){ var b=document.getElementById('saveButton'); if(b && !b._saveBound){ b._saveBound=true; b.addEventListener('click', saveAllSettings); try{ console.log('Save-Button gebunden'); }catch(e){} } loadServerAlarms(); }
   if(document.readyState==='complete' || document.readyState==='interactive'){ bind(); } else { try{ document.addEventListener('DOMContentLoaded', bind); }catch(e){ setTimeout(bind, 200); } }
 })();
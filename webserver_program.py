@@ -1,28 +1,89 @@
 # webserver_program.py
 import socket
 import uselect
+import utime
 import os
+import json
 from machine import Pin
-from log_utils import log_message
+from log_utils import log_message, flush_log, log_archive_paths
+import alarm_store
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    try:
+        import asyncio
+    except ImportError:
+        asyncio = None  # Nur Poll-Modus verfuegbar
 
 # --------------------------------------------------------------------
 #   Globale Objekte
 # --------------------------------------------------------------------
-reload_alarms_callback = None
 blue_led = Pin(13, Pin.OUT)
 
 # Race Condition Schutz fuer gleichzeitiges Speichern
 _save_lock = False  # Einfache Sperre ohne Threading-Library
 
+try:
+    from recovery_manager import feed_watchdog as _feed_watchdog
+except ImportError:
+    _feed_watchdog = None
+
+# Sendepuffer fuer Datei-Streams: ein Block = 8 SD-Sektoren a 512 Byte
+_SEND_BLOCK = 4096
+_send_buf = bytearray(_SEND_BLOCK)
+_send_mv = memoryview(_send_buf)
+
+
 # Best-effort Watchdog-Feed
 def _feed_wdt(log_path=None):
+    if _feed_watchdog is None:
+        return
     try:
-        from recovery_manager import feed_watchdog
-        feed_watchdog(log_path)
+        _feed_watchdog(log_path)
     except Exception:
         pass
 
 
+def _send_all(cl, data):
+    """
+    Sendet data (bytes/memoryview) vollstaendig. Echte Sockets ueber send()
+    mit Teil-Write-Behandlung, Adapter (Async/Datei) ueber sendall().
+    """
+    send = getattr(cl, "send", None)
+    if send is None:
+        cl.sendall(data)
+        return
+    mv = memoryview(data)
+    total = len(mv)
+    off = 0
+    while off < total:
+        n = send(mv[off:])
+        if not n:
+            raise OSError("send: Verbindung geschlossen")
+        off += n
+
+
+def _send_file_range(cl, path, start=0, length=None, log_path=None):
+    """
+    Streamt path[start:start+length] per readinto in den wiederverwendeten
+    Sendepuffer – keine Allokation pro Block. Gibt gesendete Bytes zurueck.
+    """
+    sent = 0
+    with open(path, "rb") as f:
+        if start:
+            f.seek(start)
+        while length is None or sent < length:
+            want = _SEND_BLOCK if length is None else min(_SEND_BLOCK, length - sent)
+            n = f.readinto(_send_mv[:want])
+            if not n:
+                break
+            _send_all(cl, _send_mv[:n])
+            sent += n
+            _feed_wdt(log_path)
+    return sent
+
+
 # --------------------------------------------------------------------
 #   Web-Server Lifecycle
 # --------------------------------------------------------------------
@@ -42,6 +103,7 @@ def start_webserver_and_show_ip(lcd, wlan, log_path=None):
             s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             s.bind(("0.0.0.0", 80))
             s.listen(5)
+            init_static_validators(log_path)
             blue_led.on()
             log_message(log_path, "Webserver gestartet auf " + ip + ":80")
             return s, ip
@@ -91,12 +153,15 @@ def stop_webserver(s, log_path=None):
     except Exception as e:
         cleanup_errors.append("LED: " + str(e))
     
-    # Poller aufraeumen (falls registriert)
+    # Poller aufraeumen (falls registriert) und offene Keep-Alive-Verbindungen schliessen
+    global _poll_listener
     try:
         _poller.unregister(s)
     except Exception:
         # Ignorieren - war moeglicherweise nicht registriert
         pass
+    _poll_listener = None
+    _close_all_connections()
     
     if cleanup_errors:
         log_message(log_path, "Webserver gestoppt mit Warnungen: " + "; ".join(cleanup_errors))
@@ -104,14 +169,6 @@ def stop_webserver(s, log_path=None):
         log_message(log_path, "Webserver sauber gestoppt.")
 
 
-# --------------------------------------------------------------------
-#   Callback-Setter
-# --------------------------------------------------------------------
-def set_reload_alarms_callback(func):
-    global reload_alarms_callback
-    reload_alarms_callback = func
-
-
 # --------------------------------------------------------------------
 #   Security & File Management
 # --------------------------------------------------------------------
@@ -119,10 +176,11 @@ def set_reload_alarms_callback(func):
 # Whitelist for allowed static files (security)
 ALLOWED_STATIC_FILES = {
     # Web assets (stored in Flash memory /web_assets/)
-    'styles.css': {'type': 'text/css', 'safe': True, 'location': 'flash'},
+    # 'gzip': vorkomprimierte <name>.gz daneben ausliefern (tools/build_web_assets.py)
+    'styles.css': {'type': 'text/css', 'safe': True, 'location': 'flash', 'gzip': True},
     'favicon.ico': {'type': 'image/x-icon', 'safe': True, 'location': 'flash'},
     'neuza.webp': {'type': 'image/webp', 'safe': True, 'location': 'flash'},
-    'app.js': {'type': 'application/javascript', 'safe': True, 'location': 'flash'},
+    'app.js': {'type': 'application/javascript', 'safe': True, 'location': 'flash', 'gzip': True},
     
     # System files (stored on SD card /sd/)
     'debug_log.txt': {'type': 'text/plain', 'safe': True, 'location': 'sd'},
@@ -131,6 +189,10 @@ ALLOWED_STATIC_FILES = {
     'wifis.txt': {'type': 'text/plain', 'safe': False, 'location': 'sd'}  # Internal only - NEVER serve
 }
 
+# Rotierte Log-Generationen (debug_log.txt.1 …) – abrufbar, auch per Range
+for _archive in log_archive_paths('debug_log.txt'):
+    ALLOWED_STATIC_FILES[_archive] = {'type': 'text/plain', 'safe': True, 'location': 'sd'}
+
 # Dangerous patterns that should never be served  
 FORBIDDEN_PATTERNS = [
     '..', '../', '..\\',
@@ -222,199 +284,840 @@ def html_escape(text):
 
 
 # --------------------------------------------------------------------
-#   HTTP-Request einlesen (2-s-Timeout, 8-kB-Limit)
+#   HTTP-Request-Parser (arbeitet auf bytes, dekodiert nur Benoetigtes)
 # --------------------------------------------------------------------
-def _receive_http_request(sock):
-    sock.settimeout(2)
-    data = b""
-    while b"\r\n\r\n" not in data:
-        chunk = sock.recv(512)
-        if not chunk:
-            break
-        data += chunk
-        # Watchdog bei langsamen Clients fuettern
-        try:
-            from recovery_manager import feed_watchdog
-            feed_watchdog(None)
-        except Exception:
-            pass
-        if len(data) > 8192:  # rudimentaerer DoS-Schutz
-            return "", ""
-    if b"\r\n\r\n" not in data:
-        return "", ""
-
-    header, body = data.split(b"\r\n\r\n", 1)
-
-    # Content-Length ermitteln
-    clen = 0
-    for line in header.split(b"\r\n"):
-        if line.lower().startswith(b"content-length:"):
-            clen = int(line.split(b":", 1)[1].strip())
-            break
+_MAX_HEADER = 8192        # rudimentaerer DoS-Schutz
+_MAX_HEADER_NAME = 24     # laengere Namen koennen keine der gesuchten sein
+_MAX_HEADER_LINES = 64    # Browser senden ~15; begrenzt die Parse-Schleife bei Header-Fluten
+_NEEDED_HEADERS = (
+    b"content-length", b"connection", b"accept-encoding", b"range",
+    b"if-range", b"if-none-match", b"if-modified-since",
+)
+# Tupel aus ints: MicroPython kennt "int in bytes" nicht (TypeError)
+_HEADER_INITIALS = tuple(sorted({name[0] for name in _NEEDED_HEADERS}))
 
-    # Begrenze Body-Groesse strikt
-    MAX_BODY = 4096  # 4KB reicht fuer unsere Konfigs locker aus
-    if clen > MAX_BODY:
-        return header.decode(), "__BODY_TOO_LARGE__"
 
-    while len(body) < clen:
-        chunk = sock.recv(512)
-        if not chunk:
-            break
-        body += chunk
-        # Watchdog bei grossen Bodies fuettern
-        try:
-            from recovery_manager import feed_watchdog
-            feed_watchdog(None)
-        except Exception:
-            pass
+class _Request:
+    __slots__ = ("method", "path", "query", "version", "headers", "body")
+
+
+def _parse_head(data, end):
+    """
+    Request-Zeile und die Header aus _NEEDED_HEADERS aus data[:end].
+    Alle anderen Header werden nur uebersprungen. Gibt _Request oder None.
+    """
+    line_end = data.find(b"\r\n", 0, end)
+    if line_end < 0:
+        line_end = end
+    parts = data[:line_end].split()
+    if len(parts) < 2 or len(parts) > 3:
+        return None
+    req = _Request()
+    try:
+        req.method = parts[0].decode()
+        req.path, _, req.query = parts[1].decode().partition("?")
+        req.version = parts[2].decode() if len(parts) == 3 else "HTTP/1.0"
+    except UnicodeError:
+        return None
+
+    headers = {}
+    pos = line_end + 2
+    lines = 0
+    while pos < end:
+        lines += 1
+        if lines > _MAX_HEADER_LINES:
+            return None
+        nl = data.find(b"\r\n", pos, end)
+        if nl < 0:
+            nl = end
+        # Zeilen, deren erster Buchstabe zu keinem gesuchten Header passt, gar nicht erst zerlegen
+        if data[pos] | 0x20 not in _HEADER_INITIALS:
+            pos = nl + 2
+            continue
+        colon = data.find(b":", pos, nl)
+        if 0 < colon - pos <= _MAX_HEADER_NAME:
+            name = data[pos:colon].lower()
+            if name in _NEEDED_HEADERS:
+                try:
+                    value = data[colon + 1:nl].strip().decode()
+                except UnicodeError:
+                    return None
+                key = name.decode()
+                # Widerspruechliche Content-Length (Request-Smuggling) → ungueltig
+                if key == "content-length" and headers.get(key, value) != value:
+                    return None
+                headers[key] = value
+        pos = nl + 2
+    req.headers = headers
+    req.body = ""
+    return req
+
+
+def _content_length(req):
+    try:
+        return int(req.headers.get("content-length", 0))
+    except ValueError:
+        return -1
+
+
+def _split_request(data):
+    """
+    Zerlegt den Empfangspuffer einer Verbindung.
+    Rueckgabe: (status, request, rest) mit status
+    'ok' | 'incomplete' | 'too_large' | 'invalid'. rest = gepipelinte Folgedaten.
+    """
+    end = data.find(b"\r\n\r\n")
+    if end < 0:
+        return ("invalid" if len(data) > _MAX_HEADER else "incomplete"), None, data
+
+    req = _parse_head(data, end)
+    clen = _content_length(req) if req else -1
+    if clen < 0:
+        return "invalid", None, b""
+
+    # Body-Limit je Route (GET & Co. ohne Body)
+    if clen > _body_limit(req):
+        return "too_large", req, b""
+    start = end + 4
+    if len(data) - start < clen:
+        return "incomplete", None, data
 
     # In MicroPython akzeptiert decode keine "errors"-KW-Args
-    return header.decode(), body.decode()
+    mv = memoryview(data)
+    try:
+        req.body = bytes(mv[start:start + clen]).decode()
+    except UnicodeError:
+        return "invalid", None, b""
+    return "ok", req, bytes(mv[start + clen:])
 
 
 # --------------------------------------------------------------------
-#   Haupt-Connection-Handler
+#   Keep-Alive: Antwort-Framing pruefen
+# --------------------------------------------------------------------
+_KEEPALIVE_IDLE_MS = 3000        # Leerlauf bis eine offene Verbindung geschlossen wird
+_KEEPALIVE_MAX_REQUESTS = 8      # Anfragen pro Verbindung
+_REQUEST_TIMEOUT_MS = 5000       # angefangene Anfrage muss bis dahin komplett sein
+_MAX_CONNECTIONS = 4             # Verbindungstabelle (Poll-Modus)
+_KEEP_ALIVE_LINE = "Connection: keep-alive\r\nKeep-Alive: timeout={}, max={}".format(
+    _KEEPALIVE_IDLE_MS // 1000, _KEEPALIVE_MAX_REQUESTS).encode()
+
+
+def _wants_keep_alive(req):
+    """HTTP/1.1 ohne 'Connection: close' oder HTTP/1.0 mit 'Connection: keep-alive'."""
+    connection = req.headers.get("connection", "").lower()
+    if req.version == "HTTP/1.1":
+        return "close" not in connection
+    return "keep-alive" in connection
+
+
+class _ResponseFraming:
+    """
+    Setzt den Connection-Header jeder Antwort zentral: Keep-Alive nur, wenn
+    der Client es will und die Antwort per Content-Length (oder 304) sauber
+    begrenzt ist. Die Handler muessen davon nichts wissen.
+    """
+    def start_response(self, allow_keep_alive):
+        self.allow_keep_alive = allow_keep_alive
+        self.keep = False
+        self.remaining = None  # None = Antwort-Kopf noch nicht gesendet
+
+    def _frame(self, data):
+        if self.remaining is not None:
+            if self.keep:
+                self.remaining -= len(data)
+            return data
+        data = bytes(data)
+        end = data.find(b"\r\n\r\n")
+        if not data.startswith(b"HTTP/") or end < 0:
+            self.remaining = -1
+            return data
+        lines = [line for line in data[:end].split(b"\r\n")
+                 if not line.lower().startswith(b"connection:")]
+        clen = 0 if b" 304 " in lines[0] else -1
+        for line in lines[1:]:
+            if line.lower().startswith(b"content-length:"):
+                clen = int(line[15:].strip())
+        self.keep = self.allow_keep_alive and clen >= 0
+        lines.append(_KEEP_ALIVE_LINE if self.keep else b"Connection: close")
+        self.remaining = clen - (len(data) - end - 4)
+        return b"\r\n".join(lines) + data[end:]
+
+    def response_complete(self):
+        """True, wenn die Verbindung fuer die naechste Anfrage offen bleiben darf."""
+        return self.keep and self.remaining == 0
+
+
+class _SocketSink(_ResponseFraming):
+    def __init__(self, sock):
+        self.sock = sock
+        self.start_response(False)
+
+    def sendall(self, data):
+        _send_all(self.sock, self._frame(data))
+
+
+# --------------------------------------------------------------------
+#   Haupt-Connection-Handler (Poll-Modus, Verbindungstabelle)
 # --------------------------------------------------------------------
 _poller = uselect.poll()  # Nur ein Poll-Objekt fuer alle Aufrufe
+_poll_listener = None     # aktuell registrierter Server-Socket
+
 
+class _Connection:
+    __slots__ = ("sock", "sink", "buf", "last_ms", "served")
 
-class PollerGuard:
-    """Context manager fuer sichere Poller-Registration"""
-    def __init__(self, sock, events=uselect.POLLIN):
+    def __init__(self, sock, now):
         self.sock = sock
-        self.events = events
-        self.registered = False
-    
-    def __enter__(self):
+        self.sink = _SocketSink(sock)
+        self.buf = b""
+        self.last_ms = now
+        self.served = 0
+
+
+_connections = []
+
+
+def _poll_matches(obj, sock):
+    # MicroPython liefert das Socket-Objekt, CPython den Dateideskriptor
+    return obj is sock or (isinstance(obj, int) and obj == sock.fileno())
+
+
+def _close_connection(conn):
+    try:
+        _poller.unregister(conn.sock)
+    except Exception:
+        pass
+    try:
+        conn.sock.close()
+    except Exception:
+        pass
+    if conn in _connections:
+        _connections.remove(conn)
+
+
+def _close_all_connections():
+    for conn in _connections[:]:
+        _close_connection(conn)
+
+
+def _accept_connection(s, now, log_path=None):
+    cl, addr = s.accept()
+    cl.settimeout(5.0)  # 5 Sekunden fuer das Senden einer Antwort
+    try:
+        cl.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    except Exception:
+        pass
+    conn = _Connection(cl, now)
+    _connections.append(conn)
+    _poller.register(cl, uselect.POLLIN)
+    _feed_wdt(log_path)
+
+
+def _serve_buffered_request(conn, log_path=None):
+    """
+    Bedient hoechstens eine vollstaendige Anfrage aus conn.buf.
+    Gibt False zurueck, wenn die Verbindung geschlossen werden soll.
+    """
+    status, req, rest = _split_request(conn.buf)
+    if status == "incomplete":
+        return True
+    conn.buf = rest
+    if status == "invalid":
+        return False
+    if status == "too_large":
+        log_message(log_path, "[Request] {} {}: Body zu gross".format(req.method, req.path))
+        conn.sink.start_response(False)
+        conn.sink.sendall(b"HTTP/1.1 413 Payload Too Large\r\nConnection: close\r\n\r\n")
+        return False
+
+    # Debug: Alle Requests loggen
+    log_message(log_path, "[Request] {} {}".format(req.method, req.path))
+
+    conn.served += 1
+    conn.sink.start_response(_wants_keep_alive(req) and conn.served < _KEEPALIVE_MAX_REQUESTS)
+    try:
+        _route_request(conn.sink, req, log_path)
+    except Exception as e:
+        log_message(log_path, "Fehler beim Verarbeiten der Anfrage: " + str(e))
         try:
-            _poller.register(self.sock, self.events)
-            self.registered = True
-            return _poller
+            conn.sink.sendall(b"HTTP/1.1 500\r\n\r\nInterner Fehler")
         except Exception:
-            self.registered = False
-            raise
-    
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.registered:
-            try:
-                _poller.unregister(self.sock)
-            except Exception:
-                pass
+            pass
+        return False
+    finally:
+        # Memory-Monitoring nach Request
+        from memory_monitor import monitor_memory
+        monitor_memory(log_path, context="web_request_end")
+    return conn.sink.response_complete()
 
 
 def handle_website_connection(s, log_path=None):
-    cl = None
-    
-    # Memory-Monitoring fuer Web-Requests
-    from memory_monitor import monitor_memory
-    monitor_memory(log_path, context="web_request_start")
-    
-    try:
-        # Sichere Poller-Behandlung mit automatischer Cleanup
+    """
+    Ein nicht-blockierender Durchlauf fuer die Hauptschleife: neue Verbindungen
+    annehmen, eingetroffene Daten lesen, je Verbindung max. eine Anfrage
+    beantworten und Verbindungen im Leerlauf schliessen.
+    """
+    global _poll_listener
+    if _poll_listener is not s:
         try:
-            with PollerGuard(s) as poller:
-                poll_result = poller.poll(0)
-                if not poll_result:
-                    return  # Keine pending connections
+            _poller.register(s, uselect.POLLIN)
+            _poll_listener = s
         except Exception:
-            # Poller Fehler - trotzdem versuchen zu akzeptieren
             pass
 
-        # Connection mit Timeout
-        s.settimeout(1.0)  # 1 Sekunde Timeout fuer accept
-        cl, addr = s.accept()
-        cl.settimeout(5.0)  # 5 Sekunden fuer Request-Verarbeitung
-        cl.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    try:
+        events = _poller.poll(0)
+    except Exception:
+        events = []
+    now = utime.ticks_ms()
+
+    for obj, _ in events:
+        if _poll_matches(obj, s):
+            if len(_connections) < _MAX_CONNECTIONS:
+                try:
+                    _accept_connection(s, now, log_path)
+                except Exception as e:
+                    # Nur kritische Connection-Fehler loggen (nicht jede Timeout)
+                    if "timed out" not in str(e).lower():
+                        log_message(log_path, "Webserver Connection-Fehler: " + str(e))
+            continue
+        for conn in _connections:
+            if _poll_matches(obj, conn.sock):
+                try:
+                    chunk = conn.sock.recv(1024)
+                except Exception:
+                    chunk = b""
+                if not chunk:
+                    _close_connection(conn)
+                else:
+                    conn.buf += chunk
+                    conn.last_ms = now
+                break
+
+    # Gepipelinte/fertige Anfragen bedienen, auch ohne neues Poll-Ereignis
+    for conn in _connections[:]:
+        if conn.buf:
+            _feed_wdt(log_path)
+            try:
+                keep = _serve_buffered_request(conn, log_path)
+            except Exception as e:
+                if "timed out" not in str(e).lower():
+                    log_message(log_path, "Webserver Connection-Fehler: " + str(e))
+                keep = False
+            if not keep:
+                _close_connection(conn)
+                continue
+            conn.last_ms = utime.ticks_ms()
+        limit = _REQUEST_TIMEOUT_MS if conn.buf else _KEEPALIVE_IDLE_MS
+        if utime.ticks_diff(now, conn.last_ms) > limit:
+            _close_connection(conn)
+
+
+# --------------------------------------------------------------------
+#   Routing-Tabelle: (Methode, Pfad) → (Handler, max. Body-Bytes)
+# --------------------------------------------------------------------
+_ROUTES = {}
+_PREFIX_ROUTES = []   # (Methode, Pfad-Praefix, Handler, max. Body-Bytes), z. B. /api/alarms/<id>
+
+
+def _route(method, path, max_body=0, prefix=False):
+    """Registriert handler(cl, req, log_path) fuer Methode + exakten Pfad (oder Pfad-Praefix)."""
+    def register(handler):
+        if prefix:
+            _PREFIX_ROUTES.append((method, path, handler, max_body))
+        else:
+            _ROUTES[(method, path)] = (handler, max_body)
+        return handler
+    return register
+
+
+def _find_route(method, path):
+    """(Handler, max. Body-Bytes) oder None."""
+    entry = _ROUTES.get((method, path))
+    if entry:
+        return entry
+    for r_method, r_prefix, handler, max_body in _PREFIX_ROUTES:
+        if r_method == method and path.startswith(r_prefix):
+            return handler, max_body
+    return None
+
+
+def _body_limit(req):
+    entry = _find_route(req.method, req.path)
+    return entry[1] if entry else 0
+
+
+@_route("POST", "/save_alarms", max_body=4096)
+def _handle_save_alarms(cl, req, log_path=None):
+    log_message(log_path, "[POST] Speichere Alarme: {} bytes".format(len(req.body)))
+    _save_alarms(req.body, log_path)
+    cl.sendall(b"HTTP/1.1 200 OK\r\nContent-Type:text/plain\r\nContent-Length: 2\r\n\r\nOK")
+    _feed_wdt(log_path)
+
+
+@_route("POST", "/save_display_settings", max_body=512)
+def _handle_save_display_settings(cl, req, log_path=None):
+    log_message(log_path, "[POST] Speichere Display-Settings: {} bytes".format(len(req.body)))
+    _save_display_settings(req.body, log_path)
+    cl.sendall(b"HTTP/1.1 200 OK\r\nContent-Type:text/plain\r\nContent-Length: 2\r\n\r\nOK")
+    _feed_wdt(log_path)
+
+
+@_route("GET", "/")
+@_route("GET", "/index.html")
+def _handle_index(cl, req, log_path=None):
+    _feed_wdt(log_path)
+    _serve_index_page(cl, log_path, req.headers)
+    _feed_wdt(log_path)
+
+
+@_route("GET", "/logs")
+def _handle_logs(cl, req, log_path=None):
+    _feed_wdt(log_path)
+    _serve_log_file(cl, log_path, req.query)
+    _feed_wdt(log_path)
+
+
+def _route_request(cl, req, log_path=None):
+    """Verteilt eine geparste Anfrage an die Handler (cl braucht nur sendall)."""
+    entry = _find_route(req.method, req.path)
+    if entry:
+        entry[0](cl, req, log_path)
+        return
+
+    requested_file = req.path.lstrip("/")
+    if req.method != "GET":
+        cl.sendall(b"HTTP/1.1 405 Method Not Allowed\r\nContent-Length: 0\r\n\r\n")
+    elif requested_file:
+        # Alle anderen Anfragen ueber sichere Datei-Serving-Funktion (Whitelist + Pattern-Pruefung)
+        _feed_wdt(log_path)
+        _serve_file_from_sd(cl, requested_file, log_path, req.headers)
         _feed_wdt(log_path)
+    else:
+        # Leerer Pfad -> redirect zu index
+        cl.sendall(b"HTTP/1.1 302 Found\r\nLocation: /\r\nContent-Length: 0\r\n\r\n")
 
-        try:
-            header, body = _receive_http_request(cl)
+
+# --------------------------------------------------------------------
+#   REST-API (JSON): einzelne Alarme und Display-Einstellungen
+# --------------------------------------------------------------------
+_API_ALARMS = "/api/alarms"
+_API_MAX_BODY = 256
+
+
+def _send_json(cl, obj, status="200 OK"):
+    body = json.dumps(obj).encode()
+    cl.sendall("HTTP/1.1 {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\n"
+               "Cache-Control: no-store\r\n\r\n".format(status, len(body)).encode() + body)
+
+
+def _send_json_error(cl, status, message):
+    _send_json(cl, {"error": message}, status)
+
+
+def _json_body(cl, req, kind=dict):
+    """Body als JSON-Objekt (bzw. -Liste); sendet bei Fehler selbst 400 und gibt None zurueck."""
+    try:
+        data = json.loads(req.body)
+    except ValueError:
+        data = None
+    if not isinstance(data, kind):
+        _send_json_error(cl, "400 Bad Request", "JSON-Liste erwartet" if kind is list else "JSON-Objekt erwartet")
+        return None
+    return data
+
+
+def _alarm_json(idx, alarm):
+    return {"id": idx, "time": alarm.time_str(), "text": alarm.text,
+            "days": alarm.day_names(), "active": alarm.active}
+
+
+def _alarm_from_json(data, base=None):
+    """
+    Baut einen Alarm aus JSON (PUT: base=None, PATCH: base = bisheriger Alarm).
+    Rueckgabe: (alarm, None) oder (None, Fehlermeldung).
+    """
+    if base:
+        zeit, text, tage, aktiv = base.time_str(), base.text, base.day_names(), base.active
+    else:
+        zeit, text, tage, aktiv = "", "Kein Text", [], False
+    for key in data:
+        if key not in ("id", "time", "text", "days", "active"):
+            return None, "Unbekanntes Feld: " + str(key)
+
+    if "time" in data:
+        zeit = data["time"]
+    if not isinstance(zeit, str) or not _valid_hhmm(zeit):
+        return None, "Ungueltige Zeit (HH:MM)"
+    if "text" in data:
+        if not isinstance(data["text"], str):
+            return None, "Ungueltiger Text"
+        text = _sanitize_alarm_text(data["text"])
+    if "days" in data:
+        days = data["days"]
+        if not isinstance(days, list) or any(d not in _ALARM_DAYS for d in days):
+            return None, "Ungueltige Tage"
+        tage = days
+    if "active" in data:
+        if not isinstance(data["active"], bool):
+            return None, "Ungueltiger Status"
+        aktiv = data["active"]
+    # Ohne Tage bleibt der Alarm inaktiv (erzwingt alarm_store.Alarm)
+    return alarm_store.Alarm(int(zeit[:2]), int(zeit[3:]), alarm_store.days_to_mask(tage), aktiv, text), None
+
+
+def _alarm_id(req):
+    """Index aus /api/alarms/<id> oder None."""
+    suffix = req.path[len(_API_ALARMS) + 1:]
+    if not suffix.isdigit():
+        return None
+    return int(suffix)
+
+
+def _commit_alarms(cl, alarms, log_path=None):
+    """Persistiert die neue Liste (alarm_store meldet sie an die Uhr). False → Fehler wurde gesendet."""
+    if not _safe_save_operation("Alarm-API", alarm_store.commit, alarms, log_path=log_path):
+        _send_json_error(cl, "503 Service Unavailable", "Speichern fehlgeschlagen")
+        return False
+    _feed_wdt(log_path)
+    return True
+
+
+@_route("GET", _API_ALARMS)
+def _api_list_alarms(cl, req, log_path=None):
+    _send_json(cl, [_alarm_json(i, a) for i, a in enumerate(alarm_store.alarms(log_path))])
+
+
+@_route("PUT", _API_ALARMS, max_body=_API_MAX_BODY * (alarm_store.MAX_ALARMS + 1))
+def _api_replace_alarms(cl, req, log_path=None):
+    """Ganze Liste in einem Schritt: alles gueltig → ein commit, sonst 400 und nichts geaendert."""
+    data = _json_body(cl, req, list)
+    if data is None:
+        return
+    if len(data) > alarm_store.MAX_ALARMS:
+        _send_json_error(cl, "400 Bad Request", "Maximal {} Alarme".format(alarm_store.MAX_ALARMS))
+        return
+    alarms = []
+    for idx, item in enumerate(data):
+        if not isinstance(item, dict):
+            _send_json_error(cl, "400 Bad Request", "Alarm {}: JSON-Objekt erwartet".format(idx))
+            return
+        alarm, error = _alarm_from_json(item)
+        if error:
+            _send_json_error(cl, "400 Bad Request", "Alarm {}: {}".format(idx, error))
+            return
+        alarms.append(alarm)
+
+    if alarms != list(alarm_store.alarms(log_path)):
+        log_message(log_path, "[API] Alarmliste ersetzt ({} Alarme)".format(len(alarms)))
+        if not _commit_alarms(cl, alarms, log_path):
+            return
+    _send_json(cl, [_alarm_json(i, a) for i, a in enumerate(alarms)])
+
+
+@_route("GET", _API_ALARMS + "/", prefix=True)
+def _api_get_alarm(cl, req, log_path=None):
+    alarms = alarm_store.alarms(log_path)
+    idx = _alarm_id(req)
+    if idx is None or idx >= len(alarms):
+        _send_json_error(cl, "404 Not Found", "Alarm nicht gefunden")
+        return
+    _send_json(cl, _alarm_json(idx, alarms[idx]))
+
+
+@_route("PUT", _API_ALARMS + "/", max_body=_API_MAX_BODY, prefix=True)
+@_route("PATCH", _API_ALARMS + "/", max_body=_API_MAX_BODY, prefix=True)
+def _api_write_alarm(cl, req, log_path=None):
+    alarms = list(alarm_store.alarms(log_path))
+    idx = _alarm_id(req)
+    # PUT auf den naechsten freien Platz legt einen Alarm an
+    create = req.method == "PUT" and idx == len(alarms) and idx < alarm_store.MAX_ALARMS
+    if idx is None or (idx >= len(alarms) and not create):
+        _send_json_error(cl, "404 Not Found", "Alarm nicht gefunden")
+        return
+    data = _json_body(cl, req)
+    if data is None:
+        return
+    base = alarms[idx] if req.method == "PATCH" else None
+    alarm, error = _alarm_from_json(data, base)
+    if error:
+        _send_json_error(cl, "400 Bad Request", error)
+        return
+
+    if create:
+        alarms.append(alarm)
+    elif alarm == alarms[idx]:
+        _send_json(cl, _alarm_json(idx, alarm))  # unveraendert → kein SD-Write
+        return
+    else:
+        alarms[idx] = alarm
+    log_message(log_path, "[API] Alarm {} {}".format(idx, "angelegt" if create else "geaendert"))
+    if _commit_alarms(cl, alarms, log_path):
+        _send_json(cl, _alarm_json(idx, alarm), "201 Created" if create else "200 OK")
+
+
+@_route("DELETE", _API_ALARMS + "/", prefix=True)
+def _api_delete_alarm(cl, req, log_path=None):
+    alarms = list(alarm_store.alarms(log_path))
+    idx = _alarm_id(req)
+    if idx is None or idx >= len(alarms):
+        _send_json_error(cl, "404 Not Found", "Alarm nicht gefunden")
+        return
+    del alarms[idx]
+    log_message(log_path, "[API] Alarm {} geloescht".format(idx))
+    if _commit_alarms(cl, alarms, log_path):
+        cl.sendall(b"HTTP/1.1 204 No Content\r\nContent-Length: 0\r\n\r\n")
+
+
+def _settings_json():
+    settings = _load_display_settings()
+    try:
+        volume = max(0, min(100, int(settings.get('VOLUME_PERCENT', '50'))))
+    except ValueError:
+        volume = 50
+    return {
+        "display_auto": settings.get('DISPLAY_AUTO', 'true') == 'true',
+        "display_on": settings.get('DISPLAY_ON_TIME', '07:00'),
+        "display_off": settings.get('DISPLAY_OFF_TIME', '22:00'),
+        "led_mode": settings.get('LED_POWER_MODE', 'normal'),
+        "volume": volume,
+    }
+
+
+@_route("GET", "/api/settings")
+def _api_get_settings(cl, req, log_path=None):
+    _send_json(cl, _settings_json())
+
+
+@_route("PATCH", "/api/settings", max_body=_API_MAX_BODY)
+def _api_patch_settings(cl, req, log_path=None):
+    data = _json_body(cl, req)
+    if data is None:
+        return
+    incoming = {}
+    for key, value in data.items():
+        if key == "display_auto" and isinstance(value, bool):
+            incoming['DISPLAY_AUTO'] = 'true' if value else 'false'
+        elif key in ("display_on", "display_off") and isinstance(value, str) and _valid_hhmm(value):
+            incoming['DISPLAY_ON_TIME' if key == "display_on" else 'DISPLAY_OFF_TIME'] = value
+        else:
+            # led_mode/volume werden nur am Geraet eingestellt
+            _send_json_error(cl, "400 Bad Request", "Ungueltiges Feld: " + str(key))
+            return
+    if incoming and not _safe_save_operation("Display-API", _apply_display_settings, incoming, log_path=log_path):
+        _send_json_error(cl, "503 Service Unavailable", "Speichern fehlgeschlagen")
+        return
+    _send_json(cl, _settings_json())
+    _feed_wdt(log_path)
+
+
+# --------------------------------------------------------------------
+#   Asynchroner Webserver (uasyncio)
+# --------------------------------------------------------------------
+_ASYNC_REQUEST_TIMEOUT_S = 5   # gesamte Anfrage inkl. Body
+_ASYNC_DRAIN_BYTES = 2048      # nach so vielen gepufferten Bytes an das Netz abgeben
+
+
+class _AsyncSink(_ResponseFraming):
+    """
+    sendall()-Adapter fuer StreamWriter, damit die synchronen Handler
+    (_route_request & Co.) unveraendert weiterverwendet werden koennen.
+    Die Daten landen im Puffer des Writers und werden von drain() verschickt.
+    """
+    def __init__(self, writer):
+        self.writer = writer
+        self.pending = 0
+        self.start_response(False)
+
+    def sendall(self, data):
+        data = self._frame(data)
+        self.writer.write(data)
+        self.pending += len(data)
+
+    async def drain(self):
+        if self.pending:
+            self.pending = 0
+            await self.writer.drain()
+
+
+async def _read_request_async(reader):
+    """
+    Liest Header + Body ohne zu blockieren (gleiche Parser/Limits wie der Poll-Modus).
+    Rueckgabe: (status, request) mit status wie bei _split_request.
+    """
+    raw = b""
+    while True:
+        line = await reader.readline()
+        if not line:
+            return "invalid", None
+        if line in (b"\r\n", b"\n"):
+            break
+        raw += line
+        if len(raw) > _MAX_HEADER:  # rudimentaerer DoS-Schutz
+            return "invalid", None
+
+    req = _parse_head(raw, len(raw))
+    clen = _content_length(req) if req else -1
+    if clen < 0:
+        return "invalid", None
+    if clen > _body_limit(req):
+        return "too_large", req
+
+    body = b""
+    while len(body) < clen:
+        chunk = await reader.read(clen - len(body))
+        if not chunk:
+            break
+        body += chunk
+    try:
+        req.body = body.decode()
+    except UnicodeError:
+        return "invalid", None
+    return "ok", req
+
+
+async def _send_file_async(sink, file_name, log_path=None, headers=None):
+    """Statische Datei blockweise senden, nach jedem Block an die Clock-Task abgeben."""
+    path, header, error_response, byte_range = _resolve_static_file(file_name, log_path, headers)
+    if not path:
+        sink.sendall(error_response)
+        return
+    sink.sendall(header)
+    await _stream_file_async(sink, path, log_path, byte_range[0], byte_range[1])
+
+
+async def _stream_file_async(sink, path, log_path=None, start=0, length=None):
+    # write() kopiert in den Writer-Puffer → _send_buf ist danach sofort wieder frei
+    sent = 0
+    with open(path, "rb") as f:
+        if start:
+            f.seek(start)
+        while length is None or sent < length:
+            want = _SEND_BLOCK if length is None else min(_SEND_BLOCK, length - sent)
+            n = f.readinto(_send_mv[:want])
+            if not n:
+                break
+            sink.sendall(_send_mv[:n])
+            sent += n
+            await sink.drain()
             _feed_wdt(log_path)
-            if not header:
-                cl.close()
-                return
-
-            first_line = header.splitlines()[0]
-            parts = first_line.split()
-            if len(parts) < 2:
-                cl.close()
-                return
-            method, path = parts[0], parts[1]
-            
-            # Debug: Alle Requests loggen
-            log_message(log_path, "[Request] {} {}".format(method, path))
-            
-            # Security logging nur fuer wirklich gefaehrliche Anfragen
-            if any(pattern in path for pattern in FORBIDDEN_PATTERNS):
-                log_message(log_path, "[Security] Blockiert: " + method + " " + path)
-                return
-
-            if body == "__BODY_TOO_LARGE__":
-                cl.sendall(b"HTTP/1.1 413 Payload Too Large\r\nConnection: close\r\n\r\n")
-                return
-
-            if method == "POST" and path == "/save_alarms":
-                log_message(log_path, "[POST] Speichere Alarme: {} bytes".format(len(body)))
-                _save_alarms(body, log_path)
-                if reload_alarms_callback:
-                    reload_alarms_callback()
-                cl.sendall(b"HTTP/1.1 200 OK\r\nContent-Type:text/plain\r\n\r\nOK")
-                _feed_wdt(log_path)
 
-            elif method == "POST" and path == "/save_display_settings":
-                log_message(log_path, "[POST] Speichere Display-Settings: {} bytes".format(len(body)))
-                _save_display_settings(body, log_path)
-                cl.sendall(b"HTTP/1.1 200 OK\r\nContent-Type:text/plain\r\n\r\nOK")
-                _feed_wdt(log_path)
-            
-            elif path in ("/", "/index.html"):
-                _feed_wdt(log_path)
-                _serve_index_page(cl, log_path)
-                _feed_wdt(log_path)
 
-            elif path == "/logs":
-                _feed_wdt(log_path)
-                _serve_log_file(cl, log_path)
-                _feed_wdt(log_path)
+async def _send_log_async(sink, log_path=None, query=""):
+    """Log-Ansicht wie _serve_log_file, aber mit drain() statt blockierendem sendall."""
+    for chunk in _log_view_chunks(log_path, query):
+        sink.sendall(chunk)
+        if sink.pending >= _ASYNC_DRAIN_BYTES:
+            await sink.drain()
+            _feed_wdt(log_path)
 
-            else:
-                # Alle anderen Anfragen ueber sichere Datei-Serving-Funktion
-                requested_file = path.lstrip("/")
-                if requested_file:  # Nur nicht-leere Pfade verarbeiten
-                    _feed_wdt(log_path)
-                    _serve_file_from_sd(cl, requested_file, log_path)
-                    _feed_wdt(log_path)
-                else:
-                    # Leerer Pfad -> redirect zu index
-                    cl.sendall(b"HTTP/1.1 302 Found\r\nLocation: /\r\n\r\n")
+
+async def _dispatch_async(sink, req, log_path=None):
+    # Lange Streams (Dateien, Log, Index-Cache) kooperativ senden, Rest ueber die Routing-Tabelle
+    key = (req.method, req.path)
+    if key == ("GET", "/logs"):
+        await _send_log_async(sink, log_path, req.query)
+    elif key in (("GET", "/"), ("GET", "/index.html")):
+        cache_path = _prepare_index_response(sink, log_path, req.headers)
+        if cache_path:
+            try:
+                await _stream_file_async(sink, cache_path, log_path)
+            finally:
+                _release_index_file(cache_path)
+    elif req.method == "GET" and req.path.lstrip("/") and not _find_route(*key):
+        await _send_file_async(sink, req.path.lstrip("/"), log_path, req.headers)
+    else:
+        _route_request(sink, req, log_path)
+    await sink.drain()
+
+
+def _make_async_handler(log_path):
+    async def _handle_client_async(reader, writer):
+        sink = _AsyncSink(writer)
+        served = 0
+        try:
+            # Keep-Alive: weitere (auch gepipelinte) Anfragen auf derselben Verbindung
+            while True:
+                timeout = _KEEPALIVE_IDLE_MS / 1000 if served else _ASYNC_REQUEST_TIMEOUT_S
+                try:
+                    status, req = await asyncio.wait_for(_read_request_async(reader), timeout)
+                except asyncio.TimeoutError:
+                    return
+                if status == "invalid":
+                    return
+
+                if status == "too_large":
+                    log_message(log_path, "[Request] {} {}: Body zu gross".format(req.method, req.path))
+                    sink.start_response(False)
+                    sink.sendall(b"HTTP/1.1 413 Payload Too Large\r\nConnection: close\r\n\r\n")
+                    await sink.drain()
+                    return
+
+                log_message(log_path, "[Request] {} {}".format(req.method, req.path))
+                served += 1
+                sink.start_response(_wants_keep_alive(req) and served < _KEEPALIVE_MAX_REQUESTS)
+                await _dispatch_async(sink, req, log_path)
+                _feed_wdt(log_path)
+                if not sink.response_complete():
+                    return
 
         except Exception as e:
-            log_message(log_path, "Fehler beim Verarbeiten der Anfrage: " + str(e))
+            if "timed out" not in str(e).lower():
+                log_message(log_path, "Fehler beim Verarbeiten der Anfrage: " + str(e))
             try:
-                if cl:
-                    cl.sendall(b"HTTP/1.1 500\r\n\r\nInterner Fehler")
+                sink.sendall(b"HTTP/1.1 500\r\n\r\nInterner Fehler")
+                await sink.drain()
             except Exception:
                 pass
         finally:
-            if cl:
-                try:
-                    cl.close()
-                except Exception:
-                    pass
-            
-            # Memory-Monitoring nach Request
-            monitor_memory(log_path, context="web_request_end")
-
-    except Exception as e:
-        # Nur kritische Connection-Fehler loggen (nicht jede Timeout)
-        if "timed out" not in str(e).lower():
-            log_message(log_path, "Webserver Connection-Fehler: " + str(e))
-        if cl:
             try:
-                cl.close()
+                writer.close()
+                await writer.wait_closed()
             except Exception:
                 pass
+            _feed_wdt(log_path)
+
+    return _handle_client_async
+
+
+async def start_async_webserver(wlan, log_path=None):
+    """
+    Startet den Server als uasyncio-Task. Gibt das Server-Objekt zurueck
+    oder None (kein asyncio / kein WLAN / Bind-Fehler).
+    """
+    if asyncio is None:
+        return None
+    try:
+        if not wlan or not wlan.isconnected():
+            raise Exception("WLAN nicht verbunden")
+        ip = wlan.ifconfig()[0]
+        log_message(log_path, "Webserver IP: " + ip)
+        init_static_validators(log_path)
+        server = await asyncio.start_server(_make_async_handler(log_path), "0.0.0.0", 80)
+        blue_led.on()
+        log_message(log_path, "Webserver (async) gestartet auf " + ip + ":80")
+        return server
+    except Exception as e:
+        log_message(log_path, "Fehler beim Starten des Async-Webservers: " + str(e))
+        try:
+            blue_led.off()
+        except Exception:
+            pass
+        return None
+
+
+def stop_async_webserver(server, log_path=None):
+    """Schliesst den Async-Server (offene Verbindungen laufen aus)."""
+    if server:
+        try:
+            server.close()
+        except Exception as e:
+            log_message(log_path, "Async-Webserver Stop-Fehler: " + str(e))
+    try:
+        blue_led.off()
+    except Exception:
+        pass
+    log_message(log_path, "Async-Webserver gestoppt.")
 
 
 # --------------------------------------------------------------------
@@ -459,81 +1162,89 @@ def _safe_save_operation(operation_name, save_func, *args, **kwargs):
                    "Speicher-Sperre fuer '{}' freigegeben".format(operation_name))
 
 
+# --------------------------------------------------------------------
+#   Alarme: Eingabepruefung (Formular und REST-API), Speicher = alarm_store
+# --------------------------------------------------------------------
+_ALARM_DAYS = ("Mo", "Di", "Mi", "Do", "Fr", "Sa", "So")
+
+
+def _valid_hhmm(ts):
+    try:
+        if len(ts) != 5 or ts[2] != ':':
+            return False
+        hh = int(ts[:2]); mm = int(ts[3:])
+        return 0 <= hh <= 23 and 0 <= mm <= 59
+    except Exception:
+        return False
+
+
+def _sanitize_alarm_text(txt):
+    try:
+        # CR/LF entfernen und trimmen
+        txt = txt.replace("\r", " ").replace("\n", " ")
+        txt = txt.strip()
+        # Strenge Whitelist: A-Z a-z 0-9 Leerzeichen () - _ . , : ! ?
+        allowed = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789 ()-_.:,!?"
+        buf = []
+        for ch in txt:
+            # Nur ASCII druckbar und in Whitelist
+            if 32 <= ord(ch) <= 126 and ch in allowed:
+                buf.append(ch)
+            else:
+                buf.append('_')
+        txt = ''.join(buf)
+        # Laenge begrenzen
+        if len(txt) > 32:
+            txt = txt[:32]
+        # Leere Werte ersetzen
+        return txt or "Kein Text"
+    except Exception:
+        return "Kein Text"
+
+
 # --------------------------------------------------------------------
 #   POST / save_alarms
 # --------------------------------------------------------------------
 def _save_alarms_unsafe(body, log_path=None):
     try:
-        # defensive parsing
-        def _sanitize_text(txt):
-            try:
-                # CR/LF entfernen und trimmen
-                txt = txt.replace("\r", " ").replace("\n", " ")
-                txt = txt.strip()
-                # Strenge Whitelist: A-Z a-z 0-9 Leerzeichen () - _ . , :
-                allowed = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789 ()-_.:,"
-                buf = []
-                for ch in txt:
-                    # Nur ASCII druckbar und in Whitelist
-                    if 32 <= ord(ch) <= 126 and ch in allowed:
-                        buf.append(ch)
-                    else:
-                        buf.append('_')
-                txt = ''.join(buf)
-                # Laenge begrenzen
-                if len(txt) > 32:
-                    txt = txt[:32]
-                # Leere Werte ersetzen
-                return txt or "Kein Text"
-            except Exception:
-                return "Kein Text"
-
         lines = [ln.strip() for ln in body.split("\n") if ln.strip()]
         if not lines:
             log_message(log_path, "Leerer POST-Body – Alarme nicht geaendert.")
-            return
-
-        with open("/sd/alarm.txt", "w") as f:
-            for line in lines[:5]:  # maximal 5 akzeptieren
-                teile = [t.strip() for t in line.split(",") if t.strip()]
-                if len(teile) < 2:
-                    continue
-
-                uhrzeit, text = teile[0], _sanitize_text(teile[1] or "Kein Text")
-                if not (
-                    len(uhrzeit) == 5
-                    and uhrzeit[2] == ":"
-                    and uhrzeit.replace(":", "").isdigit()
-                ):
-                    log_message(log_path, "Ueberspringe ungueltige Zeit: " + uhrzeit)
-                    continue
-
-                tage, status = [], "Inaktiv"
-                for eintrag in teile[2:]:
-                    if eintrag in ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]:
-                        tage.append(eintrag)
-                    elif eintrag.lower() == "aktiv":
-                        status = "Aktiv"
-                
-                # KRITISCH: Wenn keine Tage ausgewaehlt → Status MUSS Inaktiv sein
-                if len(tage) == 0:
-                    status = "Inaktiv"
-
-                f.write("TIME=" + uhrzeit + "\nTEXT=" + text + "\n")
-                f.write("DAYS=" + (','.join(tage) if tage else '-') + "\n")
-                f.write("STATUS=" + status + "\n---\n")
-            # Flush vor sync
-            f.flush()
-        
-        # Garantiertes Sync mit Error-Handling
-        try:
-            os.sync()
-        except Exception as e:
-            log_message(log_path, "[Sync Fehler nach Alarm Save] {}".format(str(e)))
-        
+            return False
+
+        alarms = []
+        for line in lines[:alarm_store.MAX_ALARMS]:  # maximal 5 akzeptieren
+            teile = [t.strip() for t in line.split(",") if t.strip()]
+            if len(teile) < 2:
+                continue
+
+            uhrzeit, text = teile[0], _sanitize_alarm_text(teile[1] or "Kein Text")
+            if not (
+                len(uhrzeit) == 5
+                and uhrzeit[2] == ":"
+                and uhrzeit.replace(":", "").isdigit()
+            ):
+                log_message(log_path, "Ueberspringe ungueltige Zeit: " + uhrzeit)
+                continue
+
+            tage, aktiv = [], False
+            for eintrag in teile[2:]:
+                if eintrag in _ALARM_DAYS:
+                    tage.append(eintrag)
+                elif eintrag.lower() == "aktiv":
+                    aktiv = True
+
+            # KRITISCH: Ohne Tage bleibt der Alarm inaktiv (erzwingt alarm_store.Alarm)
+            alarms.append(alarm_store.Alarm(int(uhrzeit[:2]), int(uhrzeit[3:]),
+                                            alarm_store.days_to_mask(tage), aktiv, text))
+
+        if not alarm_store.commit(alarms, log_path):
+            return False
         log_message(log_path, "Alarme erfolgreich gespeichert.")
+        return True
     except Exception as e:
         log_message(log_path, "Fehler beim Speichern: " + str(e))
+        return False
 
 
 def _save_alarms(body, log_path=None):
@@ -544,7 +1255,81 @@ def _save_alarms(body, log_path=None):
 # --------------------------------------------------------------------
 #   Statische Dateien
 # --------------------------------------------------------------------
-def _serve_file_from_sd(cl, file_name, log_path=None):
+def _static_path(file_name, file_info):
+    if file_info.get('location', 'sd') == 'flash':
+        return "/web_assets/" + file_name
+    return "/sd/" + file_name
+
+
+def _file_validators(path):
+    """(groesse, etag, last_modified) aus einem einzigen stat()."""
+    st = os.stat(path)
+    size, mtime = st[6], st[8]
+    return size, '"{:x}-{:x}"'.format(mtime, size), _http_date(mtime)
+
+
+def init_static_validators(log_path=None):
+    """
+    Berechnet ETag/Last-Modified (und ggf. .gz-Variante) je Whitelist-Datei
+    einmalig und legt sie im Whitelist-Eintrag ab.
+    """
+    count = 0
+    for name, file_info in ALLOWED_STATIC_FILES.items():
+        if not file_info.get('safe', False) or file_info.get('location') != 'flash':
+            continue  # SD-Dateien (Log) aendern sich laufend → kein Boot-Cache
+        path = _static_path(name, file_info)
+        try:
+            file_info['validators'] = _file_validators(path)
+            count += 1
+        except OSError:
+            file_info.pop('validators', None)
+            continue
+        if file_info.get('gzip'):
+            try:
+                size, etag, _ = _file_validators(path + ".gz")
+                file_info['gz'] = (size, etag[:-1] + '-gz"')
+            except OSError:
+                file_info.pop('gz', None)
+    log_message(log_path, "Static-Validatoren berechnet ({} Dateien).".format(count))
+
+
+def _parse_range(value, size):
+    """
+    Einzelner Bereich aus 'bytes=a-b' / 'bytes=a-' / 'bytes=-n'.
+    Rueckgabe: (start, ende_inklusiv), None (Header ignorieren) oder False (416).
+    """
+    if not value or not value.startswith("bytes=") or "," in value:
+        return None  # Mehrfach-Ranges nicht unterstuetzt → volle Datei
+    spec = value[6:].strip()
+    if "-" not in spec:
+        return None
+    first, last = spec.split("-", 1)
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else max(start, size - 1)
+        else:
+            suffix = int(last)
+            if suffix <= 0:
+                return False
+            start = max(0, size - suffix)
+            end = size - 1
+    except ValueError:
+        return None
+    if end < start:
+        return None  # syntaktisch ungueltig (RFC 7233 2.1) → ignorieren, volle Datei
+    if start >= size:
+        return False
+    return start, min(end, size - 1)
+
+
+def _resolve_static_file(file_name, log_path=None, headers=None):
+    """
+    Prueft Anfrage gegen Whitelist und baut den Antwort-Header.
+    Rueckgabe: (pfad, header_bytes, None, (start, laenge)) oder
+    (None, None, antwort_bytes, None) fuer Fehler, 304 und 416.
+    """
+    headers = headers or {}
     # Robuste Eingabe-Bereinigung und Sicherheitspruefung
     if isinstance(file_name, (list, tuple)):
         file_name = file_name[0] if file_name else ""
@@ -553,60 +1338,90 @@ def _serve_file_from_sd(cl, file_name, log_path=None):
     clean_filename, error = sanitize_filename(file_name, log_path)
     if not clean_filename:
         log_message(log_path, "[Security] Dateianfrage abgelehnt: " + str(file_name) + " -> " + str(error))
-        cl.sendall(b"HTTP/1.1 403 Forbidden\r\nConnection: close\r\n\r\n403")
-        return
+        return None, None, b"HTTP/1.1 403 Forbidden\r\nConnection: close\r\n\r\n403", None
     
     # Datei-Infos aus Whitelist
     file_info = ALLOWED_STATIC_FILES[clean_filename]
     
     # Pfad-Konstruktion basierend auf Datei-Location
     file_location = file_info.get('location', 'sd')
-    if file_location == 'flash':
-        path = "/web_assets/" + clean_filename
-    else:
-        path = "/sd/" + clean_filename
+    path = _static_path(clean_filename, file_info)
     
-    if not file_exists(path):
-        log_message(log_path, "Bereinigte Datei nicht gefunden: " + path)
-        cl.sendall(b"HTTP/1.1 404 Not Found\r\nConnection: close\r\n\r\n404")
-        return
+    if clean_filename == 'debug_log.txt':
+        flush_log(log_path)  # Gepufferte Zeilen zuerst, damit Groesse/Range stimmen
+
+    validators = file_info.get('validators')
+    if not validators:
+        if not file_exists(path):
+            log_message(log_path, "Bereinigte Datei nicht gefunden: " + path)
+            return None, None, b"HTTP/1.1 404 Not Found\r\nConnection: close\r\n\r\n404", None
+        validators = _file_validators(path)
+    size, etag, modified = validators
+
+    # Vorkomprimierte Variante, wenn der Client gzip akzeptiert
+    encoding = ""
+    gz = file_info.get('gz')
+    if gz and "gzip" in (headers.get("accept-encoding", "")):
+        path = path + ".gz"
+        size, etag = gz
+        encoding = "Content-Encoding: gzip\r\n"
+    vary = "Vary: Accept-Encoding\r\n" if gz else ""
+
+    # Conditional GET → 304 ohne Body
+    if_none_match = headers.get("if-none-match")
+    if_modified_since = headers.get("if-modified-since")
+    if (if_none_match and if_none_match == etag) or (not if_none_match and if_modified_since == modified):
+        return None, None, (
+            "HTTP/1.1 304 Not Modified\r\nETag: {}\r\nLast-Modified: {}\r\n{}"
+            "Cache-Control: max-age=86400\r\nConnection: close\r\n\r\n"
+        ).format(etag, modified, vary).encode(), None
+
+    # Range: ein einzelner Bereich (Wiederaufnahme, Log-Tail); If-Range nur mit passendem ETag
+    status = "200 OK"
+    content_range = ""
+    start, length = 0, size
+    if_range = headers.get("if-range")
+    byte_range = _parse_range(headers.get("range"), size)
+    if byte_range is not None and (not if_range or if_range == etag):
+        if byte_range is False:
+            return None, None, (
+                "HTTP/1.1 416 Range Not Satisfiable\r\nContent-Range: bytes */{}\r\n"
+                "Connection: close\r\n\r\n"
+            ).format(size).encode(), None
+        start, end = byte_range
+        length = end - start + 1
+        status = "206 Partial Content"
+        content_range = "Content-Range: bytes {}-{}/{}\r\n".format(start, end, size)
+    
+    # Sichere Content-Type aus Whitelist verwenden
+    content_type = file_info.get('type', 'application/octet-stream')
+    
+    header = (
+        "HTTP/1.1 {}\r\nContent-Type: {}\r\nContent-Length: {}\r\n{}{}{}"
+        "Accept-Ranges: bytes\r\nETag: {}\r\nLast-Modified: {}\r\n"
+        "Cache-Control: max-age=86400\r\n"
+        "X-Content-Type-Options: nosniff\r\n"
+        "X-Frame-Options: DENY\r\n"
+        "Connection: close\r\n\r\n"
+    ).format(status, content_type, length, content_range, encoding, vary, etag, modified)
+
+    # Sichere Logging mit Speicherort-Info
+    location_info = " (Flash)" if file_location == 'flash' else " (SD)"
+    log_message(log_path, "📦 Sende sichere Datei: " + clean_filename + location_info + (" [gzip]" if encoding else "") + (" [" + content_range[15:-2] + "]" if content_range else ""))
+    return path, header.encode(), None, (start, length)
+
+
+def _serve_file_from_sd(cl, file_name, log_path=None, headers=None):
     try:
-        size = os.stat(path)[6]
-        
-        # Sichere Content-Type aus Whitelist verwenden
-        content_type = file_info.get('type', 'application/octet-stream')
-        
-        header = (
-            "HTTP/1.1 200 OK\r\nContent-Type: {}\r\nContent-Length: {}\r\n"
-            "Cache-Control: max-age=86400\r\n"
-            "X-Content-Type-Options: nosniff\r\n"
-            "X-Frame-Options: DENY\r\n"
-            "Connection: close\r\n\r\n"
-        ).format(content_type, size)
-        cl.sendall(header.encode())
-        
-        # Sichere Logging mit Speicherort-Info
-        location_info = " (Flash)" if file_location == 'flash' else " (SD)"
-        log_message(log_path, "📦 Sende sichere Datei: " + clean_filename + location_info)
+        path, header, error_response, byte_range = _resolve_static_file(file_name, log_path, headers)
+        if not path:
+            cl.sendall(error_response)
+            return
+        cl.sendall(header)
 
-        with open(path, "rb") as f:
-            chunk_count = 0
-            while True:
-                chunk = f.read(1024)
-                if not chunk:
-                    break
-                cl.sendall(chunk)
-                
-                # Watchdog alle 10 Chunks fuettern (verhindert Reset bei grossen Dateien)
-                chunk_count += 1
-                if chunk_count % 10 == 0:
-                    try:
-                        from recovery_manager import feed_watchdog
-                        feed_watchdog(log_path)
-                    except Exception:
-                        pass  # Falls Import fehlschlaegt, weiterarbeiten
+        _send_file_range(cl, path, byte_range[0], byte_range[1], log_path)
     except Exception as e:
-        log_message(log_path, "Fehler beim Senden von " + clean_filename + ": " + str(e))
+        log_message(log_path, "Fehler beim Senden von " + str(file_name) + ": " + str(e))
         try:
             cl.sendall(b"HTTP/1.1 500\r\nConnection: close\r\n\r\n500")
         except Exception:
@@ -616,46 +1431,186 @@ def _serve_file_from_sd(cl, file_name, log_path=None):
 # Debug-Serving entfernt – stattdessen immer /logs verwenden
 
 
-def _serve_log_file(cl, log_path=None):
-    """Serviert Log-Datei - immer verfuegbar (kein Debug-Modus erforderlich)"""
-    clean_filename, error = sanitize_filename("debug_log.txt", log_path)
+# --------------------------------------------------------------------
+#   /logs – Ansicht vom Dateiende her, Paging per Byte-Offset
+#   /logs                 → letzte _LOG_TAIL_DEFAULT Zeilen
+#   /logs?tail=N          → letzte N Zeilen
+#   /logs?offset=X&len=Y  → Bytes X … X+Y
+#   &gen=1 … N            → rotierte Generation debug_log.txt.N
+# --------------------------------------------------------------------
+_LOG_PAGE_HEADER = (b"HTTP/1.1 200 OK\r\nContent-Type:text/html\r\nConnection: close\r\n"
+                    b"X-Content-Type-Options: nosniff\r\n"
+                    b"X-Frame-Options: DENY\r\n\r\n"
+                    b"<html><head><meta charset='UTF-8'><title>Logs</title></head><body>")
+_LOG_PAGE_FOOTER = b"</pre><p><a href='/'>&#x2190; Zurueck</a></p></body></html>"
+_LOG_TAIL_DEFAULT = 200
+_LOG_TAIL_MAX = 2000
+_LOG_PAGE_BYTES = 8192       # Standard-Seitengroesse beim Offset-Paging
+_LOG_PAGE_MAX = 32768
+_LOG_BLOCK = 2048            # Lese-/Sendeblock (liest in den gemeinsamen _send_buf)
+
+# Wiederverwendeter Escape-Puffer (Chunks werden vor dem naechsten Lesen gesendet)
+_log_escape_buf = bytearray(_LOG_BLOCK * 6)   # schlimmster Fall: jedes Byte → "&#039;"
+_ESCAPES = {
+    ord("&"): b"&amp;",
+    ord("<"): b"&lt;",
+    ord(">"): b"&gt;",
+    ord('"'): b"&quot;",
+    ord("'"): b"&#039;",
+}
+
+
+def _parse_query(query):
+    params = {}
+    for part in query.split("&"):
+        if "=" in part:
+            key, value = part.split("=", 1)
+            params[key] = value
+    return params
+
+
+def _query_int(params, key, default, lo, hi):
+    try:
+        value = int(params.get(key, default))
+    except ValueError:
+        value = default
+    return max(lo, min(hi, value))
+
+
+def _escape_block(mv, n):
+    """
+    HTML-Escaping von mv[:n] in einem Durchlauf. Ohne Sonderzeichen (Normalfall)
+    wird der Eingabepuffer direkt zurueckgegeben, sonst _log_escape_buf.
+    """
+    block = bytes(mv[:n])
+    if (b"&" not in block and b"<" not in block and b">" not in block
+            and b'"' not in block and b"'" not in block):
+        return mv[:n]
+    out = _log_escape_buf
+    pos = 0
+    for byte in block:
+        rep = _ESCAPES.get(byte)
+        if rep is None:
+            out[pos] = byte
+            pos += 1
+        else:
+            out[pos:pos + len(rep)] = rep
+            pos += len(rep)
+    return memoryview(out)[:pos]
+
+
+def _find_tail_start(f, size, lines):
+    """Sucht blockweise vom Dateiende rueckwaerts den Beginn der letzten `lines` Zeilen."""
+    mv = _send_mv
+    pos = size
+    # Abschliessender Zeilenumbruch zaehlt nicht als eigene Zeile
+    needed = lines + 1 if size else 0
+    while pos > 0:
+        step = min(_LOG_BLOCK, pos)
+        pos -= step
+        f.seek(pos)
+        n = f.readinto(mv[:step])
+        block = bytes(mv[:n])
+        idx = n
+        while True:
+            idx = block.rfind(b"\n", 0, idx)
+            if idx < 0:
+                break
+            if pos + idx == size - 1:
+                continue
+            needed -= 1
+            if needed == 1:
+                return pos + idx + 1
+    return 0
+
+
+def _log_nav(gen, start, end, size, page, generations):
+    """Navigationszeile: Aeltere/Neuere Seite, Generationswechsel, Ende."""
+    links = []
+    gen_arg = "&gen={}".format(gen) if gen else ""
+    if start > 0:
+        older = max(0, start - page)
+        links.append("<a href='/logs?offset={}&len={}{}'>&#x2190; Aeltere</a>".format(older, start - older, gen_arg))
+    elif gen < generations:
+        links.append("<a href='/logs?tail={}&gen={}'>&#x2190; debug_log.txt.{}</a>".format(_LOG_TAIL_DEFAULT, gen + 1, gen + 1))
+    if end < size:
+        links.append("<a href='/logs?offset={}&len={}{}'>Neuere &#x2192;</a>".format(end, page, gen_arg))
+    elif gen > 0:
+        newer = "&gen={}".format(gen - 1) if gen > 1 else ""
+        links.append("<a href='/logs?offset=0&len={}{}'>Neuere &#x2192;</a>".format(page, newer))
+    links.append("<a href='/logs'>Ende</a>")
+    name = "debug_log.txt" + (".{}".format(gen) if gen else "")
+    return "<p>{} – Bytes {}–{} von {} | {}</p><pre>".format(name, start, end, size, " | ".join(links)).encode()
+
+
+def _resolve_log_file(log_path=None, gen=0):
+    """Gibt (pfad, None) oder (None, fehler_antwort_bytes) zurueck."""
+    name = "debug_log.txt" + (".{}".format(gen) if gen else "")
+    clean_filename, error = sanitize_filename(name, log_path)
     if not clean_filename:
         log_message(log_path, "[Security] Log-Dateiname nicht validiert: " + str(error))
-        cl.sendall(b"HTTP/1.1 403 Forbidden\r\nConnection: close\r\n\r\n403")
-        return
+        return None, b"HTTP/1.1 403 Forbidden\r\nConnection: close\r\n\r\n403"
     
-    path = "/sd/" + clean_filename
+    path = _static_path(clean_filename, ALLOWED_STATIC_FILES.get(clean_filename, {}))
+    # Gepufferte Zeilen zuerst schreiben, damit die Ansicht aktuell ist
+    flush_log(log_path)
     if not file_exists(path):
-        cl.sendall(b"HTTP/1.1 404\r\nConnection: close\r\n\r\n404")
+        return None, b"HTTP/1.1 404\r\nConnection: close\r\n\r\n404"
+    return path, None
+
+
+def _log_view_chunks(log_path=None, query=""):
+    """
+    Erzeugt die /logs-Antwort als Folge grosser Chunks (gemeinsam fuer Poll-
+    und Async-Modus). Gelieferte memoryviews gelten nur bis zum naechsten Chunk.
+    """
+    params = _parse_query(query)
+    generations = len(log_archive_paths("debug_log.txt"))
+    gen = _query_int(params, "gen", 0, 0, generations)
+    path, error_response = _resolve_log_file(log_path, gen)
+    if not path:
+        yield error_response
         return
-        
+
+    size = os.stat(path)[6]
+    with open(path, "rb") as f:
+        if "offset" in params:
+            start = _query_int(params, "offset", 0, 0, size)
+            page = _query_int(params, "len", _LOG_PAGE_BYTES, 1, _LOG_PAGE_MAX)
+            end = min(size, start + page)
+        else:
+            lines = _query_int(params, "tail", _LOG_TAIL_DEFAULT, 1, _LOG_TAIL_MAX)
+            start = _find_tail_start(f, size, lines)
+            end = size
+            page = _LOG_PAGE_BYTES
+
+        yield _LOG_PAGE_HEADER
+        yield _log_nav(gen, start, end, size, page, generations)
+
+        mv = _send_mv
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            n = f.readinto(mv[:min(_LOG_BLOCK, remaining)])
+            if not n:
+                break
+            remaining -= n
+            yield _escape_block(mv, n)
+
+    yield _LOG_PAGE_FOOTER
+    log_message(log_path, "Log-Datei ausgeliefert (Bytes {}-{} von {}).".format(start, end, size))
+
+
+def _serve_log_file(cl, log_path=None, query=""):
+    """Serviert Log-Datei - immer verfuegbar (kein Debug-Modus erforderlich)"""
     try:
-        cl.sendall(b"HTTP/1.1 200 OK\r\nContent-Type:text/html\r\nConnection: close\r\n"
-                  b"X-Content-Type-Options: nosniff\r\n"
-                  b"X-Frame-Options: DENY\r\n\r\n"
-                  b"<html><head><meta charset='UTF-8'><title>Logs</title></head><body><pre>")
-
-        # Sichere Zeilenweise Ausgabe mit Groessenbegrenzung
-        line_count = 0
-        max_lines = 500  # weiter reduziert fuer noch geringeren Speicherbedarf
-
-        with open(path) as f:
-            for line in f:
-                if line_count >= max_lines:
-                    cl.sendall(b"\n--- LOG GEKUERZT (max " + str(max_lines).encode() + b" Zeilen) ---")
-                    break
-                cl.sendall(html_escape(line).encode())
-                line_count += 1
-                # Watchdog regelmaessig fuettern beim Lang-Stream
-                if line_count % 50 == 0:
-                    try:
-                        from recovery_manager import feed_watchdog
-                        feed_watchdog(log_path)
-                    except Exception:
-                        pass
-
-        cl.sendall(b"</pre><p><a href='/'>&#x2190; Zurueck</a></p></body></html>")
-        log_message(log_path, "Log-Datei ausgeliefert (" + str(line_count) + " Zeilen).")
+        sent = 0
+        for chunk in _log_view_chunks(log_path, query):
+            _send_all(cl, chunk)
+            sent += 1
+            # Watchdog regelmaessig fuettern beim Lang-Stream
+            if sent % 8 == 0:
+                _feed_wdt(log_path)
 
     except Exception as e:
         log_message(log_path, "Log-Datei Lesefehler: " + str(e))
@@ -668,114 +1623,46 @@ def _serve_log_file(cl, log_path=None):
 # --------------------------------------------------------------------
 #   Power Settings
 # --------------------------------------------------------------------
-def _save_display_settings_unsafe(body, log_path=None):
+def _apply_display_settings(incoming, log_path=None):
+    """Uebernimmt DISPLAY_*-Werte (Strings) in den ConfigStore und schreibt sofort."""
     try:
-        incoming = {}
-        for line in body.strip().split('\n'):
-            if '=' in line:
-                key, value = line.split('=', 1)
-                incoming[key.strip()] = value.strip()
-
-        existing = {}
-        if file_exists("/sd/power_config.txt"):
-            with open("/sd/power_config.txt", "r") as src:
-                for line in src:
-                    if '=' in line:
-                        key, value = line.strip().split('=', 1)
-                        existing[key.strip()] = value.strip()
-
-        # Defaults fuer fehlende Werte sicherstellen
-        if 'DISPLAY_AUTO' not in existing:
-            existing['DISPLAY_AUTO'] = 'true'
-        if 'DISPLAY_ON_TIME' not in existing:
-            existing['DISPLAY_ON_TIME'] = '07:00'
-        if 'DISPLAY_OFF_TIME' not in existing:
-            existing['DISPLAY_OFF_TIME'] = '22:00'
-        if 'BRIGHTNESS_DAY' not in existing:
-            existing['BRIGHTNESS_DAY'] = '64'
-        if 'BRIGHTNESS_NIGHT' not in existing:
-            existing['BRIGHTNESS_NIGHT'] = '16'
-        if 'LED_POWER_MODE' not in existing:
-            existing['LED_POWER_MODE'] = 'normal'
-        if 'VOLUME_PERCENT' not in existing:
-            if 'VOLUME_DEFAULT' in existing:
-                existing['VOLUME_PERCENT'] = existing['VOLUME_DEFAULT']
-            else:
-                existing['VOLUME_PERCENT'] = '50'
-        # Alte Keys entfernen, damit Config sauber bleibt
-        if 'VOLUME_DEFAULT' in existing:
-            existing.pop('VOLUME_DEFAULT', None)
-        if 'VOLUME_NIGHT' in existing:
-            existing.pop('VOLUME_NIGHT', None)
-
-        def _valid_time(ts):
-            try:
-                if len(ts) != 5 or ts[2] != ':':
-                    return False
-                hh = int(ts[:2]); mm = int(ts[3:])
-                return 0 <= hh <= 23 and 0 <= mm <= 59
-            except Exception:
-                return False
+        from power_management import get_config_store, flush_settings
+        store = get_config_store()
 
-        auto = 'true' if incoming.get('DISPLAY_AUTO', existing.get('DISPLAY_AUTO', 'true')).lower() == 'true' else 'false'
-        on_t = incoming.get('DISPLAY_ON_TIME', existing.get('DISPLAY_ON_TIME', '07:00'))
-        off_t = incoming.get('DISPLAY_OFF_TIME', existing.get('DISPLAY_OFF_TIME', '22:00'))
-        if not _valid_time(on_t):
+        auto = 'true' if incoming.get('DISPLAY_AUTO', store.get('DISPLAY_AUTO', 'true')).lower() == 'true' else 'false'
+        on_t = incoming.get('DISPLAY_ON_TIME', store.get('DISPLAY_ON_TIME', '07:00'))
+        off_t = incoming.get('DISPLAY_OFF_TIME', store.get('DISPLAY_OFF_TIME', '22:00'))
+        if not _valid_hhmm(on_t):
             on_t = '07:00'
-        if not _valid_time(off_t):
+        if not _valid_hhmm(off_t):
             off_t = '22:00'
 
-        existing['DISPLAY_AUTO'] = auto
-        existing['DISPLAY_ON_TIME'] = on_t
-        existing['DISPLAY_OFF_TIME'] = off_t
-
-        defaults_order = [
-            'DISPLAY_AUTO',
-            'DISPLAY_ON_TIME',
-            'DISPLAY_OFF_TIME',
-            'BRIGHTNESS_DAY',
-            'BRIGHTNESS_NIGHT',
-            'LED_POWER_MODE',
-            'VOLUME_PERCENT',
-            'DISPLAY_STATE'
-        ]
-
-        tmp_path = "/sd/power_config.tmp"
-        with open(tmp_path, "w") as f:
-            for key in defaults_order:
-                if key in existing:
-                    f.write("{}={}\n".format(key, existing[key]))
-            for key, value in existing.items():
-                if key not in defaults_order:
-                    f.write("{}={}\n".format(key, value))
-            f.flush()
+        # Nur geaenderte Keys markieren den Store als dirty
+        store.update({
+            'DISPLAY_AUTO': auto,
+            'DISPLAY_ON_TIME': on_t,
+            'DISPLAY_OFF_TIME': off_t,
+        })
 
-        try:
-            os.replace(tmp_path, "/sd/power_config.txt")
-        except AttributeError:
-            os.rename(tmp_path, "/sd/power_config.txt")
-        except OSError:
-            try:
-                os.remove("/sd/power_config.txt")
-            except OSError:
-                pass
-            os.rename(tmp_path, "/sd/power_config.txt")
-        
-        # Garantiertes Sync mit Error-Handling
-        try:
-            os.sync()
-        except Exception as e:
-            log_message(log_path, "[Sync Fehler nach Display Settings] {}".format(str(e)))
+        # Web-Save ist eine bewusste Aktion → sofort (ein Write) persistieren
+        if not flush_settings(log_path, force=True):
+            log_message(log_path, "[Sync Fehler nach Display Settings] Schreiben fehlgeschlagen")
+            return False
 
-        try:
-            from power_management import reload_settings
-            reload_settings()
-        except Exception as e:
-            log_message(log_path, "[Power Settings] Reload nach Save fehlgeschlagen: {}".format(str(e)))
-        
         log_message(log_path, "Display-Einstellungen gespeichert.")
+        return True
     except Exception as e:
         log_message(log_path, "Fehler beim Speichern der Display-Einstellungen: " + str(e))
+        return False
+
+
+def _save_display_settings_unsafe(body, log_path=None):
+    incoming = {}
+    for line in body.strip().split('\n'):
+        if '=' in line:
+            key, value = line.split('=', 1)
+            incoming[key.strip()] = value.strip()
+    return _apply_display_settings(incoming, log_path)
 
 
 def _save_display_settings(body, log_path=None):
@@ -785,25 +1672,15 @@ def _save_display_settings(body, log_path=None):
 
 def _load_display_settings():
     try:
-        settings = {
-            'DISPLAY_AUTO': 'true',
-            'DISPLAY_ON_TIME': '07:00',
-            'DISPLAY_OFF_TIME': '22:00',
-            'LED_POWER_MODE': 'normal',
-            'VOLUME_PERCENT': '50'
+        from power_management import get_config_store
+        store = get_config_store()
+        return {
+            'DISPLAY_AUTO': store.get('DISPLAY_AUTO', 'true'),
+            'DISPLAY_ON_TIME': store.get('DISPLAY_ON_TIME', '07:00'),
+            'DISPLAY_OFF_TIME': store.get('DISPLAY_OFF_TIME', '22:00'),
+            'LED_POWER_MODE': store.get('LED_POWER_MODE', 'normal'),
+            'VOLUME_PERCENT': store.get('VOLUME_PERCENT', '50')
         }
-        if file_exists("/sd/power_config.txt"):
-            with open("/sd/power_config.txt", "r") as f:
-                for line in f:
-                    if '=' in line:
-                        key, value = line.strip().split('=', 1)
-                        key = key.strip()
-                        value = value.strip()
-                        if key in settings:  # Nur relevante Keys laden
-                            settings[key] = value
-                        elif key == 'VOLUME_DEFAULT':  # Abwärtskompatibilität
-                            settings['VOLUME_PERCENT'] = value
-        return settings
     except Exception:
         return {
             'DISPLAY_AUTO': 'true',
@@ -817,32 +1694,194 @@ def _load_display_settings():
 # --------------------------------------------------------------------
 #   Index-Seite mit integrierten Display-Einstellungen
 # --------------------------------------------------------------------
-def _serve_index_page(cl, log_path=None):
-    """Memory-optimierte Index-Seite mit chunked streaming und aggressiver GC"""
+# --------------------------------------------------------------------
+#   Index-Seite: einmal rendern, danach als Datei ausliefern
+# --------------------------------------------------------------------
+# Jede Render-Generation bekommt eine eigene Datei (index_cache.<gen>.html): ein
+# laufender Stream liest so nie eine Datei, die gerade neu geschrieben wird.
+_INDEX_CACHE_PATH = "/sd/index_cache.html"
+_index_cache_path = None          # Datei der aktuellen Generation
+_index_readers = {}               # Pfad → Anzahl laufender Streams
+_index_cache_valid = False
+_index_cache_store_version = -1   # ConfigStore.version beim Rendern
+_index_cache_etag = None
+_index_cache_modified = None
+_index_cache_size = 0
+_index_cache_generation = 0
+_HTTP_WDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_HTTP_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun",
+                "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+def invalidate_index_cache(_alarms=None):
+    """Erzwingt neues Rendern beim naechsten Aufruf von / (nach Speichervorgaengen)."""
+    global _index_cache_valid
+    _index_cache_valid = False
+
+
+# Jede Alarm-Aenderung (Web, Uhr, reload) macht die gerenderte Seite ungueltig
+alarm_store.subscribe(invalidate_index_cache)
+
+
+def _http_date(t=None):
+    import time
+    tm = time.gmtime(t) if t is not None else time.gmtime()
+    return "{}, {:02d} {} {} {:02d}:{:02d}:{:02d} GMT".format(
+        _HTTP_WDAYS[tm[6]], tm[2], _HTTP_MONTHS[tm[1] - 1], tm[0], tm[3], tm[4], tm[5])
+
+
+class _FileSink:
+    """sendall()-Adapter, mit dem die Streaming-Renderer in eine Datei schreiben."""
+    def __init__(self, f):
+        self.f = f
+        self.size = 0
+
+    def sendall(self, data):
+        self.f.write(data)
+        self.size += len(data)
+
+
+def _index_cache_file(generation):
+    base, ext = _INDEX_CACHE_PATH.rsplit(".", 1)
+    return "{}.{}.{}".format(base, generation, ext)
+
+
+def _remove_index_file(path):
     try:
-        # AGGRESSIVE Memory Cleanup vor HTML-Rendering
-        import gc
-        for _ in range(3):  # Mehrere GC-Durchlaeufe
-            gc.collect()
-        
-        # Memory-Safe: Stream HTML in kleinen Chunks
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _remove_stale_index_files():
+    """Beim ersten Rendern nach dem Boot: Cache-Dateien frueherer Laeufe entfernen."""
+    folder, name = _INDEX_CACHE_PATH.rsplit("/", 1)
+    prefix = name.rsplit(".", 1)[0] + "."
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return
+    for entry in names:
+        if entry.startswith(prefix):
+            _remove_index_file(folder + "/" + entry)
+
+
+def _release_index_file(path):
+    """Stream einer Generation beendet; veraltete Dateien ohne Leser werden geloescht."""
+    count = _index_readers.get(path, 0) - 1
+    if count > 0:
+        _index_readers[path] = count
+        return
+    _index_readers.pop(path, None)
+    if path != _index_cache_path:
+        _remove_index_file(path)
+
+
+def _config_store_version():
+    try:
+        from power_management import get_config_store
+        store = get_config_store()
+        store.values()  # erst laden – load() zaehlt die Version hoch
+        return store.version
+    except Exception:
+        return -1
+
+
+def _ensure_index_cache(log_path=None):
+    """Rendert die Index-Seite bei Bedarf neu. Gibt True zurueck, wenn der Cache gueltig ist."""
+    global _index_cache_valid, _index_cache_store_version, _index_cache_etag
+    global _index_cache_modified, _index_cache_size, _index_cache_generation, _index_cache_path
+
+    store_version = _config_store_version()
+    if _index_cache_valid and store_version == _index_cache_store_version:
+        return True
+
+    import gc
+    gc.collect()
+    if _index_cache_path is None:
+        _remove_stale_index_files()
+    generation = _index_cache_generation + 1
+    path = _index_cache_file(generation)
+    try:
+        with open(path, "wb") as f:
+            sink = _FileSink(f)
+            _send_html_chunks(sink, log_path)
+    except Exception as e:
+        log_message(log_path, "Index-Cache konnte nicht geschrieben werden: {}".format(str(e)))
+        _remove_index_file(path)
+        _index_cache_valid = False
+        return False
+    finally:
+        gc.collect()
+
+    import time
+    # Alte Generation sofort loeschen – oder beim letzten _release_index_file()
+    old_path = _index_cache_path
+    _index_cache_path = path
+    if old_path and not _index_readers.get(old_path):
+        _remove_index_file(old_path)
+    _index_cache_generation = generation
+    _index_cache_size = sink.size
+    # Renderzeit im ETag, damit ein Neustart (Generation wieder 1) keine alten Tags bestaetigt
+    _index_cache_etag = '"idx-{:x}-{}-{}"'.format(int(time.time()), _index_cache_generation, sink.size)
+    _index_cache_modified = _http_date()
+    _index_cache_store_version = store_version
+    _index_cache_valid = True
+    log_message(log_path, "Index-Seite neu gerendert ({} Bytes).".format(sink.size))
+    return True
+
+
+def _prepare_index_response(cl, log_path=None, headers=None):
+    """
+    Sendet 304 oder den 200-Header fuer die gecachte Index-Seite.
+    Gibt den Pfad des zu streamenden Bodys zurueck (None = bereits fertig);
+    Header und Datei gehoeren zur selben Generation. Der Aufrufer gibt den
+    Pfad nach dem Stream mit _release_index_file() frei.
+    Faellt bei Cache-Fehlern auf das direkte Streaming zurueck.
+    """
+    if not _ensure_index_cache(log_path):
         _send_http_header(cl)
         _send_html_chunks(cl, log_path)
-        
-        # SOFORTIGE Memory-Bereinigung nach Request
-        gc.collect()
-        log_message(log_path, "Index-Seite gestreamt (Memory-Safe).")
+        return None
+
+    headers = headers or {}
+    etag = headers.get("if-none-match")
+    since = headers.get("if-modified-since")
+    if (etag and etag == _index_cache_etag) or (not etag and since == _index_cache_modified):
+        cl.sendall((
+            "HTTP/1.1 304 Not Modified\r\nETag: {}\r\nLast-Modified: {}\r\n"
+            "Connection: close\r\n\r\n"
+        ).format(_index_cache_etag, _index_cache_modified).encode())
+        return None
+
+    cl.sendall((
+        "HTTP/1.1 200 OK\r\nContent-Type:text/html; charset=UTF-8\r\nContent-Length: {}\r\n"
+        "ETag: {}\r\nLast-Modified: {}\r\nCache-Control: no-cache\r\n"
+        "X-Content-Type-Options: nosniff\r\nConnection: close\r\n\r\n"
+    ).format(_index_cache_size, _index_cache_etag, _index_cache_modified).encode())
+    path = _index_cache_path
+    _index_readers[path] = _index_readers.get(path, 0) + 1
+    return path
+
+
+def _serve_index_page(cl, log_path=None, headers=None):
+    """Index-Seite aus dem Cache (mit ETag/304), gerendert nur nach Aenderungen"""
+    try:
+        path = _prepare_index_response(cl, log_path, headers)
+        if not path:
+            return
+        try:
+            _send_file_range(cl, path, 0, None, log_path)
+        finally:
+            _release_index_file(path)
         
     except Exception as e:
         try:
-            log_message(log_path, "Fehler beim Erzeugen der Index-Seite: {}".format(str(e)))
+            log_message(log_path, "Fehler beim Senden der Index-Seite: {}".format(str(e)))
         except:
             pass  # Falls log_path None ist
+        invalidate_index_cache()
         _send_error_response(cl, 500, "Interner Fehler")
-    finally:
-        # GARANTIERTE Cleanup
-        import gc
-        gc.collect()
 
 
 def _send_http_header(cl):
@@ -867,8 +1906,7 @@ def _send_html_chunks(cl, log_path=None):
     
     # Chunk 2: Alarm-Bloecke (Memory-sparend laden)
     try:
-        alarme = _load_alarms("/sd/alarm.txt")
-        _send_alarm_blocks_safe(cl, alarme)
+        _send_alarm_blocks_safe(cl, alarm_store.alarms(log_path))
     except Exception as e:
         try:
             cl.sendall(b"<fieldset><p class='status-line'>Alarme konnten nicht geladen werden.</p></fieldset>")
@@ -914,11 +1952,13 @@ def _send_html_chunks(cl, log_path=None):
 def _send_alarm_blocks_safe(cl, alarme):
     """Memory-sichere Alarm-Block uebertragung"""
     import gc
-    all_alarms = alarme + [("", "", [], "")] * (5 - len(alarme))
-    
-    for i, (zeit, text, tage, aktiv) in enumerate(all_alarms):
-        # Alarm-Block einzeln generieren und senden
-        block = _generate_alarm_block(zeit, text, tage, aktiv)
+    for i in range(alarm_store.MAX_ALARMS):
+        # Alarm-Block einzeln generieren und senden (leere Bloecke fuer freie Plaetze)
+        if i < len(alarme):
+            alarm = alarme[i]
+            block = _generate_alarm_block(alarm.time_str(), alarm.text, alarm.day_names(), alarm.active)
+        else:
+            block = _generate_alarm_block("", "", [], False)
         cl.sendall(block.encode())
         
         # Memory cleanup alle 2 Bloecke
@@ -1051,24 +2091,6 @@ def _send_error_response(cl, code, message):
 # Alte _send_display_block entfernt - nur _send_display_block_safe wird verwendet
 
 
-def _load_alarms(path):
-    alarme, alarm = [], {}
-    if not file_exists(path):
-        return alarme
-    with open(path) as f:
-        for line in f:
-            line = line.strip()
-            if line == "---":
-                if set(alarm) >= {"TIME", "TEXT", "DAYS", "STATUS"}:
-                    tage = alarm["DAYS"].split(",") if alarm["DAYS"] != "-" else []
-                    alarme.append((alarm["TIME"], alarm["TEXT"], tage, alarm["STATUS"]))
-                alarm = {}
-            elif "=" in line:
-                k, v = line.split("=", 1)
-                alarm[k.strip()] = v.strip()
-    return alarme[:5]  # maximal fuenf zurueckliefern
-
-
 # Alte _render_index() und INDEX_TEMPLATE entfernt - ersetzt durch Streaming-System (_send_html_chunks)
 
 JS_SNIPPET = """